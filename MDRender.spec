@@ -20,15 +20,45 @@ a = Analysis(
         'gui.editor',
         'gui.preview',
         'gui.toolbar',
+        'gui.document_tab',
+        'gui.search_panel',
+        'gui.memory_dialog',
+        'gui.metrics_panel',
         'core',
         'core.markdown_processor',
         'core.file_handler',
         'core.themes',
         'core.exporter',
+        'core.front_matter',
+        'core.layouts',
+        'core.site_builder',
+        'core.render_server',
+        'core.daemon',
+        'core.memory',
+        'core.metrics',
+        'core.tracing',
+        'core.large_tables',
+        'core.large_code',
+        'core.block_context',
+        'core.blocks',
+        'core.document_model',
+        'core.render_scheduler',
+        'core.bundled_assets',
+        'core.diagrams',
+        'core.processor_pool',
+        'core.preview_state',
+        'core.workspace_index',
+        'core.merge',
+        'core.outline',
+        'core.link_index',
+        'core.link_checker',
+        'core.image_assets',
+        'core.image_probe',
         'utils',
         'utils.config_manager',
         'utils.shortcuts',
         'utils.helpers',
+        'utils.file_watcher',
         'config',
         # Markdown extensions
         'markdown.extensions.extra',
@@ -46,6 +76,8 @@ a = Analysis(
         'pymdownx.mark',
         'pymdownx.tilde',
         'pymdownx.keys',
+        'pymdownx.arithmatex',
+        'PyQt6.QtWebChannel',
         # Pygments
         'pygments',
         'pygments.lexers',
@@ -31,6 +31,14 @@ if (Test-Path $VenvActivate) {
         Remove-Item -Recurse -Force "dist"
     }
     
+    # Bundle Mermaid/KaTeX so diagrams and math render offline
+    Write-Host "Fetching bundled assets..." -ForegroundColor Green
+    python fetch_assets.py
+    if ($LASTEXITCODE -ne 0) {
+        Write-Host "`nCould not fetch the bundled assets! Check the errors above." -ForegroundColor Red
+        exit 1
+    }
+    
     # Build using spec file
     Write-Host "Building executable..." -ForegroundColor Green
     pyinstaller MDRender.spec --clean
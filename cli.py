@@ -0,0 +1,175 @@
+"""
+Command line rendering for editors, scripts and git hooks
+
+Requests go to a background render daemon (see core/daemon.py), started on
+first use, so repeated calls skip importing the Markdown stack. Without a
+daemon the file is rendered in this process.
+
+    mdrender render FILE [-o OUT] [--theme github] [--fragment]
+                         [--asset-mode cdn] [--no-daemon]
+    mdrender stats FILE [--no-daemon]
+    mdrender daemon start|stop|status|run [--idle-timeout 600]
+
+mdrender and mdrender.cmd launch this script; 'python cli.py' works too.
+
+Options before the command: --socket PATH (or --port N) for another daemon.
+
+FILE may be '-' to read standard input.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from core.daemon import (DaemonClient, DaemonError, daemon_address, run_daemon,
+                         start_daemon, stop_daemon)
+import config
+
+def read_source(name: str) -> tuple[str, Path]:
+    """Read a Markdown file, or standard input for '-', and get its folder"""
+    if name == '-':
+        return sys.stdin.read(), Path.cwd()
+    path = Path(name).resolve()
+    return path.read_text(encoding='utf-8'), path.parent
+
+def render_in_process(op: str, params: dict) -> tuple[int, dict]:
+    """Handle a request without the daemon"""
+    from core.render_server import RenderService
+    try:
+        return 200, json.loads(RenderService(workers=1).respond(op, params))
+    except ValueError as e:
+        return 400, {'error': str(e)}
+
+def send(op: str, params: dict, address, use_daemon: bool) -> tuple[int, dict]:
+    """Send a request to the daemon, starting it if needed"""
+    if not use_daemon:
+        return render_in_process(op, params)
+    client = DaemonClient(address)
+    try:
+        for attempt in range(2):
+            try:
+                return client.request('POST', f'/{op}', params)
+            except DaemonError:
+                if attempt or not start_daemon(address):
+                    break
+    finally:
+        client.close()
+    print("Warning: Render daemon unavailable, rendering in process", file=sys.stderr)
+    return render_in_process(op, params)
+
+def command_render(args, address) -> int:
+    """Render a file to HTML"""
+    try:
+        markdown_text, source_dir = read_source(args.file)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: Could not read {args.file}: {e}", file=sys.stderr)
+        return 1
+    params = {
+        'markdown': markdown_text,
+        'theme': args.theme,
+        'standalone': not args.fragment,
+        'asset_mode': args.asset_mode,
+        'source_dir': str(source_dir),
+    }
+    status, result = send('render', params, address, not args.no_daemon)
+    if status != 200:
+        print(f"Error: {result.get('error', status)}", file=sys.stderr)
+        return 1
+    
+    if args.output:
+        try:
+            Path(args.output).write_text(result['html'], encoding='utf-8')
+        except OSError as e:
+            print(f"Error: Could not write {args.output}: {e}", file=sys.stderr)
+            return 1
+    else:
+        sys.stdout.write(result['html'])
+    return 0
+
+def command_stats(args, address) -> int:
+    """Print document statistics"""
+    try:
+        markdown_text, _ = read_source(args.file)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: Could not read {args.file}: {e}", file=sys.stderr)
+        return 1
+    status, result = send('statistics', {'markdown': markdown_text}, address, not args.no_daemon)
+    if status != 200:
+        print(f"Error: {result.get('error', status)}", file=sys.stderr)
+        return 1
+    for name, value in result.items():
+        print(f"{name}: {value}")
+    return 0
+
+def command_daemon(args, address) -> int:
+    """Start, stop, query or run the daemon"""
+    if args.action == 'run':
+        return run_daemon(address, args.idle_timeout)
+    if args.action == 'start':
+        client = DaemonClient(address, timeout=1)
+        running = client.is_running()
+        client.close()
+        if running:
+            print(f"Render daemon already running at {address}")
+            return 0
+        if not start_daemon(address, args.idle_timeout):
+            print(f"Error: Render daemon did not start, see {config.DAEMON_LOG}", file=sys.stderr)
+            return 1
+        print(f"Render daemon started at {address}")
+        return 0
+    if args.action == 'stop':
+        if not stop_daemon(address):
+            print("No render daemon running")
+            return 1
+        print("Render daemon stopped")
+        return 0
+    
+    client = DaemonClient(address, timeout=5)
+    try:
+        _, health = client.request('GET', '/health')
+    except DaemonError:
+        print("No render daemon running")
+        return 1
+    finally:
+        client.close()
+    print(f"Render daemon running at {address}")
+    for name, value in health.items():
+        print(f"  {name}: {value}")
+    return 0
+
+def main(argv=None) -> int:
+    """Parse the command line and run a command"""
+    parser = argparse.ArgumentParser(prog="mdrender", description=f"{config.APP_NAME} command line")
+    parser.add_argument('--socket', help=f"daemon Unix socket (default: {config.DAEMON_SOCKET})")
+    parser.add_argument('--port', type=int, help="daemon TCP port where Unix sockets are missing")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    render = commands.add_parser('render', help="render a Markdown file to HTML")
+    render.add_argument('file', help="Markdown file, or - for standard input")
+    render.add_argument('-o', '--output', help="write HTML here instead of standard output")
+    render.add_argument('--theme', default=config.DEFAULT_THEME)
+    render.add_argument('--fragment', action='store_true', help="body HTML only, no document")
+    render.add_argument('--asset-mode', default='cdn', choices=('cdn', 'inline', 'link'))
+    render.add_argument('--no-daemon', action='store_true', help="render in this process")
+    
+    stats = commands.add_parser('stats', help="print document statistics")
+    stats.add_argument('file', help="Markdown file, or - for standard input")
+    stats.add_argument('--no-daemon', action='store_true', help="count in this process")
+    
+    daemon = commands.add_parser('daemon', help="manage the background render daemon")
+    daemon.add_argument('action', choices=('start', 'stop', 'status', 'run'))
+    daemon.add_argument('--idle-timeout', type=float, default=config.DAEMON_IDLE_TIMEOUT,
+                        help="seconds without requests before the daemon exits")
+    args = parser.parse_args(argv)
+    
+    if args.socket:
+        address = args.socket
+    elif args.port:
+        address = (config.RENDER_SERVER_HOST, args.port)
+    else:
+        address = daemon_address()
+    
+    handlers = {'render': command_render, 'stats': command_stats, 'daemon': command_daemon}
+    return handlers[args.command](args, address)
+
+if __name__ == "__main__":
+    sys.exit(main())
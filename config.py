@@ -1,6 +1,8 @@
 """
 Configuration settings for Markdown Renderer
 """
+import hashlib
+import html
 import os
 import sys
 from pathlib import Path
@@ -21,6 +23,9 @@ else:
 RESOURCES_DIR = BASE_DIR / "resources"
 THEMES_DIR = RESOURCES_DIR / "themes"
 TEMPLATES_DIR = RESOURCES_DIR / "templates"
+LAYOUTS_DIR = RESOURCES_DIR / "layouts"  # HTML layouts for exports
+PREVIEW_SCRIPT_FILE = RESOURCES_DIR / "preview" / "preview.js"
+VENDOR_DIR = RESOURCES_DIR / "vendor"  # populated by fetch_assets.py
 CONFIG_DIR = Path.home() / ".mdrender"
 
 # Ensure config directory exists
@@ -29,6 +34,8 @@ CONFIG_DIR.mkdir(exist_ok=True)
 # Configuration Files
 SETTINGS_FILE = CONFIG_DIR / "settings.yaml"
 RECENT_FILES_FILE = CONFIG_DIR / "recent_files.txt"
+WEB_CACHE_DIR = CONFIG_DIR / "webengine"
+INDEX_DIR = CONFIG_DIR / "index"  # one workspace search index per folder
 
 # Editor Settings
 DEFAULT_FONT_FAMILY = "Consolas" if os.name == "nt" else "Monaco"
@@ -37,6 +44,8 @@ EMOJI_FALLBACK_FONTS = ["Segoe UI Emoji", "Segoe UI Symbol", "Apple Color Emoji"
 DEFAULT_FONT_SIZE = 11
 DEFAULT_TAB_SIZE = 4
 AUTO_SAVE_INTERVAL = 60  # seconds
+FILE_WATCH_DEBOUNCE_MS = 300  # quiet time before reacting to external changes
+FILE_WATCH_POLL_MS = 2000  # for files the OS cannot watch
 MAX_RECENT_FILES = 10
 
 # Preview Settings
@@ -44,6 +53,57 @@ DEFAULT_THEME = "github"
 SYNC_SCROLL_ENABLED = True
 DEFAULT_ZOOM = 100
 
+# Preview Scheduling (adaptive debounce)
+PREVIEW_MIN_DELAY_MS = 30
+PREVIEW_MAX_DELAY_MS = 1500
+PREVIEW_MAX_WAIT_MS = 2000  # None to disable
+PREVIEW_COST_MULTIPLIER = 2.0  # delay relative to the smoothed render cost
+PREVIEW_COST_SMOOTHING = 0.3  # weight of the newest render sample
+PREVIEW_TYPING_MULTIPLIER = 1.5  # delay relative to the usual keystroke gap
+PREVIEW_TYPING_BURST_GAP_MS = 1000  # longer gaps end a typing burst
+PREVIEW_TYPING_SAMPLES = 20
+
+# Block Rendering (preview)
+FRAGMENT_CACHE_SIZE = 4096  # rendered blocks kept across edits
+PROGRESSIVE_RENDER_MIN_BLOCKS = 150  # smaller documents render in one pass
+PROGRESSIVE_CHUNK_BUDGET_MS = 12  # render time per background chunk
+LARGE_TABLE_MIN_ROWS = 500  # larger tables are virtualized (exports keep full tables)
+LARGE_CODE_MIN_LINES = 500  # larger fenced blocks are highlighted lazily (exports in full)
+LARGE_CODE_HIGHLIGHT_LINES = 200  # lines highlighted up front
+LARGE_CODE_CHUNK_LINES = 200  # lines highlighted per request from the preview
+VIRTUAL_PREVIEW_MIN_BLOCKS = 2000  # longer documents only mount blocks near the view
+
+# Document Tabs
+PROCESSOR_POOL_SIZE = 1  # processors shared by all tabs (the GUI renders on one thread)
+PREVIEW_STATE_CACHE_SIZE = 32  # evicted previews whose rendered blocks are kept
+TAB_MAX_LIVE_PREVIEWS = 4  # web views kept alive, including the current tab
+TAB_PREVIEW_IDLE_SECONDS = 300  # background previews unused this long are evicted
+TAB_EVICTION_CHECK_MS = 30000
+
+# Memory budget for long sessions (Help > Memory Diagnostics)
+MEMORY_BUDGET_BYTES = 1536 * 1024 * 1024  # application plus web engine, resident
+MEMORY_CHECK_MS = 15000
+MEMORY_RELEASE_COOLDOWN = 120  # seconds before caches are released again
+MEMORY_PS_TIMEOUT = 2  # seconds to wait for "ps" where /proc is missing
+UNDO_HISTORY_MAX_BYTES = 64 * 1024 * 1024  # per document; cleared when exceeded
+
+# Metrics
+METRICS_NAMESPACE = "mdrender"  # prefix of exported metric names
+METRICS_REFRESH_MS = 1000  # metrics panel refresh while visible
+
+# Tracing (Help > Record Trace, or MDRENDER_TRACE=1 to trace from startup)
+TRACE_ENABLED = os.environ.get('MDRENDER_TRACE') == '1'
+TRACE_FILE = CONFIG_DIR / "traces" / "trace.json"  # Chrome trace-event format
+TRACE_MAX_BYTES = 16 * 1024 * 1024  # rotated beyond this
+TRACE_BACKUPS = 3
+
+# Workspace Search
+INDEX_IGNORED_DIRS = {'node_modules', '__pycache__', 'venv', 'site-packages'}  # plus hidden dirs
+INDEX_COMMIT_BATCH = 200  # files indexed per transaction
+SEARCH_MAX_RESULTS = 50
+HEADING_SLUG_CACHE_SIZE = 8192  # heading anchors computed with the toc extension
+FRONT_MATTER_CACHE_SIZE = 1024  # parsed YAML front matter, keyed by its source
+
 # Window Settings
 DEFAULT_WINDOW_WIDTH = 1200
 DEFAULT_WINDOW_HEIGHT = 800
@@ -66,8 +126,14 @@ MARKDOWN_EXTENSIONS = [
     'pymdownx.mark',
     'pymdownx.tilde',
     'pymdownx.keys',
+    'pymdownx.arithmatex',
 ]
 
+def _mermaid_fence(src, language, class_name, options, md, **kwargs):
+    """Render a mermaid fence as a diagram container keyed by a hash of its source"""
+    key = hashlib.blake2b(src.encode('utf-8'), digest_size=8).hexdigest()
+    return f'<div class="mermaid" data-diagram="{key}">{html.escape(src, quote=False)}</div>'
+
 MARKDOWN_EXTENSION_CONFIGS = {
     'pymdownx.highlight': {
         'use_pygments': True,
@@ -78,7 +144,7 @@ MARKDOWN_EXTENSION_CONFIGS = {
             {
                 'name': 'mermaid',
                 'class': 'mermaid',
-                'format': lambda src: f'<div class="mermaid">{src}</div>'
+                'format': _mermaid_fence
             }
         ]
     },
@@ -95,13 +161,50 @@ MARKDOWN_EXTENSION_CONFIGS = {
     },
     'markdown.extensions.toc': {
         'permalink': True,
-    }
+    },
+    'pymdownx.arithmatex': {
+        'generic': True,
+    },
 }
 
+# Diagram and math libraries (bundled under VENDOR_DIR, CDN as fallback)
+MERMAID_VERSION = "11.4.1"
+KATEX_VERSION = "0.16.11"
+DIAGRAM_CACHE_SIZE = 512  # rendered Mermaid SVGs kept for exports
+IMAGE_PROBE_CACHE_SIZE = 4096  # image sizes read from file headers
+
 # Export Settings
 EXPORT_DEFAULT_FORMAT = "html"
 PDF_PAGE_SIZE = "A4"
 PDF_MARGIN = "2cm"
+EXPORT_ASSET_MODE = "inline"  # inline, link or cdn
+EXPORT_LAYOUT = "default"  # layout name in LAYOUTS_DIR, or front matter "layout:"
+IMAGE_INLINE_MAX_BYTES = 32 * 1024  # larger images are copied to assets/images
+SITE_CONTENTS_PAGE = "contents.html"  # page listing every page of a built site
+
+# Link checking during batch export
+LINK_CHECK_REMOTE = False  # send a HEAD request for every external link
+LINK_CHECK_ENDPOINT = None  # HTTP proxy for HEAD requests, e.g. a local stub
+LINK_CHECK_CONCURRENCY = 16
+LINK_CHECK_TIMEOUT = 10  # seconds
+
+# Render server (server.py)
+RENDER_SERVER_HOST = "127.0.0.1"
+RENDER_SERVER_PORT = 8765
+RENDER_SERVER_WORKERS = 4  # Markdown processors, each on its own thread
+RENDER_SERVER_QUEUE_SIZE = 64  # requests waiting for a processor before 503
+RENDER_SERVER_CACHE_SIZE = 1024  # responses kept by content hash
+RENDER_SERVER_BATCH_MAX = 256  # requests per /batch call
+RENDER_SERVER_MAX_BODY_BYTES = 16 * 1024 * 1024
+RENDER_SERVER_KEEPALIVE_TIMEOUT = 30  # seconds an idle connection stays open
+
+# Render daemon (cli.py): a warm render server reused by command line calls
+DAEMON_SOCKET = CONFIG_DIR / "daemon.sock"
+DAEMON_LOG = CONFIG_DIR / "daemon.log"
+DAEMON_PORT = 8766  # used where Unix sockets are not available
+DAEMON_WORKERS = 1
+DAEMON_IDLE_TIMEOUT = 600  # seconds without requests before the daemon exits
+DAEMON_SPAWN_TIMEOUT = 10  # seconds to wait for a new daemon to answer
 
 # Keyboard Shortcuts (default)
 SHORTCUTS = {
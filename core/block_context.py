@@ -0,0 +1,163 @@
+"""
+Document-wide context for blocks rendered on their own: footnotes and
+heading ids
+
+The preview renders each top-level block separately. Footnote
+definitions are handed to every block with the other definitions (see
+split_blocks), so references are numbered and linked as in the whole
+document; a block's footnote list is then cut down to the footnotes the
+block itself defines. Repeated heading titles get their _1, _2 suffixes
+from the whole document, so ids match the preview's table of contents.
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from core.link_checker import CollectedLinks
+from core.outline import Heading, scan_outline
+
+# Footnote definitions in a block's source
+FOOTNOTE_ID_PATTERN = re.compile(r'^ {0,3}\[\^([^\]]+)\]:', re.MULTILINE)
+
+# Heading element with an id, e.g. from the toc extension
+HEADING_ID_PATTERN = re.compile(r'<(h[1-6])([^>]*?) id="([^"]*)"([^>]*)>(.*?)</\1>', re.DOTALL)
+
+# Suffix the toc extension gives repeated ids
+DUPLICATE_SUFFIX_PATTERN = re.compile(r'_\d+$')
+
+class BlockFootnotesTreeprocessor(Treeprocessor):
+    """Drop the footnotes a block does not define from its footnote list"""
+    
+    def __init__(self, md):
+        super().__init__(md)
+        self.keep: Optional[set] = None  # footnote names; None keeps all
+    
+    def run(self, root):
+        if self.keep is None or 'footnote' not in self.md.treeprocessors:
+            return
+        footnotes = self.md.treeprocessors['footnote'].footnotes
+        wanted = {footnotes.makeFootnoteId(name) for name in self.keep}
+        for div in root.findall("div[@class='footnote']"):
+            items = div.find('ol')
+            if items is not None:
+                for item in list(items):
+                    if item.get('id') not in wanted:
+                        items.remove(item)
+            if items is None or not len(items):
+                root.remove(div)
+
+class BlockFootnotesExtension(Extension):
+    """Let block rendering choose which footnotes are listed"""
+    
+    def extendMarkdown(self, md):
+        self.processor = BlockFootnotesTreeprocessor(md)
+        # After the footnotes extension added its list
+        md.treeprocessors.register(self.processor, 'block_footnotes', 45)
+
+def defined_footnotes(block_text: str) -> set:
+    """Get the names of the footnotes a block defines"""
+    return set(FOOTNOTE_ID_PATTERN.findall(block_text))
+
+def block_heading_ids(headings: List[Heading], start_lines, end_lines,
+                      block_text) -> Dict[int, List[str]]:
+    """
+    Find the blocks whose headings get other ids in the whole document
+    than when rendered alone
+    
+    Args:
+        headings: Headings of the document, from scan_outline
+        start_lines: First line of each block, ascending
+        end_lines: Line after each block
+        block_text: Gets a block's source by index
+    
+    Returns:
+        Dictionary of block index to the document's ids of its headings
+    """
+    by_block: Dict[int, List[str]] = {}
+    for heading in headings:
+        index = bisect_right(start_lines, heading.line) - 1
+        if index >= 0 and heading.line < end_lines[index]:
+            by_block.setdefault(index, []).append(heading.anchor)
+    
+    result = {}
+    for index, anchors in by_block.items():
+        # Only repeated titles are numbered differently
+        if not any(DUPLICATE_SUFFIX_PATTERN.search(anchor) for anchor in anchors):
+            continue
+        local = [heading.anchor for heading in scan_outline(block_text(index)).headings]
+        if local != anchors:
+            result[index] = anchors
+    return result
+
+def apply_heading_ids(fragment: str, anchors: Optional[List[str]]) -> str:
+    """
+    Give the headings of a rendered block their ids in the whole document
+    
+    Args:
+        fragment: Rendered block
+        anchors: Ids of the block's headings in order, or None to keep
+            the fragment as it is
+    
+    Returns:
+        Fragment with heading ids and permalinks replaced
+    """
+    matches = _heading_matches(fragment, anchors)
+    if matches is None:
+        return fragment
+    
+    parts = []
+    position = 0
+    for match, anchor in zip(matches, anchors):
+        tag, before, old, after, inner = match.groups()
+        inner = inner.replace(f'href="#{old}"', f'href="#{anchor}"')
+        parts.append(fragment[position:match.start()])
+        parts.append(f'<{tag}{before} id="{anchor}"{after}>{inner}</{tag}>')
+        position = match.end()
+    parts.append(fragment[position:])
+    return ''.join(parts)
+
+def rename_collected_ids(collected: CollectedLinks, fragment: str,
+                        anchors: Optional[List[str]]) -> CollectedLinks:
+    """
+    Give the links and ids collected from a rendered block the heading ids
+    apply_heading_ids gives its fragment
+    
+    Args:
+        collected: Links, images and ids collected while rendering the block
+        fragment: Rendered block, before apply_heading_ids
+        anchors: Ids of the block's headings in order, or None
+    
+    Returns:
+        Collected links with the document's heading ids
+    """
+    matches = _heading_matches(fragment, anchors)
+    if matches is None:
+        return collected
+    
+    links = list(collected.links)
+    ids = set(collected.ids)
+    for match, anchor in zip(matches, anchors):
+        old = match.group(3)
+        if old == anchor:
+            continue
+        ids.discard(old)
+        ids.add(anchor)
+        # Permalinks inside the heading point to the new id; links to the
+        # old id elsewhere in the block are left alone
+        href = f'href="#{old}"'
+        first = fragment.count(href, 0, match.start())
+        count = match.group(5).count(href)
+        positions = [position for position, link in enumerate(links) if link == f'#{old}']
+        for position in positions[first:first + count]:
+            links[position] = f'#{anchor}'
+    return CollectedLinks(links, list(collected.images), ids)
+
+def _heading_matches(fragment: str, anchors: Optional[List[str]]):
+    """Find a block's headings, or None if they do not match the anchors"""
+    if not anchors:
+        return None
+    matches = list(HEADING_ID_PATTERN.finditer(fragment))
+    if len(matches) != len(anchors):
+        return None
+    return matches
@@ -0,0 +1,196 @@
+"""
+Split Markdown source into top-level blocks for incremental rendering
+"""
+import re
+from bisect import bisect_right
+from typing import List, NamedTuple, Sequence, Tuple
+from core.front_matter import front_matter_lines
+
+# Opening line of a fenced code block (``` or ~~~, possibly indented in lists)
+FENCE_PATTERN = re.compile(r'^\s*(`{3,}|~{3,})')
+
+# List item marker at the start of a line
+LIST_ITEM_PATTERN = re.compile(r'^\s{0,3}(?:[-*+]|\d+[.)])\s')
+
+# Definitions that apply document-wide: link references and abbreviations
+DEFINITION_PATTERN = re.compile(r'^(?: {0,3}\[(?!\^)[^\]]+\]:\s*\S|\*\[[^\]]+\]:)')
+
+# Footnote definitions, which also apply document-wide but span lines
+FOOTNOTE_PATTERN = re.compile(r'^ {0,3}\[\^([^\]]+)\]:')
+
+# Raw HTML block: a block-level element is one block up to its closing
+# tag, blank lines included
+HTML_BLOCK_PATTERN = re.compile(
+    r'^ {0,3}<(address|article|aside|blockquote|details|div|dl|fieldset|figure|footer|form|'
+    r'header|nav|ol|section|table|ul)(?=[\s>])', re.IGNORECASE)
+
+class Block(NamedTuple):
+    """A top-level block of Markdown source"""
+    start_line: int  # 0-based, inclusive
+    end_line: int  # 0-based, exclusive
+    text: str
+
+def _is_indented(line: str) -> bool:
+    """Check whether a line continues the previous block by indentation"""
+    return line.startswith(('    ', '\t'))
+
+def _tag_balance(tag: str, line: str) -> int:
+    """Count the opening minus the closing tags of an element in a line"""
+    return (len(re.findall(f'<{tag}(?=[\\s>])', line, re.IGNORECASE))
+            - len(re.findall(f'</{tag}\\s*>', line, re.IGNORECASE)))
+
+def split_blocks(markdown_text: str) -> Tuple[List[Block], str]:
+    """
+    Split Markdown text into independently renderable top-level blocks
+    
+    Blocks are separated by blank lines, except inside fenced code and
+    raw HTML elements and where a list or indented code block continues
+    after a blank line. YAML front matter is not part of any block.
+    
+    Args:
+        markdown_text: The Markdown content to split
+    
+    Returns:
+        Tuple of (blocks, definitions) where definitions holds the link
+        reference, abbreviation and footnote definitions every block needs
+        to render
+    """
+    lines = markdown_text.split('\n')
+    blocks: List[Block] = []
+    definitions: List[str] = []
+    footnotes: List[List[str]] = []
+    
+    start = None
+    fence = None
+    is_list = False
+    in_footnote = False
+    html_tag = None  # open raw HTML element and its nesting depth
+    html_depth = 0
+    skip = front_matter_lines(markdown_text)
+    
+    for index, line in enumerate(lines):
+        if index < skip:
+            continue
+        if fence is not None:
+            # Inside a fenced block: look for the closing fence only
+            stripped = line.strip()
+            if stripped.startswith(fence) and stripped.strip(fence[0]) == '':
+                fence = None
+            continue
+        
+        if html_tag is not None:
+            html_depth += _tag_balance(html_tag, line)
+            if html_depth <= 0:
+                html_tag = None
+            continue
+        
+        if not line.strip():
+            if start is None:
+                continue
+            if in_footnote:
+                footnotes[-1].append(line)
+            
+            # Look ahead to decide whether the block continues
+            next_index = index + 1
+            while next_index < len(lines) and not lines[next_index].strip():
+                next_index += 1
+            
+            if next_index < len(lines):
+                next_line = lines[next_index]
+                if _is_indented(next_line) or (is_list and LIST_ITEM_PATTERN.match(next_line)):
+                    continue
+            
+            blocks.append(Block(start, index, '\n'.join(lines[start:index])))
+            start = None
+            in_footnote = False
+            continue
+        
+        if start is None:
+            start = index
+            is_list = bool(LIST_ITEM_PATTERN.match(line))
+            match = HTML_BLOCK_PATTERN.match(line)
+            if match:
+                html_tag = match.group(1)
+                html_depth = _tag_balance(html_tag, line)
+                if html_depth <= 0:
+                    html_tag = None
+                continue
+        
+        match = FENCE_PATTERN.match(line)
+        if match:
+            fence = match.group(1)
+            in_footnote = False
+        elif FOOTNOTE_PATTERN.match(line):
+            footnotes.append([line])
+            in_footnote = True
+        elif in_footnote and (_is_indented(line) or lines[index - 1].strip()):
+            # Indented or lazy continuation of the footnote
+            footnotes[-1].append(line)
+        elif DEFINITION_PATTERN.match(line):
+            definitions.append(line)
+            in_footnote = False
+        else:
+            in_footnote = False
+    
+    if start is not None:
+        # Trailing blank lines belong to no block
+        end = len(lines)
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        blocks.append(Block(start, end, '\n'.join(lines[start:end])))
+    
+    # Footnotes are kept apart by blank lines so that neither they nor the
+    # one-line definitions run into each other
+    parts = ['\n'.join(definitions)] if definitions else []
+    parts.extend('\n'.join(footnote).rstrip() for footnote in footnotes)
+    return blocks, '\n\n'.join(parts)
+
+def order_by_visibility(blocks: List[Block], first_line: int,
+                        last_line: int) -> Tuple[List[int], List[int]]:
+    """
+    Order blocks so the ones on screen can be rendered first
+    
+    Args:
+        blocks: Blocks as returned by split_blocks
+        first_line: First visible editor line (0-based)
+        last_line: Last visible editor line (0-based, inclusive)
+    
+    Returns:
+        Tuple of (visible, deferred) block indices; deferred blocks are
+        ordered by distance from the visible region, nearest first
+    """
+    return order_by_start_lines([block.start_line for block in blocks], first_line, last_line)
+
+def order_by_start_lines(starts: Sequence[int], first_line: int,
+                         last_line: int) -> Tuple[List[int], List[int]]:
+    """
+    Order blocks given by their sorted start lines so the ones on screen
+    can be rendered first
+    
+    Args:
+        starts: 0-based start line of each block, ascending
+        first_line: First visible editor line (0-based)
+        last_line: Last visible editor line (0-based, inclusive)
+    
+    Returns:
+        Tuple of (visible, deferred) block indices, as order_by_visibility
+    """
+    count = len(starts)
+    if not count:
+        return [], []
+    
+    first = max(bisect_right(starts, first_line) - 1, 0)
+    last = max(bisect_right(starts, last_line) - 1, first)
+    
+    visible = list(range(first, last + 1))
+    deferred = []
+    before, after = first - 1, last + 1
+    while before >= 0 or after < count:
+        if after < count:
+            deferred.append(after)
+            after += 1
+        if before >= 0:
+            deferred.append(before)
+            before -= 1
+    
+    return visible, deferred
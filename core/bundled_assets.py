@@ -0,0 +1,201 @@
+"""
+Bundled JavaScript/CSS libraries for diagrams (Mermaid) and math (KaTeX)
+"""
+import base64
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import config
+
+MERMAID_CDN = f"https://cdn.jsdelivr.net/npm/mermaid@{config.MERMAID_VERSION}/dist"
+KATEX_CDN = f"https://cdn.jsdelivr.net/npm/katex@{config.KATEX_VERSION}/dist"
+
+KATEX_FONTS = [
+    'KaTeX_AMS-Regular', 'KaTeX_Caligraphic-Bold', 'KaTeX_Caligraphic-Regular',
+    'KaTeX_Fraktur-Bold', 'KaTeX_Fraktur-Regular', 'KaTeX_Main-Bold',
+    'KaTeX_Main-BoldItalic', 'KaTeX_Main-Italic', 'KaTeX_Main-Regular',
+    'KaTeX_Math-BoldItalic', 'KaTeX_Math-Italic', 'KaTeX_SansSerif-Bold',
+    'KaTeX_SansSerif-Italic', 'KaTeX_SansSerif-Regular', 'KaTeX_Script-Regular',
+    'KaTeX_Size1-Regular', 'KaTeX_Size2-Regular', 'KaTeX_Size3-Regular',
+    'KaTeX_Size4-Regular', 'KaTeX_Typewriter-Regular',
+]
+
+# Files of each library: (path under VENDOR_DIR, download URL)
+LIBRARIES: Dict[str, List[Tuple[str, str]]] = {
+    'mermaid': [
+        ('mermaid/mermaid.min.js', f"{MERMAID_CDN}/mermaid.min.js"),
+    ],
+    'katex': [
+        ('katex/katex.min.css', f"{KATEX_CDN}/katex.min.css"),
+        ('katex/katex.min.js', f"{KATEX_CDN}/katex.min.js"),
+        ('katex/contrib/auto-render.min.js', f"{KATEX_CDN}/contrib/auto-render.min.js"),
+    ] + [
+        (f'katex/fonts/{font}.woff2', f"{KATEX_CDN}/fonts/{font}.woff2")
+        for font in KATEX_FONTS
+    ],
+}
+
+# Marker classes that show a document needs a library
+LIBRARY_MARKERS = {
+    'mermaid': 'class="mermaid"',
+    'katex': 'class="arithmatex"',
+}
+
+# Startup code run once the libraries are loaded in an exported document
+EXPORT_INIT_SCRIPTS = {
+    'mermaid': "mermaid.initialize({ startOnLoad: true, theme: 'default' });",
+    'katex': (
+        "document.addEventListener('DOMContentLoaded', function () {"
+        " document.querySelectorAll('.arithmatex').forEach(function (el) {"
+        " renderMathInElement(el, {delimiters: ["
+        "{left: '\\\\(', right: '\\\\)', display: false},"
+        "{left: '\\\\[', right: '\\\\]', display: true}]});"
+        " }); });"
+    ),
+}
+
+ASSET_MODES = ('inline', 'link', 'cdn')
+
+class BundledAssets:
+    """Locate bundled libraries and produce the tags that load them"""
+    
+    def __init__(self, vendor_dir: Path = config.VENDOR_DIR):
+        """
+        Initialize bundled assets
+        
+        Args:
+            vendor_dir: Directory the libraries were fetched into
+        """
+        self.vendor_dir = vendor_dir
+        # File contents read for inlining, kept for the app's lifetime
+        self._contents: Dict[str, str] = {}
+    
+    def is_bundled(self, library: str) -> bool:
+        """
+        Check whether all files of a library are present locally
+        
+        Args:
+            library: Library name ('mermaid' or 'katex')
+        
+        Returns:
+            True if the library can be loaded without network access
+        """
+        return all((self.vendor_dir / path).is_file() for path, _ in LIBRARIES[library])
+    
+    def preview_tags(self) -> str:
+        """
+        Get the tags that load every library into the preview page
+        
+        The preview page is persistent, so these load once per page and
+        come from the bundled files (or the profile's HTTP cache when the
+        CDN fallback is used).
+        
+        Returns:
+            HTML with link/script tags
+        """
+        return self._tags(list(LIBRARIES), 'link', base_url=None)
+    
+    def document_tags(self, content: str, mode: str = config.EXPORT_ASSET_MODE,
+                      output_dir: Optional[Path] = None) -> str:
+        """
+        Get the tags that load the libraries an exported document uses
+        
+        Args:
+            content: Rendered HTML body, used to skip unused libraries
+            mode: 'inline' to embed the files, 'link' to copy them next
+                to the document, 'cdn' to reference the CDN
+            output_dir: Directory of the exported document (for 'link')
+        
+        Returns:
+            HTML with link/script tags followed by startup code
+        """
+        if mode not in ASSET_MODES:
+            raise ValueError(f"Unknown asset mode: {mode}")
+        
+        libraries = [name for name, marker in LIBRARY_MARKERS.items() if marker in content]
+        if not libraries:
+            return ""
+        
+        if mode == 'link' and output_dir is not None:
+            base_url = self._copy_to(libraries, output_dir)
+        else:
+            base_url = None
+        
+        tags = self._tags(libraries, mode, base_url)
+        scripts = '\n'.join(EXPORT_INIT_SCRIPTS[name] for name in libraries)
+        return f"{tags}\n<script>\n{scripts}\n</script>"
+    
+    def _tags(self, libraries: List[str], mode: str, base_url: Optional[str]) -> str:
+        """Build link/script tags for libraries in the given mode"""
+        tags = []
+        for library in libraries:
+            bundled = self.is_bundled(library)
+            for path, cdn_url in LIBRARIES[library]:
+                if path.endswith('.woff2'):
+                    continue
+                
+                if not bundled or mode == 'cdn':
+                    url = cdn_url
+                elif mode == 'inline':
+                    tags.append(self._inline_tag(path))
+                    continue
+                elif base_url is not None:
+                    url = f"{base_url}/{path}"
+                else:
+                    url = (self.vendor_dir / path).as_uri()
+                
+                if path.endswith('.css'):
+                    tags.append(f'<link rel="stylesheet" href="{url}">')
+                else:
+                    tags.append(f'<script src="{url}"></script>')
+        
+        return '\n'.join(tags)
+    
+    def _inline_tag(self, path: str) -> str:
+        """Embed a bundled file in a style or script tag"""
+        if path not in self._contents:
+            text = (self.vendor_dir / path).read_text(encoding='utf-8')
+            if path.endswith('.css'):
+                text = self._inline_fonts(path, text)
+            self._contents[path] = text
+        
+        text = self._contents[path]
+        if path.endswith('.css'):
+            return f"<style>\n{text}\n</style>"
+        # A literal </script> inside the library would end the tag early
+        text = text.replace('</script', '<\\/script')
+        return f"<script>\n{text}\n</script>"
+    
+    def _inline_fonts(self, path: str, css: str) -> str:
+        """Replace relative woff2 font URLs in a stylesheet with data URIs"""
+        css_dir = (self.vendor_dir / path).parent
+        
+        def replace(match):
+            font_path = css_dir / match.group(1)
+            if not font_path.is_file():
+                return match.group(0)
+            data = base64.b64encode(font_path.read_bytes()).decode('ascii')
+            return f"url(data:font/woff2;base64,{data})"
+        
+        return re.sub(r'url\((fonts/[^)]+\.woff2)\)', replace, css)
+    
+    def _copy_to(self, libraries: List[str], output_dir: Path) -> str:
+        """
+        Copy bundled library files next to an exported document
+        
+        Returns:
+            Relative URL of the copied vendor directory
+        """
+        target_dir = output_dir / "assets" / "vendor"
+        for library in libraries:
+            if not self.is_bundled(library):
+                continue
+            for path, _ in LIBRARIES[library]:
+                source = self.vendor_dir / path
+                target = target_dir / path
+                if target.exists() and target.stat().st_size == source.stat().st_size:
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, target)
+        return "assets/vendor"
@@ -0,0 +1,243 @@
+"""
+Render daemon: a render server kept warm in the background for the
+command line
+
+Starting Python and importing Markdown, its extensions and Pygments takes
+far longer than rendering a typical file. The daemon pays that once; each
+cli.py call then sends its file over a Unix socket (a local TCP port where
+those are not available). The daemon exits after config.DAEMON_IDLE_TIMEOUT
+seconds without requests and is started again by the next call.
+
+Every command line call imports this module, so it must not import the
+Markdown stack; only run_daemon() does. The client speaks just enough
+HTTP/1.1 for the render server, as http.client alone takes longer to
+import than a warm render.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import config
+
+# A Unix socket path, or a (host, port) pair
+Address = Union[str, Tuple[str, int]]
+
+CLI_SCRIPT = Path(__file__).parent.parent / "cli.py"
+
+def daemon_address() -> Address:
+    """Get the address the daemon listens on"""
+    if hasattr(socket, 'AF_UNIX') and os.name != 'nt':
+        return str(config.DAEMON_SOCKET)
+    return (config.RENDER_SERVER_HOST, config.DAEMON_PORT)
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached"""
+
+class DaemonClient:
+    """Blocking client for the daemon, keeping its connection open"""
+    
+    def __init__(self, address: Optional[Address] = None, timeout: float = 60):
+        """
+        Initialize the client
+        
+        Args:
+            address: Daemon address (default: daemon_address())
+            timeout: Seconds to wait for a response
+        """
+        self.address = address or daemon_address()
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._file = None
+    
+    def request(self, method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, dict]:
+        """
+        Send a request to the daemon
+        
+        Args:
+            method: HTTP method
+            path: Endpoint, e.g. '/render'
+            payload: JSON body
+        
+        Returns:
+            Tuple of (HTTP status, decoded response)
+        
+        Raises:
+            DaemonError: If no daemon answers
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        try:
+            if self._socket is None:
+                self._connect()
+            self._socket.sendall(
+                f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                .encode('latin-1') + body
+            )
+            status_line = self._file.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed")
+            status = int(status_line.split()[1])
+            length = 0
+            keep_alive = True
+            while True:
+                line = self._file.readline()
+                if not line.strip():
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.strip().lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'connection':
+                    keep_alive = value.strip().lower() != 'close'
+            data = self._file.read(length)
+        except (OSError, ValueError, IndexError) as e:
+            self.close()
+            raise DaemonError(f"No render daemon at {self.address}: {e}") from e
+        if not keep_alive:
+            self.close()
+        try:
+            return status, json.loads(data)
+        except ValueError as e:
+            raise DaemonError(f"Invalid response from the render daemon: {e}") from e
+    
+    def _connect(self):
+        """Open the connection"""
+        if isinstance(self.address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            try:
+                self._socket.connect(self.address)
+            except OSError:
+                self.close()
+                raise
+        else:
+            self._socket = socket.create_connection(self.address, self.timeout)
+        self._file = self._socket.makefile('rb')
+    
+    def is_running(self) -> bool:
+        """Check whether a daemon answers"""
+        try:
+            return self.request('GET', '/health')[0] == 200
+        except DaemonError:
+            return False
+    
+    def close(self):
+        """Close the connection"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+def start_daemon(address: Optional[Address] = None,
+                 idle_timeout: float = config.DAEMON_IDLE_TIMEOUT) -> bool:
+    """
+    Start a daemon in the background and wait until it answers
+    
+    Args:
+        address: Address to listen on (default: daemon_address())
+        idle_timeout: Seconds without requests before it exits
+    
+    Returns:
+        True if a daemon answers
+    """
+    address = address or daemon_address()
+    if isinstance(address, str):
+        command = [sys.executable, str(CLI_SCRIPT), '--socket', address]
+    else:
+        command = [sys.executable, str(CLI_SCRIPT), '--port', str(address[1])]
+    command += ['daemon', 'run', '--idle-timeout', str(idle_timeout)]
+    
+    options = {}
+    if os.name == 'nt':
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True  # outlives the terminal that started it
+    try:
+        with open(config.DAEMON_LOG, 'ab') as log:
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log,
+                                       stderr=log, **options)
+    except OSError as e:
+        print(f"Warning: Could not start the render daemon: {e}", file=sys.stderr)
+        return False
+    
+    client = DaemonClient(address, timeout=1)
+    deadline = time.monotonic() + config.DAEMON_SPAWN_TIMEOUT
+    try:
+        while time.monotonic() < deadline:
+            if client.is_running():
+                return True
+            if process.poll() is not None:
+                # Lost a race with another call that started one first
+                return client.is_running()
+            time.sleep(0.02)
+    finally:
+        client.close()
+    return False
+
+def stop_daemon(address: Optional[Address] = None) -> bool:
+    """
+    Ask a running daemon to exit
+    
+    Args:
+        address: Daemon address (default: daemon_address())
+    
+    Returns:
+        True if a daemon was running
+    """
+    client = DaemonClient(address, timeout=5)
+    try:
+        client.request('POST', '/shutdown')
+    except DaemonError:
+        return False
+    finally:
+        client.close()
+    return True
+
+def run_daemon(address: Optional[Address] = None,
+               idle_timeout: float = config.DAEMON_IDLE_TIMEOUT) -> int:
+    """
+    Serve in this process until stopped or idle
+    
+    Args:
+        address: Address to listen on (default: daemon_address())
+        idle_timeout: Seconds without requests before exiting
+    
+    Returns:
+        Process exit code
+    """
+    address = address or daemon_address()
+    client = DaemonClient(address, timeout=1)
+    running = client.is_running()
+    client.close()
+    if running:
+        print(f"A render daemon is already running at {address}", file=sys.stderr)
+        return 1
+    
+    from core.render_server import serve
+    
+    if not isinstance(address, str):
+        serve(address[0], address[1], workers=config.DAEMON_WORKERS,
+              idle_timeout=idle_timeout, allow_shutdown=True)
+        return 0
+    
+    # Left behind by a daemon that did not exit cleanly
+    try:
+        os.unlink(address)
+    except FileNotFoundError:
+        pass
+    os.umask(0o077)  # the socket is only for this user
+    try:
+        serve(socket_path=address, workers=config.DAEMON_WORKERS,
+              idle_timeout=idle_timeout, allow_shutdown=True)
+    finally:
+        try:
+            os.unlink(address)
+        except OSError:
+            pass
+    return 0
@@ -0,0 +1,99 @@
+"""
+Cache of rendered Mermaid diagrams
+"""
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, Optional
+import config
+
+# Diagram container emitted by the mermaid custom fence (see config.py)
+DIAGRAM_PATTERN = re.compile(r'<div class="mermaid" data-diagram="([0-9a-f]+)">.*?</div>', re.DOTALL)
+
+class DiagramCache:
+    """Rendered SVG for each diagram, keyed by a hash of its source"""
+    
+    def __init__(self, max_entries: int = config.DIAGRAM_CACHE_SIZE):
+        """
+        Initialize the diagram cache
+        
+        Args:
+            max_entries: Number of diagrams to keep (least recently used
+                are dropped first)
+        """
+        self.max_entries = max_entries
+        self._svgs: OrderedDict[str, str] = OrderedDict()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get the SVG rendered for a diagram
+        
+        Args:
+            key: Diagram key from the data-diagram attribute
+        
+        Returns:
+            SVG markup, or None if the diagram has not been rendered
+        """
+        svg = self._svgs.get(key)
+        if svg is not None:
+            self._svgs.move_to_end(key)
+        return svg
+    
+    def put(self, key: str, svg: str):
+        """
+        Store the SVG rendered for a diagram
+        
+        Args:
+            key: Diagram key from the data-diagram attribute
+            svg: SVG markup produced by Mermaid
+        """
+        self._svgs[key] = svg
+        self._svgs.move_to_end(key)
+        while len(self._svgs) > self.max_entries:
+            self._svgs.popitem(last=False)
+    
+    def clear(self):
+        """Drop all diagrams"""
+        self._svgs.clear()
+    
+    def memory_usage(self) -> int:
+        """Get the bytes used by the stored SVGs"""
+        return sum(sys.getsizeof(svg) for svg in self._svgs.values())
+    
+    def find(self, html_content: str) -> Dict[str, str]:
+        """
+        Get the cached SVGs for the diagrams in rendered HTML
+        
+        Args:
+            html_content: Rendered HTML
+        
+        Returns:
+            Dictionary of diagram key to SVG for diagrams already rendered
+        """
+        found = {}
+        for key in DIAGRAM_PATTERN.findall(html_content):
+            svg = self.get(key)
+            if svg is not None:
+                found[key] = svg
+        return found
+    
+    def embed(self, html_content: str) -> str:
+        """
+        Replace diagram sources with their cached SVGs
+        
+        Diagrams that were never rendered are left for Mermaid to lay
+        out when the document is opened.
+        
+        Args:
+            html_content: Rendered HTML
+        
+        Returns:
+            HTML with cached diagrams inlined as SVG
+        """
+        def replace(match):
+            svg = self.get(match.group(1))
+            if svg is None:
+                return match.group(0)
+            return f'<div class="mermaid-diagram" data-diagram="{match.group(1)}">{svg}</div>'
+        
+        return DIAGRAM_PATTERN.sub(replace, html_content)
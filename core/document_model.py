@@ -0,0 +1,300 @@
+"""
+Compact in-memory model of a block-split document and its rendered fragments
+"""
+import re
+import sys
+from array import array
+from typing import Callable, Collection, Dict, List, Optional
+from core.blocks import split_blocks
+import config
+
+# Block kinds, stored as one byte per block
+KIND_PARAGRAPH = 0
+KIND_HEADING = 1
+KIND_FENCE = 2
+KIND_LIST = 3
+KIND_QUOTE = 4
+KIND_TABLE = 5
+KIND_HTML = 6
+KIND_INDENTED = 7
+KIND_NAMES = ('paragraph', 'heading', 'fence', 'list', 'quote', 'table', 'html', 'indented')
+
+HEADING_LINE_PATTERN = re.compile(r'^\s{0,3}#{1,6}(?:\s|$)')
+FENCE_LINE_PATTERN = re.compile(r'^\s{0,3}(?:`{3,}|~{3,})')
+LIST_LINE_PATTERN = re.compile(r'^\s{0,3}(?:[-*+]|\d+[.)])\s')
+
+def block_kind(text: str) -> int:
+    """
+    Classify a block by its first lines
+    
+    Args:
+        text: Markdown source of the block
+    
+    Returns:
+        One of the KIND_* constants
+    """
+    first, _, rest = text.partition('\n')
+    if first.startswith(('    ', '\t')):
+        return KIND_INDENTED
+    if HEADING_LINE_PATTERN.match(first):
+        return KIND_HEADING
+    if FENCE_LINE_PATTERN.match(first):
+        return KIND_FENCE
+    if LIST_LINE_PATTERN.match(first):
+        return KIND_LIST
+    stripped = first.lstrip()
+    if stripped.startswith('>'):
+        return KIND_QUOTE
+    if stripped.startswith('<'):
+        return KIND_HTML
+    if '|' in first and rest.lstrip().startswith(('|', '-', ':')):
+        return KIND_TABLE
+    return KIND_PARAGRAPH
+
+def _array_bytes(column: array) -> int:
+    """Get the memory used by an array, including its object header"""
+    return sys.getsizeof(column)
+
+class FragmentBuffer:
+    """
+    Strings interned in one UTF-8 buffer
+    
+    Strings are appended and addressed by slot number; each costs its
+    encoded bytes plus 12 bytes of offset and length instead of a
+    separate str object.
+    """
+    
+    __slots__ = ('_buffer', '_offsets', '_lengths')
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array('Q')
+        self._lengths = array('I')
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def append(self, text: str) -> int:
+        """
+        Store a string
+        
+        Args:
+            text: String to store
+        
+        Returns:
+            Slot number of the string
+        """
+        data = text.encode('utf-8')
+        self._offsets.append(len(self._buffer))
+        self._lengths.append(len(data))
+        self._buffer += data
+        return len(self._offsets) - 1
+    
+    def get(self, slot: int) -> str:
+        """
+        Get a stored string
+        
+        Args:
+            slot: Slot number from append()
+        
+        Returns:
+            The string
+        """
+        offset = self._offsets[slot]
+        return self._buffer[offset:offset + self._lengths[slot]].decode('utf-8')
+    
+    def memory_usage(self) -> int:
+        """Get the bytes used by the buffer and its index"""
+        return (sys.getsizeof(self._buffer) + _array_bytes(self._offsets)
+                + _array_bytes(self._lengths))
+
+class FragmentStore:
+    """
+    Rendered fragments by block key, interned in one buffer
+    
+    Replaces a dictionary of strings as the processor's fragment cache.
+    Keys are the 64-bit block hashes; the least recently used fragments
+    are dropped in batches by compacting the buffer when the store holds
+    more than max_entries.
+    """
+    
+    def __init__(self, max_entries: int = config.FRAGMENT_CACHE_SIZE):
+        """
+        Initialize the store
+        
+        Args:
+            max_entries: Number of fragments to keep
+        """
+        self.max_entries = max_entries
+        self._slots: Dict[int, int] = {}
+        self._fragments = FragmentBuffer()
+        self._used = array('Q')  # last use tick per slot
+        self._tick = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def __contains__(self, key: int) -> bool:
+        return key in self._slots
+    
+    def get(self, key: int) -> Optional[str]:
+        """
+        Get a fragment
+        
+        Args:
+            key: Block hash
+        
+        Returns:
+            HTML fragment, or None if it is not stored
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        self._tick += 1
+        self._used[slot] = self._tick
+        return self._fragments.get(slot)
+    
+    def put(self, key: int, fragment: str):
+        """
+        Store a fragment
+        
+        Args:
+            key: Block hash
+            fragment: Rendered HTML of the block
+        """
+        self._tick += 1
+        slot = self._slots.get(key)
+        if slot is not None:
+            # The same key always renders to the same fragment
+            self._used[slot] = self._tick
+            return
+        
+        self._slots[key] = self._fragments.append(fragment)
+        self._used.append(self._tick)
+        if len(self._slots) > self.max_entries:
+            self._compact(self.max_entries * 3 // 4)
+    
+    def retain(self, keys: Collection[int]):
+        """
+        Drop every fragment except the given ones
+        
+        Args:
+            keys: Block hashes whose fragments are kept
+        """
+        self._rebuild([(key, slot) for key, slot in self._slots.items() if key in keys])
+    
+    def _compact(self, keep: int):
+        """Rebuild the buffer with the keep most recently used fragments"""
+        recent = sorted(self._slots.items(), key=lambda item: self._used[item[1]], reverse=True)[:keep]
+        self._rebuild(recent)
+    
+    def _rebuild(self, entries: list):
+        """Copy the given (key, slot) entries into a new buffer"""
+        # Buffer order is kept, so neighbouring blocks stay close together
+        entries.sort(key=lambda item: item[1])
+        
+        fragments = FragmentBuffer()
+        used = array('Q')
+        slots = {}
+        for key, slot in entries:
+            slots[key] = fragments.append(self._fragments.get(slot))
+            used.append(self._used[slot])
+        self._fragments, self._used, self._slots = fragments, used, slots
+    
+    def memory_usage(self) -> int:
+        """Get the bytes used by the store"""
+        index = sys.getsizeof(self._slots) + sum(
+            sys.getsizeof(key) + sys.getsizeof(slot) for key, slot in self._slots.items()
+        )
+        return self._fragments.memory_usage() + _array_bytes(self._used) + index
+
+class DocumentModel:
+    """
+    Blocks of a document in parallel array columns
+    
+    Each block is described by its line range, kind, hash and character
+    range in the source; block text is sliced from the source on demand.
+    Rendered fragments are not held per document but looked up by hash
+    in the processor's FragmentStore.
+    """
+    
+    __slots__ = ('source', 'definitions', 'start_lines', 'end_lines', 'kinds',
+                 'keys', 'text_starts', 'text_ends', 'heading_ids')
+    
+    def __init__(self, source: str = "", definitions: str = ""):
+        """
+        Create an empty model
+        
+        Args:
+            source: Markdown source the blocks are ranges of
+            definitions: Document-wide link/abbreviation definitions
+        """
+        self.source = source
+        self.definitions = definitions
+        self.start_lines = array('i')
+        self.end_lines = array('i')
+        self.kinds = array('B')
+        self.keys = array('Q')
+        self.text_starts = array('q')
+        self.text_ends = array('q')
+        # Block index -> heading ids, for blocks whose headings repeat
+        # titles of earlier blocks (see MarkdownProcessor.parse_document)
+        self.heading_ids: Dict[int, List[str]] = {}
+    
+    @classmethod
+    def build(cls, markdown_text: str, key_func: Callable[[str, str], int]) -> 'DocumentModel':
+        """
+        Split a document into blocks
+        
+        Args:
+            markdown_text: Markdown source
+            key_func: Computes a block's 64-bit hash from its text and the
+                document's definitions
+        
+        Returns:
+            DocumentModel
+        """
+        blocks, definitions = split_blocks(markdown_text)
+        model = cls(markdown_text, definitions)
+        
+        # Blocks are verbatim runs of lines in order, so each one is found
+        # just after the previous one; only blank lines are skipped over
+        position = 0
+        for block in blocks:
+            text_start = markdown_text.find(block.text, position)
+            position = text_start + len(block.text)
+            model.start_lines.append(block.start_line)
+            model.end_lines.append(block.end_line)
+            model.kinds.append(block_kind(block.text))
+            model.keys.append(key_func(block.text, definitions))
+            model.text_starts.append(text_start)
+            model.text_ends.append(position)
+        return model
+    
+    def __len__(self) -> int:
+        return len(self.start_lines)
+    
+    def key(self, index: int) -> str:
+        """Get a block's key as the hex string used by the preview"""
+        return f"{self.keys[index]:016x}"
+    
+    def block_text(self, index: int) -> str:
+        """Get a block's Markdown source"""
+        return self.source[self.text_starts[index]:self.text_ends[index]]
+    
+    def kind(self, index: int) -> str:
+        """Get the name of a block's kind"""
+        return KIND_NAMES[self.kinds[index]]
+    
+    def memory_usage(self) -> int:
+        """
+        Get the bytes used by the model, including its source text
+        
+        Returns:
+            Size in bytes
+        """
+        columns = (self.start_lines, self.end_lines, self.kinds, self.keys,
+                   self.text_starts, self.text_ends)
+        return (sys.getsizeof(self) + sys.getsizeof(self.source) + sys.getsizeof(self.definitions)
+                + sys.getsizeof(self.heading_ids)
+                + sum(_array_bytes(column) for column in columns))
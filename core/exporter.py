@@ -2,8 +2,13 @@
 Export functionality for converting markdown to various formats
 """
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, NamedTuple, Optional
 from datetime import datetime
+from core.image_assets import ImageAssets
+from core.link_checker import CollectedLinks, LinkChecker, LinkProblem
+from core.metrics import REGISTRY, timed
+from core.tracing import traced
+from core.site_builder import SiteBuilder, SiteBuildResult
 import config
 
 # Try to import weasyprint, but make it optional
@@ -13,6 +18,16 @@ try:
 except (ImportError, OSError):
     WEASYPRINT_AVAILABLE = False
 
+EXPORT_SECONDS = REGISTRY.histogram('export_seconds', "Time of an export", ('format',))
+EXPORT_ERRORS = REGISTRY.counter('export_errors_total', "Exports that failed", ('format',))
+
+class BatchExportResult(NamedTuple):
+    """Outcome of exporting many files"""
+    exported: int
+    errors: List[str]
+    problems: List[LinkProblem]  # broken links and images
+    metadata: Dict[Path, dict]  # front matter of each exported file
+
 class Exporter:
     """Handle exporting markdown to various formats"""
     
@@ -25,8 +40,14 @@ class Exporter:
         """
         self.markdown_processor = markdown_processor
     
+    @traced('export.html', 'export')
+    @timed(EXPORT_SECONDS, EXPORT_ERRORS, format='html')
     def export_html(self, markdown_content: str, output_path: str, 
-                   theme_css: str = "", standalone: bool = True) -> tuple[bool, str]:
+                   theme_css: str = "", standalone: bool = True,
+                   asset_mode: str = config.EXPORT_ASSET_MODE,
+                   source_dir: Optional[Path] = None,
+                   images: Optional[ImageAssets] = None,
+                   layout: Optional[str] = None) -> tuple[bool, str]:
         """
         Export markdown to HTML file
         
@@ -35,21 +56,37 @@ class Exporter:
             output_path: Path to save HTML file
             theme_css: CSS theme to apply
             standalone: Whether to create standalone HTML document
+            asset_mode: How diagram/math libraries are included: 'inline'
+                embeds them, 'link' copies them next to the file, 'cdn'
+                references the CDN
+            source_dir: Directory of the Markdown file; when given, local
+                images of a standalone document are inlined or copied
+            images: Image pipeline shared by several exports (by default
+                one writing to assets/images next to the file)
+            layout: Layout name or template path (by default the front
+                matter's layout or config.EXPORT_LAYOUT)
             
         Returns:
             Tuple of (success, error_message)
         """
         try:
+            output = Path(output_path)
+            
             # Convert markdown to HTML
             if standalone:
-                html_content = self.markdown_processor.convert(markdown_content, theme_css)
+                if source_dir is not None and images is None:
+                    images = ImageAssets(output.parent / "assets" / "images")
+                html_content = self.markdown_processor.convert(
+                    markdown_content, theme_css, asset_mode, output.parent,
+                    source_dir, images, layout
+                )
             else:
                 # Just the HTML content without full document structure
+                front_matter = self.markdown_processor.read_front_matter(markdown_content)
                 self.markdown_processor.md.reset()
-                html_content = self.markdown_processor.md.convert(markdown_content)
+                html_content = self.markdown_processor.md.convert(front_matter.body)
             
             # Write to file
-            output = Path(output_path)
             output.parent.mkdir(parents=True, exist_ok=True)
             
             with open(output, 'w', encoding='utf-8') as f:
@@ -60,6 +97,93 @@ class Exporter:
         except Exception as e:
             return False, f"Error exporting HTML: {str(e)}"
     
+    @traced('export.batch', 'export')
+    @timed(EXPORT_SECONDS, EXPORT_ERRORS, format='batch')
+    def export_batch(self, sources: List[Path], source_root: Path, output_dir: Path,
+                     theme_css: str = "", asset_mode: str = config.EXPORT_ASSET_MODE,
+                     checker: Optional[LinkChecker] = None,
+                     layout: Optional[str] = None,
+                     progress: Optional[Callable[[int, int], None]] = None) -> BatchExportResult:
+        """
+        Export many Markdown files to HTML and check their links and images
+        
+        Links are collected while each file is rendered; checking happens
+        once all files are written, so every distinct path and URL of the
+        run is checked only once. Images of all files share one
+        assets/images directory in output_dir.
+        
+        Args:
+            sources: Markdown files to export
+            source_root: Folder the output layout is relative to
+            output_dir: Folder to write the HTML files to
+            theme_css: CSS theme to apply
+            asset_mode: How diagram/math libraries are included
+            checker: LinkChecker to use (None skips link checking)
+            layout: Layout for every page (compiled once for the run)
+            progress: Called with (done, total) after each file
+        
+        Returns:
+            BatchExportResult
+        """
+        source_root = Path(source_root)
+        output_dir = Path(output_dir)
+        exported = 0
+        errors = []
+        documents: Dict[Path, CollectedLinks] = {}
+        metadata: Dict[Path, dict] = {}
+        images = ImageAssets(output_dir / "assets" / "images")
+        
+        for done, source in enumerate(sources, 1):
+            source = Path(source)
+            try:
+                markdown_content = source.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError) as e:
+                markdown_content = None
+                errors.append(f"{source}: {e}")
+            
+            if markdown_content is not None:
+                output = output_dir / source.relative_to(source_root).with_suffix('.html')
+                success, error = self.export_html(markdown_content, str(output), theme_css,
+                                                  asset_mode=asset_mode, source_dir=source.parent,
+                                                  images=images, layout=layout)
+                if success:
+                    exported += 1
+                    documents[source] = self.markdown_processor.collected_links
+                    metadata[source] = self.markdown_processor.metadata
+                else:
+                    errors.append(f"{source}: {error}")
+            
+            # Failed files count as done, so progress always reaches the total
+            if progress is not None:
+                progress(done, len(sources))
+        
+        problems = checker.check_batch(documents) if checker is not None else []
+        return BatchExportResult(exported, errors, problems, metadata)
+    
+    @traced('export.site', 'export')
+    @timed(EXPORT_SECONDS, EXPORT_ERRORS, format='site')
+    def export_site(self, source_root: Path, output_dir: Path, theme_css: str = "",
+                    layout: Optional[str] = None,
+                    progress: Optional[Callable[[int, int], None]] = None) -> SiteBuildResult:
+        """
+        Render a folder into a linked HTML site, rebuilding only what changed
+        
+        Args:
+            source_root: Folder of Markdown files
+            output_dir: Folder to write the site to; building into the same
+                folder again updates it incrementally
+            theme_css: CSS theme, written once to a shared stylesheet
+            layout: Layout for every page
+            progress: Called with (done, total) after each rendered page
+        
+        Returns:
+            SiteBuildResult
+        """
+        builder = SiteBuilder(self, source_root, output_dir, theme_css, layout)
+        return builder.build(progress)
+    
+    @traced('export.pdf', 'export')
+    @timed(EXPORT_SECONDS, EXPORT_ERRORS, format='pdf')
     def export_pdf(self, markdown_content: str, output_path: str, 
                    theme_css: str = "") -> tuple[bool, str]:
         """
@@ -84,8 +208,9 @@ class Exporter:
             )
         
         try:
-            # Convert markdown to HTML
-            html_content = self.markdown_processor.convert(markdown_content, theme_css)
+            # Convert markdown to HTML (WeasyPrint runs no scripts, so
+            # don't embed the diagram/math libraries)
+            html_content = self.markdown_processor.convert(markdown_content, theme_css, 'cdn')
             
             # Enhance CSS for PDF
             pdf_css = self._get_pdf_css()
@@ -148,6 +273,8 @@ class Exporter:
         }
         """
     
+    @traced('export.markdown', 'export')
+    @timed(EXPORT_SECONDS, EXPORT_ERRORS, format='markdown')
     def export_markdown_copy(self, markdown_content: str, output_path: str) -> tuple[bool, str]:
         """
         Export/copy markdown to another file
@@ -182,8 +309,10 @@ class Exporter:
             Dictionary with export metadata
         """
         stats = self.markdown_processor.get_statistics(markdown_content)
+        front_matter = self.markdown_processor.read_front_matter(markdown_content)
         return {
             'timestamp': datetime.now().isoformat(),
             'statistics': stats,
+            'front_matter': front_matter.metadata,
             'version': config.APP_VERSION,
         }
@@ -1,11 +1,21 @@
 """
 File operations handler for opening, saving, and managing files
 """
+import hashlib
 from pathlib import Path
 from typing import Optional, List
 from datetime import datetime
+from core.metrics import REGISTRY, timed
+from core.tracing import traced
 import config
 
+FILE_SECONDS = REGISTRY.histogram('file_io_seconds', "Time to open or save a document",
+                                  ('operation',))
+FILE_ERRORS = REGISTRY.counter('file_io_errors_total', "Documents that failed to open or save",
+                               ('operation',))
+FILE_BYTES = REGISTRY.counter('file_io_bytes_total', "UTF-8 bytes of documents opened or saved",
+                              ('operation',))
+
 class FileHandler:
     """Handle file I/O operations and recent files management"""
     
@@ -15,14 +25,31 @@ class FileHandler:
         self.current_content: str = ""
         self.is_modified: bool = False
         self.last_saved: Optional[datetime] = None
+        # Hash of current_content, the file content as last read or written
+        self.content_hash: Optional[str] = None
+    
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """
+        Hash file content to recognize it again later
+        
+        Args:
+            content: File content
+        
+        Returns:
+            Hex digest
+        """
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
     
+    @traced('file.open', 'file')
+    @timed(FILE_SECONDS, FILE_ERRORS, operation='open')
     def open_file(self, file_path: str) -> tuple[bool, str, str]:
         """
         Open and read a file
         
         Args:
             file_path: Path to the file to open
-            
+        
         Returns:
             Tuple of (success, content, error_message)
         """
@@ -38,9 +65,11 @@ class FileHandler:
             # Read file content
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
+            FILE_BYTES.inc(path.stat().st_size, operation='open')
             
             self.current_file = path
             self.current_content = content
+            self.content_hash = self.hash_content(content)
             self.is_modified = False
             self.last_saved = datetime.now()
             
@@ -48,7 +77,7 @@ class FileHandler:
             self._add_to_recent_files(str(path))
             
             return True, content, ""
-            
+        
         except UnicodeDecodeError:
             return False, "", "Unable to decode file. File may not be a text file."
         except PermissionError:
@@ -56,6 +85,8 @@ class FileHandler:
         except Exception as e:
             return False, "", f"Error opening file: {str(e)}"
     
+    @traced('file.save', 'file')
+    @timed(FILE_SECONDS, FILE_ERRORS, operation='save')
     def save_file(self, content: str, file_path: Optional[str] = None) -> tuple[bool, str]:
         """
         Save content to file
@@ -63,7 +94,7 @@ class FileHandler:
         Args:
             content: Content to save
             file_path: Path to save to (uses current_file if None)
-            
+        
         Returns:
             Tuple of (success, error_message)
         """
@@ -82,9 +113,11 @@ class FileHandler:
             # Write content
             with open(path, 'w', encoding='utf-8') as f:
                 f.write(content)
+                FILE_BYTES.inc(f.tell(), operation='save')
             
             self.current_file = path
             self.current_content = content
+            self.content_hash = self.hash_content(content)
             self.is_modified = False
             self.last_saved = datetime.now()
             
@@ -92,7 +125,7 @@ class FileHandler:
             self._add_to_recent_files(str(path))
             
             return True, ""
-            
+        
         except PermissionError:
             return False, f"Permission denied: {path}"
         except Exception as e:
@@ -102,9 +135,46 @@ class FileHandler:
         """Create a new file (clear current file state)"""
         self.current_file = None
         self.current_content = ""
+        self.content_hash = None
         self.is_modified = False
         self.last_saved = None
     
+    def check_external_change(self) -> tuple[bool, Optional[str]]:
+        """
+        Check whether another program changed the current file on disk
+        
+        Writes made by save_file() are recognized by their content hash
+        and do not count as changes.
+        
+        Returns:
+            Tuple of (changed, content); content is None if the file was deleted
+        """
+        if self.current_file is None:
+            return False, None
+        
+        try:
+            with open(self.current_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return True, None
+        except Exception as e:
+            print(f"Warning: Could not check {self.current_file}: {e}")
+            return False, None
+        
+        if self.hash_content(content) == self.content_hash:
+            return False, content
+        return True, content
+    
+    def accept_external_content(self, content: str):
+        """
+        Record file content read from disk as the new merge base
+        
+        Args:
+            content: Current file content on disk
+        """
+        self.current_content = content
+        self.content_hash = self.hash_content(content)
+    
     def set_modified(self, modified: bool = True):
         """Mark the current file as modified"""
         self.is_modified = modified
@@ -145,7 +215,7 @@ class FileHandler:
             # Write back
             with open(config.RECENT_FILES_FILE, 'w', encoding='utf-8') as f:
                 f.write('\n'.join(recent_files))
-                
+        
         except Exception as e:
             # Silently fail for recent files
             print(f"Warning: Could not update recent files: {e}")
@@ -173,7 +243,7 @@ class FileHandler:
                     f.write('\n'.join(existing_files))
             
             return existing_files
-            
+        
         except Exception:
             return []
     
@@ -191,7 +261,7 @@ class FileHandler:
         
         Args:
             file_path: Path to check
-            
+        
         Returns:
             True if file has markdown extension
         """
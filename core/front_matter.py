@@ -0,0 +1,149 @@
+"""
+YAML front matter at the start of Markdown documents
+"""
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+import yaml
+import config
+
+# Front matter opens with a "---" line and closes with "---" or "..."
+OPENING_LINE = '---'
+CLOSING_LINES = ('---', '...')
+
+# Error for YAML that parses to something other than a mapping
+NOT_A_MAPPING = "Front matter is not a mapping"
+
+class FrontMatter(NamedTuple):
+    """Front matter of a document and the Markdown after it"""
+    raw: str  # YAML source without the delimiter lines ("" if none)
+    metadata: dict  # parsed mapping, shared with the cache: do not modify
+    body: str  # Markdown after the front matter
+    line_count: int  # source lines taken, including the delimiters
+    error: str  # YAML error message, or "" if it parsed
+
+def front_matter_span(text: str) -> Tuple[int, int]:
+    """
+    Find where the front matter of a document ends
+    
+    Only the lines up to the closing delimiter are looked at; a document
+    that does not start with a "---" line costs one comparison.
+    
+    Args:
+        text: Markdown source
+    
+    Returns:
+        Tuple of (character offset of the body, number of lines), or
+        (0, 0) if the document has no front matter
+    """
+    if not text.startswith(OPENING_LINE):
+        return 0, 0
+    
+    end = text.find('\n')
+    if end == -1 or text[:end].rstrip() != OPENING_LINE:
+        return 0, 0
+    
+    line_count = 1
+    while end != -1:
+        start = end + 1
+        end = text.find('\n', start)
+        line = text[start:] if end == -1 else text[start:end]
+        line_count += 1
+        if line.rstrip() in CLOSING_LINES:
+            return (len(text) if end == -1 else end + 1), line_count
+    
+    # Without a closing line the "---" is a thematic break
+    return 0, 0
+
+def front_matter_lines(text: str) -> int:
+    """
+    Count the source lines the front matter of a document takes
+    
+    Unlike front_matter_span this parses the YAML (once per distinct front
+    matter), so lines that are not a mapping count as Markdown, as they
+    do for FrontMatterCache.read.
+    
+    Args:
+        text: Markdown source
+    
+    Returns:
+        Number of lines, including the delimiters, or 0 if there is no
+        front matter
+    """
+    return _shared_cache.read(text).line_count
+
+class FrontMatterCache:
+    """
+    Parsed front matter keyed by its YAML source
+    
+    Editing the body of a document leaves its front matter unchanged, so
+    YAML is only parsed again when the front matter itself changes.
+    """
+    
+    def __init__(self, max_entries: int = config.FRONT_MATTER_CACHE_SIZE):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries: Number of parsed front matters to keep
+        """
+        self.max_entries = max_entries
+        self._parsed: OrderedDict[str, Tuple[dict, str]] = OrderedDict()
+        self.parse_count = 0
+    
+    def read(self, text: str) -> FrontMatter:
+        """
+        Split the front matter off a document and parse it
+        
+        Args:
+            text: Markdown source
+        
+        Returns:
+            FrontMatter (empty metadata if there is none or it is invalid)
+        """
+        body_start, line_count = front_matter_span(text)
+        if not line_count:
+            return FrontMatter("", {}, text, 0, "")
+        
+        # Drop the delimiter lines
+        head = text[:body_start]
+        raw = head[head.find('\n') + 1:head.rstrip('\n').rfind('\n') + 1]
+        metadata, error = self.parse(raw)
+        if error == NOT_A_MAPPING:
+            # A list or plain text between "---" lines is Markdown (such
+            # as a thematic break and a setext heading), so keep it
+            return FrontMatter("", {}, text, 0, error)
+        return FrontMatter(raw, metadata, text[body_start:], line_count, error)
+    
+    def parse(self, raw: str) -> Tuple[dict, str]:
+        """
+        Parse front matter YAML, or get it from the cache
+        
+        Args:
+            raw: YAML source
+        
+        Returns:
+            Tuple of (metadata, error_message)
+        """
+        cached = self._parsed.get(raw)
+        if cached is not None:
+            self._parsed.move_to_end(raw)
+            return cached
+        
+        self.parse_count += 1
+        try:
+            metadata = yaml.safe_load(raw)
+            error = ""
+            if metadata is None:
+                metadata = {}
+            elif not isinstance(metadata, dict):
+                metadata, error = {}, NOT_A_MAPPING
+        except yaml.YAMLError as e:
+            metadata, error = {}, f"Invalid front matter: {e}"
+        
+        self._parsed[raw] = (metadata, error)
+        while len(self._parsed) > self.max_entries:
+            self._parsed.popitem(last=False)
+        return metadata, error
+
+# Used by front_matter_lines for the block splitter and outline scanner
+_shared_cache = FrontMatterCache()
@@ -0,0 +1,112 @@
+"""
+Local images of exported documents: small ones inlined, large ones copied
+"""
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+from html import unescape
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Set
+from urllib.parse import quote, unquote, urlsplit
+import config
+
+IMG_SRC_PATTERN = re.compile(r'(<img\b[^>]*?\bsrc=")([^"]+)(")')
+
+class ImageAsset(NamedTuple):
+    """Exported form of an image file"""
+    digest: str
+    data_uri: Optional[str]  # set for inlined images
+    file: Optional[Path]  # content-addressed copy of larger images
+
+class ImageAssets:
+    """
+    Rewrite image references so exported HTML no longer depends on the
+    source folder
+    
+    Images up to inline_max_bytes become data URIs; larger ones are copied
+    once into a shared directory under a name derived from their content,
+    so identical images used by many documents are stored once. An
+    instance is meant to last for one export run: every image file is read
+    at most once.
+    """
+    
+    def __init__(self, assets_dir: Path, inline_max_bytes: int = config.IMAGE_INLINE_MAX_BYTES):
+        """
+        Initialize the pipeline
+        
+        Args:
+            assets_dir: Directory that receives copies of larger images
+            inline_max_bytes: Largest image embedded as a data URI
+        """
+        self.assets_dir = Path(assets_dir)
+        self.inline_max_bytes = inline_max_bytes
+        
+        # Resolved source path -> asset (None if it cannot be read)
+        self._assets: Dict[str, Optional[ImageAsset]] = {}
+        self._written: Set[str] = set()
+        self.files_read = 0
+    
+    def rewrite(self, html_content: str, source_dir: Path, output_dir: Path) -> str:
+        """
+        Replace local image sources with data URIs or copied files
+        
+        Images that cannot be found keep their original source.
+        
+        Args:
+            html_content: Rendered HTML
+            source_dir: Directory of the Markdown file, for relative paths
+            output_dir: Directory the HTML is written to
+        
+        Returns:
+            HTML with rewritten image sources
+        """
+        def replace(match):
+            src = unescape(match.group(2))
+            parts = urlsplit(src)
+            if parts.scheme or parts.netloc or not parts.path:
+                return match.group(0)
+            
+            asset = self._load(Path(source_dir) / unquote(parts.path))
+            if asset is None:
+                return match.group(0)
+            if asset.data_uri is not None:
+                new_src = asset.data_uri
+            else:
+                relative = os.path.relpath(asset.file, output_dir)
+                new_src = quote(Path(relative).as_posix())
+            return f"{match.group(1)}{new_src}{match.group(3)}"
+        
+        return IMG_SRC_PATTERN.sub(replace, html_content)
+    
+    def _load(self, path: Path) -> Optional[ImageAsset]:
+        """Read an image once and store its exported form"""
+        key = os.path.normcase(os.path.abspath(path))
+        if key in self._assets:
+            return self._assets[key]
+        
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self._assets[key] = None
+            return None
+        self.files_read += 1
+        
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if len(data) <= self.inline_max_bytes:
+            mime = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+            encoded = base64.b64encode(data).decode('ascii')
+            asset = ImageAsset(digest, f"data:{mime};base64,{encoded}", None)
+        else:
+            target = self.assets_dir / f"{digest}{path.suffix.lower()}"
+            if digest not in self._written:
+                # Content-addressed: an existing file already holds these bytes
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(data)
+                self._written.add(digest)
+            asset = ImageAsset(digest, None, target)
+        
+        self._assets[key] = asset
+        return asset
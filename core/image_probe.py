@@ -0,0 +1,231 @@
+"""
+Image dimensions read from file headers, and lazy-loading image markup
+"""
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+import config
+
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>')
+SRC_ATTR_PATTERN = re.compile(r'\ssrc="([^"]*)"')
+SVG_TAG_PATTERN = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE)
+SVG_LENGTH_PATTERN = rb'\s%s\s*=\s*["\']\s*([\d.]+)\s*(?:px)?\s*["\']'
+SVG_VIEWBOX_PATTERN = re.compile(rb'\sviewBox\s*=\s*["\']\s*[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)')
+
+# Bytes read for formats whose size is near the start of the file
+HEADER_BYTES = 32
+SVG_HEADER_BYTES = 4096
+
+def _jpeg_size(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    """Walk JPEG segments up to the frame header, honouring EXIF rotation"""
+    f.seek(2)
+    rotated = False
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7:
+            continue  # segments without a length
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack('>H', header)[0]
+        
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return (height, width) if rotated else (width, height)
+        
+        segment = f.read(length - 2)
+        if marker == 0xe1 and segment.startswith(b'Exif\0\0'):
+            rotated = _exif_orientation(segment[6:]) in (5, 6, 7, 8)
+
+def _exif_orientation(tiff: bytes) -> int:
+    """Read the orientation tag of an EXIF TIFF block (1 if absent)"""
+    if tiff[:2] == b'II':
+        order = '<'
+    elif tiff[:2] == b'MM':
+        order = '>'
+    else:
+        return 1
+    try:
+        offset = struct.unpack(order + 'I', tiff[4:8])[0]
+        count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            tag = struct.unpack(order + 'H', tiff[entry:entry + 2])[0]
+            if tag == 0x0112:
+                return struct.unpack(order + 'H', tiff[entry + 8:entry + 10])[0]
+    except struct.error:
+        pass
+    return 1
+
+def _svg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    """Get an SVG's size from its width/height attributes or viewBox"""
+    tag = SVG_TAG_PATTERN.search(head)
+    if tag is None:
+        return None
+    tag = tag.group(0)
+    
+    width = re.search(SVG_LENGTH_PATTERN % rb'width', tag)
+    height = re.search(SVG_LENGTH_PATTERN % rb'height', tag)
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = SVG_VIEWBOX_PATTERN.search(tag)
+    if view_box:
+        return round(float(view_box.group(1))), round(float(view_box.group(2)))
+    return None
+
+def read_image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Get the pixel size of an image without decoding it
+    
+    Only the header is read (PNG, GIF, BMP, WebP); JPEG files are read up
+    to the frame header and SVG files up to the root element.
+    
+    Args:
+        path: Image file
+    
+    Returns:
+        Tuple of (width, height), or None for unknown or broken files
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_BYTES)
+            
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head.startswith(b'BM') and len(head) >= 26:
+                width, height = struct.unpack('<ii', head[18:26])
+                return width, abs(height)
+            if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+                chunk = head[12:16]
+                if chunk == b'VP8 ':
+                    width, height = struct.unpack('<HH', head[26:30])
+                    return width & 0x3fff, height & 0x3fff
+                if chunk == b'VP8L':
+                    b0, b1, b2, b3 = head[21:25]
+                    return (1 + (((b1 & 0x3f) << 8) | b0),
+                            1 + (((b3 & 0x0f) << 10) | (b2 << 2) | ((b1 & 0xc0) >> 6)))
+                if chunk == b'VP8X':
+                    return (1 + int.from_bytes(head[24:27], 'little'),
+                            1 + int.from_bytes(head[27:30], 'little'))
+                return None
+            if head.startswith(b'\xff\xd8'):
+                return _jpeg_size(f)
+            
+            head += f.read(SVG_HEADER_BYTES - len(head))
+            return _svg_size(head)
+    except (OSError, struct.error, ValueError):
+        return None
+
+class ImageProbe:
+    """
+    Cached image sizes, used to give <img> tags their dimensions up front
+    
+    Entries are checked against the file's modification time and size, so
+    a changed image is probed again while unchanged ones cost one stat.
+    """
+    
+    def __init__(self, max_entries: int = config.IMAGE_PROBE_CACHE_SIZE):
+        """
+        Initialize the probe
+        
+        Args:
+            max_entries: Number of image sizes to keep
+        """
+        self.max_entries = max_entries
+        # Path -> (mtime_ns, size, dimensions) in LRU order
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def size(self, path: Path) -> Optional[Tuple[int, int]]:
+        """
+        Get an image's pixel size
+        
+        Args:
+            path: Image file
+        
+        Returns:
+            Tuple of (width, height), or None if unknown
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._cache.move_to_end(key)
+                return cached[2]
+        
+        dimensions = read_image_size(Path(key))
+        with self._lock:
+            self._cache[key] = (stat.st_mtime_ns, stat.st_size, dimensions)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return dimensions
+    
+    def annotate(self, html_content: str, base_dir: Optional[Path]) -> str:
+        """
+        Make images load lazily and reserve their space before loading
+        
+        Adds loading="lazy" and decoding="async" to every <img>, and width
+        and height to local images that have neither.
+        
+        Args:
+            html_content: Rendered HTML
+            base_dir: Directory relative image paths are resolved against
+                (None leaves sizes out)
+        
+        Returns:
+            HTML with annotated image tags
+        """
+        if '<img' not in html_content:
+            return html_content
+        
+        def replace(match):
+            tag = match.group(0)
+            additions = []
+            if ' loading=' not in tag:
+                additions.append('loading="lazy"')
+            if ' decoding=' not in tag:
+                additions.append('decoding="async"')
+            if base_dir is not None and ' width=' not in tag and ' height=' not in tag:
+                dimensions = self._local_size(tag, base_dir)
+                if dimensions is not None:
+                    additions.append(f'width="{dimensions[0]}" height="{dimensions[1]}"')
+            if not additions:
+                return tag
+            
+            end = len(tag) - 2 if tag.endswith('/>') else len(tag) - 1
+            return f"{tag[:end].rstrip()} {' '.join(additions)}{tag[end:]}"
+        
+        return IMG_TAG_PATTERN.sub(replace, html_content)
+    
+    def _local_size(self, tag: str, base_dir: Path) -> Optional[Tuple[int, int]]:
+        """Get the size of the local image an <img> tag refers to"""
+        src = SRC_ATTR_PATTERN.search(tag)
+        if src is None:
+            return None
+        parts = urlsplit(src.group(1).replace('&amp;', '&'))
+        if parts.scheme or parts.netloc or not parts.path:
+            return None
+        return self.size(Path(base_dir) / unquote(parts.path))
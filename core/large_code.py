@@ -0,0 +1,136 @@
+"""
+Large fenced code blocks for the preview: only the first lines are
+highlighted up front, the rest when the page scrolls them into view
+
+A fence of config.LARGE_CODE_MIN_LINES lines or more is rendered with its
+first config.LARGE_CODE_HIGHLIGHT_LINES lines highlighted and the others
+as plain text in chunks of config.LARGE_CODE_CHUNK_LINES lines. The
+preview runtime asks for each chunk's highlighting once the chunk comes
+near the view. Line numbers are drawn with CSS counters rather than the
+line number table of the highlight extension. Exports never take this
+path and always get the fully highlighted block.
+"""
+import html
+import re
+from typing import List, NamedTuple, Optional
+from pygments.lexers import get_lexer_by_name
+from pygments.token import STANDARD_TYPES
+from pygments.util import ClassNotFound
+
+# Opening line with at most a plain language name; fences with attributes
+# or options are rendered the usual way
+OPEN_PATTERN = re.compile(r'^(`{3,}|~{3,})[ \t]*([\w#+.-]*)[ \t]*$')
+
+# Fences handled by custom formatters of the superfences extension
+CUSTOM_FENCES = ('mermaid', 'math')
+
+class Fence(NamedTuple):
+    """Source of a fenced code block"""
+    language: str
+    lines: List[str]
+
+def parse_fence(block_text: str) -> Optional[Fence]:
+    """
+    Parse a block that is exactly one fenced code block
+    
+    Args:
+        block_text: Markdown source of the block
+    
+    Returns:
+        The fence, or None if the block is anything else (it is then
+        rendered the usual way)
+    """
+    lines = block_text.split('\n')
+    match = OPEN_PATTERN.match(lines[0])
+    if match is None or len(lines) < 2:
+        return None
+    marker, language = match.group(1), match.group(2)
+    if language.lower() in CUSTOM_FENCES:
+        return None
+    
+    def closes(line: str) -> bool:
+        stripped = line.strip()
+        return stripped.startswith(marker) and stripped.strip(marker[0]) == ''
+    
+    body = lines[1:-1]
+    if not closes(lines[-1]) or any(closes(line) for line in body):
+        return None
+    return Fence(language, body)
+
+def _token_class(ttype) -> str:
+    """Get the CSS class Pygments' HTML formatter gives a token type"""
+    name = STANDARD_TYPES.get(ttype)
+    suffix = ''
+    while name is None:
+        suffix = ttype[-1] + suffix
+        ttype = ttype.parent
+        name = STANDARD_TYPES.get(ttype)
+    return name + suffix
+
+def highlight_lines(lines: List[str], language: str) -> List[str]:
+    """
+    Highlight source lines to one HTML line each
+    
+    The lines are lexed on their own, so a construct that started before
+    them (such as a multi-line string) may be colored differently than in
+    a full highlight.
+    
+    Args:
+        lines: Source lines
+        language: Fence language; unknown languages are escaped only
+    
+    Returns:
+        Line element per source line, each ending in a newline
+    """
+    try:
+        lexer = get_lexer_by_name(language, stripnl=False, ensurenl=False) if language else None
+    except ClassNotFound:
+        lexer = None
+    if lexer is None:
+        return plain_lines(lines)
+    
+    rendered = []
+    current = []
+    for ttype, value in lexer.get_tokens('\n'.join(lines)):
+        css_class = _token_class(ttype)
+        pieces = value.split('\n')
+        for index, piece in enumerate(pieces):
+            if index:
+                rendered.append(_line(''.join(current)))
+                current = []
+            if piece:
+                text = html.escape(piece, quote=False)
+                current.append(f'<span class="{css_class}">{text}</span>' if css_class else text)
+    rendered.append(_line(''.join(current)))
+    return rendered[:len(lines)]
+
+def plain_lines(lines: List[str]) -> List[str]:
+    """Escape source lines to one HTML line each, without highlighting"""
+    return [_line(html.escape(line, quote=False)) for line in lines]
+
+def _line(content: str) -> str:
+    return f'<span class="mdr-line">{content}</span>\n'
+
+def build_fragment(fence: Fence, head: List[str], chunk_lines: int) -> str:
+    """
+    Build the preview fragment of a large code block
+    
+    Args:
+        fence: Parsed fence
+        head: Highlighted HTML lines of the start of the block
+        chunk_lines: Lines per chunk of the plain rest
+    
+    Returns:
+        HTML fragment: the highlighted head and the plain rest in chunks
+        the preview runtime highlights on demand
+    """
+    parts = [
+        f'<div class="highlight mdr-code" style="--mdr-gutter: {len(str(len(fence.lines)))}ch;">'
+        '<pre><span></span><code>',
+        ''.join(head),
+    ]
+    for first in range(len(head), len(fence.lines), chunk_lines):
+        chunk = plain_lines(fence.lines[first:first + chunk_lines])
+        parts.append(f'<span class="mdr-code-chunk" data-first="{first}">{"".join(chunk)}</span>')
+    parts.append('</code></pre></div>')
+    return ''.join(parts)
@@ -0,0 +1,169 @@
+"""
+Large pipe tables for the preview: parsed without the tables extension and
+shipped to the page as data, so only the rows in view are in the DOM
+
+A table with config.LARGE_TABLE_MIN_ROWS rows or more is rendered as its
+header plus a JSON payload of row cells; the preview runtime mounts the
+visible rows as the page scrolls. Exports never take this path and always
+get the complete table.
+"""
+import html
+import json
+import re
+from typing import Callable, List, NamedTuple, Optional
+
+# Separator row cell: ---, :---, ---:, :---:
+ALIGN_PATTERN = re.compile(r'^\s*(:?)-+(:?)\s*$')
+
+# Cells without any of these render to their escaped text, so they skip
+# the Markdown parser
+MARKUP_PATTERN = re.compile(r'[*_`\[\]<>&!\\~=^$@:+{}]|www\.', re.IGNORECASE)
+
+class PipeTable(NamedTuple):
+    """Cell sources of a pipe table"""
+    header: List[str]
+    aligns: List[Optional[str]]  # 'left', 'right', 'center' or None
+    rows: List[List[str]]
+
+def split_row(line: str) -> List[str]:
+    """
+    Split a table row into cell sources like the tables extension does
+    
+    Pipes escaped with a backslash or inside code spans do not end a cell.
+    
+    Args:
+        line: Row source
+    
+    Returns:
+        Stripped cell sources
+    """
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    
+    cells = []
+    current = []
+    ticks = 0  # length of the backtick run that opened a code span
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == '\\' and i + 1 < len(line) and line[i + 1] == '|' and not ticks:
+            current.append('|')
+            i += 2
+            continue
+        if char == '`':
+            run = len(line) - i - len(line[i:].lstrip('`'))
+            if not ticks:
+                ticks = run
+            elif run == ticks:
+                ticks = 0
+            current.append(line[i:i + run])
+            i += run
+            continue
+        if char == '|' and not ticks:
+            cells.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    cells.append(''.join(current).strip())
+    return cells
+
+def parse_table(block_text: str) -> Optional[PipeTable]:
+    """
+    Parse a block that is exactly one pipe table
+    
+    Args:
+        block_text: Markdown source of the block
+    
+    Returns:
+        The table, or None if the block is anything else (it is then
+        rendered the usual way)
+    """
+    lines = block_text.split('\n')
+    if len(lines) < 2 or any('|' not in line for line in lines):
+        return None
+    
+    header = split_row(lines[0])
+    separators = split_row(lines[1])
+    if len(separators) != len(header):
+        return None
+    aligns = []
+    for cell in separators:
+        match = ALIGN_PATTERN.match(cell)
+        if match is None:
+            return None
+        left, right = match.group(1), match.group(2)
+        aligns.append('center' if left and right else 'left' if left else 'right' if right else None)
+    
+    columns = len(header)
+    rows = []
+    for line in lines[2:]:
+        cells = split_row(line)[:columns]
+        cells.extend([''] * (columns - len(cells)))
+        rows.append(cells)
+    return PipeTable(header, aligns, rows)
+
+def needs_markdown(cell: str) -> bool:
+    """Check whether a cell may contain Markdown or HTML"""
+    return MARKUP_PATTERN.search(cell) is not None
+
+def render_cells(table: PipeTable, convert: Callable[[List[str]], Optional[List[str]]],
+                 plain: bool = True) -> Optional[tuple]:
+    """
+    Render the cells of a table to inline HTML
+    
+    Args:
+        table: Parsed table
+        convert: Renders a list of cell sources to HTML in one go, or
+            returns None if it cannot
+        plain: Whether cells without markup may be escaped directly
+            (not when abbreviations could apply to plain words)
+    
+    Returns:
+        Tuple of (header HTML cells, row HTML cells), or None if convert
+        failed
+    """
+    sources = table.header + [cell for row in table.rows for cell in row]
+    marked = [i for i, cell in enumerate(sources) if not plain or needs_markdown(cell)]
+    converted = convert([sources[i] for i in marked]) if marked else []
+    if converted is None or len(converted) != len(marked):
+        return None
+    
+    rendered = [html.escape(cell, quote=False) for cell in sources]
+    for i, cell_html in zip(marked, converted):
+        rendered[i] = cell_html
+    
+    columns = len(table.header)
+    header = rendered[:columns]
+    rows = [rendered[start:start + columns] for start in range(columns, len(rendered), columns)]
+    return header, rows
+
+def build_fragment(table: PipeTable, header: List[str], rows: List[List[str]]) -> str:
+    """
+    Build the preview fragment of a virtualized table
+    
+    Args:
+        table: Parsed table, for the alignments
+        header: Header cells as HTML
+        rows: Row cells as HTML
+    
+    Returns:
+        HTML fragment: the table with its header and an empty body, and
+        the rows as JSON for the preview runtime
+    """
+    head = ''.join(
+        f'<th style="text-align: {align};">{cell}</th>' if align else f'<th>{cell}</th>'
+        for cell, align in zip(header, table.aligns)
+    )
+    payload = json.dumps({'aligns': table.aligns, 'rows': rows}, ensure_ascii=False,
+                         separators=(',', ':'))
+    # The payload must not be able to close its script element
+    payload = payload.replace('<', '\\u003c')
+    return (
+        f'<div class="mdr-table" data-rows="{len(rows)}">'
+        f'<table style="table-layout: fixed; width: 100%;"><thead><tr>{head}</tr></thead><tbody></tbody></table>'
+        f'<script type="application/json">{payload}</script></div>'
+    )
@@ -0,0 +1,179 @@
+"""
+HTML layout templates for exported documents
+
+A layout is an HTML file with placeholders:
+
+    {{ name }}         value passed to render(), inserted as is (HTML)
+    {{ meta.key }}     front matter value, HTML-escaped
+    {{> file.html }}   another template, relative to this one
+
+Templates are compiled once into a list of literal parts and slots, so
+rendering a page is a single join.
+"""
+import html
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+import config
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*(>)?\s*([\w./-]+)\s*\}\}')
+LAYOUT_NAME_PATTERN = re.compile(r'[\w-]+')
+META_PREFIX = 'meta.'
+
+class Layout(NamedTuple):
+    """Compiled layout template"""
+    path: Path
+    literals: Tuple[str, ...]  # one more than slots
+    slots: Tuple[Tuple[bool, str], ...]  # (is_meta, name) between literals
+    dependencies: Tuple[Tuple[Path, int], ...]  # (file, mtime_ns), including included files
+    
+    def render(self, values: Dict[str, str], metadata: Optional[dict] = None) -> str:
+        """
+        Fill in the layout
+        
+        Args:
+            values: HTML for each {{ name }} slot (missing slots are empty)
+            metadata: Front matter for {{ meta.key }} slots
+        
+        Returns:
+            Rendered HTML
+        """
+        metadata = metadata or {}
+        literals = self.literals
+        parts = [literals[0]]
+        for index, (is_meta, name) in enumerate(self.slots, 1):
+            if is_meta:
+                value = metadata.get(name)
+                parts.append("" if value is None else html.escape(str(value)))
+            else:
+                parts.append(values.get(name, ""))
+            parts.append(literals[index])
+        return ''.join(parts)
+
+def _compile(path: Path, including: Tuple[Path, ...] = ()) -> Layout:
+    """Compile a template file and the templates it includes"""
+    if path in including:
+        raise ValueError(f"Layout includes itself: {path}")
+    text = path.read_text(encoding='utf-8')
+    if including and text.endswith('\n'):
+        # The include tag sits on its own line already
+        text = text[:-1]
+    dependencies = [(path, os.stat(path).st_mtime_ns)]
+    
+    literals: List[str] = []
+    slots: List[Tuple[bool, str]] = []
+    pending = []  # literal text since the last slot
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        pending.append(text[position:match.start()])
+        position = match.end()
+        include, name = match.groups()
+        
+        if include:
+            # Inline the included template's parts into this one
+            part = _compile((path.parent / name).resolve(), including + (path,))
+            dependencies.extend(part.dependencies)
+            pending.append(part.literals[0])
+            for slot, literal in zip(part.slots, part.literals[1:]):
+                literals.append(''.join(pending))
+                slots.append(slot)
+                pending = [literal]
+        else:
+            literals.append(''.join(pending))
+            if name.startswith(META_PREFIX):
+                slots.append((True, name[len(META_PREFIX):]))
+            else:
+                slots.append((False, name))
+            pending = []
+    
+    pending.append(text[position:])
+    literals.append(''.join(pending))
+    return Layout(path, tuple(literals), tuple(slots), tuple(dependencies))
+
+class LayoutCache:
+    """
+    Compiled layouts keyed by path
+    
+    A cached layout is reused while none of its files changed, which costs
+    one stat per file; edited layouts are compiled again.
+    """
+    
+    def __init__(self, layouts_dir: Path = config.LAYOUTS_DIR):
+        """
+        Initialize the cache
+        
+        Args:
+            layouts_dir: Directory layouts given by name are found in
+        """
+        self.layouts_dir = Path(layouts_dir)
+        self._layouts: Dict[Path, Layout] = {}
+        self._lock = threading.Lock()
+        self.compile_count = 0
+    
+    def resolve(self, layout: Union[str, Path]) -> Path:
+        """
+        Get the file of a layout
+        
+        Names come from front matter, so documents rendered for others
+        (such as by the render server) must not reach files elsewhere.
+        
+        Args:
+            layout: Layout name (e.g. 'sidebar') or path to a template file
+                in layouts_dir
+        
+        Returns:
+            Absolute path of the template
+        
+        Raises:
+            ValueError: If the name is not a bare name, or the layout does
+                not exist or is outside layouts_dir
+        """
+        if isinstance(layout, Path):
+            path = layout
+        elif LAYOUT_NAME_PATTERN.fullmatch(layout):
+            path = self.layouts_dir / f"{layout}.html"
+        else:
+            raise ValueError(f"Invalid layout name: {layout}")
+        
+        path = path.resolve()
+        if not path.is_relative_to(self.layouts_dir.resolve()):
+            raise ValueError(f"Layout is outside the layouts folder: {layout}")
+        if not path.is_file():
+            raise ValueError(f"Unknown layout: {layout}")
+        return path
+    
+    def get(self, layout: Union[str, Path] = config.EXPORT_LAYOUT) -> Layout:
+        """
+        Get a compiled layout
+        
+        Args:
+            layout: Layout name or path to a template file
+        
+        Returns:
+            Layout
+        
+        Raises:
+            ValueError: If the layout is unknown (see resolve)
+            FileNotFoundError: If a file the layout includes is missing
+        """
+        path = self.resolve(layout)
+        with self._lock:
+            cached = self._layouts.get(path)
+        if cached is not None and self._is_current(cached):
+            return cached
+        
+        compiled = _compile(path)
+        with self._lock:
+            self._layouts[path] = compiled
+            self.compile_count += 1
+        return compiled
+    
+    @staticmethod
+    def _is_current(layout: Layout) -> bool:
+        """Check that none of a layout's files changed since it was compiled"""
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in layout.dependencies)
+        except OSError:
+            return False
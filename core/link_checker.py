@@ -0,0 +1,272 @@
+"""
+Link and image checking for exported documents
+"""
+import asyncio
+import os
+import ssl
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from core.link_index import LinkIndex, is_external
+from utils.helpers import is_valid_url
+import config
+
+# Characters left as they are when percent-encoding request targets
+URL_SAFE = "/:@!$&'()*+,;=%~"
+
+class CollectedLinks(NamedTuple):
+    """Links, images and element ids of a rendered document"""
+    links: List[str]  # href of every <a>
+    images: List[str]  # src of every <img>
+    ids: Set[str]
+
+class LinkProblem(NamedTuple):
+    """Link or image of an exported document that cannot be reached"""
+    source: Path
+    kind: str  # 'link' or 'image'
+    target: str
+    reason: str
+
+class LinkCollectorTreeprocessor(Treeprocessor):
+    """Record the links, images and ids of the rendered tree"""
+    
+    def run(self, root):
+        links, images, ids = [], [], set()
+        for element in root.iter():
+            if element.tag == 'a' and element.get('href'):
+                links.append(element.get('href'))
+            elif element.tag == 'img' and element.get('src'):
+                images.append(element.get('src'))
+            if element.get('id'):
+                ids.add(element.get('id'))
+        self.md.collected_links = CollectedLinks(links, images, ids)
+
+class LinkCollectorExtension(Extension):
+    """Collect links while rendering, after inline links are created"""
+    
+    def extendMarkdown(self, md):
+        md.treeprocessors.register(LinkCollectorTreeprocessor(md), 'link_collector', 1)
+
+class LinkChecker:
+    """
+    Check local paths and external URLs, remembering every result
+    
+    One checker is used for a whole export run, so a path or URL shared by
+    many documents is only checked once. Local paths are checked against
+    cached directory listings (one scandir per directory instead of one
+    stat per link); external URLs get concurrent HEAD requests.
+    """
+    
+    def __init__(self, check_remote: bool = config.LINK_CHECK_REMOTE,
+                 endpoint: Optional[str] = config.LINK_CHECK_ENDPOINT,
+                 concurrency: int = config.LINK_CHECK_CONCURRENCY,
+                 timeout: float = config.LINK_CHECK_TIMEOUT):
+        """
+        Initialize the checker
+        
+        Args:
+            check_remote: Whether external URLs are requested
+            endpoint: HTTP proxy URL all requests are sent to (e.g. a local
+                stub for offline runs); None connects to each host
+            concurrency: Maximum number of requests in flight
+            timeout: Seconds before a request counts as failed
+        """
+        self.check_remote = check_remote
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.timeout = timeout
+        
+        self.link_index = LinkIndex()
+        self._listings: Dict[str, Optional[Set[str]]] = {}
+        self._remote: Dict[str, Optional[str]] = {}  # URL -> problem or None
+        self.requests_sent = 0
+    
+    def path_exists(self, path: str) -> bool:
+        """
+        Check whether a file or directory exists, using cached listings
+        
+        Names missing from a listing are checked with a stat, since on
+        case-insensitive file systems (Windows, macOS) a link may spell a
+        name with other case than the file.
+        
+        Args:
+            path: Absolute path
+        
+        Returns:
+            True if the path exists
+        """
+        path = os.path.normpath(path)
+        directory, name = os.path.split(path)
+        if not name:
+            return os.path.isdir(path)
+        
+        if directory not in self._listings:
+            try:
+                with os.scandir(directory) as entries:
+                    self._listings[directory] = {entry.name for entry in entries}
+            except OSError:
+                self._listings[directory] = None
+        listing = self._listings[directory]
+        if listing is None:
+            return False
+        return name in listing or os.path.exists(path)
+    
+    def check_document(self, source: Path, collected: CollectedLinks) -> Tuple[List[LinkProblem], List[str]]:
+        """
+        Check the local links and images of a rendered document
+        
+        Args:
+            source: Markdown file the document was rendered from
+            collected: Links collected while rendering it
+        
+        Returns:
+            Tuple of (problems found, external URLs still to check)
+        """
+        problems = []
+        urls = []
+        base = source.parent
+        
+        targets = [('link', target) for target in collected.links]
+        targets += [('image', target) for target in collected.images]
+        for kind, target in targets:
+            parts = urlsplit(target)
+            if is_external(target):
+                if parts.scheme in ('http', 'https'):
+                    if is_valid_url(target):
+                        urls.append(target)
+                    else:
+                        problems.append(LinkProblem(source, kind, target, "malformed URL"))
+                continue
+            if target.startswith('data:'):
+                continue
+            
+            if not parts.path:
+                # Anchor in the same document
+                anchor = unquote(parts.fragment)
+                if anchor and anchor not in collected.ids:
+                    problems.append(LinkProblem(source, kind, target, f"no heading #{anchor}"))
+                continue
+            
+            path = os.path.join(base, unquote(parts.path))
+            if not self.path_exists(path):
+                problems.append(LinkProblem(source, kind, target, "file not found"))
+            elif parts.fragment and self.link_index.resolve(str(source), target) is None:
+                problems.append(LinkProblem(source, kind, target, f"no heading #{unquote(parts.fragment)}"))
+        
+        return problems, urls
+    
+    def check_urls(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Check external URLs concurrently, skipping those already checked
+        
+        Args:
+            urls: URLs to check
+        
+        Returns:
+            Dictionary of URL to problem description (None if reachable)
+        """
+        urls = list(dict.fromkeys(urls))
+        if self.check_remote:
+            pending = [url for url in urls if url not in self._remote]
+            if pending:
+                results = asyncio.run(self._check_all(pending))
+                self._remote.update(zip(pending, results))
+        return {url: self._remote.get(url) for url in urls}
+    
+    async def _check_all(self, urls: List[str]) -> List[Optional[str]]:
+        """Send HEAD requests with a bounded number in flight"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        context = ssl.create_default_context()
+        
+        async def check(url):
+            async with semaphore:
+                try:
+                    status = await asyncio.wait_for(self._head(url, context), self.timeout)
+                except asyncio.TimeoutError:
+                    return "timed out"
+                except (OSError, ValueError) as e:
+                    return str(e) or type(e).__name__
+            # Servers that refuse HEAD still answered
+            if status < 400 or status in (405, 501):
+                return None
+            return f"HTTP {status}"
+        
+        return await asyncio.gather(*(check(url) for url in urls))
+    
+    async def _head(self, url: str, context: ssl.SSLContext) -> int:
+        """Send a HEAD request and return the status code"""
+        self.requests_sent += 1
+        parts = urlsplit(url)
+        # Non-ASCII hosts and paths are sent encoded
+        host = parts.hostname.encode('idna').decode('ascii')
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        target = quote(parts.path or '/', safe=URL_SAFE)
+        if parts.query:
+            target += '?' + quote(parts.query, safe=URL_SAFE)
+        
+        if self.endpoint:
+            # Proxy-style request with the absolute URL as target
+            server = urlsplit(self.endpoint)
+            target = urlunsplit((parts.scheme, host, target, '', ''))
+        else:
+            server = parts
+        
+        secure = server.scheme == 'https'
+        port = server.port or (443 if secure else 80)
+        reader, writer = await asyncio.open_connection(
+            server.hostname, port, ssl=context if secure else None
+        )
+        try:
+            request = (
+                f"HEAD {target} HTTP/1.1\r\n"
+                f"Host: {host}\r\n"
+                f"User-Agent: {config.APP_NAME}/{config.APP_VERSION}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(request.encode('ascii'))
+            await writer.drain()
+            status_line = await reader.readline()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        
+        fields = status_line.decode('latin-1').split()
+        if len(fields) < 2 or not fields[1].isdigit():
+            raise ValueError("invalid HTTP response")
+        return int(fields[1])
+    
+    def check_batch(self, documents: Dict[Path, CollectedLinks]) -> List[LinkProblem]:
+        """
+        Check the links and images of many rendered documents
+        
+        External URLs of all documents are gathered first and requested
+        once each, concurrently.
+        
+        Args:
+            documents: Dictionary of source file to its collected links
+        
+        Returns:
+            List of LinkProblem
+        """
+        problems = []
+        external: List[Tuple[Path, str, str]] = []
+        for source, collected in documents.items():
+            local_problems, urls = self.check_document(source, collected)
+            problems.extend(local_problems)
+            images = set(collected.images)
+            external.extend((source, 'image' if url in images else 'link', url) for url in urls)
+        
+        results = self.check_urls(url for _, _, url in external)
+        reported = set()
+        for source, kind, url in external:
+            problem = results.get(url)
+            if problem and (source, url) not in reported:
+                reported.add((source, url))
+                problems.append(LinkProblem(source, kind, url, problem))
+        return problems
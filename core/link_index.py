@@ -0,0 +1,278 @@
+"""
+Link graph of Markdown files: headings, anchors and links of each file
+"""
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+from core.file_handler import FileHandler
+from core.outline import Heading, scan_outline
+
+# Links the cursor can be on: [text](target), <url> and [id]: target
+LINK_AT_PATTERNS = [
+    re.compile(r'!?\[[^\]]*\]\(\s*<?([^)\s>]+)[^)]*\)'),
+    re.compile(r'<((?:https?|ftp|mailto):[^>\s]+)>'),
+    re.compile(r'^\s{0,3}\[[^\]]+\]:\s*<?([^\s>]+)'),
+]
+
+class LinkTarget(NamedTuple):
+    """Location a link points at"""
+    path: Path
+    line: int  # 0-based line of the heading, or 0 for the file itself
+
+class BrokenLink(NamedTuple):
+    """Link whose file or heading does not exist"""
+    source: Path
+    line: int
+    target: str
+    reason: str
+
+class FileOutline(NamedTuple):
+    """Indexed headings and links of one file"""
+    headings: List[Heading]
+    anchors: Dict[str, int]  # anchor -> 0-based heading line
+    links: List[Tuple[int, str]]
+    targets: Set[str]  # keys of the local files it links to
+
+def is_external(target: str) -> bool:
+    """
+    Check whether a link target is a URL rather than a local file
+    
+    Args:
+        target: Link target as written
+    
+    Returns:
+        True for targets with a scheme (http:, mailto:, ...) or host
+    """
+    parts = urlsplit(target)
+    # A one-letter "scheme" is a Windows drive letter
+    return len(parts.scheme) > 1 or bool(parts.netloc)
+
+def link_at(line_text: str, column: int) -> Optional[str]:
+    """
+    Find the link target under a cursor position
+    
+    Args:
+        line_text: Text of the line
+        column: Cursor position in the line
+    
+    Returns:
+        Link target, or None if the cursor is not on a link
+    """
+    for pattern in LINK_AT_PATTERNS:
+        for match in pattern.finditer(line_text):
+            if match.start() <= column <= match.end():
+                return match.group(1)
+    return None
+
+class LinkIndex:
+    """
+    Headings and links of Markdown files, for resolving links across files
+    
+    Files are keyed by normalized absolute path, so resolving a link, and
+    looking up its file and anchor, are dictionary lookups.
+    """
+    
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Initialize the index
+        
+        Args:
+            root: Workspace folder; links starting with / resolve against it
+        """
+        self.root = Path(root).resolve() if root else None
+        self._files: Dict[str, FileOutline] = {}
+        self._backlinks: Dict[str, Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._files)
+    
+    @staticmethod
+    def _key(path) -> str:
+        """Normalize a path without touching the file system"""
+        return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+    
+    def load(self, outlines: Dict[Path, Tuple[List[Heading], List[Tuple[int, str]]]]):
+        """
+        Replace the index with stored outlines, e.g. WorkspaceIndex.outlines()
+        
+        Args:
+            outlines: Dictionary of file path to (headings, links)
+        """
+        self._files.clear()
+        self._backlinks.clear()
+        for path, (headings, links) in outlines.items():
+            self._store(self._key(path), headings, links)
+    
+    def update_file(self, file_path: str, text: Optional[str] = None):
+        """
+        Index (or re-index) a single file
+        
+        Args:
+            file_path: Path of the file
+            text: Content to index instead of reading the file, e.g. an
+                unsaved editor buffer
+        """
+        key = self._key(file_path)
+        if text is None:
+            try:
+                text = Path(file_path).read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                self.remove_file(file_path)
+                return
+        
+        outline = scan_outline(text)
+        self._store(key, outline.headings, outline.links)
+    
+    def remove_file(self, file_path: str):
+        """
+        Drop a file from the index
+        
+        Args:
+            file_path: Path of the file
+        """
+        key = self._key(file_path)
+        entry = self._files.pop(key, None)
+        if entry is not None:
+            for target in entry.targets:
+                self._backlinks.get(target, set()).discard(key)
+    
+    def _store(self, key: str, headings: List[Heading], links: List[Tuple[int, str]]):
+        """Record a file's outline and update backlinks"""
+        self.remove_file(key)
+        
+        targets = set()
+        for _, target in links:
+            resolved = self._split(key, target)
+            if resolved is not None and resolved[0] != key:
+                targets.add(resolved[0])
+        
+        anchors = {}
+        for heading in headings:
+            anchors.setdefault(heading.anchor, heading.line)
+        
+        self._files[key] = FileOutline(headings, anchors, links, targets)
+        for target in targets:
+            self._backlinks.setdefault(target, set()).add(key)
+    
+    def _split(self, source_key: str, target: str) -> Optional[Tuple[str, str]]:
+        """
+        Turn a local link target into (file key, anchor)
+        
+        Returns:
+            None for external links
+        """
+        if is_external(target):
+            return None
+        
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        anchor = unquote(parts.fragment)
+        
+        if not path:
+            return source_key, anchor
+        if path.startswith('/') and self.root is not None:
+            return self._key(self.root / path.lstrip('/')), anchor
+        return self._key(os.path.join(os.path.dirname(source_key), path)), anchor
+    
+    def _outline(self, key: str) -> Optional[FileOutline]:
+        """Get a file's outline, indexing Markdown files outside the workspace on first use"""
+        entry = self._files.get(key)
+        if entry is None and FileHandler.is_markdown_file(key) and os.path.isfile(key):
+            self.update_file(key)
+            entry = self._files.get(key)
+        return entry
+    
+    def resolve(self, source: str, target: str) -> Optional[LinkTarget]:
+        """
+        Find where a link points
+        
+        Args:
+            source: Path of the file containing the link
+            target: Link target as written, e.g. "other.md#setup"
+        
+        Returns:
+            LinkTarget, or None for external or broken links
+        """
+        split = self._split(self._key(source), target)
+        if split is None:
+            return None
+        key, anchor = split
+        
+        entry = self._outline(key)
+        if entry is None:
+            # Images and other local files only need to exist
+            if not anchor and os.path.exists(key):
+                return LinkTarget(Path(key), 0)
+            return None
+        
+        if not anchor:
+            return LinkTarget(Path(key), 0)
+        line = entry.anchors.get(anchor)
+        return LinkTarget(Path(key), line) if line is not None else None
+    
+    def check(self, file_path: str) -> List[BrokenLink]:
+        """
+        Find the broken local links of a file
+        
+        Args:
+            file_path: Path of an indexed file
+        
+        Returns:
+            List of BrokenLink in line order
+        """
+        source = self._key(file_path)
+        entry = self._outline(source)
+        if entry is None:
+            return []
+        
+        broken = []
+        for line, target in entry.links:
+            split = self._split(source, target)
+            if split is None or self.resolve(source, target) is not None:
+                continue
+            key, anchor = split
+            if self._outline(key) is None and not os.path.exists(key):
+                reason = "file not found"
+            else:
+                reason = f"no heading #{anchor}"
+            broken.append(BrokenLink(Path(source), line, target, reason))
+        return broken
+    
+    def broken_links(self) -> List[BrokenLink]:
+        """
+        Find the broken local links of every indexed file
+        
+        Returns:
+            List of BrokenLink
+        """
+        broken = []
+        for key in list(self._files):
+            broken.extend(self.check(key))
+        return broken
+    
+    def headings(self, file_path: str) -> List[Heading]:
+        """
+        Get the headings of a file
+        
+        Args:
+            file_path: Path of the file
+        
+        Returns:
+            List of Heading
+        """
+        entry = self._outline(self._key(file_path))
+        return entry.headings if entry else []
+    
+    def backlinks(self, file_path: str) -> List[Path]:
+        """
+        Get the indexed files that link to a file
+        
+        Args:
+            file_path: Path of the file
+        
+        Returns:
+            Sorted list of linking file paths
+        """
+        return sorted(Path(key) for key in self._backlinks.get(self._key(file_path), ()))
@@ -4,222 +4,767 @@ Markdown to HTML processor with extensions support
 import markdown
 from markdown.extensions import Extension
 from markdown.preprocessors import Preprocessor
+import hashlib
+import html
 import re
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional
+from core.block_context import (BlockFootnotesExtension, apply_heading_ids, block_heading_ids,
+                                 defined_footnotes, rename_collected_ids)
+from core.blocks import FOOTNOTE_PATTERN, Block, split_blocks
+from core.document_model import KIND_FENCE, KIND_TABLE, DocumentModel, FragmentStore, block_kind
+from core.bundled_assets import BundledAssets
+from core.diagrams import DiagramCache
+from core.front_matter import FrontMatter, FrontMatterCache
+from core.image_assets import ImageAssets
+from core.image_probe import ImageProbe
+from core.large_code import highlight_lines, parse_fence
+from core.large_code import build_fragment as build_code_fragment
+from core.large_tables import build_fragment, parse_table, render_cells
+from core.layouts import LayoutCache
+from core.outline import scan_outline
+from core.link_checker import CollectedLinks, LinkCollectorExtension
+from core.metrics import REGISTRY
 import config
 
+BLOCK_ERRORS = REGISTRY.counter('preview_block_errors_total',
+                                "Preview blocks that failed to render", ('error',))
+
+# Base stylesheet shared by exported documents and the preview page
+BASE_CSS = """
+    /* Base styles */
+    body {
+        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica', 'Arial', sans-serif;
+        line-height: 1.6;
+        padding: 20px;
+        max-width: 900px;
+        margin: 0 auto;
+    }
+    
+    /* Code block styling */
+    .codehilite, .highlight {
+        background-color: #f6f8fa;
+        border-radius: 6px;
+        padding: 16px;
+        overflow-x: auto;
+        margin: 1em 0;
+    }
+    
+    code {
+        font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
+        font-size: 0.9em;
+    }
+    
+    /* Inline code */
+    p code, li code {
+        background-color: rgba(175, 184, 193, 0.2);
+        padding: 0.2em 0.4em;
+        border-radius: 3px;
+    }
+    
+    /* Table styling */
+    table {
+        border-collapse: collapse;
+        width: 100%;
+        margin: 1em 0;
+    }
+    
+    table th, table td {
+        border: 1px solid #dfe2e5;
+        padding: 6px 13px;
+    }
+    
+    table tr:nth-child(2n) {
+        background-color: #f6f8fa;
+    }
+    
+    /* Task list styling */
+    .task-list-item {
+        list-style-type: none;
+    }
+    
+    .task-list-item input[type="checkbox"] {
+        margin-right: 0.5em;
+    }
+    
+    /* Blockquote styling */
+    blockquote {
+        border-left: 4px solid #dfe2e5;
+        color: #6a737d;
+        padding-left: 1em;
+        margin-left: 0;
+    }
+    
+    /* Link styling */
+    a {
+        color: #0366d6;
+        text-decoration: none;
+    }
+    
+    a:hover {
+        text-decoration: underline;
+    }
+    
+    /* Heading anchors */
+    h1, h2, h3, h4, h5, h6 {
+        margin-top: 24px;
+        margin-bottom: 16px;
+        font-weight: 600;
+        line-height: 1.25;
+    }
+    
+    h1 {
+        font-size: 2em;
+        border-bottom: 1px solid #eaecef;
+        padding-bottom: 0.3em;
+    }
+    
+    h2 {
+        font-size: 1.5em;
+        border-bottom: 1px solid #eaecef;
+        padding-bottom: 0.3em;
+    }
+    
+    /* TOC styling */
+    .toc {
+        background-color: #f6f8fa;
+        border: 1px solid #d0d7de;
+        border-radius: 6px;
+        padding: 16px;
+        margin-bottom: 16px;
+    }
+    
+    .toc ul {
+        list-style-type: none;
+        padding-left: 1em;
+    }
+    
+    /* Image styling */
+    img {
+        max-width: 100%;
+        height: auto;
+    }
+    
+    /* Horizontal rule */
+    hr {
+        border: 0;
+        border-top: 1px solid #e1e4e8;
+        margin: 24px 0;
+    }
+    
+    /* Mark/highlight */
+    mark {
+        background-color: #fff3cd;
+        padding: 0.1em 0.2em;
+    }
+    
+    /* Keyboard keys */
+    kbd {
+        display: inline-block;
+        padding: 3px 5px;
+        font-size: 0.85em;
+        line-height: 1;
+        color: #444d56;
+        vertical-align: middle;
+        background-color: #fafbfc;
+        border: 1px solid #d1d5da;
+        border-radius: 3px;
+        box-shadow: inset 0 -1px 0 #d1d5da;
+    }
+    
+    /* Blocks that failed to render, shown as their source */
+    .mdr-render-error {
+        border-left: 4px solid #d73a49;
+        padding-left: 1em;
+        margin: 1em 0;
+    }
+    
+    .mdr-render-error pre {
+        white-space: pre-wrap;
+    }
+    
+    .mdr-error-badge {
+        display: inline-block;
+        padding: 0.1em 0.6em;
+        border-radius: 3px;
+        background-color: #d73a49;
+        color: #fff;
+        font-size: 0.8em;
+    }
+    
+    /* Diagrams Mermaid could not lay out, shown as their source */
+    .mermaid.mdr-diagram-error {
+        border-left: 4px solid #d73a49;
+        padding-left: 1em;
+        white-space: pre-wrap;
+        font-family: monospace;
+    }
+    
+    .mermaid.mdr-diagram-error::before {
+        content: "Could not render this diagram";
+        display: block;
+        width: fit-content;
+        margin-bottom: 0.5em;
+        padding: 0.1em 0.6em;
+        border-radius: 3px;
+        background-color: #d73a49;
+        color: #fff;
+        font-family: sans-serif;
+        font-size: 0.8em;
+    }
+"""
+
+# Leads each table cell converted by _convert_cells (INVISIBLE SEPARATOR)
+CELL_MARKER = '\u2063'
+CELL_PATTERN = re.compile(f'<p>{CELL_MARKER}(.*?)</p>', re.DOTALL)
+
+def render_error_fragment(block_text: str, error: Exception) -> str:
+    """
+    Build the fragment of a block that failed to render
+    
+    Args:
+        block_text: Markdown source of the block
+        error: Exception raised while rendering it
+    
+    Returns:
+        HTML fragment: an error badge and the escaped source
+    """
+    message = html.escape(f"{type(error).__name__}: {error}")
+    return (
+        f'<div class="mdr-render-error"><span class="mdr-error-badge" title="{message}">'
+        f'Could not render this block</span>'
+        f'<pre><code>{html.escape(block_text, quote=False)}</code></pre></div>'
+    )
+
 class MarkdownProcessor:
     """Process Markdown text and convert to HTML"""
     
     def __init__(self):
         """Initialize the Markdown processor with extensions"""
+        self.block_footnotes = BlockFootnotesExtension()
         self.md = markdown.Markdown(
-            extensions=config.MARKDOWN_EXTENSIONS,
+            extensions=config.MARKDOWN_EXTENSIONS + [LinkCollectorExtension(), self.block_footnotes],
             extension_configs=config.MARKDOWN_EXTENSION_CONFIGS,
             output_format='html5'
         )
+        
+        # Rendered block fragments keyed by block hash
+        self.fragments = FragmentStore(config.FRAGMENT_CACHE_SIZE)
+        
+        # Mermaid/KaTeX libraries for the preview page and exports
+        self.assets = BundledAssets()
+        
+        # Diagram SVGs rendered by the preview, reused in exports
+        self.diagrams = DiagramCache()
+        
+        # Image sizes for width/height attributes
+        self.image_probe = ImageProbe()
+        
+        # Parsed YAML front matter, and that of the last converted document
+        self.front_matter = FrontMatterCache()
+        self.metadata: dict = {}
+        
+        # Compiled HTML layouts for exported documents
+        self.layouts = LayoutCache()
     
-    def convert(self, markdown_text: str, theme_css: str = "") -> str:
+    def convert(self, markdown_text: str, theme_css: str = "",
+                asset_mode: str = config.EXPORT_ASSET_MODE,
+                output_dir: Optional[Path] = None, source_dir: Optional[Path] = None,
+                images: Optional[ImageAssets] = None, layout: Optional[str] = None,
+                layout_values: Optional[Dict[str, str]] = None) -> str:
         """
         Convert Markdown text to HTML with theme styling
         
+        Front matter is not rendered; its metadata is kept in
+        self.metadata and its title, if any, becomes the document title.
+        If an extension fails on the document, it is converted block by
+        block and the failing blocks are shown as their source with an
+        error badge, as in the preview.
+        The page is built from a layout template: the one given, else the
+        front matter's "layout", else config.EXPORT_LAYOUT.
+        
         Args:
             markdown_text: The Markdown content to convert
             theme_css: CSS styling to apply to the HTML
-            
+            asset_mode: How diagram/math libraries are included
+                ('inline', 'link' or 'cdn')
+            output_dir: Directory the document is written to (for 'link')
+            source_dir: Directory of the Markdown file, for relative images
+            images: Pipeline that inlines or copies local images (needs
+                source_dir and output_dir)
+            layout: Layout name or template path
+            layout_values: HTML for further layout slots, such as header,
+                navigation or footer
+        
         Returns:
             Complete HTML document with styling
         """
-        # Reset the parser to clear previous state
-        self.md.reset()
+        front_matter = self.read_front_matter(markdown_text)
+        self.metadata = front_matter.metadata
+        
+        try:
+            # Reset the parser to clear previous state
+            self.md.reset()
+            
+            # Convert markdown to HTML
+            html_content = self.md.convert(front_matter.body)
+            
+            # Get table of contents if generated
+            toc = ""
+            if hasattr(self.md, 'toc'):
+                toc = f'<div class="toc">{self.md.toc}</div>'
+        except Exception as e:
+            # Keep the rest of the document when an extension fails on part of it
+            print(f"Warning: Could not render document in one pass: {type(e).__name__}: {e}")
+            html_content = self._convert_by_block(front_matter.body)
+            toc = self.build_toc_html(front_matter.body)
+        
+        # Diagrams already laid out by the preview are embedded as SVG
+        html_content = self.diagrams.embed(html_content)
         
-        # Convert markdown to HTML
-        html_content = self.md.convert(markdown_text)
+        # Images load lazily with their space reserved
+        html_content = self.image_probe.annotate(html_content, source_dir)
         
-        # Get table of contents if generated
-        toc = ""
-        if hasattr(self.md, 'toc'):
-            toc = f'<div class="toc">{self.md.toc}</div>'
+        # Local images are inlined or copied so the export can be moved
+        if images is not None and source_dir is not None and output_dir is not None:
+            html_content = images.rewrite(html_content, source_dir, output_dir)
+        
+        # Only the libraries the document actually uses are included
+        asset_tags = self.assets.document_tags(html_content, asset_mode, output_dir)
         
         # Build complete HTML document
-        full_html = self._build_html_document(html_content, toc, theme_css)
+        title = str(front_matter.metadata.get('title') or "Markdown Preview")
+        full_html = self._build_html_document(
+            html_content, toc, theme_css, asset_tags, title,
+            layout or front_matter.metadata.get('layout') or config.EXPORT_LAYOUT,
+            layout_values, front_matter.metadata
+        )
         
         return full_html
     
-    def _build_html_document(self, content: str, toc: str, theme_css: str) -> str:
+    @property
+    def collected_links(self) -> CollectedLinks:
+        """Links, images and ids of the last converted document or block"""
+        return getattr(self.md, 'collected_links', CollectedLinks([], [], set()))
+    
+    def read_front_matter(self, markdown_text: str) -> FrontMatter:
         """
-        Build a complete HTML document with CSS and content
+        Split off and parse a document's front matter
+        
+        The YAML is only parsed when the front matter changed since it was
+        last read, so this is cheap to call on every render.
         
         Args:
-            content: The HTML content
-            toc: Table of contents HTML
-            theme_css: CSS styling
-            
+            markdown_text: The Markdown content
+        
         Returns:
-            Complete HTML document as string
+            FrontMatter with the metadata and the Markdown body
         """
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Markdown Preview</title>
-    <style>
-        {theme_css}
+        return self.front_matter.read(markdown_text)
+    
+    def split_document(self, markdown_text: str) -> tuple[list[Block], str]:
+        """
+        Split markdown text into top-level blocks for block rendering
         
-        /* Base styles */
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica', 'Arial', sans-serif;
-            line-height: 1.6;
-            padding: 20px;
-            max-width: 900px;
-            margin: 0 auto;
-        }}
+        Args:
+            markdown_text: The Markdown content to split
         
-        /* Code block styling */
-        .codehilite, .highlight {{
-            background-color: #f6f8fa;
-            border-radius: 6px;
-            padding: 16px;
-            overflow-x: auto;
-            margin: 1em 0;
-        }}
+        Returns:
+            Tuple of (blocks, definitions)
+        """
+        return split_blocks(markdown_text)
+    
+    def parse_document(self, markdown_text: str) -> DocumentModel:
+        """
+        Split markdown text into a compact block model for block rendering
         
-        code {{
-            font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
-            font-size: 0.9em;
-        }}
+        Args:
+            markdown_text: The Markdown content to split
         
-        /* Inline code */
-        p code, li code {{
-            background-color: rgba(175, 184, 193, 0.2);
-            padding: 0.2em 0.4em;
-            border-radius: 3px;
-        }}
+        Returns:
+            DocumentModel with each block's range, kind and hash, and the
+            document-wide ids of headings whose block alone numbers them
+            differently
+        """
+        model = DocumentModel.build(markdown_text, self.block_hash)
+        model.heading_ids = block_heading_ids(scan_outline(markdown_text).headings,
+                                              model.start_lines, model.end_lines, model.block_text)
+        return model
+    
+    @staticmethod
+    def apply_heading_ids(fragment: str, model: DocumentModel, index: int) -> str:
+        """
+        Give a rendered block the heading ids it has in the whole document
         
-        /* Table styling */
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-            margin: 1em 0;
-        }}
+        Args:
+            fragment: Rendered block
+            model: Document the block belongs to
+            index: Index of the block
         
-        table th, table td {{
-            border: 1px solid #dfe2e5;
-            padding: 6px 13px;
-        }}
+        Returns:
+            Fragment with matching heading ids
+        """
+        return apply_heading_ids(fragment, model.heading_ids.get(index))
+    
+    @staticmethod
+    def block_key(block_text: str, definitions: str = "") -> str:
+        """
+        Get the cache key for a block
         
-        table tr:nth-child(2n) {{
-            background-color: #f6f8fa;
-        }}
+        Args:
+            block_text: Markdown source of the block
+            definitions: Document-wide link/abbreviation definitions
         
-        /* Task list styling */
-        .task-list-item {{
-            list-style-type: none;
-        }}
+        Returns:
+            Hex digest identifying the block's rendered output
+        """
+        return f"{MarkdownProcessor.block_hash(block_text, definitions):016x}"
+    
+    @staticmethod
+    def block_hash(block_text: str, definitions: str = "") -> int:
+        """
+        Get the 64-bit hash a block key is the hex form of
         
-        .task-list-item input[type="checkbox"] {{
-            margin-right: 0.5em;
-        }}
+        Args:
+            block_text: Markdown source of the block
+            definitions: Document-wide link/abbreviation definitions
         
-        /* Blockquote styling */
-        blockquote {{
-            border-left: 4px solid #dfe2e5;
-            color: #6a737d;
-            padding-left: 1em;
-            margin-left: 0;
-        }}
+        Returns:
+            Unsigned 64-bit integer
+        """
+        digest = hashlib.blake2b(block_text.encode('utf-8'), digest_size=8)
+        digest.update(b'\0')
+        digest.update(definitions.encode('utf-8'))
+        return int.from_bytes(digest.digest(), 'big')
+    
+    def get_cached_block(self, key: str) -> Optional[str]:
+        """
+        Get a previously rendered block fragment
         
-        /* Link styling */
-        a {{
-            color: #0366d6;
-            text-decoration: none;
-        }}
+        Args:
+            key: Block key from block_key()
         
-        a:hover {{
-            text-decoration: underline;
-        }}
+        Returns:
+            HTML fragment, or None if the block is not cached
+        """
+        return self.fragments.get(int(key, 16))
+    
+    def render_block(self, block_text: str, definitions: str = "",
+                     key: Optional[str] = None) -> str:
+        """
+        Convert a single top-level block to an HTML fragment for the preview
         
-        /* Heading anchors */
-        h1, h2, h3, h4, h5, h6 {{
-            margin-top: 24px;
-            margin-bottom: 16px;
-            font-weight: 600;
-            line-height: 1.25;
-        }}
+        Tables of config.LARGE_TABLE_MIN_ROWS rows or more become
+        virtualized tables (see core/large_tables.py), fenced code of
+        config.LARGE_CODE_MIN_LINES lines or more is highlighted lazily
+        (see core/large_code.py).
         
-        h1 {{
-            font-size: 2em;
-            border-bottom: 1px solid #eaecef;
-            padding-bottom: 0.3em;
-        }}
+        A block an extension fails on is shown as its source with an error
+        badge. That fragment is cached like any other, so the block is not
+        tried again until it changes.
         
-        h2 {{
-            font-size: 1.5em;
-            border-bottom: 1px solid #eaecef;
-            padding-bottom: 0.3em;
-        }}
+        Args:
+            block_text: Markdown source of the block
+            definitions: Document-wide link/abbreviation definitions
+            key: Precomputed block key (computed if None)
         
-        /* TOC styling */
-        .toc {{
-            background-color: #f6f8fa;
-            border: 1px solid #d0d7de;
-            border-radius: 6px;
-            padding: 16px;
-            margin-bottom: 16px;
-        }}
+        Returns:
+            HTML fragment for the block
+        """
+        if key is None:
+            key = self.block_key(block_text, definitions)
         
-        .toc ul {{
-            list-style-type: none;
-            padding-left: 1em;
-        }}
+        fragment = self.get_cached_block(key)
+        if fragment is not None:
+            return fragment
+        
+        try:
+            fragment = self._convert_block(block_text, definitions)
+        except Exception as e:
+            print(f"Warning: Could not render preview block {key}: {type(e).__name__}: {e}")
+            BLOCK_ERRORS.inc(error=type(e).__name__)
+            fragment = render_error_fragment(block_text, e)
+        
+        self.fragments.put(int(key, 16), fragment)
+        
+        return fragment
+    
+    def _convert_block(self, block_text: str, definitions: str) -> str:
+        """Convert a block that is not cached to its fragment"""
+        # Footnotes are defined for every block; each lists its own only
+        self.block_footnotes.processor.keep = defined_footnotes(block_text)
+        try:
+            return self._convert_block_source(block_text, definitions)
+        finally:
+            self.block_footnotes.processor.keep = None
+    
+    def _convert_by_block(self, markdown_text: str) -> str:
+        """
+        Convert a document one top-level block at a time, for exports
+        
+        The links, images and ids of the blocks are merged into the
+        collected_links of the whole document.
+        """
+        model = self.parse_document(markdown_text)
+        parts = []
+        links, images, ids = [], [], set()
+        for index in range(len(model)):
+            block_text = model.block_text(index)
+            self.block_footnotes.processor.keep = defined_footnotes(block_text)
+            try:
+                fragment = self._convert_markdown(block_text, model.definitions)
+                collected = self.collected_links
+            except Exception as e:
+                print(f"Warning: Could not render block at line {model.start_lines[index] + 1}: "
+                      f"{type(e).__name__}: {e}")
+                fragment = render_error_fragment(block_text, e)
+                collected = None
+            finally:
+                self.block_footnotes.processor.keep = None
+            
+            anchors = model.heading_ids.get(index)
+            if collected is not None:
+                collected = rename_collected_ids(collected, fragment, anchors)
+                links.extend(collected.links)
+                images.extend(collected.images)
+                ids.update(collected.ids)
+            parts.append(apply_heading_ids(fragment, anchors))
+        
+        self.md.collected_links = CollectedLinks(links, images, ids)
+        return '\n'.join(parts)
+    
+    def _convert_block_source(self, block_text: str, definitions: str) -> str:
+        lines = block_text.count('\n')
+        if lines > min(config.LARGE_TABLE_MIN_ROWS, config.LARGE_CODE_MIN_LINES):
+            kind = block_kind(block_text)
+            fragment = None
+            if kind == KIND_TABLE and lines > config.LARGE_TABLE_MIN_ROWS:
+                fragment = self._render_large_table(block_text, definitions)
+            elif kind == KIND_FENCE and lines > config.LARGE_CODE_MIN_LINES:
+                fragment = self._render_large_code(block_text)
+            if fragment is not None:
+                return fragment
+        
+        return self._convert_markdown(block_text, definitions)
+    
+    def _convert_markdown(self, block_text: str, definitions: str) -> str:
+        """Convert a block with the document's definitions appended"""
+        if definitions and FOOTNOTE_PATTERN.match(block_text):
+            # Footnote definitions are numbered in document order
+            source = definitions
+        else:
+            source = f"{block_text}\n\n{definitions}" if definitions else block_text
+        self.md.reset()
+        return self.md.convert(source)
+    
+    def _render_large_table(self, block_text: str, definitions: str) -> Optional[str]:
+        """
+        Render a large table block as a virtualized table
+        
+        Returns:
+            HTML fragment, or None to render the block the usual way
+        """
+        table = parse_table(block_text)
+        if table is None:
+            return None
+        # Abbreviations can apply to any word, so then every cell is parsed
+        cells = render_cells(table, lambda sources: self._convert_cells(sources, definitions),
+                             plain='*[' not in definitions)
+        if cells is None:
+            return None
+        return build_fragment(table, *cells)
+    
+    def _render_large_code(self, block_text: str) -> Optional[str]:
+        """
+        Render a large fenced code block with only its first lines highlighted
+        
+        Returns:
+            HTML fragment, or None to render the block the usual way
+        """
+        fence = parse_fence(block_text)
+        if fence is None:
+            return None
+        head = highlight_lines(fence.lines[:config.LARGE_CODE_HIGHLIGHT_LINES], fence.language)
+        return build_code_fragment(fence, head, config.LARGE_CODE_CHUNK_LINES)
+    
+    def highlight_code(self, block_text: str, first: int) -> Optional[str]:
+        """
+        Highlight one chunk of a large code block for the preview
+        
+        Args:
+            block_text: Markdown source of the block
+            first: Index of the chunk's first line in the code
+        
+        Returns:
+            HTML lines of the chunk, or None if the block is no large fence
+        """
+        fence = parse_fence(block_text)
+        if fence is None or not 0 <= first < len(fence.lines):
+            return None
+        lines = fence.lines[first:first + config.LARGE_CODE_CHUNK_LINES]
+        return ''.join(highlight_lines(lines, fence.language))
+    
+    def _convert_cells(self, sources: list, definitions: str) -> Optional[list]:
+        """
+        Render table cells to inline HTML with one parser run
+        
+        Every cell becomes a paragraph led by an invisible marker, which
+        also keeps cell text from starting a heading, list or quote.
+        
+        Returns:
+            HTML of each cell, or None if the output cannot be split
+        """
+        source = '\n\n'.join(CELL_MARKER + cell for cell in sources)
+        if definitions:
+            source += f"\n\n{definitions}"
+        self.md.reset()
+        cells = CELL_PATTERN.findall(self.md.convert(source))
+        return cells if len(cells) == len(sources) else None
+    
+    def build_toc_html(self, markdown_text: str) -> str:
+        """
+        Build table of contents HTML without rendering the document
         
-        /* Image styling */
-        img {{
-            max-width: 100%;
-            height: auto;
+        Args:
+            markdown_text: The markdown content
+        
+        Returns:
+            Nested list HTML inside a toc div, or empty string if there
+            are no headings
+        """
+        entries = self.extract_toc(markdown_text)
+        if not entries:
+            return ""
+        
+        parts = ['<div class="toc">']
+        depth = 0
+        base_level = min(level for level, _, _ in entries)
+        for level, title, anchor in entries:
+            target = level - base_level + 1
+            while depth < target:
+                parts.append('<ul>')
+                depth += 1
+            while depth > target:
+                parts.append('</ul>')
+                depth -= 1
+            parts.append(f'<li><a href="#{html.escape(anchor)}">{html.escape(title)}</a></li>')
+        parts.append('</ul>' * depth)
+        parts.append('</div>')
+        
+        return ''.join(parts)
+    
+    def build_preview_page(self, theme_css: str) -> str:
+        """
+        Build the persistent preview page
+        
+        The page holds no content of its own; rendered blocks are pushed
+        into it by the preview runtime script.
+        
+        Args:
+            theme_css: CSS styling
+        
+        Returns:
+            Complete HTML document as string
+        """
+        runtime_js = config.PREVIEW_SCRIPT_FILE.read_text(encoding='utf-8')
+        
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Markdown Preview</title>
+    <style id="mdr-theme">
+        {theme_css}
+    </style>
+    <style>
+        {BASE_CSS}
+        
+        /* Line numbers of large code blocks, drawn without extra markup */
+        .mdr-code code {{
+            counter-reset: mdr-line;
         }}
         
-        /* Horizontal rule */
-        hr {{
-            border: 0;
-            border-top: 1px solid #e1e4e8;
-            margin: 24px 0;
+        .mdr-code .mdr-line::before {{
+            counter-increment: mdr-line;
+            content: counter(mdr-line);
+            display: inline-block;
+            width: var(--mdr-gutter);
+            margin-right: 1.5em;
+            text-align: right;
+            opacity: 0.5;
+            user-select: none;
         }}
         
-        /* Mark/highlight */
-        mark {{
-            background-color: #fff3cd;
-            padding: 0.1em 0.2em;
+        /* Blocks still waiting for progressive rendering */
+        .mdr-pending {{
+            min-height: 1.6em;
         }}
         
-        /* Keyboard keys */
-        kbd {{
-            display: inline-block;
-            padding: 3px 5px;
-            font-size: 0.85em;
-            line-height: 1;
-            color: #444d56;
-            vertical-align: middle;
-            background-color: #fafbfc;
-            border: 1px solid #d1d5da;
-            border-radius: 3px;
-            box-shadow: inset 0 -1px 0 #d1d5da;
+        /* Empty state */
+        #mdr-empty {{
+            text-align: center;
+            margin-top: 30vh;
+            color: #6a737d;
         }}
     </style>
     
-    <!-- Mermaid for diagrams -->
-    <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
+    <!-- Bridge to the application (scroll sync) -->
+    <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+    
+    <!-- Mermaid and KaTeX, loaded once for the lifetime of the page -->
+    {self.assets.preview_tags()}
     <script>
-        mermaid.initialize({{ startOnLoad: true, theme: 'default' }});
+        if (window.mermaid) {{
+            mermaid.initialize({{ startOnLoad: false, theme: 'default' }});
+        }}
     </script>
 </head>
 <body>
-    {toc}
-    {content}
+    <div id="mdr-empty">
+        <h2>👋 Welcome to Markdown Renderer</h2>
+        <p>Start typing in the editor to see a live preview</p>
+    </div>
+    <div id="mdr-toc"></div>
+    <div id="mdr-content"></div>
+    <script>
+{runtime_js}
+    </script>
 </body>
 </html>"""
-        return html
+
+    def _build_html_document(self, content: str, toc: str, theme_css: str,
+                             asset_tags: str = "", title: str = "Markdown Preview",
+                             layout: str = config.EXPORT_LAYOUT,
+                             layout_values: Optional[Dict[str, str]] = None,
+                             metadata: Optional[dict] = None) -> str:
+        """
+        Build a complete HTML document with CSS and content
+        
+        Args:
+            content: The HTML content
+            toc: Table of contents HTML
+            theme_css: CSS styling
+            asset_tags: Tags loading diagram/math libraries
+            title: Document title
+            layout: Layout name or template path
+            layout_values: HTML for further layout slots
+            metadata: Front matter for {{ meta.key }} slots
+        
+        Returns:
+            Complete HTML document as string
+        """
+        values = {
+            'title': html.escape(title),
+            'theme_css': theme_css,
+            'base_css': BASE_CSS,
+            'asset_tags': asset_tags,
+            'toc': toc,
+            'content': content,
+        }
+        if layout_values:
+            values.update(layout_values)
+        return self.layouts.get(layout).render(values, metadata)
     
     def get_statistics(self, markdown_text: str) -> dict:
         """
@@ -227,7 +772,7 @@ class MarkdownProcessor:
         
         Args:
             markdown_text: The markdown content to analyze
-            
+        
         Returns:
             Dictionary with statistics (words, characters, lines, etc.)
         """
@@ -263,19 +808,14 @@ class MarkdownProcessor:
         """
         Extract table of contents from markdown text
         
+        Headings in fenced code are skipped.
+        
         Args:
             markdown_text: The markdown content
-            
+        
         Returns:
             List of tuples (level, title, anchor)
         """
-        toc = []
-        for match in re.finditer(r'^(#{1,6})\s+(.+)$', markdown_text, re.MULTILINE):
-            level = len(match.group(1))
-            title = match.group(2).strip()
-            # Create anchor from title
-            anchor = re.sub(r'[^\w\s-]', '', title.lower())
-            anchor = re.sub(r'[-\s]+', '-', anchor)
-            toc.append((level, title, anchor))
-        
-        return toc
+        # Same anchors as the toc extension, including its _1, _2 suffixes
+        # for repeated titles and attr_list ids
+        return [(h.level, h.title, h.anchor) for h in scan_outline(markdown_text).headings]
@@ -0,0 +1,210 @@
+"""
+Memory accounting for long editing sessions: resident size of processes,
+the estimated size of an editor's undo history, and the budget the
+application checks them against
+"""
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+import config
+
+def resident_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Get the resident memory of a process
+    
+    Args:
+        pid: Process ID (None for this process)
+    
+    Returns:
+        Size in bytes, or None if it cannot be read on this platform
+    """
+    if pid is None:
+        pid = os.getpid()
+    if sys.platform.startswith('linux'):
+        try:
+            with open(f"/proc/{pid}/statm", 'r') as f:
+                pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    if os.name == 'nt':
+        return _windows_working_set(pid)
+    # macOS and the BSDs: getrusage only reports the peak, which never
+    # goes down, so ask ps for the current size
+    return _ps_resident(pid)
+
+def _ps_resident(pid: int) -> Optional[int]:
+    """Get the current resident size of a process from ps"""
+    try:
+        result = subprocess.run(['ps', '-o', 'rss=', '-p', str(pid)], capture_output=True,
+                                text=True, timeout=config.MEMORY_PS_TIMEOUT)
+        kilobytes = int(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+    return kilobytes * 1024
+
+def _windows_working_set(pid: int) -> Optional[int]:
+    """Get the working set of a process on Windows"""
+    import ctypes
+    from ctypes import wintypes
+    
+    class Counters(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage',
+                'QuotaPagedPoolUsage', 'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage',
+                'PagefileUsage', 'PeakPagefileUsage')
+        ]
+    
+    kernel32 = ctypes.WinDLL('kernel32')
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.WorkingSetSize
+    finally:
+        kernel32.CloseHandle(handle)
+
+def child_pids(pid: Optional[int] = None) -> List[int]:
+    """
+    Get the direct child processes of a process
+    
+    Only Linux is supported; elsewhere the list is empty.
+    
+    Args:
+        pid: Process ID (None for this process)
+    
+    Returns:
+        Process IDs of the children
+    """
+    if pid is None:
+        pid = os.getpid()
+    if not sys.platform.startswith('linux'):
+        return []
+    
+    children = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses
+        fields = stat.rpartition(')')[2].split()
+        if len(fields) > 1 and fields[1] == str(pid):
+            children.append(int(name))
+    return children
+
+class UndoHistoryMeter:
+    """
+    Estimated memory held by a text document's undo history
+    
+    QTextDocument keeps all text it ever held in one append-only buffer
+    while undo commands may refer to it. The history therefore costs
+    about two bytes (UTF-16) per removed character, whether removed by
+    an edit or by undoing one, plus a fixed amount per undo command.
+    Qt cannot drop only the oldest steps, so an editor whose history
+    goes over budget has to clear all of it.
+    """
+    
+    COMMAND_BYTES = 64
+    
+    def __init__(self, max_bytes: int = config.UNDO_HISTORY_MAX_BYTES):
+        """
+        Initialize the meter
+        
+        Args:
+            max_bytes: Budget for the history (0 for no limit)
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.commands = 0
+    
+    @property
+    def over_budget(self) -> bool:
+        """Whether the history has grown past its budget"""
+        return 0 < self.max_bytes < self.bytes
+    
+    def record_change(self, removed_chars: int) -> bool:
+        """
+        Account for a change of the document's text
+        
+        Args:
+            removed_chars: Characters the change removed
+        
+        Returns:
+            True if the history is now over budget
+        """
+        self.bytes += 2 * removed_chars
+        return self.over_budget
+    
+    def record_command(self) -> bool:
+        """
+        Account for a new undo step
+        
+        Returns:
+            True if the history is now over budget
+        """
+        self.bytes += self.COMMAND_BYTES
+        self.commands += 1
+        return self.over_budget
+    
+    def reset(self):
+        """Start over after the history was cleared"""
+        self.bytes = 0
+        self.commands = 0
+
+class MemoryBudget:
+    """
+    Decide when the application should release caches
+    
+    Released memory is not always handed back to the system, so after a
+    release the resident size may stay over budget for a while; caches
+    are released again only after a cooldown.
+    """
+    
+    def __init__(self, max_bytes: int = config.MEMORY_BUDGET_BYTES,
+                 cooldown: float = config.MEMORY_RELEASE_COOLDOWN):
+        """
+        Initialize the budget
+        
+        Args:
+            max_bytes: Resident bytes of the application and its web
+                engine processes before caches are released
+            cooldown: Minimum seconds between two releases
+        """
+        self.max_bytes = max_bytes
+        self.cooldown = cooldown
+        self.releases = 0
+        self._last_release: Optional[float] = None
+    
+    def should_release(self, resident: int, now: Optional[float] = None) -> bool:
+        """
+        Check a measurement against the budget
+        
+        Args:
+            resident: Current resident bytes
+            now: Monotonic time of the measurement (default: now)
+        
+        Returns:
+            True if caches should be released now; the release is then
+            assumed to happen
+        """
+        if resident <= self.max_bytes:
+            return False
+        if now is None:
+            now = time.monotonic()
+        if self._last_release is not None and now - self._last_release < self.cooldown:
+            return False
+        self._last_release = now
+        self.releases += 1
+        return True
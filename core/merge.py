@@ -0,0 +1,159 @@
+"""
+Three-way merge of the editor buffer with a file changed on disk
+"""
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Tuple
+
+CONFLICT_START = "<<<<<<< editor\n"
+CONFLICT_SEPARATOR = "=======\n"
+CONFLICT_END = ">>>>>>> disk\n"
+
+class MergeResult(NamedTuple):
+    """Merged text and the number of conflicting regions in it"""
+    text: str
+    conflicts: int
+
+# A change to base lines [start, end) replacing them with lines
+Hunk = Tuple[int, int, List[str]]
+
+def _hunks(base: List[str], other: List[str]) -> List[Hunk]:
+    """Get the changes that turn base into other"""
+    matcher = SequenceMatcher(None, base, other, autojunk=False)
+    return [
+        (i1, i2, other[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+    ]
+
+def _apply(base: List[str], start: int, end: int, hunks: List[Hunk]) -> List[str]:
+    """Apply the hunks that fall in base[start:end]"""
+    lines = []
+    position = start
+    for hunk_start, hunk_end, replacement in hunks:
+        lines.extend(base[position:hunk_start])
+        lines.extend(replacement)
+        position = hunk_end
+    lines.extend(base[position:end])
+    return lines
+
+def _terminated(lines: List[str]) -> List[str]:
+    """Make sure the last line ends with a newline (before a conflict marker)"""
+    if lines and not lines[-1].endswith('\n'):
+        return lines[:-1] + [lines[-1] + '\n']
+    return lines
+
+def merge3(base: str, ours: str, theirs: str) -> MergeResult:
+    """
+    Merge two edited versions of a text line by line
+    
+    Changes made on only one side are taken over; regions both sides
+    changed differently are kept with git-style conflict markers.
+    
+    Args:
+        base: Common ancestor (the file as last loaded or saved)
+        ours: Editor buffer
+        theirs: File content now on disk
+    
+    Returns:
+        MergeResult
+    """
+    base_lines = base.splitlines(keepends=True)
+    our_hunks = _hunks(base_lines, ours.splitlines(keepends=True))
+    their_hunks = _hunks(base_lines, theirs.splitlines(keepends=True))
+    
+    merged: List[str] = []
+    conflicts = 0
+    position = 0
+    i = j = 0
+    while i < len(our_hunks) or j < len(their_hunks):
+        # Start a region at the earliest hunk, then grow it over every
+        # hunk of either side that overlaps or touches it
+        if j >= len(their_hunks) or (i < len(our_hunks) and our_hunks[i][0] <= their_hunks[j][0]):
+            start, end = our_hunks[i][0], our_hunks[i][1]
+        else:
+            start, end = their_hunks[j][0], their_hunks[j][1]
+        
+        ours_region: List[Hunk] = []
+        theirs_region: List[Hunk] = []
+        grown = True
+        while grown:
+            grown = False
+            while i < len(our_hunks) and our_hunks[i][0] <= end:
+                end = max(end, our_hunks[i][1])
+                ours_region.append(our_hunks[i])
+                i += 1
+                grown = True
+            while j < len(their_hunks) and their_hunks[j][0] <= end:
+                end = max(end, their_hunks[j][1])
+                theirs_region.append(their_hunks[j])
+                j += 1
+                grown = True
+        
+        merged.extend(base_lines[position:start])
+        our_lines = _apply(base_lines, start, end, ours_region)
+        their_lines = _apply(base_lines, start, end, theirs_region)
+        
+        if not theirs_region or our_lines == their_lines:
+            merged.extend(our_lines)
+        elif not ours_region:
+            merged.extend(their_lines)
+        else:
+            conflicts += 1
+            merged = _terminated(merged)
+            merged.append(CONFLICT_START)
+            merged.extend(_terminated(our_lines))
+            merged.append(CONFLICT_SEPARATOR)
+            merged.extend(_terminated(their_lines))
+            merged.append(CONFLICT_END)
+        
+        position = end
+    
+    merged.extend(base_lines[position:])
+    return MergeResult(''.join(merged), conflicts)
+
+def has_conflict_markers(text: str) -> bool:
+    """
+    Check whether a text still contains unresolved merge conflicts
+    
+    Args:
+        text: Text to check
+    
+    Returns:
+        True if conflict markers from merge3() are present
+    """
+    return CONFLICT_START in text and CONFLICT_END in text
+
+def changed_span(old: str, new: str) -> Tuple[int, int, int]:
+    """
+    Find the smallest region that differs between two texts
+    
+    Args:
+        old: Current text
+        new: Replacement text
+    
+    Returns:
+        Tuple of (start, old_end, new_end): old[start:old_end] must be
+        replaced by new[start:new_end]
+    """
+    limit = min(len(old), len(new))
+    
+    # Binary search with slice comparisons (done in C) rather than a
+    # character loop, which is slow on long documents
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[:middle] == new[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    start = low
+    
+    low, high = 0, limit - start
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:] == new[len(new) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    suffix = low
+    
+    return start, len(old) - suffix, len(new) - suffix
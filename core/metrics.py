@@ -0,0 +1,343 @@
+"""
+Counters and histograms for the render and I/O hot paths
+
+Instrumented modules declare their metrics once at import time through the
+process-wide REGISTRY and record into them; the metrics panel reads and
+exports the registry. Histograms keep cumulative buckets like Prometheus,
+so recording is a lock, a bisect and a few additions however long the
+session runs.
+"""
+import bisect
+import functools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import config
+
+# Upper bounds in seconds, for work between a tenth of a millisecond and
+# ten seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# For per-line work such as highlighting one block
+FINE_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                0.001, 0.0025, 0.005, 0.01)
+
+LabelValues = Tuple[str, ...]
+
+class MetricRow(NamedTuple):
+    """One labelled series of a metric, summarized for display"""
+    name: str
+    labels: str
+    count: float
+    mean: Optional[float]
+    p50: Optional[float]
+    p95: Optional[float]
+    max: Optional[float]
+
+class _Metric:
+    """Base of the metric types: a family of series told apart by labels"""
+    
+    kind = ""
+    
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._series: Dict[LabelValues, object] = {}
+    
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        """Get the series key for keyword labels"""
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+    
+    def _label_dict(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+    
+    def reset(self):
+        """Forget all recorded values"""
+        with self._lock:
+            self._series.clear()
+
+class Counter(_Metric):
+    """A value that only goes up, such as a number of cache hits"""
+    
+    kind = "counter"
+    
+    def inc(self, amount: float = 1, **labels):
+        """
+        Add to the counter
+        
+        Args:
+            amount: Non-negative increment
+            **labels: Value of each of the counter's labels
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        """Get the current value of a series"""
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+    
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        """Get (labels, value) of every series"""
+        with self._lock:
+            return [(self._label_dict(key), value) for key, value in sorted(self._series.items())]
+
+class _HistogramSeries:
+    """Bucket counts and totals of one labelled histogram series"""
+    
+    __slots__ = ('counts', 'sum', 'count', 'max', 'last')
+    
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.last = 0.0
+
+class Histogram(_Metric):
+    """A distribution of observations, such as durations in seconds"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        """
+        Record an observation
+        
+        Args:
+            value: Observed value
+            **labels: Value of each of the histogram's labels
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+            series.last = value
+            if value > series.max:
+                series.max = value
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """
+        Estimate a quantile of a series from its buckets
+        
+        Args:
+            q: Quantile between 0 and 1
+            **labels: Value of each of the histogram's labels
+        
+        Returns:
+            The estimate, or None if nothing was observed
+        """
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return None
+            return self._estimate(series, q)
+    
+    def _estimate(self, series: _HistogramSeries, q: float) -> Optional[float]:
+        """Interpolate a quantile within the bucket that holds it"""
+        if not series.count:
+            return None
+        rank = q * series.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets + (math.inf,), series.counts):
+            if count and seen + count >= rank:
+                if bound == math.inf:
+                    return series.max
+                estimate = lower + (bound - lower) * (rank - seen) / count
+                return min(estimate, series.max)
+            seen += count
+            lower = bound
+        return series.max
+    
+    def samples(self) -> List[Tuple[Dict[str, str], dict]]:
+        """Get (labels, statistics) of every series"""
+        with self._lock:
+            result = []
+            for key, series in sorted(self._series.items()):
+                cumulative = []
+                total = 0
+                for count in series.counts:
+                    total += count
+                    cumulative.append(total)
+                result.append((self._label_dict(key), {
+                    'count': series.count,
+                    'sum': series.sum,
+                    'max': series.max,
+                    'last': series.last,
+                    'p50': self._estimate(series, 0.5),
+                    'p95': self._estimate(series, 0.95),
+                    'buckets': list(zip(self.buckets + (math.inf,), cumulative)),
+                }))
+            return result
+
+def timed(histogram: Histogram, errors: Optional[Counter] = None, **labels) -> Callable:
+    """
+    Decorate a function to observe how long each call takes
+    
+    Args:
+        histogram: Histogram receiving the durations
+        errors: Counter incremented when the call raises or returns a
+            (success, ...) tuple whose success is false
+        **labels: Labels for the histogram and the counter
+    
+    Returns:
+        The decorator
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = isinstance(result, tuple) and bool(result) and result[0] is False
+                return result
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+                if failed and errors is not None:
+                    errors.inc(**labels)
+        return wrapper
+    return decorator
+
+class MetricsRegistry:
+    """The set of metrics of a process, with JSON and Prometheus export"""
+    
+    def __init__(self, namespace: str = config.METRICS_NAMESPACE):
+        """
+        Initialize the registry
+        
+        Args:
+            namespace: Prefix of the exported metric names
+        """
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        """Get a counter, declaring it on first use"""
+        return self._declare(Counter, name, help_text, label_names)
+    
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get a histogram, declaring it on first use"""
+        return self._declare(Histogram, name, help_text, label_names, buckets)
+    
+    def _declare(self, cls, name: str, help_text: str, label_names: Sequence[str], *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, label_names, *args)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(label_names):
+                raise ValueError(f"Metric {name} is already declared differently")
+            return metric
+    
+    def metrics(self) -> List[_Metric]:
+        """Get all metrics, sorted by name"""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+    
+    def reset(self):
+        """Forget all recorded values, keeping the declarations"""
+        for metric in self.metrics():
+            metric.reset()
+    
+    def rows(self) -> List[MetricRow]:
+        """
+        Summarize every series for display
+        
+        Returns:
+            One row per series; counters have their value as count
+        """
+        rows = []
+        for metric in self.metrics():
+            for labels, value in metric.samples():
+                label_text = ", ".join(f"{name}={text}" for name, text in labels.items())
+                if metric.kind == "counter":
+                    rows.append(MetricRow(metric.name, label_text, value, None, None, None, None))
+                else:
+                    mean = value['sum'] / value['count'] if value['count'] else None
+                    rows.append(MetricRow(metric.name, label_text, value['count'], mean,
+                                          value['p50'], value['p95'], value['max']))
+        return rows
+    
+    def to_json(self) -> str:
+        """Export the registry as a JSON document"""
+        exported = []
+        for metric in self.metrics():
+            series = []
+            for labels, value in metric.samples():
+                if metric.kind == "counter":
+                    series.append({'labels': labels, 'value': value})
+                else:
+                    value = dict(value, buckets=[
+                        ["+Inf" if bound == math.inf else bound, count]
+                        for bound, count in value['buckets']
+                    ])
+                    series.append({'labels': labels, **value})
+            exported.append({'name': self._full_name(metric), 'type': metric.kind,
+                             'help': metric.help, 'series': series})
+        return json.dumps({'time': time.time(), 'metrics': exported}, indent=2)
+    
+    def to_prometheus(self) -> str:
+        """Export the registry in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics():
+            name = self._full_name(metric)
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in metric.samples():
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+                    continue
+                for bound, count in value['buckets']:
+                    le = "+Inf" if bound == math.inf else _format_number(bound)
+                    lines.append(f"{name}_bucket{_format_labels(dict(labels, le=le))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+    
+    def _full_name(self, metric: _Metric) -> str:
+        return f"{self.namespace}_{metric.name}" if self.namespace else metric.name
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Format labels as {name="value",...}, escaped for Prometheus"""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+REGISTRY = MetricsRegistry()
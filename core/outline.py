@@ -0,0 +1,139 @@
+"""
+Headings, heading anchors and link targets of Markdown source, found
+without rendering the whole document
+"""
+import html
+import re
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple
+import markdown
+from markdown.extensions.toc import slugify, unique
+from core.front_matter import front_matter_lines
+import config
+
+FENCE_PATTERN = re.compile(r'^\s{0,3}(`{3,}|~{3,})')
+HEADING_PATTERN = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+\s*)?$')
+SETEXT_PATTERN = re.compile(r'^\s{0,3}(=+|-+)\s*$')
+LINK_PATTERNS = [
+    re.compile(r'\]\(\s*<?([^)\s>]+)'),  # [text](target)
+    re.compile(r'<((?:https?|ftp|mailto):[^>\s]+)>'),  # <url>
+    re.compile(r'^\s{0,3}\[[^\]]+\]:\s*<?([^\s>]+)'),  # [id]: target
+]
+# Explicit id set with attr_list, e.g. "# Title {#custom}"
+EXPLICIT_ID_PATTERN = re.compile(r'\{:?[^}]*#([^\s}]+)[^}]*\}\s*$')
+
+class Heading(NamedTuple):
+    """Heading of a Markdown document"""
+    line: int  # 0-based source line
+    level: int
+    text: str  # Markdown source of the heading
+    title: str  # plain text, as shown in a table of contents
+    anchor: str  # id given to the heading element by the toc extension
+
+class Outline(NamedTuple):
+    """Headings and outgoing links of a Markdown document"""
+    headings: List[Heading]
+    links: List[Tuple[int, str]]  # (0-based line, target as written)
+
+# Title and slug per heading source; Markdown instances are per thread
+_local = threading.local()
+_slug_cache: OrderedDict = OrderedDict()
+_slug_lock = threading.Lock()
+
+def _heading_slug(text: str) -> Tuple[str, str]:
+    """
+    Get the plain title and base id the toc extension gives a heading
+    
+    The heading is rendered on its own with the configured extensions,
+    so inline markup, entities and attr_list ids are handled exactly as
+    in a full render.
+    """
+    with _slug_lock:
+        cached = _slug_cache.get(text)
+        if cached is not None:
+            _slug_cache.move_to_end(text)
+            return cached
+    
+    md = getattr(_local, 'md', None)
+    if md is None:
+        md = _local.md = markdown.Markdown(
+            extensions=config.MARKDOWN_EXTENSIONS,
+            extension_configs=config.MARKDOWN_EXTENSION_CONFIGS,
+            output_format='html5'
+        )
+    
+    try:
+        md.reset()
+        md.convert(f"# {text}")
+        token = md.toc_tokens[0]
+        result = (html.unescape(token['name']), token['id'])
+    except Exception:
+        # Markup an extension fails on still gets the toc slug of its text
+        result = (text, slugify(text, '-'))
+    
+    with _slug_lock:
+        _slug_cache[text] = result
+        if len(_slug_cache) > config.HEADING_SLUG_CACHE_SIZE:
+            _slug_cache.popitem(last=False)
+    return result
+
+def scan_outline(text: str) -> Outline:
+    """
+    Find the headings and link targets of Markdown source
+    
+    Headings and links inside fenced code blocks and front matter are
+    skipped. Anchors are made unique across the document the way the toc extension does it.
+    
+    Args:
+        text: Markdown source
+    
+    Returns:
+        Outline
+    """
+    found: List[Tuple[int, int, str]] = []
+    links: List[Tuple[int, str]] = []
+    
+    lines = text.splitlines()
+    skip = front_matter_lines(text)
+    fence = None
+    for number, line in enumerate(lines[skip:], skip):
+        match = FENCE_PATTERN.match(line)
+        if match:
+            marker = match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+            continue
+        if fence is not None:
+            continue
+        
+        match = HEADING_PATTERN.match(line)
+        if match:
+            found.append((number, len(match.group(1)), match.group(2).strip()))
+        elif (number + 1 < len(lines) and line.strip()
+                and SETEXT_PATTERN.match(lines[number + 1])
+                and not SETEXT_PATTERN.match(line)):
+            level = 1 if lines[number + 1].strip().startswith('=') else 2
+            found.append((number, level, line.strip()))
+        
+        for pattern in LINK_PATTERNS:
+            for target in pattern.findall(line):
+                links.append((number, target))
+    
+    # Explicit ids are taken first; generated ones are numbered around them
+    used_ids = set()
+    for _, _, heading_text in found:
+        match = EXPLICIT_ID_PATTERN.search(heading_text)
+        if match:
+            used_ids.add(match.group(1))
+    
+    headings = []
+    for number, level, heading_text in found:
+        title, slug = _heading_slug(heading_text)
+        if not EXPLICIT_ID_PATTERN.search(heading_text):
+            slug = unique(slug, used_ids)
+        headings.append(Heading(number, level, heading_text, title, slug))
+    
+    return Outline(headings, links)
@@ -0,0 +1,75 @@
+"""
+Rendered preview state kept for documents whose web view was evicted
+"""
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+from core.document_model import DocumentModel
+import config
+
+class PreviewState(NamedTuple):
+    """Snapshot of a document's preview"""
+    revision: int  # editor document revision the blocks were rendered from
+    model: DocumentModel  # blocks with their rendered fragments
+    toc_html: str
+    scroll_line: float
+
+class PreviewStateCache:
+    """Bounded store of preview snapshots, least recently used dropped first"""
+    
+    def __init__(self, max_entries: int = config.PREVIEW_STATE_CACHE_SIZE):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries: Number of snapshots to keep
+        """
+        self.max_entries = max_entries
+        self._states: OrderedDict[Hashable, PreviewState] = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._states)
+    
+    def get(self, key: Hashable) -> Optional[PreviewState]:
+        """
+        Get the snapshot stored for a document
+        
+        Args:
+            key: Document identifier
+        
+        Returns:
+            PreviewState, or None if none is stored
+        """
+        state = self._states.get(key)
+        if state is not None:
+            self._states.move_to_end(key)
+        return state
+    
+    def put(self, key: Hashable, state: PreviewState):
+        """
+        Store the snapshot of a document
+        
+        Args:
+            key: Document identifier
+            state: Preview snapshot
+        """
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+    
+    def clear(self):
+        """Drop all snapshots"""
+        self._states.clear()
+    
+    def memory_usage(self) -> int:
+        """Get the bytes used by the snapshots"""
+        return sum(state.model.memory_usage() + len(state.toc_html) for state in self._states.values())
+    
+    def discard(self, key: Hashable):
+        """
+        Drop the snapshot of a document, if any
+        
+        Args:
+            key: Document identifier
+        """
+        self._states.pop(key, None)
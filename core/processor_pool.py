@@ -0,0 +1,115 @@
+"""
+Pool of Markdown processors shared by open documents
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Collection, Iterator, List, Optional
+from core.markdown_processor import MarkdownProcessor
+from core.diagrams import DiagramCache
+from core.image_probe import ImageProbe
+import config
+
+class ProcessorPool:
+    """Hand out MarkdownProcessor instances to one caller at a time"""
+    
+    def __init__(self, size: int = config.PROCESSOR_POOL_SIZE):
+        """
+        Initialize the pool
+        
+        Processors are created on first use, up to size of them, and all
+        share one diagram cache and image probe.
+        
+        Args:
+            size: Maximum number of processors
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        
+        self.size = size
+        self.diagrams = DiagramCache()
+        self.image_probe = ImageProbe()
+        
+        # Most recently returned processor first: its caches are warmest
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[MarkdownProcessor]:
+        """
+        Borrow a processor for the duration of a with block
+        
+        Args:
+            timeout: Seconds to wait for a free processor (None waits forever)
+        
+        Yields:
+            MarkdownProcessor not used by any other caller
+        
+        Raises:
+            TimeoutError: If no processor became free in time
+        """
+        processor = self._take(timeout)
+        try:
+            yield processor
+        finally:
+            self._idle.put(processor)
+    
+    def release_caches(self, keep: Collection[int] = ()):
+        """
+        Drop cached fragments and diagrams to free memory
+        
+        Processors in use keep their caches.
+        
+        Args:
+            keep: Block hashes whose fragments are kept (e.g. those of
+                the document on screen)
+        """
+        with self._borrow_idle() as processors:
+            for processor in processors:
+                processor.fragments.retain(keep)
+        self.diagrams.clear()
+    
+    def memory_usage(self) -> int:
+        """Get the bytes used by the fragment caches of idle processors"""
+        with self._borrow_idle() as processors:
+            return sum(processor.fragments.memory_usage() for processor in processors)
+    
+    @contextmanager
+    def _borrow_idle(self) -> Iterator[List[MarkdownProcessor]]:
+        """Take all idle processors for the duration of a with block"""
+        processors = []
+        while True:
+            try:
+                processors.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            yield processors
+        finally:
+            # Warmest processor back on top
+            for processor in reversed(processors):
+                self._idle.put(processor)
+    
+    def _take(self, timeout: Optional[float]) -> MarkdownProcessor:
+        """Get an idle processor, creating one while below the pool size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        
+        if create:
+            processor = MarkdownProcessor()
+            processor.diagrams = self.diagrams
+            processor.image_probe = self.image_probe
+            return processor
+        
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No Markdown processor free after {timeout}s") from None
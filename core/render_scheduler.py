@@ -0,0 +1,122 @@
+"""
+Adaptive debounce scheduling for preview rendering
+"""
+import time
+from collections import deque
+from typing import Optional
+import config
+
+class PreviewScheduler:
+    """Choose the preview debounce delay from measured render cost and typing rate"""
+    
+    def __init__(self,
+                 min_delay_ms: int = config.PREVIEW_MIN_DELAY_MS,
+                 max_delay_ms: int = config.PREVIEW_MAX_DELAY_MS,
+                 max_wait_ms: Optional[int] = config.PREVIEW_MAX_WAIT_MS):
+        """
+        Initialize the scheduler
+        
+        Args:
+            min_delay_ms: Lower bound for the debounce delay
+            max_delay_ms: Upper bound for the debounce delay
+            max_wait_ms: Longest a pending edit may go unrendered while
+                the user keeps typing (None disables the max-wait)
+        """
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.max_wait_ms = max_wait_ms
+        
+        # Smoothed render cost in milliseconds (None until first sample)
+        self.render_cost_ms: Optional[float] = None
+        
+        # Recent gaps between keystrokes, in milliseconds
+        self._typing_gaps = deque(maxlen=config.PREVIEW_TYPING_SAMPLES)
+        self._last_keystroke: Optional[float] = None
+        
+        # Time of the first keystroke not yet covered by a render
+        self._pending_since: Optional[float] = None
+    
+    def record_keystroke(self, now: Optional[float] = None):
+        """
+        Register an edit in the editor
+        
+        Args:
+            now: Timestamp in seconds (defaults to time.monotonic())
+        """
+        if now is None:
+            now = time.monotonic()
+        
+        if self._last_keystroke is not None:
+            gap_ms = (now - self._last_keystroke) * 1000
+            # Long pauses start a new burst rather than describe typing speed
+            if gap_ms <= config.PREVIEW_TYPING_BURST_GAP_MS:
+                self._typing_gaps.append(gap_ms)
+        
+        self._last_keystroke = now
+        if self._pending_since is None:
+            self._pending_since = now
+    
+    def record_render(self, duration: float):
+        """
+        Register how long a preview render took
+        
+        Args:
+            duration: Render duration in seconds
+        """
+        duration_ms = duration * 1000
+        if self.render_cost_ms is None:
+            self.render_cost_ms = duration_ms
+        else:
+            alpha = config.PREVIEW_COST_SMOOTHING
+            self.render_cost_ms = alpha * duration_ms + (1 - alpha) * self.render_cost_ms
+    
+    def render_started(self):
+        """Mark all pending edits as covered by the render that is starting"""
+        self._pending_since = None
+    
+    def typing_interval(self) -> Optional[float]:
+        """
+        Get the user's typical gap between keystrokes
+        
+        Returns:
+            Median keystroke gap in milliseconds, or None without samples
+        """
+        if not self._typing_gaps:
+            return None
+        gaps = sorted(self._typing_gaps)
+        return gaps[len(gaps) // 2]
+    
+    def next_delay(self, now: Optional[float] = None) -> int:
+        """
+        Compute the debounce delay for the next preview render
+        
+        The delay is long enough that rendering never takes more than a
+        fraction of the time (so input stays responsive), and just longer
+        than the user's usual keystroke gap so renders land in pauses.
+        
+        Args:
+            now: Timestamp in seconds (defaults to time.monotonic())
+        
+        Returns:
+            Delay in milliseconds
+        """
+        if now is None:
+            now = time.monotonic()
+        
+        cost = self.render_cost_ms or 0.0
+        delay = cost * config.PREVIEW_COST_MULTIPLIER
+        
+        typing_gap = self.typing_interval()
+        if typing_gap is not None:
+            delay = max(delay, typing_gap * config.PREVIEW_TYPING_MULTIPLIER)
+        
+        delay = min(max(delay, self.min_delay_ms), self.max_delay_ms)
+        
+        # Never let a continuous burst of typing hold the preview back
+        # for longer than the max-wait (stretched for very slow renders)
+        if self.max_wait_ms is not None and self._pending_since is not None:
+            max_wait = max(self.max_wait_ms, cost * config.PREVIEW_COST_MULTIPLIER * 2)
+            waited = (now - self._pending_since) * 1000
+            delay = min(delay, max(max_wait - waited, 0))
+        
+        return int(delay)
@@ -0,0 +1,476 @@
+"""
+Headless HTTP render service
+
+Serves MarkdownProcessor rendering and statistics to other tools over
+HTTP/1.1 on TCP or a Unix socket, with the application's extensions and
+themes. Imports nothing from Qt.
+
+Endpoints (JSON in, JSON out):
+
+    POST /render       {"markdown": ..., "theme": ..., "standalone": true,
+                        "asset_mode": "cdn"} -> {"html": ..., "metadata": {...}}
+    POST /statistics   {"markdown": ...} -> get_statistics() result
+    POST /batch        {"requests": [{"op": "render", ...}, ...]}
+                       -> {"results": [...]}, failed items as {"error": ...}
+    GET  /health       counters of the running service
+    POST /shutdown     stop the server (only when it allows it)
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from core.bundled_assets import ASSET_MODES
+from core.processor_pool import ProcessorPool
+from core.themes import ThemeManager
+import config
+
+OPERATIONS = ('render', 'statistics')
+ROUTES = {'/render': 'render', '/statistics': 'statistics', '/batch': 'batch'}
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 501: 'Not Implemented',
+    503: 'Service Unavailable',
+}
+
+class RenderService:
+    """
+    Rendering behind the server, usable without a network
+    
+    Results are cached as encoded JSON keyed by a hash of the operation
+    and its parameters, so a repeated request costs a dictionary lookup.
+    Methods may be called from several threads.
+    """
+    
+    def __init__(self, workers: int = config.RENDER_SERVER_WORKERS,
+                 cache_size: int = config.RENDER_SERVER_CACHE_SIZE):
+        """
+        Initialize the service
+        
+        Args:
+            workers: Number of Markdown processors
+            cache_size: Number of results to keep
+        """
+        self.pool = ProcessorPool(workers)
+        self.themes = ThemeManager()
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.computed = 0
+    
+    def warm_up(self):
+        """Create every processor and render once, so no request pays for imports"""
+        # Held at once, so each render gets a processor of its own
+        with ExitStack() as stack:
+            for _ in range(self.pool.size):
+                processor = stack.enter_context(self.pool.acquire())
+                processor.convert("# Warm up\n\n`code`", "", 'cdn')
+    
+    def cached_response(self, op: str, params: dict) -> Optional[str]:
+        """
+        Get the response body of a request if every result is cached
+        
+        Args:
+            op: 'render', 'statistics' or 'batch'
+            params: Request parameters
+        
+        Returns:
+            JSON response body, or None if something must be computed
+        """
+        try:
+            if op == 'batch':
+                items = self._batch_items(params)
+                results = [self._lookup(item_op, self._check(item_op, item_params))
+                           for item_op, item_params in items]
+                if any(result is None for result in results):
+                    return None
+                return self._batch_body(results)
+            return self._lookup(op, self._check(op, params))
+        except ValueError:
+            return None  # reported when the request is handled
+    
+    def respond(self, op: str, params: dict) -> str:
+        """
+        Handle a request
+        
+        Args:
+            op: 'render', 'statistics' or 'batch'
+            params: Request parameters
+        
+        Returns:
+            JSON response body
+        
+        Raises:
+            ValueError: If the request is malformed
+        """
+        if op != 'batch':
+            return self._result(op, self._check(op, params))
+        
+        results = []
+        for item_op, item_params in self._batch_items(params):
+            try:
+                results.append(self._result(item_op, self._check(item_op, item_params)))
+            except ValueError as e:
+                results.append(json.dumps({'error': str(e)}))
+        return self._batch_body(results)
+    
+    def health(self) -> dict:
+        """Get the service's counters"""
+        with self._lock:
+            entries = len(self._cache)
+        return {
+            'status': 'ok',
+            'workers': self.pool.size,
+            'cache_entries': entries,
+            'cache_hits': self.cache_hits,
+            'computed': self.computed,
+        }
+    
+    @staticmethod
+    def _batch_body(results: List[str]) -> str:
+        """Join encoded results into a batch response"""
+        return '{"results": [' + ', '.join(results) + ']}'
+    
+    @staticmethod
+    def _batch_items(params: dict) -> List[Tuple[str, dict]]:
+        """Split a batch request into (op, params) items"""
+        items = params.get('requests')
+        if not isinstance(items, list):
+            raise ValueError("'requests' must be a list")
+        if len(items) > config.RENDER_SERVER_BATCH_MAX:
+            raise ValueError(f"At most {config.RENDER_SERVER_BATCH_MAX} requests per batch")
+        split = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError("Batch requests must be objects")
+            item = dict(item)
+            split.append((item.pop('op', 'render'), item))
+        return split
+    
+    def _check(self, op: str, params: dict) -> dict:
+        """Validate request parameters and fill in defaults"""
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op}")
+        markdown_text = params.get('markdown')
+        if not isinstance(markdown_text, str):
+            raise ValueError("'markdown' must be a string")
+        if op == 'statistics':
+            return {'markdown': markdown_text}
+        
+        theme = params.get('theme', config.DEFAULT_THEME)
+        if theme not in self.themes.themes:
+            raise ValueError(f"Unknown theme: {theme}")
+        asset_mode = params.get('asset_mode', 'cdn')
+        if asset_mode not in ASSET_MODES:
+            raise ValueError(f"Unknown asset mode: {asset_mode}")
+        source_dir = params.get('source_dir')
+        if source_dir is not None and not isinstance(source_dir, str):
+            raise ValueError("'source_dir' must be a string")
+        return {
+            'markdown': markdown_text,
+            'theme': theme,
+            'standalone': bool(params.get('standalone', True)),
+            'asset_mode': asset_mode,
+            'source_dir': source_dir,
+        }
+    
+    @staticmethod
+    def _key(op: str, params: dict) -> bytes:
+        """Hash a request's content"""
+        data = json.dumps([op, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=16).digest()
+    
+    def _lookup(self, op: str, params: dict) -> Optional[str]:
+        """Get a cached result"""
+        key = self._key(op, params)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+        return result
+    
+    def _result(self, op: str, params: dict) -> str:
+        """Get a result from the cache or compute it"""
+        result = self._lookup(op, params)
+        if result is not None:
+            return result
+        
+        with self.pool.acquire() as processor:
+            if op == 'statistics':
+                value = processor.get_statistics(params['markdown'])
+            elif params['standalone']:
+                # The source folder only gives local images their size
+                source_dir = params['source_dir']
+                html_content = processor.convert(
+                    params['markdown'], self.themes.get_theme_css(params['theme']),
+                    params['asset_mode'], source_dir=Path(source_dir) if source_dir else None
+                )
+                value = {'html': html_content, 'metadata': processor.metadata}
+            else:
+                front_matter = processor.read_front_matter(params['markdown'])
+                processor.md.reset()
+                value = {'html': processor.md.convert(front_matter.body),
+                         'metadata': front_matter.metadata}
+        # Front matter may hold dates
+        result = json.dumps(value, default=str)
+        
+        key = self._key(op, params)
+        with self._lock:
+            self.computed += 1
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+class RenderServer:
+    """
+    HTTP/1.1 front end of a RenderService
+    
+    Connections are kept alive between requests. Rendering runs on a
+    thread per processor; at most queue_size requests wait for one, and
+    further requests get 503 with Retry-After instead of piling up.
+    Cached results are answered without queueing.
+    """
+    
+    def __init__(self, service: RenderService,
+                 queue_size: int = config.RENDER_SERVER_QUEUE_SIZE,
+                 keepalive_timeout: float = config.RENDER_SERVER_KEEPALIVE_TIMEOUT,
+                 idle_timeout: Optional[float] = None, allow_shutdown: bool = False):
+        """
+        Initialize the server
+        
+        Args:
+            service: Service that handles requests
+            queue_size: Requests allowed to wait for a processor
+            keepalive_timeout: Seconds an idle connection is kept open
+            idle_timeout: Stop after this many seconds without requests
+                (None runs until stopped)
+            allow_shutdown: Accept POST /shutdown
+        """
+        self.service = service
+        self.queue_size = queue_size
+        self.keepalive_timeout = keepalive_timeout
+        self.idle_timeout = idle_timeout
+        self.allow_shutdown = allow_shutdown
+        self._last_request = time.monotonic()
+        self._stopped: Optional[asyncio.Event] = None
+        self._executor = ThreadPoolExecutor(service.pool.size, thread_name_prefix='render')
+        self._admitted = 0  # requests queued or running
+        self.rejected = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+    
+    async def start(self, host: str = config.RENDER_SERVER_HOST,
+                    port: int = config.RENDER_SERVER_PORT,
+                    socket_path: Optional[str] = None) -> asyncio.AbstractServer:
+        """
+        Start listening
+        
+        Args:
+            host: Interface to listen on
+            port: TCP port (0 picks a free one)
+            socket_path: Listen on this Unix socket instead of TCP
+        
+        Returns:
+            The asyncio server
+        """
+        self._stopped = asyncio.Event()
+        if socket_path is not None:
+            self.server = await asyncio.start_unix_server(self._serve_connection, socket_path)
+        else:
+            self.server = await asyncio.start_server(self._serve_connection, host, port)
+        if self.idle_timeout is not None:
+            asyncio.get_running_loop().create_task(self._watch_idle())
+        return self.server
+    
+    def stop(self):
+        """Make wait_stopped() return"""
+        if self._stopped is not None:
+            self._stopped.set()
+    
+    async def wait_stopped(self):
+        """Wait until the server is stopped or has been idle for too long"""
+        await self._stopped.wait()
+    
+    async def _watch_idle(self):
+        """Stop the server once no request arrived for idle_timeout seconds"""
+        while not self._stopped.is_set():
+            idle = time.monotonic() - self._last_request
+            if self._admitted == 0 and idle >= self.idle_timeout:
+                self.stop()
+                return
+            await asyncio.sleep(max(self.idle_timeout - idle, 0.05))
+    
+    async def close(self):
+        """Stop listening and release the worker threads"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        # Idle keep-alive connections see end of file; busy ones finish first
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+    
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle the requests of one connection until it closes"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                if not request_line.strip():
+                    continue
+                
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self._send(writer, 400, {'error': "Malformed request line"}, False)
+                    break
+                method, target, version = parts
+                
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+                
+                if 'transfer-encoding' in headers:
+                    await self._send(writer, 501, {'error': "Send a Content-Length"}, False)
+                    break
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= config.RENDER_SERVER_MAX_BODY_BYTES:
+                    await self._send(writer, 413, {'error': "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                
+                status, payload = await self._dispatch(method, urlsplit(target).path, body)
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+    
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        """Route a request and get its status and payload"""
+        self._last_request = time.monotonic()
+        if path == '/shutdown' and self.allow_shutdown:
+            if method != 'POST':
+                return 405, {'error': "Use POST"}
+            asyncio.get_running_loop().call_soon(self.stop)
+            return 200, {'status': 'stopping'}
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': "Use GET"}
+            health = self.service.health()
+            health.update(pending=self._admitted, rejected=self.rejected)
+            return 200, health
+        
+        op = ROUTES.get(path)
+        if op is None:
+            return 404, {'error': f"No such endpoint: {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}
+        try:
+            params = json.loads(body or b'{}')
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        if not isinstance(params, dict):
+            return 400, {'error': "Request must be a JSON object"}
+        
+        cached = self.service.cached_response(op, params)
+        if cached is not None:
+            return 200, cached
+        
+        # Backpressure: refuse work the processors cannot get to soon
+        if self._admitted >= self.service.pool.size + self.queue_size:
+            self.rejected += 1
+            return 503, {'error': "Server busy, retry later"}
+        
+        self._admitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return 200, await loop.run_in_executor(self._executor, self.service.respond, op, params)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            print(f"Warning: Render request failed: {e}")
+            return 500, {'error': str(e)}
+        finally:
+            self._admitted -= 1
+            self._last_request = time.monotonic()
+    
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        """Write a JSON response"""
+        body = (payload if isinstance(payload, str) else json.dumps(payload)).encode('utf-8')
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+def serve(host: str = config.RENDER_SERVER_HOST, port: int = config.RENDER_SERVER_PORT,
+          socket_path: Optional[str] = None, workers: int = config.RENDER_SERVER_WORKERS,
+          queue_size: int = config.RENDER_SERVER_QUEUE_SIZE,
+          idle_timeout: Optional[float] = None, allow_shutdown: bool = False):
+    """
+    Run a render server until interrupted or stopped
+    
+    Args:
+        host: Interface to listen on
+        port: TCP port
+        socket_path: Listen on this Unix socket instead of TCP
+        workers: Number of Markdown processors
+        queue_size: Requests allowed to wait for a processor
+        idle_timeout: Stop after this many seconds without requests
+        allow_shutdown: Accept POST /shutdown
+    """
+    service = RenderService(workers)
+    service.warm_up()
+    server = RenderServer(service, queue_size, idle_timeout=idle_timeout,
+                          allow_shutdown=allow_shutdown)
+    
+    async def main():
+        listener = await server.start(host, port, socket_path)
+        where = socket_path or ', '.join(str(s.getsockname()) for s in listener.sockets)
+        print(f"Serving on {where}", flush=True)
+        try:
+            await server.wait_stopped()
+        finally:
+            await server.close()
+    
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
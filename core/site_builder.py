@@ -0,0 +1,335 @@
+"""
+Static site builds: a folder of Markdown files rendered to linked HTML
+pages, rebuilt incrementally
+"""
+import hashlib
+import html
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import quote, unquote, urlsplit
+from core.file_handler import FileHandler
+from core.image_assets import ImageAssets
+from core.link_index import is_external
+from core.markdown_processor import BASE_CSS
+from core.outline import scan_outline
+from core.workspace_index import scan_folder
+import config
+
+# Bumped whenever the manifest changes; older sites are rebuilt
+MANIFEST_VERSION = 1
+MANIFEST_FILE = ".mdrender-site.json"
+STYLESHEET = "assets/site.css"
+
+A_HREF_PATTERN = re.compile(r'(<a\b[^>]*?\bhref=")([^"]+)(")')
+
+class SiteBuildResult(NamedTuple):
+    """Outcome of a site build"""
+    built: List[str]  # source-relative paths of pages written
+    removed: List[str]  # pages whose source is gone
+    unchanged: int  # pages left as they were
+    errors: List[str]
+
+def _fingerprint(path: str) -> Optional[List[int]]:
+    """Get a file's (mtime_ns, size), or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _digest(data: bytes) -> str:
+    """Hash file contents"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _page_url(page: str, target: str) -> str:
+    """Get the URL of a source-relative page from another page"""
+    relative = posixpath.relpath(target, posixpath.dirname(page) or '.')
+    return quote(str(Path(relative).with_suffix('.html').as_posix()))
+
+class SiteBuilder:
+    """
+    Render a folder into an HTML site and keep it up to date
+    
+    Pages link one shared stylesheet and have previous/next navigation;
+    a contents page lists them all. A manifest in the output folder
+    records what each page was built from:
+    
+    - the source file (by content hash)
+    - files it depends on: images it embeds and the layout templates
+    - the titles of its neighbours, shown in its navigation
+    - the local Markdown files it links to, and whether they were pages
+    
+    A build only renders the pages for which one of these changed, so
+    editing a page rebuilds that page, adding or renaming one rebuilds
+    its neighbours and the pages linking to it, and a theme change only
+    rewrites the stylesheet.
+    """
+    
+    def __init__(self, exporter, source_root: Path, output_dir: Path,
+                 theme_css: str = "", layout: Optional[str] = None,
+                 asset_mode: str = config.EXPORT_ASSET_MODE):
+        """
+        Initialize the builder
+        
+        Args:
+            exporter: Exporter whose processor renders the pages
+            source_root: Folder of Markdown files
+            output_dir: Folder the site is written to
+            theme_css: CSS theme, written to the shared stylesheet
+            layout: Layout for every page (default: front matter or
+                config.EXPORT_LAYOUT)
+            asset_mode: How diagram/math libraries are included
+        """
+        self.processor = exporter.markdown_processor
+        self.source_root = Path(source_root)
+        self.output_dir = Path(output_dir)
+        self.theme_css = theme_css
+        self.layout = layout
+        self.asset_mode = asset_mode
+        self.images = ImageAssets(self.output_dir / "assets" / "images")
+    
+    def build(self, progress: Optional[Callable[[int, int], None]] = None) -> SiteBuildResult:
+        """
+        Bring the site up to date with the source folder
+        
+        Args:
+            progress: Called with (done, total) after each rendered page
+        
+        Returns:
+            SiteBuildResult
+        """
+        manifest = self._load_manifest()
+        old_pages: Dict[str, dict] = manifest['pages']
+        sources = scan_folder(self.source_root)
+        order = sorted(sources, key=lambda page: (page.count('/'), page))
+        errors = []
+        
+        # Titles are needed for every page's navigation, but only changed
+        # sources are read
+        pages: Dict[str, dict] = {}
+        texts: Dict[str, str] = {}
+        for page in order:
+            entry = old_pages.get(page)
+            stat = list(sources[page])
+            if entry is not None and entry['stat'] == stat:
+                pages[page] = entry
+                continue
+            try:
+                data = (self.source_root / page).read_bytes()
+                text = data.decode('utf-8')
+            except (OSError, UnicodeDecodeError) as e:
+                errors.append(f"{page}: {e}")
+                if entry is not None:
+                    pages[page] = entry  # keep the last good build
+                continue
+            if entry is not None and entry['digest'] == _digest(data):
+                pages[page] = dict(entry, stat=stat)  # touched, not changed
+                continue
+            texts[page] = text
+            pages[page] = {'stat': stat, 'digest': _digest(data), 'title': self._title(page, text)}
+        order = [page for page in order if page in pages]
+        
+        dirty = []
+        for index, page in enumerate(order):
+            nav = self._navigation(order, pages, index)
+            entry = pages[page]
+            if page in texts or self._is_stale(entry, nav, pages):
+                dirty.append((page, nav))
+        
+        built = []
+        for done, (page, nav) in enumerate(dirty, 1):
+            try:
+                text = texts.get(page)
+                if text is None:
+                    text = (self.source_root / page).read_text(encoding='utf-8')
+                pages[page] = self._render_page(page, text, nav, pages)
+                built.append(page)
+            except Exception as e:
+                errors.append(f"{page}: {e}")
+                pages[page] = dict(pages[page], nav=None)  # retried next build
+            if progress is not None:
+                progress(done, len(dirty))
+        
+        removed = sorted(set(old_pages) - set(pages))
+        for page in removed:
+            try:
+                (self.output_dir / page).with_suffix('.html').unlink()
+            except OSError:
+                pass
+        
+        self._write_if_changed(self.output_dir / STYLESHEET, f"{self.theme_css}\n{BASE_CSS}")
+        self._write_if_changed(self.output_dir / config.SITE_CONTENTS_PAGE,
+                               self._contents_page(order, pages))
+        
+        manifest['pages'] = pages
+        self._save_manifest(manifest)
+        return SiteBuildResult(built, removed, len(order) - len(built), errors)
+    
+    def _settings(self) -> dict:
+        """Options that, when changed, make every page stale"""
+        return {
+            'version': config.APP_VERSION,
+            'layout': self.layout,
+            'asset_mode': self.asset_mode,
+        }
+    
+    def _load_manifest(self) -> dict:
+        """Read the manifest of the last build (empty for a new site)"""
+        empty = {'manifest_version': MANIFEST_VERSION, 'settings': self._settings(), 'pages': {}}
+        try:
+            with open(self.output_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if (manifest.get('manifest_version') != MANIFEST_VERSION
+                or manifest.get('settings') != self._settings()):
+            return empty
+        return manifest
+    
+    def _save_manifest(self, manifest: dict):
+        """Write the manifest"""
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+        except OSError as e:
+            print(f"Warning: Could not save site manifest: {e}")
+    
+    def _title(self, page: str, text: str) -> str:
+        """Get a page's title: front matter title, first heading or file name"""
+        title = self.processor.read_front_matter(text).metadata.get('title')
+        if title:
+            return str(title)
+        outline = scan_outline(text)
+        if outline.headings:
+            return outline.headings[0].title
+        return Path(page).stem
+    
+    @staticmethod
+    def _navigation(order: List[str], pages: Dict[str, dict], index: int) -> list:
+        """Get the previous and next page, with their titles, of a page"""
+        nav = []
+        for neighbour in (index - 1, index + 1):
+            if 0 <= neighbour < len(order):
+                nav.append([order[neighbour], pages[order[neighbour]]['title']])
+            else:
+                nav.append(None)
+        return nav
+    
+    @staticmethod
+    def _is_stale(entry: dict, nav: list, pages: Dict[str, dict]) -> bool:
+        """Check whether anything an unchanged page was built from changed"""
+        if entry.get('nav') != nav:
+            return True
+        for path, fingerprint in entry['files'].items():
+            if _fingerprint(path) != fingerprint:
+                return True
+        return any((target in pages) != was_page for target, was_page in entry['links'].items())
+    
+    def _render_page(self, page: str, text: str, nav: list, pages: Dict[str, dict]) -> dict:
+        """Render one page and get its manifest entry"""
+        source = self.source_root / page
+        output = (self.output_dir / page).with_suffix('.html')
+        depth = page.count('/')
+        root_url = '../' * depth
+        
+        layout_values = {
+            'theme_css': "",
+            'base_css': "",
+            'stylesheets': f'<link rel="stylesheet" href="{root_url}{STYLESHEET}">',
+            'navigation': self._navigation_html(page, nav, root_url),
+        }
+        html_content = self.processor.convert(
+            text, "", self.asset_mode, output.parent, source.parent,
+            self.images, self.layout, layout_values
+        )
+        collected = self.processor.collected_links
+        
+        # Links to other pages point at their HTML
+        links: Dict[str, bool] = {}
+        page_dir = posixpath.dirname(page)
+        
+        def replace(match):
+            href = html.unescape(match.group(2))
+            parts = urlsplit(href)
+            if is_external(href) or not parts.path or not FileHandler.is_markdown_file(parts.path):
+                return match.group(0)
+            target = posixpath.normpath(posixpath.join(page_dir, unquote(parts.path)))
+            if target not in pages:
+                return match.group(0)
+            new_href = parts.path[:-len(Path(parts.path).suffix)] + '.html'
+            if parts.fragment:
+                new_href += f"#{parts.fragment}"
+            return f"{match.group(1)}{html.escape(new_href)}{match.group(3)}"
+        
+        html_content = A_HREF_PATTERN.sub(replace, html_content)
+        for href in collected.links:
+            parts = urlsplit(href)
+            if not is_external(href) and parts.path and FileHandler.is_markdown_file(parts.path):
+                target = posixpath.normpath(posixpath.join(page_dir, unquote(parts.path)))
+                links[target] = target in pages
+        
+        # Images are embedded or copied, layouts shape every page
+        files = {}
+        for src in collected.images:
+            parts = urlsplit(src)
+            if not is_external(src) and parts.path:
+                path = os.path.abspath(source.parent / unquote(parts.path))
+                files[path] = _fingerprint(path)
+        layout_name = (self.layout or self.processor.metadata.get('layout')
+                       or config.EXPORT_LAYOUT)
+        for path, _ in self.processor.layouts.get(layout_name).dependencies:
+            files[str(path)] = _fingerprint(str(path))
+        
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        
+        return dict(pages[page], nav=nav, files=files, links=links)
+    
+    @staticmethod
+    def _navigation_html(page: str, nav: list, root_url: str) -> str:
+        """Build the navigation bar of a page"""
+        parts = [f'<nav class="mdr-nav"><a href="{root_url}{config.SITE_CONTENTS_PAGE}">Contents</a>']
+        for neighbour, rel, label in zip(nav, ('prev', 'next'), ('&larr; {}', '{} &rarr;')):
+            if neighbour is not None:
+                target, title = neighbour
+                parts.append(f' | <a rel="{rel}" href="{_page_url(page, target)}">'
+                             f'{label.format(html.escape(title))}</a>')
+        parts.append('</nav>')
+        return ''.join(parts)
+    
+    def _contents_page(self, order: List[str], pages: Dict[str, dict]) -> str:
+        """Build the page listing every page, grouped by folder"""
+        items = ['<h1>Contents</h1>', '<ul class="mdr-contents">']
+        folder = ''
+        for page in order:
+            page_folder = posixpath.dirname(page)
+            if page_folder != folder:
+                folder = page_folder
+                items.append(f'<li class="mdr-folder">{html.escape(folder)}/</li>')
+            items.append(f'<li><a href="{_page_url("", page)}">'
+                         f'{html.escape(pages[page]["title"])}</a></li>')
+        items.append('</ul>')
+        
+        layout = self.processor.layouts.get(self.layout or config.EXPORT_LAYOUT)
+        return layout.render({
+            'title': "Contents",
+            'stylesheets': f'<link rel="stylesheet" href="{STYLESHEET}">',
+            'content': '\n'.join(items),
+        })
+    
+    @staticmethod
+    def _write_if_changed(path: Path, text: str):
+        """Write a file unless it already has this content"""
+        try:
+            if path.read_text(encoding='utf-8') == text:
+                return
+        except (OSError, UnicodeDecodeError):
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
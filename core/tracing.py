@@ -0,0 +1,217 @@
+"""
+Opt-in tracing of user-visible operations in Chrome trace-event format
+
+Spans are written as they end to a local file that chrome://tracing,
+Perfetto or speedscope can load, so a slow session can be recorded on the
+user's machine and sent in. Only operation names and sizes are recorded,
+never document text or file paths. The file is rotated once it grows past
+config.TRACE_MAX_BYTES, keeping config.TRACE_BACKUPS older files.
+
+Tracing is off until TRACER.start(); a disabled span costs one or two
+microseconds.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+import config
+
+def now() -> float:
+    """Get the clock spans are measured with, in seconds"""
+    return time.perf_counter()
+
+class Tracer:
+    """Writer of trace events for one process"""
+    
+    def __init__(self, path: Path = config.TRACE_FILE, max_bytes: int = config.TRACE_MAX_BYTES,
+                 backups: int = config.TRACE_BACKUPS):
+        """
+        Initialize the tracer (disabled)
+        
+        Args:
+            path: Trace file; older ones get .1, .2, ... appended
+            max_bytes: Size after which the file is rotated
+            backups: Number of rotated files kept
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._threads: Set[int] = set()  # threads named in the current file
+        self._tracks: Dict[str, int] = {}
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether events are being recorded"""
+        return self._file is not None
+    
+    def start(self) -> bool:
+        """
+        Start recording to a new trace file, rotating out the previous one
+        
+        Returns:
+            True if recording
+        """
+        with self._lock:
+            if self._file is not None:
+                return True
+            try:
+                self._open()
+            except OSError as e:
+                print(f"Warning: Could not write trace file {self.path}: {e}")
+                self._file = None
+                return False
+        return True
+    
+    def stop(self):
+        """Stop recording and close the trace file"""
+        with self._lock:
+            self._close()
+    
+    @contextmanager
+    def span(self, name: str, category: str = "app", **args):
+        """
+        Record the time spent in a with block
+        
+        Spans of one thread nest by time, so spans opened inside the block
+        show up as its children.
+        
+        Args:
+            name: Operation name
+            category: Group of the operation, e.g. 'preview' or 'file'
+            **args: Sizes and counts to show with the span
+        """
+        if self._file is None:
+            yield
+            return
+        start = now()
+        try:
+            yield
+        finally:
+            self.complete(name, start, now(), category, **args)
+    
+    def complete(self, name: str, start: float, end: float, category: str = "app",
+                 track: Optional[str] = None, **args):
+        """
+        Record a span measured by the caller, e.g. across timer callbacks
+        
+        Args:
+            name: Operation name
+            start: Start time from now()
+            end: End time from now()
+            category: Group of the operation
+            track: Name of a separate row for work that overlaps this
+                thread's spans, such as the web page's (default: the
+                current thread)
+            **args: Sizes and counts to show with the span
+        """
+        if self._file is None:
+            return
+        self._write({'name': name, 'cat': category, 'ph': 'X', 'ts': _micros(start),
+                     'dur': _micros(end - start), 'args': args}, track)
+    
+    def instant(self, name: str, category: str = "app", **args):
+        """
+        Record a point in time, such as a keystroke
+        
+        Args:
+            name: Event name
+            category: Group of the event
+            **args: Values to show with the event
+        """
+        if self._file is None:
+            return
+        self._write({'name': name, 'cat': category, 'ph': 'i', 's': 't', 'ts': _micros(now()),
+                     'args': args})
+    
+    def _write(self, event: dict, track: Optional[str] = None):
+        """Append an event of the current thread or of a named track"""
+        with self._lock:
+            if self._file is None:
+                return
+            if track is None:
+                tid = threading.get_native_id()
+                thread_name = threading.current_thread().name
+            else:
+                # Tracks get IDs beyond those of real threads
+                tid = self._tracks.setdefault(track, (1 << 30) + len(self._tracks))
+                thread_name = track
+            event['pid'] = os.getpid()
+            event['tid'] = tid
+            try:
+                if tid not in self._threads:
+                    self._threads.add(tid)
+                    self._append({'name': 'thread_name', 'ph': 'M', 'pid': event['pid'],
+                                  'tid': tid, 'args': {'name': thread_name}})
+                self._append(event)
+                if self._size > self.max_bytes:
+                    self._close()
+                    self._open()
+            except OSError as e:
+                print(f"Warning: Stopped tracing: {e}")
+                self._close()
+    
+    def _append(self, event: dict):
+        data = ",\n" + json.dumps(event, separators=(',', ':'))
+        self._file.write(data)
+        self._size += len(data)
+    
+    def _open(self):
+        """Rotate existing files and start a new one"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for index in range(self.backups, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            newer = self.path.with_name(f"{self.path.name}.{index - 1}") if index > 1 else self.path
+            if newer.exists():
+                os.replace(newer, older)
+        if self.path.exists():
+            self.path.unlink()  # no backups kept
+        
+        self._file = open(self.path, 'w', encoding='utf-8')
+        # Events are joined by leading commas, so the first one is metadata
+        header = json.dumps({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                             'args': {'name': config.APP_NAME}}, separators=(',', ':'))
+        self._file.write("[" + header)
+        self._size = len(header) + 1
+        self._threads = set()
+    
+    def _close(self):
+        """Terminate the JSON array and close the file"""
+        if self._file is None:
+            return
+        try:
+            self._file.write("\n]\n")
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+
+def _micros(seconds: float) -> float:
+    return round(seconds * 1_000_000, 1)
+
+def traced(name: str, category: str = "app") -> Callable:
+    """
+    Decorate a function to record each call as a span of TRACER
+    
+    Args:
+        name: Operation name
+        category: Group of the operation
+    
+    Returns:
+        The decorator
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+TRACER = Tracer()
@@ -0,0 +1,441 @@
+"""
+Full-text index of the Markdown files in a workspace folder
+"""
+import hashlib
+import heapq
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from core.file_handler import FileHandler
+from core.outline import Heading, scan_outline
+import config
+
+TERM_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+MAX_TERM_LENGTH = 64
+PREFIX_EXPANSION_LIMIT = 64  # terms a partially typed word may stand for
+
+# Postings fields and their weight in search scores
+FIELD_BODY = 0
+FIELD_HEADING = 1
+FIELD_WEIGHTS = {FIELD_BODY: 1.0, FIELD_HEADING: 4.0}
+
+# Bumped whenever the tables change; older indexes are rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    field INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS headings (
+    doc_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    title TEXT NOT NULL,
+    anchor TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS headings_doc ON headings (doc_id);
+CREATE TABLE IF NOT EXISTS links (
+    doc_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS links_doc ON links (doc_id);
+CREATE INDEX IF NOT EXISTS links_target ON links (target);
+"""
+
+class ParsedDocument(NamedTuple):
+    """Searchable content extracted from a Markdown file"""
+    title: str
+    body_terms: Counter
+    heading_terms: Counter
+    headings: List[Heading]
+    links: List[Tuple[int, str]]  # (0-based line, target)
+
+class SearchResult(NamedTuple):
+    """Document matching a search query"""
+    path: Path
+    title: str
+    score: float
+    line: int  # first line containing a query term, or 0
+    snippet: str
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of terms in order of appearance
+    """
+    return [term for term in TERM_PATTERN.findall(text.lower()) if len(term) <= MAX_TERM_LENGTH]
+
+def parse_document(text: str, default_title: str = "") -> ParsedDocument:
+    """
+    Extract terms, headings and link targets from Markdown source
+    
+    Args:
+        text: Markdown source
+        default_title: Title used when the document has no heading
+    
+    Returns:
+        ParsedDocument
+    """
+    body_terms = Counter(tokenize(text))
+    outline = scan_outline(text)
+    
+    heading_terms: Counter = Counter()
+    for heading in outline.headings:
+        heading_terms.update(tokenize(heading.title))
+    
+    title = outline.headings[0].title if outline.headings else default_title
+    return ParsedDocument(title, body_terms, heading_terms, outline.headings, outline.links)
+
+def scan_folder(root: Path) -> Dict[str, Tuple[int, int]]:
+    """
+    List the Markdown files of a folder, skipping hidden and ignored folders
+    
+    Args:
+        root: Folder to scan
+    
+    Returns:
+        Dictionary of root-relative POSIX path to (mtime_ns, size)
+    """
+    files = {}
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            name for name in dirnames
+            if not name.startswith('.') and name not in config.INDEX_IGNORED_DIRS
+        ]
+        for name in filenames:
+            if not FileHandler.is_markdown_file(name):
+                continue
+            path = Path(directory) / name
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files[path.relative_to(root).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+class WorkspaceIndex:
+    """Inverted index over the Markdown files below a root folder, stored on disk"""
+    
+    def __init__(self, root: Path, index_dir: Path = config.INDEX_DIR):
+        """
+        Open (or create) the index of a workspace
+        
+        Args:
+            root: Workspace folder
+            index_dir: Directory holding the index databases
+        """
+        self.root = Path(root).resolve()
+        
+        digest = hashlib.blake2b(str(self.root).encode('utf-8'), digest_size=8).hexdigest()
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = index_dir / f"{digest}.sqlite3"
+        
+        # WAL lets a background update run while the GUI keeps querying
+        self._db = sqlite3.connect(str(self.db_path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            for table in ('documents', 'postings', 'terms', 'headings', 'links'):
+                self._db.execute(f"DROP TABLE IF EXISTS {table}")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.executescript(SCHEMA)
+    
+    def close(self):
+        """Close the index database"""
+        self._db.close()
+    
+    def document_count(self) -> int:
+        """Get the number of indexed documents"""
+        return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """
+        List the Markdown files of the workspace
+        
+        Returns:
+            Dictionary of root-relative POSIX path to (mtime_ns, size)
+        """
+        return scan_folder(self.root)
+    
+    def update(self, progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int]:
+        """
+        Bring the index up to date with the files on disk
+        
+        Only files whose modification time or size changed are read again.
+        
+        Args:
+            progress: Called with (done, total) after each batch of files
+        
+        Returns:
+            Tuple of (files indexed, files removed)
+        """
+        on_disk = self.scan()
+        indexed = {
+            path: (doc_id, mtime_ns, size)
+            for doc_id, path, mtime_ns, size
+            in self._db.execute("SELECT id, path, mtime_ns, size FROM documents")
+        }
+        
+        removed = [indexed[path][0] for path in indexed.keys() - on_disk.keys()]
+        changed = [
+            path for path, stat in on_disk.items()
+            if path not in indexed or indexed[path][1:] != stat
+        ]
+        
+        with self._db:
+            for doc_id in removed:
+                self._delete(doc_id)
+        
+        for start in range(0, len(changed), config.INDEX_COMMIT_BATCH):
+            with self._db:
+                for path in changed[start:start + config.INDEX_COMMIT_BATCH]:
+                    self._index(path, on_disk[path])
+            if progress:
+                progress(min(start + config.INDEX_COMMIT_BATCH, len(changed)), len(changed))
+        
+        return len(changed), len(removed)
+    
+    def update_file(self, file_path: str) -> bool:
+        """
+        Re-index a single file, e.g. right after it was saved
+        
+        Args:
+            file_path: Path of the file
+        
+        Returns:
+            True if the file belongs to the workspace and was indexed
+        """
+        path = Path(file_path).resolve()
+        try:
+            relative = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return False
+        if not FileHandler.is_markdown_file(relative):
+            return False
+        
+        with self._db:
+            try:
+                stat = path.stat()
+            except OSError:
+                row = self._db.execute("SELECT id FROM documents WHERE path = ?", (relative,)).fetchone()
+                if row:
+                    self._delete(row[0])
+                return False
+            self._index(relative, (stat.st_mtime_ns, stat.st_size))
+        return True
+    
+    def _delete(self, doc_id: int):
+        """Remove a document and everything indexed from it"""
+        for table in ('postings', 'headings', 'links'):
+            self._db.execute(f"DELETE FROM {table} WHERE doc_id = ?", (doc_id,))
+        self._db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+    
+    def _index(self, relative: str, stat: Tuple[int, int]):
+        """Parse a file and replace its entries in the index"""
+        path = self.root / relative
+        try:
+            text = path.read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return
+        
+        parsed = parse_document(text, path.stem)
+        
+        row = self._db.execute("SELECT id FROM documents WHERE path = ?", (relative,)).fetchone()
+        if row:
+            self._delete(row[0])
+        doc_id = self._db.execute(
+            "INSERT INTO documents (path, mtime_ns, size, title) VALUES (?, ?, ?, ?)",
+            (relative, stat[0], stat[1], parsed.title)
+        ).lastrowid
+        
+        postings = [(term, doc_id, FIELD_BODY, count) for term, count in parsed.body_terms.items()]
+        postings += [(term, doc_id, FIELD_HEADING, count) for term, count in parsed.heading_terms.items()]
+        self._db.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+        # Vocabulary for prefix lookups; terms of deleted documents may linger
+        self._db.executemany("INSERT OR IGNORE INTO terms VALUES (?)",
+                             [(term,) for term in parsed.body_terms])
+        self._db.executemany(
+            "INSERT INTO headings VALUES (?, ?, ?, ?, ?, ?)",
+            [(doc_id, *heading) for heading in parsed.headings]
+        )
+        self._db.executemany(
+            "INSERT INTO links VALUES (?, ?, ?)",
+            [(doc_id, line, target) for line, target in parsed.links]
+        )
+    
+    def search(self, query: str, limit: int = config.SEARCH_MAX_RESULTS) -> List[SearchResult]:
+        """
+        Find the documents containing all terms of a query
+        
+        The last term also matches as a prefix while the query is being
+        typed (no trailing space). Matches in headings rank higher.
+        
+        Args:
+            query: Search text
+            limit: Maximum number of results
+        
+        Returns:
+            List of SearchResult, best match first
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        
+        total = max(self.document_count(), 1)
+        scores: Optional[Dict[int, float]] = None
+        for position, term in enumerate(terms):
+            prefix = position == len(terms) - 1 and not query[-1:].isspace()
+            term_scores = self._term_scores(term, prefix)
+            if not term_scores:
+                return []
+            
+            idf = math.log(1 + total / len(term_scores))
+            if scores is None:
+                scores = {doc_id: score * idf for doc_id, score in term_scores.items()}
+            else:
+                scores = {
+                    doc_id: scores[doc_id] + score * idf
+                    for doc_id, score in term_scores.items() if doc_id in scores
+                }
+            if not scores:
+                return []
+        
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        placeholders = ','.join('?' * len(best))
+        documents = {
+            doc_id: (path, title)
+            for doc_id, path, title in self._db.execute(
+                f"SELECT id, path, title FROM documents WHERE id IN ({placeholders})",
+                [doc_id for doc_id, _ in best]
+            )
+        }
+        
+        results = []
+        for doc_id, score in best:
+            if doc_id not in documents:
+                continue
+            path, title = documents[doc_id]
+            line, snippet = self._locate(self.root / path, terms)
+            results.append(SearchResult(self.root / path, title, score, line, snippet))
+        return results
+    
+    def _term_scores(self, term: str, prefix: bool) -> Dict[int, float]:
+        """Score each document containing a term (or a term starting with it)"""
+        terms = [term]
+        if prefix:
+            # Short prefixes stand for many terms; only the first few count
+            terms = [row[0] for row in self._db.execute(
+                "SELECT term FROM terms WHERE term >= ? AND term < ? LIMIT ?",
+                (term, term + '\U0010ffff', PREFIX_EXPANSION_LIMIT)
+            )]
+        
+        scores: Dict[int, float] = {}
+        for candidate in terms:
+            rows = self._db.execute(
+                "SELECT doc_id, field, count FROM postings WHERE term = ?", (candidate,)
+            )
+            for doc_id, field, count in rows:
+                scores[doc_id] = scores.get(doc_id, 0.0) + (1 + math.log(count)) * FIELD_WEIGHTS[field]
+        return scores
+    
+    @staticmethod
+    def _locate(path: Path, terms: List[str]) -> Tuple[int, str]:
+        """Find the first line of a file mentioning a query term"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for number, line in enumerate(f):
+                    lowered = line.lower()
+                    if not any(term in lowered for term in terms):
+                        continue
+                    line_terms = tokenize(line)
+                    if any(t.startswith(term) for term in terms for t in line_terms):
+                        return number, line.strip()[:200]
+        except OSError:
+            pass
+        return 0, ""
+    
+    def headings(self, file_path: str) -> List[Heading]:
+        """
+        Get the headings of an indexed file
+        
+        Args:
+            file_path: Path of the file
+        
+        Returns:
+            List of Heading in document order
+        """
+        try:
+            relative = Path(file_path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return []
+        rows = self._db.execute(
+            "SELECT h.line, h.level, h.text, h.title, h.anchor FROM headings h JOIN documents d ON d.id = h.doc_id"
+            " WHERE d.path = ? ORDER BY h.line",
+            (relative,)
+        )
+        return [Heading(*row) for row in rows]
+    
+    def links_to(self, target: str) -> List[Tuple[Path, int]]:
+        """
+        Find the links pointing at a target, with or without a #fragment
+        
+        Args:
+            target: Link target as written in the source
+        
+        Returns:
+            List of (file path, 0-based line) of each link
+        """
+        rows = self._db.execute(
+            "SELECT d.path, l.line FROM links l JOIN documents d ON d.id = l.doc_id"
+            " WHERE l.target = ? OR (l.target >= ? AND l.target < ?)"
+            " ORDER BY d.path, l.line",
+            (target, target + '#', target + '$')
+        )
+        return [(self.root / path, line) for path, line in rows]
+    
+    def outlines(self) -> Dict[Path, Tuple[List[Heading], List[Tuple[int, str]]]]:
+        """
+        Get the headings and links of every indexed file
+        
+        Returns:
+            Dictionary of file path to (headings, links)
+        """
+        outlines: Dict[Path, Tuple[List[Heading], List[Tuple[int, str]]]] = {}
+        paths = {}
+        for doc_id, path in self._db.execute("SELECT id, path FROM documents"):
+            paths[doc_id] = self.root / path
+            outlines[paths[doc_id]] = ([], [])
+        
+        for doc_id, *heading in self._db.execute(
+                "SELECT doc_id, line, level, text, title, anchor FROM headings ORDER BY doc_id, line"):
+            outlines[paths[doc_id]][0].append(Heading(*heading))
+        for doc_id, line, target in self._db.execute(
+                "SELECT doc_id, line, target FROM links ORDER BY doc_id, line"):
+            outlines[paths[doc_id]][1].append((line, target))
+        return outlines
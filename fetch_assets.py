@@ -0,0 +1,44 @@
+"""
+Download the Mermaid and KaTeX files bundled with MDRender
+
+Run once before building (build.ps1 does this) so the preview and
+exported documents can render diagrams and math without network access.
+"""
+import sys
+import urllib.request
+from core.bundled_assets import LIBRARIES
+import config
+
+def fetch_assets(force: bool = False) -> bool:
+    """
+    Download every bundled library file into config.VENDOR_DIR
+    
+    Args:
+        force: Download files that already exist again
+    
+    Returns:
+        True if all files are present afterwards
+    """
+    ok = True
+    for library, files in LIBRARIES.items():
+        for path, url in files:
+            target = config.VENDOR_DIR / path
+            if target.exists() and not force:
+                continue
+            
+            print(f"Fetching {library}: {url}")
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    data = response.read()
+            except Exception as e:
+                print(f"  Failed: {e}")
+                ok = False
+                continue
+            
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+    
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if fetch_assets(force='--force' in sys.argv) else 1)
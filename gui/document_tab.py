@@ -0,0 +1,587 @@
+"""
+Document tab holding the editor and preview of one open file
+"""
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Set
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSplitter
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
+
+from gui.editor import MarkdownEditor
+from gui.preview import MarkdownPreview
+from core.file_handler import FileHandler
+from core.processor_pool import ProcessorPool
+from core.preview_state import PreviewState, PreviewStateCache
+from core.render_scheduler import PreviewScheduler
+from core.blocks import order_by_start_lines
+from core.document_model import DocumentModel
+from core.merge import merge3, changed_span
+from core.metrics import REGISTRY
+from core.tracing import TRACER, traced
+from core.themes import ThemeManager
+import config
+
+PREVIEW_UPDATE_SECONDS = REGISTRY.histogram('preview_update_seconds',
+                                            "Time of a preview update, from editor text to the page")
+PREVIEW_PARSE_SECONDS = REGISTRY.histogram('preview_parse_seconds',
+                                           "Time to split a document into blocks and build its contents")
+PREVIEW_CONVERT_SECONDS = REGISTRY.histogram(
+    'preview_convert_seconds', "Time to convert the uncached blocks of an update or chunk",
+    ('stage',))
+PREVIEW_PUSH_SECONDS = REGISTRY.histogram('preview_push_seconds',
+                                          "Time to hand blocks to the web view", ('function',))
+PREVIEW_BLOCKS = REGISTRY.counter('preview_blocks_total',
+                                  "Blocks pushed to previews, by where their HTML came from",
+                                  ('source',))
+
+class DocumentTab(QWidget):
+    """Editor and preview for one document in the tabbed workspace"""
+    
+    titleChanged = pyqtSignal()
+    contentChanged = pyqtSignal()
+    
+    def __init__(self, processor_pool: ProcessorPool, theme_manager: ThemeManager,
+                 preview_states: PreviewStateCache, parent=None):
+        """
+        Initialize the tab
+        
+        Args:
+            processor_pool: Markdown processors shared by all tabs
+            theme_manager: Theme manager shared by all tabs
+            preview_states: Snapshots of evicted previews, shared by all tabs
+        """
+        super().__init__(parent)
+        
+        self.file_handler = FileHandler()
+        self.processor_pool = processor_pool
+        self.theme_manager = theme_manager
+        self.preview_states = preview_states
+        
+        # When the tab was last shown, for idle eviction of its preview
+        self.last_active = time.monotonic()
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.editor = MarkdownEditor()
+        self.splitter.addWidget(self.editor)
+        layout.addWidget(self.splitter)
+        
+        # The preview is created on demand and dropped when evicted
+        self.preview: Optional[MarkdownPreview] = None
+        self.preview_visible = True
+        self._zoom_factor = 1.0
+        self._create_preview()
+        
+        self.splitter.setSizes([
+            int(config.DEFAULT_WINDOW_WIDTH * config.DEFAULT_SPLITTER_RATIO),
+            int(config.DEFAULT_WINDOW_WIDTH * (1 - config.DEFAULT_SPLITTER_RATIO))
+        ])
+        
+        # Preview update timer (adaptive debounce)
+        self.preview_scheduler = PreviewScheduler()
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.timeout.connect(self.update_preview)
+        self._debounce_start: Optional[float] = None  # first keystroke waiting for an update
+        
+        # Background rendering of off-screen blocks (progressive preview)
+        self.progressive_timer = QTimer(self)
+        self.progressive_timer.setSingleShot(True)
+        self.progressive_timer.timeout.connect(self._render_pending_blocks)
+        self._pending_blocks: deque = deque()
+        
+        # Last rendered preview content, snapshotted when the preview is evicted
+        self._model: Optional[DocumentModel] = None
+        self._toc_html = ""
+        self._revision = -1
+        self._stale = False
+        
+        # Scroll synchronization between editor and preview
+        self.sync_scroll_enabled = config.SYNC_SCROLL_ENABLED
+        self._syncing_scroll = False
+        self._preview_line = 0.0
+        
+        self.editor.textChanged.connect(self._on_text_changed)
+        self.editor.verticalScrollBar().valueChanged.connect(self._sync_preview_scroll)
+    
+    def _create_preview(self):
+        """Create the preview web view and connect it to the tab"""
+        self.preview = MarkdownPreview()
+        self.preview.web_view.setZoomFactor(self._zoom_factor)
+        self.preview.setVisible(self.preview_visible)
+        self.splitter.addWidget(self.preview)
+        
+        self.preview.scrolledToLine.connect(self._sync_editor_scroll)
+        self.preview.diagramRendered.connect(self.processor_pool.diagrams.put)
+        self.preview.codeRequested.connect(self._highlight_code)
+    
+    @property
+    def has_preview(self) -> bool:
+        """Whether the tab currently holds a live web view"""
+        return self.preview is not None
+    
+    def title(self) -> str:
+        """
+        Get the tab title
+        
+        Returns:
+            File name with a trailing * when modified
+        """
+        modified = "*" if self.file_handler.is_modified else ""
+        return f"{self.file_handler.get_current_file_name()}{modified}"
+    
+    def is_pristine(self) -> bool:
+        """
+        Check whether the tab is an empty, untouched untitled document
+        
+        Returns:
+            True if opening a file may reuse this tab
+        """
+        return (self.file_handler.current_file is None
+                and not self.file_handler.is_modified
+                and self.editor.document().isEmpty())
+    
+    @traced('document.open', 'document')
+    def load_file(self, file_path: str) -> tuple[bool, str]:
+        """
+        Load a file into the tab
+        
+        Args:
+            file_path: Path to the file
+        
+        Returns:
+            Tuple of (success, error_message)
+        """
+        success, content, error = self.file_handler.open_file(file_path)
+        if not success:
+            return False, error
+        
+        self.editor.setPlainText(content)
+        # Loading the text is not an edit
+        self.file_handler.set_modified(False)
+        self.titleChanged.emit()
+        self.update_preview()
+        return True, ""
+    
+    @traced('document.save', 'document')
+    def save(self, file_path: Optional[str] = None) -> tuple[bool, str]:
+        """
+        Save the document
+        
+        Args:
+            file_path: Target path (None saves to the current file)
+        
+        Returns:
+            Tuple of (success, error_message)
+        """
+        success, error = self.file_handler.save_file(self.editor.toPlainText(), file_path)
+        if success:
+            self.titleChanged.emit()
+        return success, error
+    
+    def reload_from_disk(self) -> str:
+        """
+        Take over changes another program made to the file
+        
+        Without local edits the buffer simply follows the file; otherwise
+        the file is merged into the buffer against the content last loaded
+        or saved. Only the changed region of the editor is replaced, so
+        scroll position and undo history are kept.
+        
+        Returns:
+            Status message, or "" if the file did not really change
+        """
+        changed, content = self.file_handler.check_external_change()
+        if not changed:
+            return ""
+        
+        name = self.file_handler.get_current_file_name()
+        if content is None:
+            # Keep the buffer; saving recreates the file
+            self.file_handler.set_modified(True)
+            self.titleChanged.emit()
+            return f"{name} was deleted on disk"
+        
+        buffer = self.editor.toPlainText()
+        if self.file_handler.is_modified:
+            merged, conflicts = merge3(self.file_handler.current_content, buffer, content)
+        else:
+            merged, conflicts = content, 0
+        
+        self._replace_text(buffer, merged)
+        self.file_handler.accept_external_content(content)
+        self.file_handler.set_modified(merged != content)
+        self.titleChanged.emit()
+        
+        if conflicts:
+            return f"{name} changed on disk: {conflicts} conflict(s) marked in the editor"
+        if merged != content:
+            return f"{name} changed on disk: merged with your edits"
+        return f"{name} reloaded"
+    
+    def _replace_text(self, old: str, new: str):
+        """Replace the editor text by editing only the region that differs"""
+        start, old_end, new_end = changed_span(old, new)
+        if start == old_end == new_end:
+            return
+        
+        # QTextDocument positions count UTF-16 code units
+        def position(index: int) -> int:
+            return len(old[:index].encode('utf-16-le')) // 2
+        
+        cursor = QTextCursor(self.editor.document())
+        cursor.beginEditBlock()
+        cursor.setPosition(position(start))
+        cursor.setPosition(position(old_end), QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(new[start:new_end])
+        cursor.endEditBlock()
+    
+    def _on_text_changed(self):
+        """Handle editor text changes"""
+        start = time.perf_counter()
+        was_modified = self.file_handler.is_modified
+        self.file_handler.set_modified(True)
+        if not was_modified:
+            self.titleChanged.emit()
+        self.contentChanged.emit()
+        
+        # Debounce preview update based on render cost and typing rate
+        self.preview_scheduler.record_keystroke()
+        delay = self.preview_scheduler.next_delay()
+        self.preview_timer.start(delay)
+        if self._debounce_start is None:
+            self._debounce_start = start
+        TRACER.complete('edit.keystroke', start, time.perf_counter(), 'edit', debounce_ms=delay)
+    
+    def update_preview(self):
+        """Update the preview pane"""
+        self.preview_timer.stop()
+        self.progressive_timer.stop()
+        if self.preview is None:
+            self._stale = True
+            return
+        
+        self._stale = False
+        self.preview_scheduler.render_started()
+        start = time.perf_counter()
+        if self._debounce_start is not None:
+            TRACER.complete('preview.debounce', self._debounce_start, start, 'preview')
+            self._debounce_start = None
+        
+        markdown_text = self.editor.toPlainText()
+        with self.processor_pool.acquire() as processor:
+            model = processor.parse_document(markdown_text)
+            toc_html = processor.build_toc_html(markdown_text)
+        parsed = time.perf_counter()
+        PREVIEW_PARSE_SECONDS.observe(parsed - start)
+        TRACER.complete('preview.parse', start, parsed, 'preview', blocks=len(model))
+        
+        self._show_model(model, toc_html)
+        self._revision = self.editor.document().revision()
+        
+        end = time.perf_counter()
+        self.preview_scheduler.record_render(end - start)
+        PREVIEW_UPDATE_SECONDS.observe(end - start)
+        TRACER.complete('preview.update', start, end, 'preview', chars=len(markdown_text))
+    
+    def _show_model(self, model: DocumentModel, toc_html: str):
+        """
+        Push a document's blocks to the preview
+        
+        Fragments come from the processor's cache; visible blocks that are
+        not cached are rendered now, other missing blocks are rendered in
+        the background on long documents.
+        """
+        page_reloaded = self._ensure_page()
+        
+        base_dir = self._base_dir()
+        started = time.perf_counter()
+        with self.processor_pool.acquire() as processor:
+            first_line, last_line = self.editor.visible_line_range()
+            visible, deferred = order_by_start_lines(model.start_lines, first_line, last_line)
+            on_screen = set(visible)
+            progressive = len(model) >= config.PROGRESSIVE_RENDER_MIN_BLOCKS
+            
+            # Visible blocks first; off-screen blocks that are not cached yet
+            # are streamed in afterwards on long documents
+            items = [None] * len(model)
+            self._pending_blocks = deque()
+            converted = 0
+            convert_seconds = 0.0
+            for index in visible + deferred:
+                key = model.key(index)
+                fragment = processor.get_cached_block(key)
+                if fragment is None and (not progressive or index in on_screen):
+                    block_started = time.perf_counter()
+                    fragment = processor.render_block(model.block_text(index), model.definitions, key)
+                    convert_seconds += time.perf_counter() - block_started
+                    converted += 1
+                elif fragment is None:
+                    self._pending_blocks.append(index)
+                if fragment is not None:
+                    fragment = processor.image_probe.annotate(fragment, base_dir)
+                    fragment = processor.apply_heading_ids(fragment, model, index)
+                items[index] = [key, model.start_lines[index], model.end_lines[index], fragment]
+        
+        # A fresh page has no diagrams yet; hand it the ones laid out before
+        if page_reloaded:
+            self._seed_diagrams(items)
+        
+        if converted:
+            PREVIEW_CONVERT_SECONDS.observe(convert_seconds, stage='visible')
+        TRACER.complete('preview.convert', started, time.perf_counter(), 'preview',
+                        converted=converted, pending=len(self._pending_blocks))
+        PREVIEW_BLOCKS.inc(converted, source='rendered')
+        PREVIEW_BLOCKS.inc(len(model) - converted - len(self._pending_blocks), source='cache')
+        
+        anchor = visible[0] if self._pending_blocks else None
+        virtual = len(model) >= config.VIRTUAL_PREVIEW_MIN_BLOCKS
+        with PREVIEW_PUSH_SECONDS.time(function='render'), TRACER.span('preview.push', 'preview'):
+            self.preview.render_blocks(items, toc_html, anchor, virtual)
+        
+        self._model = model
+        self._toc_html = toc_html
+        
+        if self._pending_blocks:
+            self.progressive_timer.start(0)
+    
+    def _base_dir(self) -> Optional[Path]:
+        """Get the directory relative image paths are resolved against"""
+        if self.file_handler.current_file:
+            return self.file_handler.current_file.parent
+        return None
+    
+    def _ensure_page(self) -> bool:
+        """
+        Load the preview page if the document's base URL changed
+        
+        Returns:
+            True if the page was (re)loaded
+        """
+        base_url = ""
+        if self.file_handler.current_file:
+            base_url = str(self.file_handler.current_file.parent)
+        
+        # The preview page is loaded once per base URL and updated in place
+        if self.preview.page_base_url == base_url:
+            return False
+        
+        theme_css = self.theme_manager.get_theme_css()
+        with TRACER.span('preview.load_page', 'preview'):
+            with self.processor_pool.acquire() as processor:
+                page_html = processor.build_preview_page(theme_css)
+            self.preview.load_page(page_html, base_url)
+        return True
+    
+    def _seed_diagrams(self, items: list):
+        """Give a freshly loaded page the cached diagrams of its blocks"""
+        rendered = ''.join(item[3] for item in items if item[3])
+        self.preview.seed_diagrams(self.processor_pool.diagrams.find(rendered))
+    
+    def _highlight_code(self, key: str, first: int):
+        """Highlight a chunk of a large code block the preview scrolled to"""
+        model = self._model
+        if model is None or self.preview is None:
+            return
+        try:
+            index = model.keys.index(int(key, 16))
+        except ValueError:
+            return  # the block was edited since
+        
+        started = time.perf_counter()
+        with self.processor_pool.acquire() as processor:
+            lines_html = processor.highlight_code(model.block_text(index), first)
+        PREVIEW_CONVERT_SECONDS.observe(time.perf_counter() - started, stage='code')
+        TRACER.complete('preview.highlight_code', started, time.perf_counter(), 'preview')
+        if lines_html is not None:
+            self.preview.fill_code(key, first, lines_html)
+    
+    def _render_pending_blocks(self):
+        """Render the next chunk of off-screen blocks into the preview"""
+        deadline = time.perf_counter() + config.PROGRESSIVE_CHUNK_BUDGET_MS / 1000
+        
+        filled = []
+        base_dir = self._base_dir()
+        started = time.perf_counter()
+        with self.processor_pool.acquire() as processor:
+            while self._pending_blocks and time.perf_counter() < deadline:
+                index = self._pending_blocks.popleft()
+                model = self._model
+                fragment = processor.render_block(model.block_text(index), model.definitions,
+                                                  model.key(index))
+                fragment = processor.image_probe.annotate(fragment, base_dir)
+                fragment = processor.apply_heading_ids(fragment, model, index)
+                filled.append([index, fragment])
+        converted = time.perf_counter()
+        PREVIEW_CONVERT_SECONDS.observe(converted - started, stage='background')
+        PREVIEW_BLOCKS.inc(len(filled), source='rendered')
+        TRACER.complete('preview.convert_background', started, converted, 'preview',
+                        converted=len(filled))
+        
+        with PREVIEW_PUSH_SECONDS.time(function='fill'), TRACER.span('preview.fill', 'preview'):
+            self.preview.fill_blocks(filled)
+        
+        if self._pending_blocks:
+            self.progressive_timer.start(0)
+    
+    def activate(self):
+        """Resume the tab when it becomes the current one"""
+        self.last_active = time.monotonic()
+        
+        if self.preview is None:
+            self._restore_preview()
+            return
+        
+        self.preview.set_active(True)
+        if self._stale:
+            self.update_preview()
+        elif self._pending_blocks:
+            self.progressive_timer.start(0)
+    
+    def deactivate(self):
+        """Suspend preview work while the tab is in the background"""
+        self.last_active = time.monotonic()
+        
+        # Edits not rendered yet are picked up when the tab is shown again
+        if self.preview_timer.isActive():
+            self._stale = True
+            self.preview_timer.stop()
+        self.progressive_timer.stop()
+        
+        if self.preview is not None:
+            self.preview.set_active(False)
+    
+    def evict_preview(self):
+        """
+        Release the tab's web view, keeping a snapshot of its content
+        
+        The next activate() recreates the view from the snapshot without
+        rendering the document again.
+        """
+        if self.preview is None:
+            return
+        
+        # Pending blocks need no special care: the model only refers to
+        # fragments, and missing ones are rendered again on restore
+        if not self._stale and self._model is not None:
+            self.preview_states.put(id(self), PreviewState(
+                self._revision, self._model, self._toc_html, self._preview_line))
+        self._pending_blocks = deque()
+        self.progressive_timer.stop()
+        
+        self._zoom_factor = self.preview.get_zoom_factor()
+        self.preview.setParent(None)
+        self.preview.deleteLater()
+        self.preview = None
+    
+    def _restore_preview(self):
+        """Recreate an evicted preview, from its snapshot when still current"""
+        self._create_preview()
+        
+        state = self.preview_states.get(id(self))
+        self.preview_states.discard(id(self))
+        if state is None or self._stale or state.revision != self.editor.document().revision():
+            self.update_preview()
+            self.preview.scroll_to_line(self._preview_line)
+            return
+        
+        self._show_model(state.model, state.toc_html)
+        self.preview.scroll_to_line(state.scroll_line)
+    
+    def release_memory(self):
+        """Let the preview page drop its copies of rendered markup"""
+        if self.preview is not None:
+            self.preview.release_memory()
+    
+    def block_keys(self) -> Set[int]:
+        """
+        Get the hashes of the blocks on the preview
+        
+        Returns:
+            Block hashes, whose fragments are worth keeping cached
+        """
+        return set(self._model.keys) if self._model is not None else set()
+    
+    def preview_memory_usage(self) -> int:
+        """Get the bytes used by the last rendered model and table of contents"""
+        if self._model is None:
+            return 0
+        return self._model.memory_usage() + len(self._toc_html)
+    
+    def render_process_pid(self) -> int:
+        """Get the web engine process of the preview (0 if none)"""
+        return self.preview.render_process_pid() if self.preview is not None else 0
+    
+    def set_theme(self, theme_css: str):
+        """
+        Apply a theme stylesheet to the preview
+        
+        Args:
+            theme_css: CSS styling
+        """
+        if self.preview is not None:
+            self.preview.set_theme(theme_css)
+    
+    def toggle_preview(self):
+        """Toggle preview pane visibility"""
+        self.preview_visible = not self.preview_visible
+        if self.preview is not None:
+            self.preview.setVisible(self.preview_visible)
+    
+    def zoom(self, step: Optional[float]):
+        """
+        Zoom the preview
+        
+        Args:
+            step: Change of the zoom factor (None resets it)
+        """
+        if self.preview is None:
+            return
+        if step is None:
+            self.preview.zoom_reset()
+        elif step > 0:
+            self.preview.zoom_in()
+        else:
+            self.preview.zoom_out()
+        self._zoom_factor = self.preview.get_zoom_factor()
+    
+    def close_document(self):
+        """Stop background work and drop cached state before the tab closes"""
+        self.preview_timer.stop()
+        self.progressive_timer.stop()
+        self.preview_states.discard(id(self))
+    
+    def _sync_preview_scroll(self):
+        """Scroll the preview to follow the editor"""
+        if self.sync_scroll_enabled and not self._syncing_scroll:
+            self._preview_line = self.editor.top_line()
+            if self.preview is not None:
+                self.preview.scroll_to_line(self._preview_line)
+    
+    def _sync_editor_scroll(self, line: float):
+        """Scroll the editor to follow the preview"""
+        self._preview_line = line
+        if not self.sync_scroll_enabled:
+            return
+        
+        # Don't echo the editor's own scroll back to the preview
+        self._syncing_scroll = True
+        try:
+            self.editor.scroll_to_line(line)
+        finally:
+            self._syncing_scroll = False
+    
+    def set_sync_scroll(self, enabled: bool):
+        """
+        Enable or disable synchronized scrolling
+        
+        Args:
+            enabled: True to keep editor and preview in step
+        """
+        self.sync_scroll_enabled = enabled
+        if enabled:
+            self._sync_preview_scroll()
@@ -2,13 +2,19 @@
 Text editor component with markdown syntax highlighting
 """
 from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit
-from PyQt6.QtCore import Qt, pyqtSignal, QRect, QSize
+from PyQt6.QtCore import Qt, pyqtSignal, QRect, QSize, QPoint, QTimer
 from PyQt6.QtGui import (QColor, QPainter, QTextFormat, QFont, 
                          QSyntaxHighlighter, QTextCharFormat, QPalette)
 import re
 import os
+from core.memory import UndoHistoryMeter
+from core.metrics import FINE_BUCKETS, REGISTRY, timed
 import config
 
+HIGHLIGHT_SECONDS = REGISTRY.histogram('editor_highlight_seconds',
+                                       "Time to highlight one line of the editor",
+                                       buckets=FINE_BUCKETS)
+
 class LineNumberArea(QWidget):
     """Widget for displaying line numbers"""
     
@@ -68,6 +74,7 @@ class MarkdownHighlighter(QSyntaxHighlighter):
         self.comment_format.setForeground(QColor("#6a737d"))
         self.comment_format.setFontItalic(True)
     
+    @timed(HIGHLIGHT_SECONDS)
     def highlightBlock(self, text):
         """Apply syntax highlighting to a block of text"""
         
@@ -116,6 +123,7 @@ class MarkdownEditor(QPlainTextEdit):
     """Enhanced text editor for markdown with line numbers and syntax highlighting"""
     
     textChanged = pyqtSignal()
+    undoHistoryCleared = pyqtSignal(int)  # estimated bytes released
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -134,6 +142,15 @@ class MarkdownEditor(QPlainTextEdit):
         self.updateRequest.connect(self.update_line_number_area)
         
         self.update_line_number_area_width(0)
+        
+        # Undo history, cleared when its estimated size passes the budget
+        self.undo_history = UndoHistoryMeter()
+        self._undo_clear_pending = False
+        document = self.document()
+        document.contentsChange.connect(self._on_contents_change)
+        document.undoCommandAdded.connect(self._on_undo_command_added)
+        document.undoAvailable.connect(self._on_undo_history_changed)
+        document.redoAvailable.connect(self._on_undo_history_changed)
     
     def _setup_editor(self):
         """Configure editor settings"""
@@ -167,6 +184,57 @@ class MarkdownEditor(QPlainTextEdit):
         # Placeholder
         self.setPlaceholderText("Start typing your markdown here...")
     
+    def _on_contents_change(self, position: int, removed: int, added: int):
+        """Account for text an edit, undo or redo removed"""
+        # setPlainText() replaces the text with undo disabled
+        if self.document().isUndoRedoEnabled() and self.undo_history.record_change(removed):
+            self._schedule_undo_clear()
+    
+    def _on_undo_command_added(self):
+        """Account for a new undo step"""
+        if self.undo_history.record_command():
+            self._schedule_undo_clear()
+    
+    def _on_undo_history_changed(self, _available: bool):
+        """Start counting again once Qt dropped the whole history"""
+        document = self.document()
+        if not document.isUndoAvailable() and not document.isRedoAvailable():
+            self.undo_history.reset()
+    
+    def _schedule_undo_clear(self):
+        """Clear the history once the current edit is complete"""
+        if not self._undo_clear_pending:
+            self._undo_clear_pending = True
+            QTimer.singleShot(0, self.clear_undo_history)
+    
+    def clear_undo_history(self) -> int:
+        """
+        Drop the undo and redo history
+        
+        Disabling undo also lets the document compact the buffer that
+        held all removed text.
+        
+        Returns:
+            Estimated bytes released
+        """
+        self._undo_clear_pending = False
+        released = self.undo_history.bytes
+        document = self.document()
+        document.setUndoRedoEnabled(False)
+        document.setUndoRedoEnabled(True)
+        self.undo_history.reset()
+        self.undoHistoryCleared.emit(released)
+        return released
+    
+    def memory_usage(self) -> tuple[int, int]:
+        """
+        Get the estimated memory of the document
+        
+        Returns:
+            Tuple of (text bytes, undo history bytes)
+        """
+        return self.document().characterCount() * 2, self.undo_history.bytes
+    
     def line_number_area_width(self):
         """Calculate the width needed for line numbers"""
         digits = len(str(max(1, self.blockCount())))
@@ -217,6 +285,45 @@ class MarkdownEditor(QPlainTextEdit):
             bottom = top + self.blockBoundingRect(block).height()
             block_number += 1
     
+    def visible_line_range(self) -> tuple[int, int]:
+        """
+        Get the range of lines currently shown in the viewport
+        
+        Returns:
+            Tuple of (first_line, last_line), 0-based and inclusive
+        """
+        first_line = self.firstVisibleBlock().blockNumber()
+        bottom = self.cursorForPosition(QPoint(0, self.viewport().height() - 1))
+        return first_line, max(first_line, bottom.blockNumber())
+    
+    def top_line(self) -> float:
+        """
+        Get the source line at the top of the viewport
+        
+        Returns:
+            0-based line number, with the fraction of the line scrolled past
+        """
+        block = self.firstVisibleBlock()
+        geometry = self.blockBoundingGeometry(block).translated(self.contentOffset())
+        fraction = -geometry.top() / geometry.height() if geometry.height() > 0 else 0.0
+        return block.blockNumber() + min(max(fraction, 0.0), 1.0)
+    
+    def scroll_to_line(self, line: float):
+        """
+        Scroll so that a source line is at the top of the viewport
+        
+        Args:
+            line: 0-based line number, fractional for positions inside it
+        """
+        block = self.document().findBlockByNumber(int(line))
+        if not block.isValid():
+            return
+        
+        # The scroll bar counts layout lines, which differ from source
+        # lines when long lines wrap
+        wrapped = int((line - int(line)) * block.lineCount())
+        self.verticalScrollBar().setValue(block.firstLineNumber() + wrapped)
+    
     def insert_markdown_syntax(self, syntax_type: str):
         """
         Insert markdown syntax at cursor position
@@ -1,32 +1,87 @@
 """
 Main application window
 """
-from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                            QSplitter, QFileDialog, QMessageBox, QStatusBar,
-                            QLabel, QMenuBar, QMenu)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+import gc
+import time
+from pathlib import Path
+from typing import Optional
+from PyQt6.QtWidgets import (QMainWindow, QFileDialog, QMessageBox, QStatusBar,
+                            QLabel, QMenu, QTabWidget, QApplication)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction, QKeySequence
 
-from gui.editor import MarkdownEditor
-from gui.preview import MarkdownPreview
+from gui.document_tab import DocumentTab
+from gui.search_panel import SearchPanel
 from gui.toolbar import MarkdownToolbar
-from core.markdown_processor import MarkdownProcessor
+from gui.memory_dialog import MemoryDialog
+from gui.metrics_panel import MetricsPanel
 from core.file_handler import FileHandler
+from core.processor_pool import ProcessorPool
+from core.preview_state import PreviewStateCache
 from core.themes import ThemeManager
-from core.exporter import Exporter
+from core.exporter import BatchExportResult, Exporter
+from core.markdown_processor import MarkdownProcessor
+from core.merge import has_conflict_markers
+from core.link_index import LinkIndex, link_at
+from core.link_checker import LinkChecker
+from core.workspace_index import scan_folder
+from core.memory import MemoryBudget, child_pids, resident_bytes
+from core.tracing import TRACER
+from utils.file_watcher import FileWatcher
+from utils.helpers import get_file_size_str
 import config
 
+class ExportBatchThread(QThread):
+    """Export the Markdown files of a folder in the background"""
+    
+    progress = pyqtSignal(int, int)
+    exported = pyqtSignal(object)  # BatchExportResult
+    
+    def __init__(self, sources: list, source_root: Path, output_dir: Path,
+                 theme_css: str, parent=None):
+        super().__init__(parent)
+        self.sources = sources
+        self.source_root = source_root
+        self.output_dir = output_dir
+        self.theme_css = theme_css
+    
+    def run(self):
+        """Export and check links with a processor owned by this thread"""
+        try:
+            result = Exporter(MarkdownProcessor()).export_batch(
+                self.sources, self.source_root, self.output_dir, self.theme_css,
+                checker=LinkChecker(), progress=self.progress.emit
+            )
+        except Exception as e:
+            print(f"Warning: Could not export {self.source_root}: {e}")
+            result = BatchExportResult(0, [f"Export failed: {e}"], [], {})
+        self.exported.emit(result)
+
 class MainWindow(QMainWindow):
     """Main application window"""
     
     def __init__(self):
         super().__init__()
+        if config.TRACE_ENABLED:
+            TRACER.start()
         
-        # Initialize components
-        self.file_handler = FileHandler()
-        self.markdown_processor = MarkdownProcessor()
+        # Initialize components shared by all document tabs
+        self.processor_pool = ProcessorPool()
+        self.preview_states = PreviewStateCache()
         self.theme_manager = ThemeManager()
-        self.exporter = Exporter(self.markdown_processor)
+        # Recent files are stored on disk, independent of any open document
+        self.recent_files_handler = FileHandler()
+        self.sync_scroll_enabled = config.SYNC_SCROLL_ENABLED
+        
+        # Changes to open files made by other programs
+        self.file_watcher = FileWatcher(parent=self)
+        self.file_watcher.fileChanged.connect(self._on_file_changed_on_disk)
+        
+        # Headings and links of the workspace, for following links
+        self.link_index = LinkIndex()
+        
+        # Folder export running in the background
+        self._export_thread: Optional[ExportBatchThread] = None
         
         # Setup UI
         self.setWindowTitle(config.APP_NAME)
@@ -34,26 +89,30 @@ class MainWindow(QMainWindow):
         
         # Create UI components (order matters - central widget must be created first)
         self._create_central_widget()
+        self._create_metrics_panel()  # the View menu shows its toggle action
         self._create_menu_bar()
         self._create_toolbar()
         self._create_status_bar()
+        self._create_search_panel()
         
         # Setup auto-save timer
         self.auto_save_timer = QTimer(self)
         self.auto_save_timer.timeout.connect(self._auto_save)
         self.auto_save_timer.start(config.AUTO_SAVE_INTERVAL * 1000)
         
-        # Preview update timer (debounce)
-        self.preview_timer = QTimer(self)
-        self.preview_timer.setSingleShot(True)
-        self.preview_timer.timeout.connect(self._update_preview)
+        # Release web views of tabs left in the background
+        self.eviction_timer = QTimer(self)
+        self.eviction_timer.timeout.connect(self._evict_idle_previews)
+        self.eviction_timer.start(config.TAB_EVICTION_CHECK_MS)
         
-        # Connect signals
-        self._connect_signals()
+        # Release caches when memory use passes the budget
+        self.memory_budget = MemoryBudget()
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self._check_memory)
+        self.memory_timer.start(config.MEMORY_CHECK_MS)
         
         # Initial state
-        self._update_title()
-        self._update_preview()
+        self._new_tab().update_preview()
     
     def _create_menu_bar(self):
         """Create the menu bar"""
@@ -72,21 +131,31 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self._open_file)
         file_menu.addAction(open_action)
         
+        open_folder_action = QAction("Open &Folder...", self)
+        open_folder_action.setShortcut("Ctrl+Shift+O")
+        open_folder_action.triggered.connect(self._open_folder)
+        file_menu.addAction(open_folder_action)
+        
         # Recent files submenu
         self.recent_menu = QMenu("Open &Recent", self)
         self._update_recent_files_menu()
         file_menu.addMenu(self.recent_menu)
         
+        close_tab_action = QAction("&Close Tab", self)
+        close_tab_action.setShortcut(QKeySequence.StandardKey.Close)
+        close_tab_action.triggered.connect(lambda: self._close_tab(self.tabs.currentIndex()))
+        file_menu.addAction(close_tab_action)
+        
         file_menu.addSeparator()
         
         save_action = QAction("&Save", self)
         save_action.setShortcut(QKeySequence.StandardKey.Save)
-        save_action.triggered.connect(self._save_file)
+        save_action.triggered.connect(lambda: self._save_file())
         file_menu.addAction(save_action)
         
         save_as_action = QAction("Save &As...", self)
         save_as_action.setShortcut(QKeySequence.StandardKey.SaveAs)
-        save_as_action.triggered.connect(self._save_file_as)
+        save_as_action.triggered.connect(lambda: self._save_file_as())
         file_menu.addAction(save_as_action)
         
         file_menu.addSeparator()
@@ -104,6 +173,14 @@ class MainWindow(QMainWindow):
         export_pdf_action.triggered.connect(self._export_pdf)
         export_menu.addAction(export_pdf_action)
         
+        export_folder_action = QAction("Export &Folder as HTML...", self)
+        export_folder_action.triggered.connect(self._export_folder)
+        export_menu.addAction(export_folder_action)
+        
+        build_site_action = QAction("Build &Site from Folder...", self)
+        build_site_action.triggered.connect(self._build_site)
+        export_menu.addAction(build_site_action)
+        
         file_menu.addMenu(export_menu)
         
         file_menu.addSeparator()
@@ -118,38 +195,45 @@ class MainWindow(QMainWindow):
         
         undo_action = QAction("&Undo", self)
         undo_action.setShortcut(QKeySequence.StandardKey.Undo)
-        undo_action.triggered.connect(self.editor.undo)
+        undo_action.triggered.connect(lambda: self.current_tab().editor.undo())
         edit_menu.addAction(undo_action)
         
         redo_action = QAction("&Redo", self)
         redo_action.setShortcut(QKeySequence.StandardKey.Redo)
-        redo_action.triggered.connect(self.editor.redo)
+        redo_action.triggered.connect(lambda: self.current_tab().editor.redo())
         edit_menu.addAction(redo_action)
         
         edit_menu.addSeparator()
         
         cut_action = QAction("Cu&t", self)
         cut_action.setShortcut(QKeySequence.StandardKey.Cut)
-        cut_action.triggered.connect(self.editor.cut)
+        cut_action.triggered.connect(lambda: self.current_tab().editor.cut())
         edit_menu.addAction(cut_action)
         
         copy_action = QAction("&Copy", self)
         copy_action.setShortcut(QKeySequence.StandardKey.Copy)
-        copy_action.triggered.connect(self.editor.copy)
+        copy_action.triggered.connect(lambda: self.current_tab().editor.copy())
         edit_menu.addAction(copy_action)
         
         paste_action = QAction("&Paste", self)
         paste_action.setShortcut(QKeySequence.StandardKey.Paste)
-        paste_action.triggered.connect(self.editor.paste)
+        paste_action.triggered.connect(lambda: self.current_tab().editor.paste())
         edit_menu.addAction(paste_action)
         
         edit_menu.addSeparator()
         
         select_all_action = QAction("Select &All", self)
         select_all_action.setShortcut(QKeySequence.StandardKey.SelectAll)
-        select_all_action.triggered.connect(self.editor.selectAll)
+        select_all_action.triggered.connect(lambda: self.current_tab().editor.selectAll())
         edit_menu.addAction(select_all_action)
         
+        edit_menu.addSeparator()
+        
+        definition_action = QAction("Go to &Definition", self)
+        definition_action.setShortcut("F12")
+        definition_action.triggered.connect(self._go_to_definition)
+        edit_menu.addAction(definition_action)
+        
         # View menu
         view_menu = menubar.addMenu("&View")
         
@@ -158,21 +242,37 @@ class MainWindow(QMainWindow):
         toggle_preview_action.triggered.connect(self._toggle_preview)
         view_menu.addAction(toggle_preview_action)
         
+        search_action = QAction("Search &Workspace", self)
+        search_action.setShortcut("Ctrl+Shift+F")
+        search_action.triggered.connect(lambda: self.search_panel.focus_query())
+        view_menu.addAction(search_action)
+        
+        sync_scroll_action = QAction("&Sync Scrolling", self)
+        sync_scroll_action.setCheckable(True)
+        sync_scroll_action.setChecked(config.SYNC_SCROLL_ENABLED)
+        sync_scroll_action.toggled.connect(self._toggle_sync_scroll)
+        view_menu.addAction(sync_scroll_action)
+        
+        metrics_action = self.metrics_panel.toggleViewAction()
+        metrics_action.setText("&Metrics")
+        metrics_action.setShortcut("Ctrl+Shift+M")
+        view_menu.addAction(metrics_action)
+        
         view_menu.addSeparator()
         
         zoom_in_action = QAction("Zoom &In", self)
         zoom_in_action.setShortcut(QKeySequence.StandardKey.ZoomIn)
-        zoom_in_action.triggered.connect(self.preview.zoom_in)
+        zoom_in_action.triggered.connect(lambda: self.current_tab().zoom(0.1))
         view_menu.addAction(zoom_in_action)
         
         zoom_out_action = QAction("Zoom &Out", self)
         zoom_out_action.setShortcut(QKeySequence.StandardKey.ZoomOut)
-        zoom_out_action.triggered.connect(self.preview.zoom_out)
+        zoom_out_action.triggered.connect(lambda: self.current_tab().zoom(-0.1))
         view_menu.addAction(zoom_out_action)
         
         zoom_reset_action = QAction("&Reset Zoom", self)
         zoom_reset_action.setShortcut("Ctrl+0")
-        zoom_reset_action.triggered.connect(self.preview.zoom_reset)
+        zoom_reset_action.triggered.connect(lambda: self.current_tab().zoom(None))
         view_menu.addAction(zoom_reset_action)
         
         view_menu.addSeparator()
@@ -188,6 +288,17 @@ class MainWindow(QMainWindow):
         # Help menu
         help_menu = menubar.addMenu("&Help")
         
+        memory_action = QAction("&Memory Diagnostics...", self)
+        memory_action.triggered.connect(self._show_memory_diagnostics)
+        help_menu.addAction(memory_action)
+        
+        trace_action = QAction("Record &Trace", self)
+        trace_action.setCheckable(True)
+        trace_action.setChecked(TRACER.enabled)
+        trace_action.toggled.connect(self._toggle_tracing)
+        help_menu.addAction(trace_action)
+        self.trace_action = trace_action
+        
         about_action = QAction("&About", self)
         about_action.triggered.connect(self._show_about)
         help_menu.addAction(about_action)
@@ -200,42 +311,28 @@ class MainWindow(QMainWindow):
         # Connect toolbar signals
         self.toolbar.newFileClicked.connect(self._new_file)
         self.toolbar.openFileClicked.connect(self._open_file)
-        self.toolbar.saveFileClicked.connect(self._save_file)
-        self.toolbar.boldClicked.connect(lambda: self.editor.insert_markdown_syntax('bold'))
-        self.toolbar.italicClicked.connect(lambda: self.editor.insert_markdown_syntax('italic'))
-        self.toolbar.codeClicked.connect(lambda: self.editor.insert_markdown_syntax('code'))
-        self.toolbar.linkClicked.connect(lambda: self.editor.insert_markdown_syntax('link'))
-        self.toolbar.heading1Clicked.connect(lambda: self.editor.insert_markdown_syntax('heading1'))
-        self.toolbar.heading2Clicked.connect(lambda: self.editor.insert_markdown_syntax('heading2'))
-        self.toolbar.heading3Clicked.connect(lambda: self.editor.insert_markdown_syntax('heading3'))
+        self.toolbar.saveFileClicked.connect(lambda: self._save_file())
+        self.toolbar.boldClicked.connect(lambda: self._insert_syntax('bold'))
+        self.toolbar.italicClicked.connect(lambda: self._insert_syntax('italic'))
+        self.toolbar.codeClicked.connect(lambda: self._insert_syntax('code'))
+        self.toolbar.linkClicked.connect(lambda: self._insert_syntax('link'))
+        self.toolbar.heading1Clicked.connect(lambda: self._insert_syntax('heading1'))
+        self.toolbar.heading2Clicked.connect(lambda: self._insert_syntax('heading2'))
+        self.toolbar.heading3Clicked.connect(lambda: self._insert_syntax('heading3'))
         self.toolbar.togglePreviewClicked.connect(self._toggle_preview)
     
     def _create_central_widget(self):
-        """Create the central widget with editor and preview"""
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        
-        layout = QVBoxLayout(central_widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Create splitter for editor and preview
-        self.splitter = QSplitter(Qt.Orientation.Horizontal)
-        
-        # Create editor
-        self.editor = MarkdownEditor()
-        self.splitter.addWidget(self.editor)
-        
-        # Create preview
-        self.preview = MarkdownPreview()
-        self.splitter.addWidget(self.preview)
-        
-        # Set initial splitter sizes (50-50)
-        self.splitter.setSizes([
-            int(config.DEFAULT_WINDOW_WIDTH * config.DEFAULT_SPLITTER_RATIO),
-            int(config.DEFAULT_WINDOW_WIDTH * (1 - config.DEFAULT_SPLITTER_RATIO))
-        ])
-        
-        layout.addWidget(self.splitter)
+        """Create the tab widget holding one editor and preview per document"""
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.setDocumentMode(True)
+        self.tabs.tabCloseRequested.connect(self._close_tab)
+        self.tabs.currentChanged.connect(self._on_current_tab_changed)
+        self.setCentralWidget(self.tabs)
+        
+        # Tab shown before the current one, to suspend its preview
+        self._previous_tab: Optional[DocumentTab] = None
     
     def _create_status_bar(self):
         """Create the status bar"""
@@ -248,44 +345,219 @@ class MainWindow(QMainWindow):
         
         self.status_bar.addWidget(self.status_label, 1)
         self.status_bar.addPermanentWidget(self.stats_label)
-        
-        self._update_stats()
     
-    def _connect_signals(self):
-        """Connect signals and slots"""
-        self.editor.textChanged.connect(self._on_text_changed)
+    def _create_search_panel(self):
+        """Create the workspace search dock (hidden until a folder is opened)"""
+        self.search_panel = SearchPanel(self)
+        self.search_panel.fileActivated.connect(self._open_at_line)
+        self.search_panel.indexUpdated.connect(self._load_link_index)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.search_panel)
+        self.search_panel.hide()
+    
+    def _create_metrics_panel(self):
+        """Create the render and I/O metrics dock (hidden until toggled)"""
+        self.metrics_panel = MetricsPanel(parent=self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.metrics_panel)
+        self.metrics_panel.hide()
+    
+    def current_tab(self) -> DocumentTab:
+        """Get the tab of the document being edited"""
+        return self.tabs.currentWidget()
+    
+    def _tabs(self) -> list[DocumentTab]:
+        """Get all document tabs"""
+        return [self.tabs.widget(i) for i in range(self.tabs.count())]
+    
+    def _new_tab(self) -> DocumentTab:
+        """Create an empty document tab and make it current"""
+        tab = DocumentTab(self.processor_pool, self.theme_manager, self.preview_states)
+        tab.set_sync_scroll(self.sync_scroll_enabled)
+        tab.titleChanged.connect(lambda t=tab: self._on_tab_title_changed(t))
+        tab.contentChanged.connect(lambda t=tab: self._on_tab_content_changed(t))
+        tab.editor.undoHistoryCleared.connect(
+            lambda released, t=tab: self._on_undo_history_cleared(t, released))
+        
+        index = self.tabs.addTab(tab, tab.title())
+        self.tabs.setCurrentIndex(index)
+        return tab
     
-    def _on_text_changed(self):
-        """Handle editor text changes"""
-        self.file_handler.set_modified(True)
+    def _find_tab(self, file_path: str) -> Optional[DocumentTab]:
+        """Find the tab that has a file open"""
+        path = Path(file_path).resolve()
+        for tab in self._tabs():
+            current = tab.file_handler.current_file
+            if current is not None and current.resolve() == path:
+                return tab
+        return None
+    
+    def _on_current_tab_changed(self, index: int):
+        """Suspend the previous tab's preview and resume the new one"""
+        tab = self.tabs.widget(index)
+        if self._previous_tab is not None and self._previous_tab is not tab:
+            self._previous_tab.deactivate()
+        self._previous_tab = tab
+        if tab is None:
+            return
+        
+        tab.activate()
         self._update_title()
         self._update_stats()
-        
-        # Debounce preview update
-        self.preview_timer.start(300)  # 300ms delay
+        self._update_recent_files_menu()
+        self._limit_live_previews()
     
-    def _update_preview(self):
-        """Update the preview pane"""
-        markdown_text = self.editor.toPlainText()
-        theme_css = self.theme_manager.get_theme_css()
-        html = self.markdown_processor.convert(markdown_text, theme_css)
+    def _on_tab_title_changed(self, tab: DocumentTab):
+        """Refresh the tab label and window title of a tab"""
+        index = self.tabs.indexOf(tab)
+        if index >= 0:
+            self.tabs.setTabText(index, tab.title())
+            self.tabs.setTabToolTip(index, str(tab.file_handler.current_file or ""))
+        if tab is self.current_tab():
+            self._update_title()
+    
+    def _on_tab_content_changed(self, tab: DocumentTab):
+        """Refresh statistics when the current document is edited"""
+        if tab is self.current_tab():
+            self._update_stats()
+    
+    def _limit_live_previews(self):
+        """Evict the least recently shown background previews beyond the limit"""
+        current = self.current_tab()
+        live = [tab for tab in self._tabs() if tab.has_preview and tab is not current]
+        live.sort(key=lambda tab: tab.last_active, reverse=True)
+        for tab in live[config.TAB_MAX_LIVE_PREVIEWS - 1:]:
+            tab.evict_preview()
+    
+    def _evict_idle_previews(self):
+        """Evict previews of background tabs that have not been shown for a while"""
+        current = self.current_tab()
+        now = time.monotonic()
+        for tab in self._tabs():
+            if (tab is not current and tab.has_preview
+                    and now - tab.last_active > config.TAB_PREVIEW_IDLE_SECONDS):
+                tab.evict_preview()
+    
+    def _on_undo_history_cleared(self, tab: DocumentTab, released: int):
+        """Tell the user that a document's undo history was dropped"""
+        self.status_label.setText(
+            f"Undo history of {tab.file_handler.get_current_file_name()} cleared "
+            f"({get_file_size_str(released)} over its budget)"
+        )
+    
+    def _resident_usage(self) -> tuple[Optional[int], Optional[int]]:
+        """
+        Get the resident memory of the application and its web engine processes
         
-        # Get base URL for relative paths
-        base_url = ""
-        if self.file_handler.current_file:
-            base_url = str(self.file_handler.current_file.parent)
+        Returns:
+            Tuple of (application bytes, web engine bytes), None where unknown
+        """
+        pids = {tab.render_process_pid() for tab in self._tabs()}
+        pids.update(child_pids())
+        pids.discard(0)
+        
+        sizes = [resident_bytes(pid) for pid in pids]
+        known = [size for size in sizes if size is not None]
+        webengine = sum(known) if known or not sizes else None
+        return resident_bytes(), webengine
+    
+    def _check_memory(self):
+        """Release caches when memory use passes the budget"""
+        application, webengine = self._resident_usage()
+        if application is None:
+            return
+        if self.memory_budget.should_release(application + (webengine or 0)):
+            self._release_memory()
+            self.status_label.setText(
+                f"Memory use passed {get_file_size_str(self.memory_budget.max_bytes)}: "
+                f"caches released"
+            )
+    
+    def _release_memory(self):
+        """Drop background web views, preview snapshots and render caches"""
+        current = self.current_tab()
+        for tab in self._tabs():
+            if tab is not current:
+                tab.evict_preview()
+        self.preview_states.clear()
+        
+        # The fragments on screen are needed for the next edit
+        self.processor_pool.release_caches(current.block_keys())
+        current.release_memory()
+        gc.collect()
+    
+    def _memory_report(self) -> list:
+        """Measure memory use by component for the diagnostics dialog"""
+        application, webengine = self._resident_usage()
+        text = undo = models = 0
+        for tab in self._tabs():
+            text_bytes, undo_bytes = tab.editor.memory_usage()
+            text += text_bytes
+            undo += undo_bytes
+            models += tab.preview_memory_usage()
+        
+        return [
+            ("Application (resident)", application),
+            ("Web engine processes (resident)", webengine),
+            ("Editor text", text),
+            ("Undo history (estimated)", undo),
+            ("Rendered documents", models),
+            ("Evicted preview snapshots", self.preview_states.memory_usage()),
+            ("Rendered block cache", self.processor_pool.memory_usage()),
+            ("Diagram cache", self.processor_pool.diagrams.memory_usage()),
+        ]
+    
+    def _show_memory_diagnostics(self):
+        """Show memory use and let the user release caches"""
+        dialog = MemoryDialog(self._memory_report, self._release_memory,
+                              self.memory_budget.max_bytes, self)
+        dialog.exec()
+    
+    def _toggle_tracing(self, enabled: bool):
+        """Start or stop recording a trace of the session"""
+        if not enabled:
+            TRACER.stop()
+            self.status_label.setText(f"Trace saved to {TRACER.path}")
+        elif TRACER.start():
+            self.status_label.setText(f"Recording trace to {TRACER.path}")
+        else:
+            self.trace_action.setChecked(False)
+            QMessageBox.warning(self, "Record Trace", f"Could not write {TRACER.path}")
+    
+    def _close_tab(self, index: int):
+        """Close a document tab, prompting for unsaved changes"""
+        tab = self.tabs.widget(index)
+        if tab is None or not self._check_save_changes(tab):
+            return
         
-        self.preview.set_html(html, base_url)
+        if self._previous_tab is tab:
+            self._previous_tab = None
+        if tab.file_handler.current_file:
+            self.file_watcher.unwatch(str(tab.file_handler.current_file))
+        tab.close_document()
+        self.tabs.removeTab(index)
+        tab.deleteLater()
+        
+        # Always keep one document open
+        if self.tabs.count() == 0:
+            self._new_tab().update_preview()
+    
+    def _insert_syntax(self, syntax_type: str):
+        """Insert markdown syntax into the current editor"""
+        self.current_tab().editor.insert_markdown_syntax(syntax_type)
+    
+    def _toggle_sync_scroll(self, enabled: bool):
+        """Enable or disable synchronized scrolling"""
+        self.sync_scroll_enabled = enabled
+        for tab in self._tabs():
+            tab.set_sync_scroll(enabled)
     
     def _update_title(self):
         """Update window title"""
-        filename = self.file_handler.get_current_file_name()
-        modified = "*" if self.file_handler.is_modified else ""
-        self.setWindowTitle(f"{filename}{modified} - {config.APP_NAME}")
+        self.setWindowTitle(f"{self.current_tab().title()} - {config.APP_NAME}")
     
     def _update_stats(self):
         """Update statistics in status bar"""
-        stats = self.editor.get_statistics()
+        with TRACER.span('edit.stats', 'edit'):
+            stats = self.current_tab().editor.get_statistics()
         self.stats_label.setText(
             f"Lines: {stats['lines']} | "
             f"Words: {stats['words']} | "
@@ -293,19 +565,12 @@ class MainWindow(QMainWindow):
         )
     
     def _new_file(self):
-        """Create a new file"""
-        if self._check_save_changes():
-            self.file_handler.new_file()
-            self.editor.clear()
-            self._update_title()
-            self._update_preview()
-            self.status_label.setText("New file created")
+        """Create a new file in a new tab"""
+        self._new_tab().update_preview()
+        self.status_label.setText("New file created")
     
     def _open_file(self):
         """Open a file"""
-        if not self._check_save_changes():
-            return
-        
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Open Markdown File",
@@ -317,27 +582,105 @@ class MainWindow(QMainWindow):
             self._load_file(file_path)
     
     def _load_file(self, file_path: str):
-        """Load a file from path"""
-        success, content, error = self.file_handler.open_file(file_path)
+        """Load a file from path into its own tab"""
+        tab = self._find_tab(file_path)
+        if tab is not None:
+            self.tabs.setCurrentWidget(tab)
+            return
+        
+        # An untouched untitled tab is reused rather than left behind
+        tab = self.current_tab()
+        reuse = tab is not None and tab.is_pristine()
+        if not reuse:
+            tab = self._new_tab()
+        
+        success, error = tab.load_file(file_path)
         
         if success:
-            self.editor.setPlainText(content)
-            self._update_title()
-            self._update_preview()
+            self.file_watcher.watch(file_path)
             self._update_recent_files_menu()
-            self.status_label.setText(f"Opened: {self.file_handler.get_current_file_name()}")
+            self.status_label.setText(f"Opened: {tab.file_handler.get_current_file_name()}")
         else:
+            if not reuse:
+                self._close_tab(self.tabs.indexOf(tab))
             QMessageBox.critical(self, "Error Opening File", error)
     
-    def _save_file(self):
-        """Save the current file"""
-        if self.file_handler.current_file:
-            self._save_to_file(str(self.file_handler.current_file))
+    def _on_file_changed_on_disk(self, file_path: str):
+        """Bring an external change to an open file into its tab"""
+        tab = self._find_tab(file_path)
+        if tab is None:
+            return
+        
+        message = tab.reload_from_disk()
+        if message:
+            self.status_label.setText(message)
+            self.search_panel.update_file(file_path)
+            self.link_index.update_file(file_path)
+    
+    def _open_folder(self):
+        """Open a workspace folder for searching"""
+        folder = QFileDialog.getExistingDirectory(self, "Open Folder")
+        
+        if folder:
+            self.link_index = LinkIndex(Path(folder))
+            self.search_panel.set_root(folder)
+            self.search_panel.focus_query()
+            self.status_label.setText(f"Workspace: {folder}")
+    
+    def _load_link_index(self):
+        """Rebuild the link index from the updated workspace index"""
+        index = self.search_panel.index
+        if index is None:
+            return
+        try:
+            self.link_index.load(index.outlines())
+        except Exception as e:
+            print(f"Warning: Could not load link index: {e}")
+    
+    def _open_at_line(self, file_path: str, line: int):
+        """Open a file (or switch to its tab) and scroll to a line"""
+        self._load_file(file_path)
+        
+        tab = self._find_tab(file_path)
+        if tab is not None:
+            tab.editor.scroll_to_line(line)
+    
+    def _go_to_definition(self):
+        """Follow the link under the cursor to its file and heading"""
+        tab = self.current_tab()
+        cursor = tab.editor.textCursor()
+        target = link_at(cursor.block().text(), cursor.positionInBlock())
+        if target is None:
+            self.status_label.setText("No link at cursor")
+            return
+        
+        if tab.file_handler.current_file is None:
+            self.status_label.setText("Save the document to follow its links")
+            return
+        
+        # Resolve against the buffer as edited, not as last saved
+        source = str(tab.file_handler.current_file)
+        self.link_index.update_file(source, tab.editor.toPlainText())
+        
+        location = self.link_index.resolve(source, target)
+        if location is None:
+            self.status_label.setText(f"Cannot resolve link: {target}")
+            return
+        if FileHandler.is_markdown_file(str(location.path)):
+            self._open_at_line(str(location.path), location.line)
         else:
-            self._save_file_as()
+            self.status_label.setText(f"Not a Markdown file: {location.path}")
     
-    def _save_file_as(self):
-        """Save file as a new file"""
+    def _save_file(self, tab: Optional[DocumentTab] = None) -> bool:
+        """Save a document (the current one by default)"""
+        tab = tab or self.current_tab()
+        if tab.file_handler.current_file:
+            return self._save_to_file(tab, str(tab.file_handler.current_file))
+        return self._save_file_as(tab)
+    
+    def _save_file_as(self, tab: Optional[DocumentTab] = None) -> bool:
+        """Save a document as a new file"""
+        tab = tab or self.current_tab()
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save Markdown File",
@@ -346,28 +689,42 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            self._save_to_file(file_path)
+            return self._save_to_file(tab, file_path)
+        return False
     
-    def _save_to_file(self, file_path: str):
-        """Save content to file"""
-        content = self.editor.toPlainText()
-        success, error = self.file_handler.save_file(content, file_path)
+    def _save_to_file(self, tab: DocumentTab, file_path: str) -> bool:
+        """Save a document's content to file"""
+        previous_file = tab.file_handler.current_file
+        success, error = tab.save(file_path)
         
         if success:
-            self._update_title()
+            if previous_file is not None and previous_file != tab.file_handler.current_file:
+                self.file_watcher.unwatch(str(previous_file))
+            self.file_watcher.watch(file_path)
             self._update_recent_files_menu()
-            self.status_label.setText(f"Saved: {self.file_handler.get_current_file_name()}")
+            self.search_panel.update_file(file_path)
+            self.link_index.update_file(file_path)
+            self.status_label.setText(f"Saved: {tab.file_handler.get_current_file_name()}")
         else:
             QMessageBox.critical(self, "Error Saving File", error)
+        return success
     
     def _auto_save(self):
-        """Auto-save the current file"""
-        if self.file_handler.is_modified and self.file_handler.current_file:
-            content = self.editor.toPlainText()
-            success, _ = self.file_handler.save_file(content)
-            if success:
-                self._update_title()
-                self.status_label.setText("Auto-saved", 2000)
+        """Auto-save all modified documents that have a file"""
+        saved = False
+        for tab in self._tabs():
+            if tab.file_handler.is_modified and tab.file_handler.current_file:
+                # Never overwrite changes made on disk since the last load
+                # or save; merge them in first, and leave conflicts unsaved
+                message = tab.reload_from_disk()
+                if message:
+                    self.status_label.setText(message)
+                if not tab.file_handler.is_modified or has_conflict_markers(tab.editor.toPlainText()):
+                    continue
+                success, _ = tab.save()
+                saved = saved or success
+        if saved:
+            self.status_bar.showMessage("Auto-saved", 2000)
     
     def _export_html(self):
         """Export as HTML"""
@@ -379,9 +736,16 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            markdown_content = self.editor.toPlainText()
+            tab = self.current_tab()
+            markdown_content = tab.editor.toPlainText()
             theme_css = self.theme_manager.get_theme_css()
-            success, error = self.exporter.export_html(markdown_content, file_path, theme_css)
+            # Images of saved documents are embedded or copied with the export
+            current_file = tab.file_handler.current_file
+            source_dir = current_file.parent if current_file else None
+            with self.processor_pool.acquire() as processor:
+                success, error = Exporter(processor).export_html(
+                    markdown_content, file_path, theme_css, source_dir=source_dir
+                )
             
             if success:
                 QMessageBox.information(self, "Export Successful", 
@@ -389,6 +753,83 @@ class MainWindow(QMainWindow):
             else:
                 QMessageBox.critical(self, "Export Failed", error)
     
+    def _export_folder(self):
+        """Export every Markdown file of a folder as HTML and report broken links"""
+        if self._export_thread is not None and self._export_thread.isRunning():
+            self.status_label.setText("A folder export is still running")
+            return
+        
+        start = str(self.search_panel.index.root) if self.search_panel.index else ""
+        source_root = QFileDialog.getExistingDirectory(self, "Folder to Export", start)
+        if not source_root:
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "Export To")
+        if not output_dir:
+            return
+        
+        source_root = Path(source_root)
+        sources = [source_root / relative for relative in sorted(scan_folder(source_root))]
+        theme_css = self.theme_manager.get_theme_css()
+        
+        # Exporting and checking remote links can take long; the window stays usable
+        self.status_label.setText(f"Exporting 0/{len(sources)}")
+        self._export_thread = ExportBatchThread(sources, source_root, Path(output_dir),
+                                                theme_css, self)
+        self._export_thread.progress.connect(
+            lambda done, total: self.status_label.setText(f"Exporting {done}/{total}")
+        )
+        self._export_thread.exported.connect(self._on_folder_exported)
+        self._export_thread.start()
+    
+    def _on_folder_exported(self, result: BatchExportResult):
+        """Report the outcome of a folder export"""
+        thread = self._export_thread
+        source_root, output_dir = thread.source_root, thread.output_dir
+        summary = f"{result.exported} of {len(thread.sources)} files exported to:\n{output_dir}"
+        if result.problems:
+            summary += f"\n\n{len(result.problems)} broken links or images found."
+        message = QMessageBox(QMessageBox.Icon.Information, "Export Finished", summary,
+                              QMessageBox.StandardButton.Ok, self)
+        details = result.errors + [
+            f"{problem.source.relative_to(source_root).as_posix()}: {problem.kind} "
+            f"{problem.target} ({problem.reason})"
+            for problem in result.problems
+        ]
+        if details:
+            message.setDetailedText("\n".join(details))
+        message.exec()
+        self.status_label.setText(f"Exported {result.exported} files")
+    
+    def _build_site(self):
+        """Render a folder into a linked HTML site, updating an earlier build"""
+        start = str(self.search_panel.index.root) if self.search_panel.index else ""
+        source_root = QFileDialog.getExistingDirectory(self, "Folder to Publish", start)
+        if not source_root:
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "Build Site In")
+        if not output_dir:
+            return
+        
+        theme_css = self.theme_manager.get_theme_css()
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            with self.processor_pool.acquire() as processor:
+                result = Exporter(processor).export_site(
+                    Path(source_root), Path(output_dir), theme_css,
+                    progress=lambda done, total: self.status_label.setText(f"Building {done}/{total}")
+                )
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        summary = (f"{len(result.built)} pages rebuilt, {result.unchanged} unchanged, "
+                   f"{len(result.removed)} removed in:\n{output_dir}")
+        message = QMessageBox(QMessageBox.Icon.Information, "Site Built", summary,
+                              QMessageBox.StandardButton.Ok, self)
+        if result.errors:
+            message.setDetailedText("\n".join(result.errors))
+        message.exec()
+        self.status_label.setText(f"Built {len(result.built)} pages")
+    
     def _export_pdf(self):
         """Export as PDF"""
         file_path, _ = QFileDialog.getSaveFileName(
@@ -399,9 +840,10 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            markdown_content = self.editor.toPlainText()
+            markdown_content = self.current_tab().editor.toPlainText()
             theme_css = self.theme_manager.get_theme_css()
-            success, error = self.exporter.export_pdf(markdown_content, file_path, theme_css)
+            with self.processor_pool.acquire() as processor:
+                success, error = Exporter(processor).export_pdf(markdown_content, file_path, theme_css)
             
             if success:
                 QMessageBox.information(self, "Export Successful", 
@@ -420,22 +862,21 @@ class MainWindow(QMainWindow):
     
     def _toggle_preview(self):
         """Toggle preview pane visibility"""
-        if self.preview.isVisible():
-            self.preview.hide()
-        else:
-            self.preview.show()
+        self.current_tab().toggle_preview()
     
     def _change_theme(self, theme_name: str):
         """Change preview theme"""
         self.theme_manager.set_theme(theme_name)
-        self._update_preview()
+        theme_css = self.theme_manager.get_theme_css()
+        for tab in self._tabs():
+            tab.set_theme(theme_css)
         self.status_label.setText(f"Theme changed to: {theme_name}")
     
     def _update_recent_files_menu(self):
         """Update recent files menu"""
         self.recent_menu.clear()
         
-        recent_files = self.file_handler.get_recent_files()
+        recent_files = self.recent_files_handler.get_recent_files()
         
         if recent_files:
             for file_path in recent_files:
@@ -455,31 +896,34 @@ class MainWindow(QMainWindow):
     
     def _clear_recent_files(self):
         """Clear recent files list"""
-        self.file_handler.clear_recent_files()
+        self.recent_files_handler.clear_recent_files()
         self._update_recent_files_menu()
     
-    def _check_save_changes(self) -> bool:
+    def _check_save_changes(self, tab: DocumentTab) -> bool:
         """
-        Check if there are unsaved changes and prompt user
+        Check if a document has unsaved changes and prompt user
+        
+        Args:
+            tab: Tab of the document
         
         Returns:
             True if it's safe to continue, False if user cancelled
         """
-        if not self.file_handler.is_modified:
+        if not tab.file_handler.is_modified:
             return True
         
+        self.tabs.setCurrentWidget(tab)
         reply = QMessageBox.question(
             self,
             "Unsaved Changes",
-            "Do you want to save your changes?",
+            f"Do you want to save your changes to {tab.file_handler.get_current_file_name()}?",
             QMessageBox.StandardButton.Save | 
             QMessageBox.StandardButton.Discard | 
             QMessageBox.StandardButton.Cancel
         )
         
         if reply == QMessageBox.StandardButton.Save:
-            self._save_file()
-            return True
+            return self._save_file(tab)
         elif reply == QMessageBox.StandardButton.Discard:
             return True
         else:
@@ -505,7 +949,11 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close event"""
-        if self._check_save_changes():
+        if all(self._check_save_changes(tab) for tab in self._tabs()):
+            if self._export_thread is not None and self._export_thread.isRunning():
+                self._export_thread.wait()
+            self.search_panel.close_index()
+            TRACER.stop()
             event.accept()
         else:
             event.ignore()
@@ -0,0 +1,74 @@
+"""
+Dialog showing where the application's memory goes
+"""
+from typing import Callable, List, Optional, Tuple
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                            QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt
+
+from utils.helpers import get_file_size_str
+
+# (component, bytes or None if unknown)
+MemoryReport = List[Tuple[str, Optional[int]]]
+
+class MemoryDialog(QDialog):
+    """Resident usage of the application, its caches and web engine processes"""
+    
+    def __init__(self, report: Callable[[], MemoryReport], release: Callable[[], None],
+                 budget: int, parent=None):
+        """
+        Initialize the dialog
+        
+        Args:
+            report: Measures the current usage
+            release: Releases caches
+            budget: Memory budget in bytes, shown for comparison
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Memory Diagnostics")
+        self.resize(460, 380)
+        self.report = report
+        self.release = release
+        
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Component", "Size"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+        
+        layout.addWidget(QLabel(
+            f"Caches are released when the application and web engine use more "
+            f"than {get_file_size_str(budget)}."
+        ))
+        
+        buttons = QHBoxLayout()
+        release_button = QPushButton("&Release Memory")
+        release_button.clicked.connect(self._release)
+        refresh_button = QPushButton("Re&fresh")
+        refresh_button.clicked.connect(self.refresh)
+        close_button = QPushButton("&Close")
+        close_button.clicked.connect(self.accept)
+        buttons.addWidget(release_button)
+        buttons.addStretch()
+        buttons.addWidget(refresh_button)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+        
+        self.refresh()
+    
+    def refresh(self):
+        """Measure again and fill the table"""
+        rows = self.report()
+        self.table.setRowCount(len(rows))
+        for row, (name, size) in enumerate(rows):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            item = QTableWidgetItem(get_file_size_str(size) if size is not None else "n/a")
+            item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, 1, item)
+    
+    def _release(self):
+        """Release caches and show the result"""
+        self.release()
+        self.refresh()
@@ -0,0 +1,109 @@
+"""
+Metrics panel showing the render and I/O timings of the session
+"""
+from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                            QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog,
+                            QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+
+from core.metrics import REGISTRY, MetricsRegistry
+import config
+
+COLUMNS = ["Metric", "Labels", "Count", "Mean", "p50", "p95", "Max"]
+
+def format_value(name: str, value) -> str:
+    """Format a statistic, in milliseconds for metrics measured in seconds"""
+    if value is None:
+        return ""
+    if name.endswith('_seconds'):
+        return f"{value * 1000:.2f} ms"
+    return f"{value:g}"
+
+class MetricsPanel(QDockWidget):
+    """Dock listing every metric, refreshed while it is shown"""
+    
+    def __init__(self, registry: MetricsRegistry = REGISTRY, parent=None):
+        """
+        Initialize the panel
+        
+        Args:
+            registry: Metrics to show
+        """
+        super().__init__("Metrics", parent)
+        self.setObjectName("MetricsPanel")
+        self.registry = registry
+        
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(4, 4, 4, 4)
+        
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+        
+        buttons = QHBoxLayout()
+        json_button = QPushButton("Export &JSON...")
+        json_button.clicked.connect(lambda: self._export("JSON", "JSON Files (*.json)",
+                                                         self.registry.to_json))
+        prometheus_button = QPushButton("Export &Prometheus...")
+        prometheus_button.clicked.connect(lambda: self._export("Prometheus", "Text Files (*.prom *.txt)",
+                                                               self.registry.to_prometheus))
+        reset_button = QPushButton("&Reset")
+        reset_button.clicked.connect(self._reset)
+        buttons.addWidget(json_button)
+        buttons.addWidget(prometheus_button)
+        buttons.addStretch()
+        buttons.addWidget(reset_button)
+        layout.addLayout(buttons)
+        
+        self.setWidget(container)
+        
+        # Only poll the registry while someone is looking
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(config.METRICS_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility_changed)
+    
+    def refresh(self):
+        """Fill the table from the registry"""
+        rows = self.registry.rows()
+        self.table.setRowCount(len(rows))
+        for row, metric in enumerate(rows):
+            values = [metric.name, metric.labels, metric.count, metric.mean,
+                      metric.p50, metric.p95, metric.max]
+            for column, value in enumerate(values):
+                if column < 2:
+                    item = QTableWidgetItem(value)
+                else:
+                    # Counts are plain numbers whatever the metric measures
+                    name = metric.name if column > 2 else ""
+                    item = QTableWidgetItem(format_value(name, value))
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+    
+    def _on_visibility_changed(self, visible: bool):
+        if visible:
+            self.refresh()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+    
+    def _reset(self):
+        """Forget everything recorded so far"""
+        self.registry.reset()
+        self.refresh()
+    
+    def _export(self, title: str, file_filter: str, render):
+        """Write the metrics to a file chosen by the user"""
+        file_path, _ = QFileDialog.getSaveFileName(self, f"Export Metrics as {title}", "",
+                                                   file_filter)
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(render())
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write {file_path}: {e}")
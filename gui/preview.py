@@ -1,15 +1,73 @@
 """
 Preview pane component for rendering HTML
 """
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
+import json
+from typing import Callable, Optional
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QApplication
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineSettings
-from PyQt6.QtCore import QUrl, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineSettings, QWebEngineProfile, QWebEnginePage
+from PyQt6.QtWebChannel import QWebChannel
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal, pyqtSlot
+from core.metrics import REGISTRY
+from core.tracing import TRACER, now
+import config
+
+PREVIEW_PAGE_SECONDS = REGISTRY.histogram(
+    'preview_page_seconds', "Time the preview page spends applying blocks, before layout",
+    ('function',))
+
+_shared_profile: Optional[QWebEngineProfile] = None
+
+def shared_profile() -> QWebEngineProfile:
+    """
+    Get the WebEngine profile shared by all previews
+    
+    The profile keeps a disk HTTP cache under the config directory, so
+    libraries loaded from the CDN fallback survive restarts.
+    """
+    global _shared_profile
+    if _shared_profile is None:
+        _shared_profile = QWebEngineProfile(config.APP_NAME, QApplication.instance())
+        _shared_profile.setCachePath(str(config.WEB_CACHE_DIR / "cache"))
+        _shared_profile.setPersistentStoragePath(str(config.WEB_CACHE_DIR / "storage"))
+        _shared_profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    return _shared_profile
+
+class PreviewBridge(QObject):
+    """Object exposed to the preview page through QWebChannel"""
+    
+    scrolledToLine = pyqtSignal(float)
+    diagramReady = pyqtSignal(str, str)
+    paintReached = pyqtSignal(int)
+    codeRequested = pyqtSignal(str, int)
+    
+    @pyqtSlot(float)
+    def previewScrolled(self, line: float):
+        """Called by the page when the user scrolls the preview"""
+        self.scrolledToLine.emit(line)
+    
+    @pyqtSlot(str, str)
+    def diagramRendered(self, key: str, svg: str):
+        """Called by the page after Mermaid laid out a new diagram"""
+        self.diagramReady.emit(key, svg)
+    
+    @pyqtSlot(int)
+    def painted(self, token: int):
+        """Called by the page once an update asked for by mdr.notifyPaint is on screen"""
+        self.paintReached.emit(token)
+    
+    @pyqtSlot(str, int)
+    def highlightCode(self, key: str, first: int):
+        """Called by the page when a plain chunk of a large code block nears the view"""
+        self.codeRequested.emit(key, first)
 
 class MarkdownPreview(QWidget):
     """Preview pane for rendering markdown as HTML"""
     
     linkClicked = pyqtSignal(str)
+    scrolledToLine = pyqtSignal(float)
+    diagramRendered = pyqtSignal(str, str)
+    codeRequested = pyqtSignal(str, int)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -20,8 +78,28 @@ class MarkdownPreview(QWidget):
         
         # Create web view
         self.web_view = QWebEngineView()
+        self.web_view.setPage(QWebEnginePage(shared_profile(), self.web_view))
         layout.addWidget(self.web_view)
         
+        # Persistent preview page state
+        self.page_base_url: Optional[str] = None
+        self._page_ready = False
+        self._pending_scripts: list[tuple[str, Optional[Callable]]] = []
+        self.web_view.loadFinished.connect(self._on_load_finished)
+        # Traced updates waiting for their paint: token -> (function, dispatch time)
+        self._paint_tokens: dict[int, tuple[str, float]] = {}
+        self._next_paint_token = 0
+        
+        # Page -> application channel
+        self.bridge = PreviewBridge(self)
+        self.bridge.scrolledToLine.connect(self.scrolledToLine)
+        self.bridge.diagramReady.connect(self.diagramRendered)
+        self.bridge.paintReached.connect(self._on_painted)
+        self.bridge.codeRequested.connect(self.codeRequested)
+        self.channel = QWebChannel(self)
+        self.channel.registerObject("bridge", self.bridge)
+        self.web_view.page().setWebChannel(self.channel)
+        
         # Configure web view settings
         self._setup_web_view()
         
@@ -42,14 +120,196 @@ class MarkdownPreview(QWidget):
         settings.setFontFamily(QWebEngineSettings.FontFamily.StandardFont, "Arial")
         settings.setFontSize(QWebEngineSettings.FontSize.DefaultFontSize, 16)
     
+    def load_page(self, page_html: str, base_url: str = ""):
+        """
+        Load the persistent preview page
+        
+        Content is then updated in place with render_blocks() and
+        fill_blocks() instead of reloading the whole document.
+        
+        Args:
+            page_html: Preview page from MarkdownProcessor.build_preview_page
+            base_url: Base URL for resolving relative links
+        """
+        self._page_ready = False
+        self._pending_scripts.clear()
+        self._paint_tokens.clear()
+        self.page_base_url = base_url
+        
+        # Untitled documents still need a file: origin to load the
+        # bundled libraries
+        base_dir = base_url or str(config.RESOURCES_DIR)
+        self.web_view.setHtml(page_html, QUrl.fromLocalFile(base_dir + "/"))
+    
+    def render_blocks(self, blocks: list, toc_html: str = "", anchor: Optional[int] = None,
+                      virtual: bool = False):
+        """
+        Replace the content of the preview page
+        
+        Args:
+            blocks: List of [key, start_line, end_line, html] per block; html is
+                None for blocks that will arrive later via fill_blocks()
+            toc_html: Table of contents HTML
+            anchor: Index of a block to scroll into view
+            virtual: Keep only the blocks near the view in the page's DOM
+                (for very long documents)
+        """
+        self._run_script("mdr.render", blocks, toc_html, anchor, virtual,
+                         callback=self._page_timer('render'))
+        self._trace_paint('render')
+    
+    def fill_blocks(self, items: list):
+        """
+        Fill in blocks left pending by the last render_blocks() call
+        
+        Args:
+            items: List of [index, html] pairs
+        """
+        self._run_script("mdr.fill", items, callback=self._page_timer('fill'))
+        self._trace_paint('fill')
+    
+    def scroll_to_line(self, line: float):
+        """
+        Scroll the preview so a source line is at the top
+        
+        Args:
+            line: 0-based source line, fractional for positions inside it
+        """
+        self._run_script("mdr.scrollToLine", line)
+    
+    def fill_code(self, key: str, first: int, lines_html: str):
+        """
+        Replace a plain chunk of a large code block with its highlighting
+        
+        Args:
+            key: Key of the block holding the code
+            first: Index of the chunk's first line
+            lines_html: Highlighted lines of the chunk
+        """
+        self._run_script("mdr.fillCode", key, first, lines_html)
+    
+    def seed_diagrams(self, diagrams: dict):
+        """
+        Give the page diagrams rendered before it was loaded
+        
+        Args:
+            diagrams: Dictionary of diagram key to SVG
+        """
+        if diagrams:
+            self._run_script("mdr.seedDiagrams", diagrams)
+    
+    def set_theme(self, theme_css: str):
+        """
+        Swap the theme stylesheet of the preview page
+        
+        Args:
+            theme_css: CSS styling
+        """
+        self._run_script("mdr.setTheme", theme_css)
+    
+    def set_active(self, active: bool):
+        """
+        Freeze or resume the page when its document tab is hidden or shown
+        
+        A frozen page keeps its DOM but runs no scripts or timers.
+        
+        Args:
+            active: True when the preview is shown
+        """
+        page = self.web_view.page()
+        if active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        elif page.lifecycleState() == QWebEnginePage.LifecycleState.Active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+    
+    def release_memory(self):
+        """Drop the page's copies of block markup and of diagrams not shown"""
+        self._run_script("mdr.releaseMemory")
+    
+    def render_process_pid(self) -> int:
+        """
+        Get the web engine process rendering the page
+        
+        Returns:
+            Process ID, or 0 if the page has no render process yet
+        """
+        return self.web_view.page().renderProcessPid()
+    
+    def _run_script(self, function: str, *args, callback: Optional[Callable] = None):
+        """
+        Call a preview runtime function, queueing it until the page is loaded
+        
+        Args:
+            function: Name of the function
+            *args: JSON-serializable arguments
+            callback: Called with the function's result
+        """
+        script = f"{function}({', '.join(json.dumps(arg) for arg in args)});"
+        if not self._page_ready:
+            self._pending_scripts.append((script, callback))
+        elif callback is not None:
+            self.web_view.page().runJavaScript(script, callback)
+        else:
+            self.web_view.page().runJavaScript(script)
+    
+    @staticmethod
+    def _page_timer(function: str) -> Callable:
+        """Get a callback recording the milliseconds a page function reports"""
+        dispatched = now()
+        def record(elapsed):
+            if isinstance(elapsed, (int, float)):
+                PREVIEW_PAGE_SECONDS.observe(elapsed / 1000, function=function)
+                TRACER.complete(f'page.{function}', dispatched, now(), 'page', track="Preview page",
+                                script_ms=round(elapsed, 3))
+        return record
+    
+    def _trace_paint(self, function: str):
+        """Ask the page to report when the update just sent is painted"""
+        if not TRACER.enabled:
+            return
+        if len(self._paint_tokens) >= 64:
+            self._paint_tokens.clear()  # a hidden page does not paint
+        self._next_paint_token += 1
+        self._paint_tokens[self._next_paint_token] = (function, now())
+        self._run_script("mdr.notifyPaint", self._next_paint_token)
+    
+    def _on_painted(self, token: int):
+        """Record the span from sending an update to seeing it painted"""
+        entry = self._paint_tokens.pop(token, None)
+        if entry is not None:
+            function, dispatched = entry
+            TRACER.complete(f'page.{function}_to_paint', dispatched, now(), 'page',
+                            track="Preview page")
+    
+    def _on_load_finished(self, ok: bool):
+        """Flush calls queued while the preview page was loading"""
+        if self.page_base_url is None or not ok:
+            return
+        
+        self._page_ready = True
+        scripts, self._pending_scripts = self._pending_scripts, []
+        for script, callback in scripts:
+            if callback is not None:
+                self.web_view.page().runJavaScript(script, callback)
+            else:
+                self.web_view.page().runJavaScript(script)
+    
     def set_html(self, html_content: str, base_url: str = ""):
         """
         Set HTML content to display
         
+        This replaces the persistent preview page, so load_page() must be
+        called again before rendering blocks.
+        
         Args:
             html_content: HTML content to render
             base_url: Base URL for resolving relative links
         """
+        self.page_base_url = None
+        self._page_ready = False
+        self._pending_scripts.clear()
+        self._paint_tokens.clear()
+        
         if not html_content:
             # Show empty state
             html_content = """
@@ -0,0 +1,153 @@
+"""
+Workspace search panel backed by the on-disk full-text index
+"""
+from pathlib import Path
+from typing import Optional
+from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QLineEdit,
+                            QListWidget, QListWidgetItem, QLabel)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+from core.workspace_index import WorkspaceIndex
+
+class IndexUpdateThread(QThread):
+    """Bring a workspace index up to date in the background"""
+    
+    progress = pyqtSignal(int, int)
+    updated = pyqtSignal(int, int)
+    
+    def __init__(self, root: Path, parent=None):
+        super().__init__(parent)
+        self.root = root
+    
+    def run(self):
+        """Update the index through a connection owned by this thread"""
+        index = WorkspaceIndex(self.root)
+        try:
+            indexed, removed = index.update(self.progress.emit)
+        except Exception as e:
+            print(f"Warning: Could not index {self.root}: {e}")
+            indexed, removed = 0, 0
+        finally:
+            index.close()
+        self.updated.emit(indexed, removed)
+
+class SearchPanel(QDockWidget):
+    """Dock for searching all Markdown files of a workspace folder"""
+    
+    fileActivated = pyqtSignal(str, int)
+    indexUpdated = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__("Search", parent)
+        self.setObjectName("SearchPanel")
+        
+        self.index: Optional[WorkspaceIndex] = None
+        self._update_thread: Optional[IndexUpdateThread] = None
+        
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(4, 4, 4, 4)
+        
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Search workspace")
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.textChanged.connect(self._run_search)
+        layout.addWidget(self.query_edit)
+        
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self._on_item_activated)
+        layout.addWidget(self.results_list)
+        
+        self.status_label = QLabel("Open a folder to search it")
+        layout.addWidget(self.status_label)
+        
+        self.setWidget(container)
+    
+    def set_root(self, root: str):
+        """
+        Search a new workspace folder, indexing changed files in the background
+        
+        Args:
+            root: Workspace folder
+        """
+        if self.index is not None:
+            self.index.close()
+        self.index = WorkspaceIndex(Path(root))
+        self.refresh()
+        self._run_search()
+    
+    def refresh(self):
+        """Re-index files changed since the last update"""
+        if self.index is None or (self._update_thread and self._update_thread.isRunning()):
+            return
+        
+        self.status_label.setText(f"Indexing {self.index.root.name}...")
+        self._update_thread = IndexUpdateThread(self.index.root, self)
+        self._update_thread.progress.connect(self._on_progress)
+        self._update_thread.updated.connect(self._on_updated)
+        self._update_thread.finished.connect(self._on_thread_finished)
+        self._update_thread.start()
+    
+    def update_file(self, file_path: str):
+        """
+        Re-index a file after it was saved
+        
+        Args:
+            file_path: Path of the saved file
+        """
+        if self.index is not None and self.index.update_file(file_path):
+            self._run_search()
+    
+    def focus_query(self):
+        """Show the panel and focus the search field"""
+        self.show()
+        self.raise_()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+    
+    def _on_progress(self, done: int, total: int):
+        """Show indexing progress"""
+        if self.index is not None:
+            self.status_label.setText(f"Indexing {self.index.root.name}: {done}/{total}")
+    
+    def _on_updated(self, indexed: int, removed: int):
+        """Refresh results once the background update finished"""
+        if self.index is None or self._update_thread.root != self.index.root:
+            return
+        
+        self.status_label.setText(f"{self.index.document_count()} documents indexed")
+        if indexed or removed:
+            self._run_search()
+        self.indexUpdated.emit()
+    
+    def _on_thread_finished(self):
+        """Index a folder opened while the previous one was being indexed"""
+        if self.index is not None and self._update_thread.root != self.index.root:
+            self.refresh()
+    
+    def _run_search(self):
+        """Show the results for the current query"""
+        self.results_list.clear()
+        query = self.query_edit.text()
+        if self.index is None or not query.strip():
+            return
+        
+        for result in self.index.search(query):
+            relative = result.path.relative_to(self.index.root).as_posix()
+            item = QListWidgetItem(f"{result.title}  ({relative}:{result.line + 1})\n{result.snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, (str(result.path), result.line))
+            item.setToolTip(str(result.path))
+            self.results_list.addItem(item)
+    
+    def _on_item_activated(self, item: QListWidgetItem):
+        """Open the file of a result at the matching line"""
+        path, line = item.data(Qt.ItemDataRole.UserRole)
+        self.fileActivated.emit(path, line)
+    
+    def close_index(self):
+        """Wait for background indexing and close the index"""
+        if self._update_thread is not None:
+            self._update_thread.wait()
+        if self.index is not None:
+            self.index.close()
+            self.index = None
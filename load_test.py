@@ -0,0 +1,162 @@
+"""
+Load test for the render server
+
+Sends render requests over keep-alive connections and reports throughput
+and latency percentiles.
+
+    python load_test.py [--spawn] [--port 8765] [--connections 16]
+                        [--requests 2000] [--distinct 50] [--batch 0]
+
+--spawn starts server.py on the port for the duration of the test;
+otherwise a server must already be listening on localhost. --distinct
+sets how many different documents are sent (fewer means more cache hits);
+--batch N sends N documents per /batch request instead of /render.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+import config
+
+HOST = "127.0.0.1"
+
+def make_document(number: int) -> str:
+    """Build a test document with headings, lists, code and a table"""
+    parts = [f"# Document {number}"]
+    for section in range(8):
+        parts.append(f"## Section {section}\n\nSome *text* with **bold**, `code` and a "
+                     f"[link](https://example.com/{number}/{section}).")
+        parts.append("\n".join(f"- item {i} of document {number}" for i in range(5)))
+        parts.append(f"```python\ndef f{section}(x):\n    return x * {number}\n```")
+        parts.append("| a | b |\n|---|---|\n" + "\n".join(f"| {i} | {i * number} |" for i in range(4)))
+    return "\n\n".join(parts)
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                  method: str, path: str, body: bytes = b'') -> tuple[int, bytes]:
+    """Send one request on a kept-alive connection and read the response"""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {HOST}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1')
+        + body
+    )
+    await writer.drain()
+    
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def run_connection(port: int, bodies: list, path: str, latencies: list, statuses: Counter):
+    """Send a share of the requests over one connection"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, 'POST', path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if status == 503:
+                await asyncio.sleep(0.05)
+    finally:
+        writer.close()
+
+async def load_test(port: int, connections: int, requests: int, distinct: int, batch: int) -> dict:
+    """Run the test and collect latencies, statuses and server counters"""
+    documents = [make_document(number) for number in range(distinct)]
+    if batch:
+        path = '/batch'
+        bodies = [json.dumps({'requests': [
+            {'op': 'render', 'markdown': documents[(i * batch + j) % distinct]} for j in range(batch)
+        ]}).encode('utf-8') for i in range(requests)]
+    else:
+        path = '/render'
+        bodies = [json.dumps({'markdown': documents[i % distinct]}).encode('utf-8')
+                  for i in range(requests)]
+    
+    latencies: list = []
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(port, bodies[i::connections], path, latencies, statuses)
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    
+    reader, writer = await asyncio.open_connection(HOST, port)
+    _, health = await request(reader, writer, 'GET', '/health')
+    writer.close()
+    return {'elapsed': elapsed, 'latencies': sorted(latencies), 'statuses': statuses,
+            'health': json.loads(health)}
+
+def wait_for_server(port: int, timeout: float = 30) -> bool:
+    """Wait until a server answers on the port"""
+    async def probe():
+        reader, writer = await asyncio.open_connection(HOST, port)
+        status, _ = await request(reader, writer, 'GET', '/health')
+        writer.close()
+        return status == 200
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if asyncio.run(probe()):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def main():
+    """Parse the command line, run the test and print a report"""
+    parser = argparse.ArgumentParser(description="Load test for the render server")
+    parser.add_argument('--port', type=int, default=config.RENDER_SERVER_PORT)
+    parser.add_argument('--spawn', action='store_true', help="start server.py for the test")
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--distinct', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=0)
+    args = parser.parse_args()
+    
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, str(Path(__file__).parent / "server.py"),
+                                   '--port', str(args.port)])
+    try:
+        if not wait_for_server(args.port):
+            print(f"No render server on {HOST}:{args.port}")
+            return 1
+        
+        result = asyncio.run(load_test(args.port, args.connections, args.requests,
+                                       args.distinct, args.batch))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    
+    latencies = result['latencies']
+    documents = args.requests * (args.batch or 1)
+    
+    def percentile(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+    
+    print(f"{args.requests} requests ({documents} documents) over {args.connections} "
+          f"connections in {result['elapsed']:.2f}s")
+    print(f"  {args.requests / result['elapsed']:.0f} requests/s, "
+          f"{documents / result['elapsed']:.0f} documents/s")
+    print(f"  latency ms: p50 {percentile(0.5):.1f}  p95 {percentile(0.95):.1f}  "
+          f"p99 {percentile(0.99):.1f}  max {latencies[-1] * 1000:.1f}")
+    print(f"  statuses: {dict(result['statuses'])}")
+    print(f"  server: {result['health']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+@echo off
+rem MDRender command line launcher: "mdrender render notes.md"
+rem Put this folder on PATH to use it from editors and git hooks.
+setlocal
+set "MDRENDER_PYTHON=%~dp0.venv\Scripts\python.exe"
+if not exist "%MDRENDER_PYTHON%" set "MDRENDER_PYTHON=python"
+"%MDRENDER_PYTHON%" "%~dp0cli.py" %*
+exit /b %ERRORLEVEL%
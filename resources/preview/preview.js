@@ -0,0 +1,760 @@
+/*
+ * Preview page runtime
+ *
+ * The preview page is loaded once; the application pushes rendered
+ * Markdown blocks into it with mdr.render() and, for long documents,
+ * streams the remaining blocks in afterwards with mdr.fill().
+ *
+ * Blocks are keyed by a hash of their source. render() keeps the
+ * elements of blocks whose key and markup did not change, so their
+ * images, diagrams and math are not decoded or laid out again. Each
+ * block keeps a copy of its markup for that comparison; under memory
+ * pressure mdr.releaseMemory() replaces the copies with hashes.
+ *
+ * Every block carries its source line range (data-source-line and
+ * data-end-line). After each layout change the page rebuilds a sorted
+ * line -> offset index in typed arrays, so scroll synchronisation is a
+ * binary search per scroll event and never touches the DOM.
+ *
+ * Very long documents are rendered virtually: only blocks near the view
+ * hold their markup, the others are placeholders of estimated or
+ * measured height (see updateVirtual()).
+ */
+(function () {
+    'use strict';
+
+    var content = document.getElementById('mdr-content');
+    var toc = document.getElementById('mdr-toc');
+    var emptyState = document.getElementById('mdr-empty');
+
+    // Source map index: parallel arrays sorted by start line and offset
+    var index = {
+        starts: new Int32Array(0),
+        ends: new Int32Array(0),
+        tops: new Float64Array(0),
+        bottoms: new Float64Array(0)
+    };
+    var indexPending = false;
+
+    // Bridge to the application (set up through QWebChannel)
+    var bridge = null;
+    var ignoreNextScroll = false;
+    var lastReportedLine = -1;
+
+    // Rendered diagram SVG by source hash; diagrams whose source did not
+    // change are never laid out again
+    var diagramCache = new Map();
+    var diagramQueue = Promise.resolve();
+
+    // Block markup is compared by hash instead of by copy once memory
+    // was released
+    var keepMarkup = true;
+
+    function markupHash(html) {
+        var hash = 0x811c9dc5;
+        for (var i = 0; i < html.length; i++) {
+            hash ^= html.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193);
+        }
+        return html.length + ':' + (hash >>> 0);
+    }
+
+    // Large code blocks arrive with their first lines highlighted and the
+    // rest in plain chunks; a chunk is highlighted by the application once
+    // it nears the view
+    var codeObserver = window.IntersectionObserver ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (!entry.isIntersecting) {
+                return;
+            }
+            var chunk = entry.target;
+            codeObserver.unobserve(chunk);
+            var block = chunk.closest('.mdr-block');
+            if (bridge && block && !chunk.dataset.requested) {
+                chunk.dataset.requested = 'true';
+                bridge.highlightCode(block.dataset.key, +chunk.dataset.first);
+            }
+        });
+    }, { rootMargin: '100% 0px' }) : null;
+
+    function observeCode(root) {
+        if (!codeObserver) {
+            return;
+        }
+        var chunks = root.querySelectorAll('.mdr-code-chunk:not([data-requested])');
+        for (var i = 0; i < chunks.length; i++) {
+            codeObserver.observe(chunks[i]);
+        }
+    }
+
+    // Virtualized preview for very long documents: every block keeps its
+    // element, but only those near the view hold their markup. The others
+    // are empty placeholders as tall as the block was when last measured,
+    // or as estimated from its source lines, and their markup waits in
+    // el.mdrHtml (kept even after releaseMemory(), as it is the only copy).
+    var VIRTUAL_MARGIN = 1.5;  // viewport heights mounted above and below
+    var VIRTUAL_LINE_ESTIMATE = 24;  // px per source line until measured
+    var virtual = false;
+    var mounted = new Set();
+    var heightCache = new Map();  // block key -> measured height
+    var measuredHeight = 0;
+    var measuredLines = 0;
+    var placeholderLinePixels = VIRTUAL_LINE_ESTIMATE;  // used by the placeholders
+    var virtualPending = false;
+    var viewportWidth = window.innerWidth;
+
+    function setMarkup(el, html) {
+        el.mdrMarkup = keepMarkup ? html : markupHash(html);
+        if (virtual) {
+            el.mdrHtml = html;
+            if (!mounted.has(el)) {
+                showPlaceholder(el);
+                return;
+            }
+        }
+        el.innerHTML = html;
+    }
+
+    function hasMarkup(el, html) {
+        return el.mdrMarkup === (keepMarkup ? html : markupHash(html));
+    }
+
+    function showDiagram(node, svg) {
+        node.innerHTML = svg;
+        node.dataset.rendered = 'true';
+    }
+
+    function layoutDiagram(node) {
+        var key = node.dataset.diagram;
+        // The id scopes the SVG's styles and markers, so it is derived from
+        // the source hash: seeded SVGs from before a page reload keep theirs
+        return mermaid.render('mdr-diagram-' + key, node.textContent)
+            .then(function (result) {
+                diagramCache.set(key, result.svg);
+                showDiagram(node, result.svg);
+                if (bridge) {
+                    bridge.diagramRendered(key, result.svg);
+                }
+            })
+            .catch(function (e) {
+                node.classList.add('mdr-diagram-error');
+                node.dataset.rendered = 'true';
+                console.error(e);
+            });
+    }
+
+    function renderDiagrams(root) {
+        var nodes = root.querySelectorAll('.mermaid[data-diagram]:not([data-rendered])');
+        for (var i = 0; i < nodes.length; i++) {
+            var node = nodes[i];
+            var svg = diagramCache.get(node.dataset.diagram);
+            if (svg !== undefined) {
+                showDiagram(node, svg);
+            } else if (window.mermaid) {
+                // Mermaid layouts run one at a time
+                diagramQueue = diagramQueue.then(layoutDiagram.bind(null, node));
+            }
+        }
+        diagramQueue.then(scheduleIndex);
+    }
+
+    function renderMath(root) {
+        if (!window.renderMathInElement) {
+            return;
+        }
+        var nodes = root.querySelectorAll('.arithmatex:not([data-processed])');
+        for (var i = 0; i < nodes.length; i++) {
+            renderMathInElement(nodes[i], {
+                delimiters: [
+                    { left: '\\(', right: '\\)', display: false },
+                    { left: '\\[', right: '\\]', display: true }
+                ],
+                throwOnError: false
+            });
+            nodes[i].dataset.processed = 'true';
+        }
+    }
+
+    // Virtualized tables (see core/large_tables.py): the page gets a
+    // table's rows as data and keeps only those near the view in the DOM,
+    // with spacers standing in for the others
+    var TABLE_OVERSCAN_ROWS = 40;
+    var TABLE_ROW_ESTIMATE = 30;  // px, until the first rows are measured
+    var tables = new Set();
+    var tablesPending = false;
+
+    function tableSpacer(columns) {
+        var body = document.createElement('tbody');
+        body.className = 'mdr-table-spacer';
+        body.style.display = 'none';
+        var cell = body.insertRow().insertCell();
+        cell.colSpan = columns;
+        cell.style.cssText = 'padding: 0; border: 0; height: 0;';
+        return body;
+    }
+
+    function setSpacer(body, height) {
+        body.style.display = height > 0 ? '' : 'none';
+        body.rows[0].cells[0].style.height = height + 'px';
+    }
+
+    function mountTables(root) {
+        var nodes = root.querySelectorAll('.mdr-table:not([data-mounted])');
+        for (var i = 0; i < nodes.length; i++) {
+            var el = nodes[i];
+            var script = el.querySelector('script[type="application/json"]');
+            var table = el.querySelector('table');
+            if (!script || !table) {
+                continue;
+            }
+            var data = JSON.parse(script.textContent);
+            el.removeChild(script);
+
+            var state = {
+                rows: data.rows,
+                aligns: data.aligns,
+                head: table.tHead,
+                body: table.tBodies[0],
+                before: tableSpacer(data.aligns.length),
+                after: tableSpacer(data.aligns.length),
+                rowHeight: 0,
+                first: 0,
+                last: 0
+            };
+            table.insertBefore(state.before, state.body);
+            table.appendChild(state.after);
+            el.mdrTable = state;
+            el.dataset.mounted = 'true';
+            tables.add(el);
+            updateTable(el);
+        }
+    }
+
+    function rowsHtml(state, first, last) {
+        var parts = [];
+        for (var i = first; i < last; i++) {
+            var row = state.rows[i];
+            parts.push('<tr>');
+            for (var c = 0; c < row.length; c++) {
+                var align = state.aligns[c];
+                parts.push(align ? '<td style="text-align: ' + align + ';">' : '<td>', row[c], '</td>');
+            }
+            parts.push('</tr>');
+        }
+        return parts.join('');
+    }
+
+    // Mount the rows around the view if the mounted ones do not cover it
+    function updateTable(el) {
+        var state = el.mdrTable;
+        var count = state.rows.length;
+        var rowHeight = state.rowHeight || TABLE_ROW_ESTIMATE;
+        // Viewport top relative to the top of the first row
+        var top = -state.head.getBoundingClientRect().bottom;
+        var visibleFirst = Math.min(Math.max(Math.floor(top / rowHeight), 0), count);
+        var visibleLast = Math.min(Math.ceil((top + window.innerHeight) / rowHeight), count);
+        if (state.last > state.first && state.first <= visibleFirst && visibleLast <= state.last) {
+            return;
+        }
+
+        var first = Math.max(visibleFirst - TABLE_OVERSCAN_ROWS, 0);
+        first -= first % 2;  // keeps the theme's nth-child row stripes
+        var last = Math.min(Math.max(visibleLast, first) + TABLE_OVERSCAN_ROWS, count);
+        state.body.innerHTML = rowsHtml(state, first, last);
+        state.first = first;
+        state.last = last;
+        renderMath(state.body);
+
+        if (last > first) {
+            var measured = state.body.getBoundingClientRect().height / (last - first);
+            if (Math.abs(measured - state.rowHeight) > 0.5) {
+                state.rowHeight = measured;
+                scheduleIndex();
+            }
+        }
+        setSpacer(state.before, first * state.rowHeight);
+        setSpacer(state.after, (count - last) * state.rowHeight);
+    }
+
+    function updateTables() {
+        tablesPending = false;
+        tables.forEach(function (el) {
+            if (el.isConnected) {
+                updateTable(el);
+            } else {
+                tables.delete(el);
+            }
+        });
+    }
+
+    function scheduleTables() {
+        if (!tablesPending && tables.size) {
+            tablesPending = true;
+            window.requestAnimationFrame(updateTables);
+        }
+    }
+
+    function linePixels() {
+        return measuredLines ? measuredHeight / measuredLines : VIRTUAL_LINE_ESTIMATE;
+    }
+
+    function estimateHeight(el) {
+        var known = heightCache.get(el.dataset.key);
+        if (known !== undefined) {
+            return known;
+        }
+        return Math.max(+el.dataset.endLine - +el.dataset.sourceLine, 1) * linePixels();
+    }
+
+    // Height of a mounted block including the margins of its first and
+    // last elements, which collapse through the block's own box
+    function measureBlock(el) {
+        var height = el.getBoundingClientRect().height;
+        if (el.firstElementChild) {
+            height += parseFloat(getComputedStyle(el.firstElementChild).marginTop) || 0;
+            height += parseFloat(getComputedStyle(el.lastElementChild).marginBottom) || 0;
+        }
+        if (!heightCache.has(el.dataset.key)) {
+            measuredHeight += height;
+            measuredLines += Math.max(+el.dataset.endLine - +el.dataset.sourceLine, 1);
+        }
+        heightCache.set(el.dataset.key, height);
+    }
+
+    function showPlaceholder(el) {
+        el.textContent = '';
+        el.style.height = estimateHeight(el) + 'px';
+        el.classList.add('mdr-unmounted');
+    }
+
+    function mountBlock(el) {
+        if (el.mdrHtml === undefined) {
+            return;  // still pending
+        }
+        mounted.add(el);
+        el.classList.remove('mdr-unmounted');
+        el.style.height = '';
+        el.innerHTML = el.mdrHtml;
+        mountTables(el);
+        renderDiagrams(el);
+        renderMath(el);
+        observeCode(el);
+        measureBlock(el);
+    }
+
+    function unmountBlock(el) {
+        // Late images and diagrams may have changed the height since mounting
+        measureBlock(el);
+        mounted.delete(el);
+        showPlaceholder(el);
+    }
+
+    // First block whose bottom is below a page offset (offsetTop is
+    // relative to the page, as in buildIndex())
+    function blockAt(offset) {
+        var blocks = content.children;
+        var lo = 0;
+        var hi = blocks.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >> 1;
+            var el = blocks[mid];
+            if (el.offsetTop + el.offsetHeight <= offset) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return lo;
+    }
+
+    // Mount the blocks near the view and unmount the others
+    function updateVirtual() {
+        virtualPending = false;
+        if (!virtual) {
+            return;
+        }
+        var margin = window.innerHeight * VIRTUAL_MARGIN;
+        var top = window.scrollY - margin;
+        var bottom = window.scrollY + window.innerHeight + margin;
+        var blocks = content.children;
+
+        var wanted = new Set();
+        for (var i = blockAt(top); i < blocks.length; i++) {
+            if (blocks[i].offsetTop > bottom) {
+                break;
+            }
+            wanted.add(blocks[i]);
+        }
+        var changed = false;
+        mounted.forEach(function (el) {
+            if (!el.isConnected) {
+                mounted.delete(el);  // removed by render()
+            } else if (!wanted.has(el)) {
+                unmountBlock(el);
+                changed = true;
+            }
+        });
+        wanted.forEach(function (el) {
+            if (!mounted.has(el) && el.mdrHtml !== undefined) {
+                mountBlock(el);
+                changed = true;
+            }
+        });
+        if (changed) {
+            // Re-estimate the placeholders once measurements disagree with
+            // the estimate they were given
+            var perLine = linePixels();
+            if (Math.abs(perLine - placeholderLinePixels) > placeholderLinePixels / 4) {
+                placeholderLinePixels = perLine;
+                for (var j = 0; j < blocks.length; j++) {
+                    if (blocks[j].classList.contains('mdr-unmounted')) {
+                        blocks[j].style.height = estimateHeight(blocks[j]) + 'px';
+                    }
+                }
+            }
+            // Measured heights may bring further blocks into range
+            scheduleVirtual();
+            scheduleIndex();
+        }
+    }
+
+    function scheduleVirtual() {
+        if (virtual && !virtualPending) {
+            virtualPending = true;
+            window.requestAnimationFrame(updateVirtual);
+        }
+    }
+
+    // Switch between mounting all blocks and mounting those near the view;
+    // blocks are recreated rather than converted
+    function setVirtual(enabled) {
+        if (enabled === virtual) {
+            return;
+        }
+        virtual = enabled;
+        mounted.clear();
+        content.textContent = '';
+        content.classList.toggle('mdr-virtual', enabled);
+    }
+
+    function createBlock(item) {
+        var el = document.createElement('div');
+        el.className = 'mdr-block';
+        el.dataset.key = item[0];
+        el.dataset.sourceLine = item[1];
+        el.dataset.endLine = item[2];
+        if (item[3] === null) {
+            el.classList.add('mdr-pending');
+        } else {
+            setMarkup(el, item[3]);
+        }
+        return el;
+    }
+
+    // Elements for new blocks, reusing current ones with the same key and
+    // markup (or any rendered one with that key if the markup is pending)
+    function reconcile(blocks) {
+        var byKey = new Map();
+        var children = content.children;
+        for (var i = 0; i < children.length; i++) {
+            var list = byKey.get(children[i].dataset.key);
+            if (list) {
+                list.push(children[i]);
+            } else {
+                byKey.set(children[i].dataset.key, [children[i]]);
+            }
+        }
+
+        var elements = new Array(blocks.length);
+        for (var j = 0; j < blocks.length; j++) {
+            var item = blocks[j];
+            var candidates = byKey.get(item[0]);
+            var el = null;
+            if (candidates && candidates.length && candidates[0].mdrMarkup !== undefined &&
+                    (item[3] === null || hasMarkup(candidates[0], item[3]))) {
+                el = candidates.shift();
+                el.dataset.sourceLine = item[1];
+                el.dataset.endLine = item[2];
+            } else {
+                el = createBlock(item);
+            }
+            elements[j] = el;
+        }
+        return elements;
+    }
+
+    // Make the content's children equal elements with as few moves as
+    // possible: unchanged runs of blocks stay where they are
+    function applyElements(elements) {
+        var keep = new Set(elements);
+        var child = content.firstElementChild;
+        while (child) {
+            var next = child.nextElementSibling;
+            if (!keep.has(child)) {
+                content.removeChild(child);
+            }
+            child = next;
+        }
+
+        var current = content.firstElementChild;
+        for (var i = 0; i < elements.length; i++) {
+            if (elements[i] === current) {
+                current = current.nextElementSibling;
+            } else {
+                content.insertBefore(elements[i], current);
+            }
+        }
+    }
+
+    // First block at least partly visible, used to keep the view steady
+    // while blocks above it change height
+    function viewportAnchor() {
+        var blocks = content.children;
+        for (var i = 0; i < blocks.length; i++) {
+            if (blocks[i].getBoundingClientRect().bottom > 0) {
+                return blocks[i];
+            }
+        }
+        return null;
+    }
+
+    function buildIndex() {
+        indexPending = false;
+        var blocks = content.children;
+        var count = blocks.length;
+        var starts = new Int32Array(count);
+        var ends = new Int32Array(count);
+        var tops = new Float64Array(count);
+        var bottoms = new Float64Array(count);
+        for (var i = 0; i < count; i++) {
+            var el = blocks[i];
+            starts[i] = +el.dataset.sourceLine;
+            ends[i] = +el.dataset.endLine;
+            tops[i] = el.offsetTop;
+            bottoms[i] = el.offsetTop + el.offsetHeight;
+        }
+        index = { starts: starts, ends: ends, tops: tops, bottoms: bottoms };
+    }
+
+    function scheduleIndex() {
+        if (!indexPending) {
+            indexPending = true;
+            window.requestAnimationFrame(buildIndex);
+        }
+    }
+
+    // Last position i with values[i] <= target, or -1
+    function search(values, target) {
+        var lo = 0;
+        var hi = values.length - 1;
+        var found = -1;
+        while (lo <= hi) {
+            var mid = (lo + hi) >> 1;
+            if (values[mid] <= target) {
+                found = mid;
+                lo = mid + 1;
+            } else {
+                hi = mid - 1;
+            }
+        }
+        return found;
+    }
+
+    function lineToOffset(line) {
+        var i = search(index.starts, line);
+        if (i < 0) {
+            return 0;
+        }
+        var span = Math.max(index.ends[i] - index.starts[i], 1);
+        var fraction = Math.min(Math.max((line - index.starts[i]) / span, 0), 1);
+        return index.tops[i] + fraction * (index.bottoms[i] - index.tops[i]);
+    }
+
+    function offsetToLine(offset) {
+        var i = search(index.tops, offset);
+        if (i < 0) {
+            return 0;
+        }
+        var height = Math.max(index.bottoms[i] - index.tops[i], 1);
+        var fraction = Math.min(Math.max((offset - index.tops[i]) / height, 0), 1);
+        return index.starts[i] + fraction * (index.ends[i] - index.starts[i]);
+    }
+
+    window.addEventListener('scroll', function () {
+        scheduleTables();
+        scheduleVirtual();
+        if (ignoreNextScroll) {
+            ignoreNextScroll = false;
+            return;
+        }
+        if (bridge) {
+            var line = offsetToLine(window.scrollY);
+            if (Math.abs(line - lastReportedLine) >= 0.01) {
+                lastReportedLine = line;
+                bridge.previewScrolled(line);
+            }
+        }
+    }, { passive: true });
+
+    window.addEventListener('resize', scheduleIndex);
+    window.addEventListener('resize', scheduleTables);
+    window.addEventListener('resize', function () {
+        // Heights measured at another width no longer hold
+        if (window.innerWidth !== viewportWidth) {
+            viewportWidth = window.innerWidth;
+            heightCache.clear();
+            measuredHeight = 0;
+            measuredLines = 0;
+        }
+        scheduleVirtual();
+    });
+    // Images and other late content change block heights
+    content.addEventListener('load', scheduleIndex, true);
+
+    if (window.QWebChannel && window.qt && qt.webChannelTransport) {
+        new QWebChannel(qt.webChannelTransport, function (channel) {
+            bridge = channel.objects.bridge;
+        });
+    }
+
+    window.mdr = {
+        /*
+         * Replace the document content.
+         *   blocks: [[key, startLine, endLine, html or null], ...]; null
+         *           marks a block that will arrive later through fill()
+         *   tocHtml: table of contents markup (may be empty)
+         *   anchor: index of a block to scroll into view, or null
+         *   virtualize: mount only the blocks near the view
+         * Returns the milliseconds spent, for the metrics panel.
+         */
+        render: function (blocks, tocHtml, anchor, virtualize) {
+            var started = performance.now();
+            setVirtual(!!virtualize);
+            applyElements(reconcile(blocks));
+            toc.innerHTML = tocHtml;
+            emptyState.style.display = blocks.length ? 'none' : '';
+
+            if (anchor !== null && content.children[anchor]) {
+                ignoreNextScroll = true;
+                content.children[anchor].scrollIntoView();
+            }
+            updateVirtual();
+            mountTables(content);
+            scheduleTables();
+            renderDiagrams(content);
+            renderMath(content);
+            observeCode(content);
+            scheduleIndex();
+            return performance.now() - started;
+        },
+
+        /*
+         * Fill in blocks that were pending in the last render().
+         *   items: [[index, html], ...]
+         * Returns the milliseconds spent.
+         */
+        fill: function (items) {
+            var started = performance.now();
+            var anchor = viewportAnchor();
+            var anchorTop = anchor ? anchor.getBoundingClientRect().top : 0;
+
+            for (var i = 0; i < items.length; i++) {
+                var el = content.children[items[i][0]];
+                if (el && !hasMarkup(el, items[i][1])) {
+                    setMarkup(el, items[i][1]);
+                    el.classList.remove('mdr-pending');
+                }
+            }
+            updateVirtual();
+            mountTables(content);
+
+            // Blocks filled above the viewport must not push the view down
+            if (anchor) {
+                var delta = anchor.getBoundingClientRect().top - anchorTop;
+                if (delta) {
+                    ignoreNextScroll = true;
+                    window.scrollBy(0, delta);
+                }
+            }
+            renderDiagrams(content);
+            renderMath(content);
+            observeCode(content);
+            scheduleIndex();
+            return performance.now() - started;
+        },
+
+        // Report through the bridge once the latest update is painted
+        notifyPaint: function (token) {
+            requestAnimationFrame(function () {
+                // Runs after the frame that rAF callbacks precede
+                setTimeout(function () {
+                    if (bridge) {
+                        bridge.painted(token);
+                    }
+                }, 0);
+            });
+        },
+
+        // Highlight a plain chunk of a large code block; the lines keep
+        // their height, so the layout does not move
+        fillCode: function (key, first, html) {
+            var blocks = content.querySelectorAll('.mdr-block[data-key="' + key + '"]');
+            for (var i = 0; i < blocks.length; i++) {
+                var chunk = blocks[i].querySelector('.mdr-code-chunk[data-first="' + first + '"]');
+                if (chunk) {
+                    chunk.innerHTML = html;
+                }
+            }
+        },
+
+        // Scroll so that the given (fractional) source line is at the top
+        scrollToLine: function (line) {
+            var offset = lineToOffset(line);
+            if (Math.abs(offset - window.scrollY) >= 1) {
+                ignoreNextScroll = true;
+                window.scrollTo(0, offset);
+            }
+        },
+
+        // Preload diagrams rendered before the page was (re)loaded
+        //   diagrams: {key: svg, ...}
+        seedDiagrams: function (diagrams) {
+            Object.keys(diagrams).forEach(function (key) {
+                diagramCache.set(key, diagrams[key]);
+            });
+        },
+
+        // Keep hashes instead of copies of block markup and drop diagrams
+        // no block shows any more
+        releaseMemory: function () {
+            var children = content.children;
+            if (keepMarkup) {
+                keepMarkup = false;
+                for (var i = 0; i < children.length; i++) {
+                    if (children[i].mdrMarkup !== undefined) {
+                        children[i].mdrMarkup = markupHash(children[i].mdrMarkup);
+                    }
+                }
+            }
+            var shown = new Set();
+            var nodes = content.querySelectorAll('.mermaid[data-diagram]');
+            for (var j = 0; j < nodes.length; j++) {
+                shown.add(nodes[j].dataset.diagram);
+            }
+            Array.from(diagramCache.keys()).forEach(function (key) {
+                if (!shown.has(key)) {
+                    diagramCache.delete(key);
+                }
+            });
+        },
+
+        setTheme: function (css) {
+            document.getElementById('mdr-theme').textContent = css;
+            heightCache.clear();
+            measuredHeight = 0;
+            measuredLines = 0;
+            scheduleVirtual();
+            scheduleIndex();
+        }
+    };
+})();
@@ -0,0 +1,28 @@
+"""
+Run the headless render server
+
+Other tools get the application's exact rendering (extensions, themes)
+over HTTP without starting the GUI; see core/render_server.py for the
+endpoints.
+
+    python server.py [--host 127.0.0.1] [--port 8765] [--socket PATH]
+                     [--workers 4] [--queue-size 64]
+"""
+import argparse
+from core.render_server import serve
+import config
+
+def main():
+    """Parse the command line and serve until interrupted"""
+    parser = argparse.ArgumentParser(description=f"{config.APP_NAME} render server")
+    parser.add_argument('--host', default=config.RENDER_SERVER_HOST)
+    parser.add_argument('--port', type=int, default=config.RENDER_SERVER_PORT)
+    parser.add_argument('--socket', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=config.RENDER_SERVER_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=config.RENDER_SERVER_QUEUE_SIZE)
+    args = parser.parse_args()
+    
+    serve(args.host, args.port, args.socket, args.workers, args.queue_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for block splitting
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.blocks import split_blocks, order_by_visibility
+
+class TestSplitBlocks(unittest.TestCase):
+    """Test cases for split_blocks"""
+    
+    def test_paragraphs(self):
+        """Test that blank lines separate blocks"""
+        blocks, _ = split_blocks("# Title\n\nFirst paragraph.\n\n\nSecond\nparagraph.\n")
+        
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(blocks[0].text, "# Title")
+        self.assertEqual((blocks[1].start_line, blocks[1].end_line), (2, 3))
+        self.assertEqual(blocks[2].text, "Second\nparagraph.")
+        self.assertEqual(blocks[2].start_line, 5)
+    
+    def test_fenced_code_kept_together(self):
+        """Test that blank lines inside fences do not split blocks"""
+        blocks, _ = split_blocks("```python\na = 1\n\nb = 2\n```\n\nAfter")
+        
+        self.assertEqual(len(blocks), 2)
+        self.assertIn("b = 2", blocks[0].text)
+    
+    def test_loose_list_kept_together(self):
+        """Test that loose lists and their continuations stay in one block"""
+        blocks, _ = split_blocks("- one\n\n- two\n\n    more of two\n\nParagraph")
+        
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(blocks[1].text, "Paragraph")
+    
+    def test_definitions_collected(self):
+        """Test that link references are collected for every block"""
+        _, definitions = split_blocks("See [docs][d].\n\n[d]: https://example.com\n*[HTML]: Hyper")
+        
+        self.assertIn("[d]: https://example.com", definitions)
+        self.assertIn("*[HTML]: Hyper", definitions)
+    
+    def test_footnotes_collected(self):
+        """Test that footnote definitions are collected with their continuations"""
+        _, definitions = split_blocks("Note[^1].\n\n[^1]: First\n    second\n\n[d]: https://example.com")
+        
+        self.assertEqual(definitions, "[d]: https://example.com\n\n[^1]: First\n    second")
+    
+    def test_html_block_kept_together(self):
+        """Test that blank lines inside a raw HTML element do not split blocks"""
+        blocks, _ = split_blocks("<div markdown=\"1\">\n\n<div>\n\n*a*\n\n</div>\n</div>\n\nAfter")
+        
+        self.assertEqual(len(blocks), 2)
+        self.assertTrue(blocks[0].text.endswith("</div>\n</div>"))
+        self.assertEqual(blocks[1].text, "After")
+    
+    def test_empty_document(self):
+        """Test that an empty document has no blocks"""
+        self.assertEqual(split_blocks("\n\n"), ([], ""))
+
+class TestOrderByVisibility(unittest.TestCase):
+    """Test cases for order_by_visibility"""
+    
+    def test_visible_first(self):
+        """Test that visible blocks come first and the rest by distance"""
+        blocks, _ = split_blocks("\n\n".join(f"Paragraph {i}" for i in range(6)))
+        visible, deferred = order_by_visibility(blocks, 4, 6)
+        
+        self.assertEqual(visible, [2, 3])
+        self.assertEqual(deferred, [4, 1, 5, 0])
+
+if __name__ == '__main__':
+    unittest.main()
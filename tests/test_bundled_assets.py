@@ -0,0 +1,81 @@
+"""
+Unit tests for BundledAssets
+"""
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.bundled_assets import BundledAssets, LIBRARIES
+
+MERMAID_HTML = '<div class="mermaid">graph TD; A--&gt;B</div>'
+
+class TestBundledAssets(unittest.TestCase):
+    """Test cases for BundledAssets"""
+    
+    def setUp(self):
+        """Set up a fake vendor directory with every library file"""
+        self.vendor_dir = Path(tempfile.mkdtemp())
+        self.output_dir = Path(tempfile.mkdtemp())
+        for files in LIBRARIES.values():
+            for path, _ in files:
+                target = self.vendor_dir / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if path.endswith('.css'):
+                    target.write_text("@font-face{src:url(fonts/KaTeX_AMS-Regular.woff2)}")
+                else:
+                    target.write_text(f"/* {path} */ '</script>'")
+        self.assets = BundledAssets(self.vendor_dir)
+    
+    def tearDown(self):
+        """Clean up temporary directories"""
+        shutil.rmtree(self.vendor_dir)
+        shutil.rmtree(self.output_dir)
+    
+    def test_unused_libraries_skipped(self):
+        """Test that documents without diagrams or math load nothing"""
+        self.assertEqual(self.assets.document_tags("<p>Plain</p>", 'inline'), "")
+    
+    def test_inline(self):
+        """Test that inline mode embeds only the needed library"""
+        tags = self.assets.document_tags(MERMAID_HTML, 'inline')
+        
+        self.assertIn('mermaid/mermaid.min.js', tags)
+        self.assertNotIn('katex', tags)
+        self.assertNotIn("'</script>'", tags)
+        self.assertIn('mermaid.initialize', tags)
+    
+    def test_inline_fonts(self):
+        """Test that inlined KaTeX CSS embeds its fonts as data URIs"""
+        tags = self.assets.document_tags('<span class="arithmatex">\\(x\\)</span>', 'inline')
+        
+        self.assertIn('url(data:font/woff2;base64,', tags)
+    
+    def test_link(self):
+        """Test that link mode copies libraries next to the document"""
+        tags = self.assets.document_tags(MERMAID_HTML, 'link', self.output_dir)
+        
+        self.assertIn('src="assets/vendor/mermaid/mermaid.min.js"', tags)
+        self.assertTrue((self.output_dir / "assets/vendor/mermaid/mermaid.min.js").exists())
+    
+    def test_cdn_fallback(self):
+        """Test that missing bundled files fall back to the CDN"""
+        assets = BundledAssets(self.output_dir / "missing")
+        tags = assets.document_tags(MERMAID_HTML, 'inline')
+        
+        self.assertIn('https://cdn.jsdelivr.net/npm/mermaid@', tags)
+    
+    def test_preview_tags_use_local_files(self):
+        """Test that the preview page loads bundled files from disk"""
+        tags = self.assets.preview_tags()
+        
+        self.assertIn('file://', tags)
+        self.assertIn('katex.min.css', tags)
+        self.assertNotIn('.woff2', tags)
+
+if __name__ == '__main__':
+    unittest.main()
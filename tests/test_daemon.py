@@ -0,0 +1,80 @@
+"""
+Unit tests for the render daemon and the command line
+"""
+import socket
+import subprocess
+import time
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.daemon import DaemonClient, start_daemon, stop_daemon
+
+CLI = Path(__file__).parent.parent / "cli.py"
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "needs Unix sockets")
+class TestDaemon(unittest.TestCase):
+    """Test cases for the daemon, its client and cli.py"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = str(Path(self.temp_dir.name) / "daemon.sock")
+        self.source = Path(self.temp_dir.name) / "doc.md"
+        self.source.write_text("# Hi\n\nSome *text*.", encoding='utf-8')
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        stop_daemon(self.socket_path)
+        self.temp_dir.cleanup()
+    
+    def cli(self, *args, stdin=""):
+        """Run cli.py against the test socket"""
+        return subprocess.run([sys.executable, str(CLI), '--socket', self.socket_path, *args],
+                              input=stdin, capture_output=True, text=True, timeout=60)
+    
+    def test_render_starts_daemon(self):
+        """Test that render spawns a daemon which later calls reuse"""
+        result = self.cli('render', str(self.source), '--fragment')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("<em>text</em>", result.stdout)
+        self.assertEqual(result.stderr, "")
+        
+        self.assertEqual(self.cli('render', str(self.source), '--fragment').stdout, result.stdout)
+        status = self.cli('daemon', 'status')
+        self.assertIn("cache_hits: 1", status.stdout)
+        
+        self.assertEqual(self.cli('daemon', 'stop').returncode, 0)
+        self.assertEqual(self.cli('daemon', 'status').returncode, 1)
+    
+    def test_idle_timeout(self):
+        """Test that an idle daemon exits and removes its socket"""
+        self.assertTrue(start_daemon(self.socket_path, idle_timeout=0.5))
+        self.assertTrue(DaemonClient(self.socket_path, timeout=1).is_running())
+        
+        deadline = time.monotonic() + 10
+        while Path(self.socket_path).exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertFalse(Path(self.socket_path).exists())
+        self.assertFalse(DaemonClient(self.socket_path, timeout=1).is_running())
+    
+    def test_in_process(self):
+        """Test rendering without a daemon, and errors"""
+        result = self.cli('render', str(self.source), '--no-daemon')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertTrue(result.stdout.startswith("<!DOCTYPE html>"))
+        self.assertFalse(Path(self.socket_path).exists())
+        
+        result = self.cli('stats', '-', '--no-daemon')
+        self.assertIn("words: 0", result.stdout)
+        
+        result = self.cli('render', str(self.source), '--theme', "none", '--no-daemon')
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Unknown theme", result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Unit tests for DiagramCache
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.diagrams import DiagramCache
+from core.markdown_processor import MarkdownProcessor
+
+DIAGRAM = "```mermaid\ngraph TD; A-->B\n```"
+
+class TestDiagramCache(unittest.TestCase):
+    """Test cases for DiagramCache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.processor = MarkdownProcessor()
+        self.cache = self.processor.diagrams
+    
+    def _diagram_key(self, html):
+        """Extract the data-diagram key from rendered HTML"""
+        start = html.index('data-diagram="') + len('data-diagram="')
+        return html[start:html.index('"', start)]
+    
+    def test_fence_keyed_by_source(self):
+        """Test that identical diagram sources get identical keys"""
+        first = self.processor.render_block(DIAGRAM)
+        second = self.processor.render_block(DIAGRAM.replace("A-->B", "A-->C"))
+        
+        self.assertIn('class="mermaid"', first)
+        self.assertNotEqual(self._diagram_key(first), self._diagram_key(second))
+    
+    def test_export_reuses_svg(self):
+        """Test that exports embed diagrams already rendered by the preview"""
+        key = self._diagram_key(self.processor.render_block(DIAGRAM))
+        self.cache.put(key, "<svg>cached</svg>")
+        
+        html = self.processor.convert(DIAGRAM, asset_mode='cdn')
+        
+        self.assertIn("<svg>cached</svg>", html)
+        self.assertNotIn('mermaid.min.js', html)
+    
+    def test_unrendered_diagram_kept(self):
+        """Test that diagrams without SVG are left for Mermaid"""
+        html = self.processor.convert(DIAGRAM, asset_mode='cdn')
+        
+        self.assertIn('class="mermaid"', html)
+        self.assertIn('mermaid.min.js', html)
+    
+    def test_lru_eviction(self):
+        """Test that the cache drops the least recently used diagrams"""
+        cache = DiagramCache(max_entries=2)
+        cache.put("a", "<svg>a</svg>")
+        cache.put("b", "<svg>b</svg>")
+        cache.get("a")
+        cache.put("c", "<svg>c</svg>")
+        
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "<svg>a</svg>")
+
+if __name__ == '__main__':
+    unittest.main()
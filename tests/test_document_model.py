@@ -0,0 +1,131 @@
+"""
+Unit tests for the compact document model
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.document_model import DocumentModel, FragmentBuffer, FragmentStore, block_kind
+from core.document_model import KIND_FENCE, KIND_HEADING, KIND_LIST, KIND_PARAGRAPH, KIND_QUOTE, KIND_TABLE
+from core.markdown_processor import MarkdownProcessor
+
+SAMPLE = """# Title
+
+Some *text* with a [link][ref].
+
+- one
+- two
+
+```python
+x = 1
+
+y = 2
+```
+
+> quoted
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+[ref]: https://example.com
+"""
+
+class TestDocumentModel(unittest.TestCase):
+    """Test cases for DocumentModel, FragmentBuffer and FragmentStore"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.processor = MarkdownProcessor()
+    
+    def test_blocks_match_split(self):
+        """Test that the model's columns describe the split blocks"""
+        model = self.processor.parse_document(SAMPLE)
+        blocks, definitions = self.processor.split_document(SAMPLE)
+        
+        self.assertEqual(len(model), len(blocks))
+        self.assertEqual(model.definitions, definitions)
+        for index, block in enumerate(blocks):
+            self.assertEqual(model.block_text(index), block.text)
+            self.assertEqual(model.start_lines[index], block.start_line)
+            self.assertEqual(model.end_lines[index], block.end_line)
+            self.assertEqual(model.key(index), self.processor.block_key(block.text, definitions))
+    
+    def test_repeated_blocks(self):
+        """Test that identical blocks are each found at their own place"""
+        text = "same\n\nsame\n\n\n\nsame"
+        model = self.processor.parse_document(text)
+        
+        self.assertEqual(list(model.start_lines), [0, 2, 6])
+        self.assertEqual(list(model.text_starts), [0, 6, 14])
+        self.assertEqual(model.key(0), model.key(2))
+    
+    def test_kinds(self):
+        """Test block classification"""
+        model = self.processor.parse_document(SAMPLE)
+        kinds = [model.kinds[i] for i in range(len(model))]
+        
+        self.assertEqual(kinds[:6], [KIND_HEADING, KIND_PARAGRAPH, KIND_LIST, KIND_FENCE,
+                                     KIND_QUOTE, KIND_TABLE])
+        self.assertEqual(model.kind(0), 'heading')
+        self.assertEqual(block_kind("not | a table"), KIND_PARAGRAPH)
+    
+    def test_empty_document(self):
+        """Test a document without blocks"""
+        model = self.processor.parse_document("\n\n")
+        self.assertEqual(len(model), 0)
+        self.assertEqual(len(DocumentModel()), 0)
+    
+    def test_fragment_buffer(self):
+        """Test storing strings in the shared buffer"""
+        buffer = FragmentBuffer()
+        first = buffer.append("<p>é</p>")
+        second = buffer.append("")
+        
+        self.assertEqual(buffer.get(first), "<p>é</p>")
+        self.assertEqual(buffer.get(second), "")
+        self.assertEqual(len(buffer), 2)
+    
+    def test_fragment_store_evicts_least_recent(self):
+        """Test that compaction keeps the recently used fragments"""
+        store = FragmentStore(max_entries=4)
+        for key in range(4):
+            store.put(key, f"<p>{key}</p>")
+        store.get(0)
+        store.put(4, "<p>4</p>")
+        
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.get(0), "<p>0</p>")
+        self.assertEqual(store.get(4), "<p>4</p>")
+        self.assertIsNone(store.get(1))
+    
+    def test_fragment_store_retain(self):
+        """Test that retain() keeps only the given fragments"""
+        store = FragmentStore()
+        for key in range(10):
+            store.put(key, f"<p>{key}</p>")
+        store.retain({3, 7, 42})
+        
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.get(7), "<p>7</p>")
+        self.assertIsNone(store.get(0))
+        store.put(0, "<p>0</p>")
+        self.assertEqual(store.get(0), "<p>0</p>")
+    
+    def test_model_smaller_than_block_lists(self):
+        """Test that the model of a long document is smaller than per-block lists"""
+        text = "\n\n".join(f"## Section {i}\n\nParagraph {i} with some *text*." for i in range(2000))
+        model = self.processor.parse_document(text)
+        blocks, _ = self.processor.split_document(text)
+        
+        lists = sys.getsizeof(blocks) + sum(
+            sys.getsizeof(block) + sys.getsizeof(block.text) + 2 * sys.getsizeof(block.end_line)
+            for block in blocks
+        )
+        self.assertLess(model.memory_usage(), lists)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -90,6 +90,29 @@ class TestFileHandler(unittest.TestCase):
         self.handler.save_file("test", self.test_file)
         self.assertEqual(self.handler.get_current_file_name(), "test.md")
     
+    def test_own_save_is_not_external_change(self):
+        """Test that a file written by save_file is not reported as changed"""
+        self.handler.save_file("# Mine", self.test_file)
+        self.assertEqual(self.handler.check_external_change(), (False, "# Mine"))
+    
+    def test_external_change_detected(self):
+        """Test that content written by another program is reported"""
+        self.handler.save_file("# Mine", self.test_file)
+        with open(self.test_file, 'w') as f:
+            f.write("# Theirs")
+        
+        self.assertEqual(self.handler.check_external_change(), (True, "# Theirs"))
+        
+        self.handler.accept_external_content("# Theirs")
+        self.assertEqual(self.handler.current_content, "# Theirs")
+        self.assertFalse(self.handler.check_external_change()[0])
+    
+    def test_external_delete_detected(self):
+        """Test that a deleted file is reported without content"""
+        self.handler.save_file("# Mine", self.test_file)
+        os.remove(self.test_file)
+        self.assertEqual(self.handler.check_external_change(), (True, None))
+    
     def test_is_markdown_file(self):
         """Test markdown file detection"""
         self.assertTrue(FileHandler.is_markdown_file("test.md"))
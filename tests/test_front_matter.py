@@ -0,0 +1,117 @@
+"""
+Unit tests for YAML front matter
+"""
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.blocks import split_blocks
+from core.exporter import Exporter
+from core.front_matter import FrontMatterCache, front_matter_span
+from core.markdown_processor import MarkdownProcessor
+from core.outline import scan_outline
+
+DOCUMENT = """---
+title: Release <notes>
+tags: [a, b]
+# not a heading
+---
+
+# Notes
+
+Body text.
+"""
+
+class TestFrontMatter(unittest.TestCase):
+    """Test cases for front matter splitting, parsing and rendering"""
+    
+    def test_span(self):
+        """Test finding the end of the front matter"""
+        self.assertEqual(front_matter_span(DOCUMENT), (DOCUMENT.index('\n# Notes'), 5))
+        self.assertEqual(front_matter_span("---\na: 1\n..."), (12, 3))
+        self.assertEqual(front_matter_span("---\na: 1\n"), (0, 0))
+        self.assertEqual(front_matter_span("# Title\n---\n"), (0, 0))
+        self.assertEqual(front_matter_span("----\n---\n"), (0, 0))
+    
+    def test_read(self):
+        """Test splitting and parsing front matter"""
+        front_matter = FrontMatterCache().read(DOCUMENT)
+        
+        self.assertEqual(front_matter.metadata, {'title': 'Release <notes>', 'tags': ['a', 'b']})
+        self.assertTrue(front_matter.raw.startswith("title:"))
+        self.assertTrue(front_matter.body.startswith("\n# Notes"))
+        self.assertEqual(front_matter.line_count, 5)
+        self.assertEqual(front_matter.error, "")
+    
+    def test_no_front_matter(self):
+        """Test documents without front matter"""
+        front_matter = FrontMatterCache().read("# Title\n")
+        self.assertEqual(front_matter.metadata, {})
+        self.assertEqual(front_matter.body, "# Title\n")
+    
+    def test_invalid_front_matter(self):
+        """Test that invalid YAML gives empty metadata and an error"""
+        cache = FrontMatterCache()
+        self.assertIn("Invalid", cache.read("---\na: [\n---\nText").error)
+        self.assertIn("mapping", cache.read("---\n- a\n---\nText").error)
+        self.assertEqual(cache.read("---\n---\nText").metadata, {})
+    
+    def test_non_mapping_kept_in_body(self):
+        """Test that front matter that is not a mapping stays Markdown"""
+        text = "---\nJust a paragraph\n---\nText"
+        front_matter = FrontMatterCache().read(text)
+        self.assertEqual(front_matter.body, text)
+        self.assertEqual(front_matter.line_count, 0)
+        self.assertIn("mapping", front_matter.error)
+        
+        self.assertEqual(split_blocks(text)[0][0].start_line, 0)
+        self.assertIn("Just a paragraph", MarkdownProcessor().convert(text))
+    
+    def test_parsed_once(self):
+        """Test that YAML is only parsed again when the front matter changes"""
+        cache = FrontMatterCache()
+        cache.read(DOCUMENT)
+        cache.read(DOCUMENT + "More text.\n")
+        self.assertEqual(cache.parse_count, 1)
+        
+        cache.read(DOCUMENT.replace("tags", "labels"))
+        self.assertEqual(cache.parse_count, 2)
+    
+    def test_blocks_and_outline_skip_front_matter(self):
+        """Test that front matter lines are not blocks or headings"""
+        blocks, _ = split_blocks(DOCUMENT)
+        self.assertEqual([block.start_line for block in blocks], [6, 8])
+        
+        outline = scan_outline(DOCUMENT)
+        self.assertEqual([heading.title for heading in outline.headings], ["Notes"])
+    
+    def test_convert(self):
+        """Test that exports drop the front matter and use its title"""
+        processor = MarkdownProcessor()
+        html_output = processor.convert(DOCUMENT)
+        
+        self.assertIn("<title>Release &lt;notes&gt;</title>", html_output)
+        self.assertNotIn("tags:", html_output)
+        self.assertEqual(processor.metadata['tags'], ['a', 'b'])
+        
+        metadata = Exporter(processor).get_export_metadata(DOCUMENT)
+        self.assertEqual(metadata['front_matter']['title'], 'Release <notes>')
+    
+    def test_fragment_export(self):
+        """Test that exports without the page structure drop the front matter"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "notes.html"
+            success, error = Exporter(MarkdownProcessor()).export_html(
+                DOCUMENT, str(output), standalone=False
+            )
+            self.assertTrue(success, error)
+            html_output = output.read_text(encoding='utf-8')
+        self.assertNotIn("tags:", html_output)
+        self.assertIn('<h1 id="notes">', html_output)
+
+if __name__ == '__main__':
+    unittest.main()
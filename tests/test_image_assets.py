@@ -0,0 +1,69 @@
+"""
+Unit tests for the export image pipeline
+"""
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.exporter import Exporter
+from core.image_assets import ImageAssets
+from core.markdown_processor import MarkdownProcessor
+
+class TestImageAssets(unittest.TestCase):
+    """Test cases for ImageAssets"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "docs"
+        (self.root / "sub").mkdir(parents=True)
+        (self.root / "small.png").write_bytes(b"\x89PNG small")
+        (self.root / "big.png").write_bytes(b"B" * 100)
+        (self.root / "sub" / "copy of big.png").write_bytes(b"B" * 100)
+        self.output = Path(self.temp_dir.name) / "out"
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_inline_and_copy(self):
+        """Test that small images are inlined and large ones copied by content"""
+        images = ImageAssets(self.output / "assets" / "images", inline_max_bytes=50)
+        html = ('<img alt="a" src="small.png"><img src="big.png">'
+                '<img src="sub/copy%20of%20big.png"><img src="https://example.com/x.png">'
+                '<img src="missing.png">')
+        result = images.rewrite(html, self.root, self.output / "sub")
+        
+        self.assertIn('src="data:image/png;base64,iVBORyBzbWFsbA=="', result)
+        copies = list((self.output / "assets" / "images").iterdir())
+        self.assertEqual(len(copies), 1)
+        self.assertEqual(result.count(f'src="../assets/images/{copies[0].name}"'), 2)
+        self.assertIn('src="https://example.com/x.png"', result)
+        self.assertIn('src="missing.png"', result)
+    
+    def test_each_image_read_once(self):
+        """Test that images shared by several documents are read once"""
+        images = ImageAssets(self.output / "assets" / "images", inline_max_bytes=50)
+        images.rewrite('<img src="small.png"><img src="big.png">', self.root, self.output)
+        images.rewrite('<img src="../small.png"><img src="../big.png">',
+                       self.root / "sub", self.output / "sub")
+        images.rewrite('<img src="copy%20of%20big.png">', self.root / "sub", self.output / "sub")
+        self.assertEqual(images.files_read, 3)
+        self.assertEqual(len(list((self.output / "assets" / "images").iterdir())), 1)
+    
+    def test_export_batch_embeds_images(self):
+        """Test that batch exports no longer reference the source folder"""
+        (self.root / "sub" / "b.md").write_text("![s](../small.png)\n", encoding='utf-8')
+        
+        exporter = Exporter(MarkdownProcessor())
+        result = exporter.export_batch([self.root / "sub" / "b.md"], self.root, self.output)
+        self.assertEqual(result.exported, 1)
+        
+        html = (self.output / "sub" / "b.html").read_text(encoding='utf-8')
+        self.assertIn('src="data:image/png;base64,', html)
+        self.assertNotIn('src="../small.png"', html)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for the image size probe
+"""
+import os
+import struct
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.image_probe import ImageProbe, read_image_size
+
+def jpeg(width, height, orientation=None):
+    """Build the segments of a JPEG file up to its frame header"""
+    data = b'\xff\xd8'
+    data += b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\0' + bytes(9)
+    if orientation is not None:
+        tiff = b'MM\0*' + struct.pack('>I', 8) + struct.pack('>H', 1)
+        tiff += struct.pack('>HHIHH', 0x0112, 3, 1, orientation, 0) + bytes(4)
+        exif = b'Exif\0\0' + tiff
+        data += b'\xff\xe1' + struct.pack('>H', len(exif) + 2) + exif
+    data += b'\xff\xc0' + struct.pack('>HBHH', 17, 8, height, width) + bytes(12)
+    return data + b'\xff\xd9'
+
+class TestImageProbe(unittest.TestCase):
+    """Test cases for read_image_size and ImageProbe"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def write(self, name, data):
+        path = self.root / name
+        path.write_bytes(data)
+        return path
+    
+    def test_formats(self):
+        """Test sizes read from the headers of each supported format"""
+        png = b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', 640, 480) + bytes(8)
+        gif = b'GIF89a' + struct.pack('<HH', 32, 16) + bytes(20)
+        bmp = b'BM' + bytes(16) + struct.pack('<ii', 10, -20) + bytes(8)
+        webp = b'RIFF' + bytes(4) + b'WEBPVP8X' + bytes(8) + (99).to_bytes(3, 'little') + (49).to_bytes(3, 'little')
+        svg = b'<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 120.5 60"></svg>'
+        
+        self.assertEqual(read_image_size(self.write("a.png", png)), (640, 480))
+        self.assertEqual(read_image_size(self.write("a.gif", gif)), (32, 16))
+        self.assertEqual(read_image_size(self.write("a.bmp", bmp)), (10, 20))
+        self.assertEqual(read_image_size(self.write("a.webp", webp)), (100, 50))
+        self.assertEqual(read_image_size(self.write("a.svg", svg)), (120, 60))
+        self.assertEqual(read_image_size(self.write("b.svg", b'<svg width="30px" height="40">')), (30, 40))
+        self.assertEqual(read_image_size(self.write("a.jpg", jpeg(300, 200))), (300, 200))
+        self.assertEqual(read_image_size(self.write("r.jpg", jpeg(300, 200, orientation=6))), (200, 300))
+        self.assertIsNone(read_image_size(self.write("a.txt", b'not an image')))
+        self.assertIsNone(read_image_size(self.root / "missing.png"))
+    
+    def test_cache_revalidates_changed_files(self):
+        """Test that sizes are cached until the file changes"""
+        probe = ImageProbe()
+        path = self.write("a.gif", b'GIF89a' + struct.pack('<HH', 1, 2) + bytes(20))
+        self.assertEqual(probe.size(path), (1, 2))
+        
+        path.write_bytes(b'GIF89a' + struct.pack('<HH', 3, 4) + bytes(21))
+        os.utime(path, ns=(0, 10 ** 9))
+        self.assertEqual(probe.size(path), (3, 4))
+    
+    def test_annotate(self):
+        """Test that images get lazy loading and their local size"""
+        self.write("a b.gif", b'GIF89a' + struct.pack('<HH', 8, 6) + bytes(20))
+        html = ('<p><img alt="x" src="a%20b.gif"> <img src="https://example.com/y.png" />'
+                '<img src="a%20b.gif" width="5"></p>')
+        result = ImageProbe().annotate(html, self.root)
+        
+        self.assertIn('<img alt="x" src="a%20b.gif" loading="lazy" decoding="async" width="8" height="6">', result)
+        self.assertIn('<img src="https://example.com/y.png" loading="lazy" decoding="async"/>', result)
+        self.assertIn('<img src="a%20b.gif" width="5" loading="lazy" decoding="async">', result)
+        self.assertEqual(ImageProbe().annotate("<p>text</p>", self.root), "<p>text</p>")
+
+if __name__ == '__main__':
+    unittest.main()
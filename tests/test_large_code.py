@@ -0,0 +1,74 @@
+"""
+Unit tests for lazily highlighted large code blocks
+"""
+import re
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.large_code import highlight_lines, parse_fence
+from core.markdown_processor import MarkdownProcessor
+import config
+
+class TestLargeCode(unittest.TestCase):
+    """Test cases for parsing and rendering large code blocks"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.processor = MarkdownProcessor()
+    
+    def fence(self, lines: int, language="python") -> str:
+        """Build a fenced code block source"""
+        body = [f"x{i} = '<{i}>'  # line {i}" for i in range(lines)]
+        return "\n".join([f"```{language}"] + body + ["```"])
+    
+    def test_parse_fence(self):
+        """Test that only plain, complete fences are handled"""
+        fence = parse_fence("~~~~ js\na\n```\nb\n~~~~")
+        self.assertEqual(fence.language, "js")
+        self.assertEqual(fence.lines, ["a", "```", "b"])
+        self.assertIsNone(parse_fence("```python\na\n```\nmore text"))
+        self.assertIsNone(parse_fence("```python\na"))
+        self.assertIsNone(parse_fence("```{.python hl_lines=\"1\"}\na\n```"))
+        self.assertIsNone(parse_fence("```mermaid\ngraph TD\n```"))
+    
+    def test_highlight_lines(self):
+        """Test that tokens spanning lines are split into one element per line"""
+        lines = highlight_lines(['s = """a', 'b"""', ''], "python")
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line.startswith('<span class="mdr-line">') for line in lines))
+        self.assertIn('<span class="s2">b', lines[1])
+        self.assertEqual(lines[2], '<span class="mdr-line"></span>\n')
+        self.assertEqual(highlight_lines(['<a>'], "no-such-language"),
+                         ['<span class="mdr-line">&lt;a&gt;</span>\n'])
+    
+    def test_render_and_chunks(self):
+        """Test the highlighted head, the plain chunks and their highlighting"""
+        count = config.LARGE_CODE_MIN_LINES
+        source = self.fence(count)
+        fragment = self.processor.render_block(source)
+        self.assertIn('class="highlight mdr-code"', fragment)
+        self.assertNotIn('linenos', fragment)
+        self.assertEqual(fragment.count('class="mdr-line"'), count)
+        
+        chunks = re.findall(r'<span class="mdr-code-chunk" data-first="(\d+)">', fragment)
+        self.assertEqual(int(chunks[0]), config.LARGE_CODE_HIGHLIGHT_LINES)
+        head = fragment.split('<span class="mdr-code-chunk"')[0]
+        self.assertIn('<span class="c1">', head)
+        self.assertNotIn('<span class="c1">', fragment[len(head):])
+        
+        chunk = self.processor.highlight_code(source, int(chunks[0]))
+        self.assertEqual(chunk.count('class="mdr-line"'),
+                         min(config.LARGE_CODE_CHUNK_LINES, count - int(chunks[0])))
+        self.assertIn(f"&lt;{chunks[0]}&gt;", chunk)
+        self.assertIsNone(self.processor.highlight_code(source, count))
+        
+        # Small blocks and exports keep the highlight extension's output
+        self.assertIn('linenos', self.processor.render_block(self.fence(3)))
+        self.assertNotIn('mdr-code', self.processor.convert(source))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for virtualized large tables
+"""
+import json
+import re
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.large_tables import parse_table, split_row
+from core.markdown_processor import MarkdownProcessor
+import config
+
+class TestLargeTables(unittest.TestCase):
+    """Test cases for parsing and rendering large tables"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.processor = MarkdownProcessor()
+    
+    def table(self, rows: int, cells=("a", "**b**", "`x|y`", "www.example.com", "1 < 2")) -> str:
+        """Build a pipe table source"""
+        lines = ["| A | B | C | D | E |", "|:--|--:|:-:|---|---|"]
+        lines += ["| " + " | ".join(cells) + " |" for _ in range(rows)]
+        return "\n".join(lines)
+    
+    def test_split_row(self):
+        """Test cell splitting with escaped pipes and code spans"""
+        self.assertEqual(split_row("| a | b \\| c | `x|y` |"), ["a", "b | c", "`x|y`"])
+        self.assertEqual(split_row("a|b"), ["a", "b"])
+        self.assertIsNone(parse_table("| a | b |\nnot a table"))
+        self.assertIsNone(parse_table("| a | b |\n|--|"))
+        
+        table = parse_table("a | b\n:-: | --:\n1 |\n2 | 3 | 4")
+        self.assertEqual(table.aligns, ['center', 'right'])
+        self.assertEqual(table.rows, [["1", ""], ["2", "3"]])
+    
+    def test_cells_match_tables_extension(self):
+        """Test that virtualized rows hold the cells the tables extension renders"""
+        source = self.table(config.LARGE_TABLE_MIN_ROWS)
+        fragment = self.processor.render_block(source)
+        self.assertTrue(fragment.startswith('<div class="mdr-table"'))
+        # Fixed layout only applies to tables with a width
+        self.assertIn('<table style="table-layout: fixed; width: 100%;">', fragment)
+        self.assertNotIn('<tr><td', fragment)
+        self.assertNotIn('</script', fragment.split('<script')[1][:-len('</script></div>')])
+        
+        payload = json.loads(re.search(r'<script type="application/json">(.*)</script>',
+                                       fragment).group(1))
+        self.assertEqual(len(payload['rows']), config.LARGE_TABLE_MIN_ROWS)
+        self.assertEqual(payload['aligns'], ['left', 'right', 'center', None, None])
+        
+        self.processor.md.reset()
+        expected = re.findall(r'<td[^>]*>(.*?)</td>', self.processor.md.convert(self.table(1)))
+        self.assertEqual(payload['rows'][0], expected)
+    
+    def test_small_tables_and_exports(self):
+        """Test that small tables and exports keep the full table"""
+        small = self.processor.render_block(self.table(3))
+        self.assertIn('<tbody>\n<tr>', small)
+        
+        document = self.processor.convert(self.table(config.LARGE_TABLE_MIN_ROWS))
+        self.assertNotIn('mdr-table', document)
+        self.assertEqual(document.count('<tr>'), config.LARGE_TABLE_MIN_ROWS + 1)
+
+if __name__ == '__main__':
+    unittest.main()
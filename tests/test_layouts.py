@@ -0,0 +1,103 @@
+"""
+Unit tests for export layout templates
+"""
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.layouts import LayoutCache
+from core.markdown_processor import MarkdownProcessor
+
+class TestLayouts(unittest.TestCase):
+    """Test cases for LayoutCache and layouts in exports"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.cache = LayoutCache(self.root)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+    
+    def write(self, name, text, mtime=None):
+        """Write a template file"""
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+    
+    def test_render(self):
+        """Test filling in slots, front matter and includes"""
+        self.write("page.html", "<h1>{{ meta.title }}</h1>{{content}}\n{{> parts/foot.html }}\n")
+        self.write("parts/foot.html", "<footer>{{ footer }}</footer>\n")
+        
+        layout = self.cache.get("page")
+        output = layout.render({'content': "<p>x</p>", 'footer': "end"}, {'title': "A & B"})
+        
+        self.assertEqual(output, "<h1>A &amp; B</h1><p>x</p>\n<footer>end</footer>\n")
+        self.assertEqual(layout.render({}), "<h1></h1>\n<footer></footer>\n")
+    
+    def test_compiled_once(self):
+        """Test that a layout is compiled again only when a file changes"""
+        self.write("page.html", "{{> part.html }}", mtime=10**18)
+        part = self.write("part.html", "a{{ content }}", mtime=10**18)
+        
+        for _ in range(3):
+            self.cache.get("page")
+        self.assertEqual(self.cache.compile_count, 1)
+        
+        self.write("part.html", "b{{ content }}", mtime=2 * 10**18)
+        self.assertEqual(self.cache.get(self.root / "page.html").render({'content': "!"}), "b!")
+        self.assertEqual(self.cache.compile_count, 2)
+        self.assertIn(part.resolve(), [path for path, _ in self.cache.get("page").dependencies])
+    
+    def test_errors(self):
+        """Test missing and self-including layouts"""
+        self.write("loop.html", "{{> loop.html }}")
+        with self.assertRaises(ValueError):
+            self.cache.get("loop")
+        with self.assertRaises(ValueError):
+            self.cache.get("missing")
+        self.write("broken.html", "{{> missing.html }}")
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get("broken")
+    
+    def test_names_stay_in_layouts_dir(self):
+        """Test that layout names cannot point outside the layouts directory"""
+        self.write("secret.html", "secret")
+        outside = self.root.parent / f"{self.root.name}-outside.html"
+        outside.write_text("outside", encoding='utf-8')
+        self.addCleanup(outside.unlink)
+        
+        self.assertEqual(self.cache.resolve("secret"), (self.root / "secret.html").resolve())
+        for name in ("../../secret", "secret.html", "/etc/passwd", f"../{outside.stem}"):
+            with self.assertRaises(ValueError):
+                self.cache.resolve(name)
+        with self.assertRaises(ValueError):
+            self.cache.resolve(outside)
+    
+    def test_export_layouts(self):
+        """Test the bundled layouts in a conversion"""
+        processor = MarkdownProcessor()
+        
+        default = processor.convert("# Title\n\nText", "", 'cdn')
+        self.assertIn("<title>Markdown Preview</title>", default)
+        self.assertIn("<p>Text</p>", default)
+        self.assertNotIn("{{", default)
+        
+        sidebar = processor.convert("---\nlayout: sidebar\n---\n# Title", "", 'cdn',
+                                    layout_values={'footer': "<p>Footer</p>"})
+        self.assertIn('<aside class="mdr-sidebar">', sidebar)
+        self.assertIn('<footer class="mdr-footer"><p>Footer</p></footer>', sidebar)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Unit tests for link checking during batch export
+"""
+import unittest
+import sys
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.exporter import Exporter
+from core.link_checker import LinkChecker
+from core.markdown_processor import MarkdownProcessor
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer proxy-style HEAD requests: URLs containing 'missing' are 404"""
+    
+    requests = []
+    
+    def do_HEAD(self):
+        StubHandler.requests.append(self.path)
+        self.send_response(404 if 'missing' in self.path else 200)
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        pass
+
+class TestLinkChecker(unittest.TestCase):
+    """Test cases for LinkChecker and Exporter.export_batch"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        StubHandler.requests = []
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "docs"
+        (self.root / "sub").mkdir(parents=True)
+        (self.root / "logo.png").write_bytes(b"png")
+        (self.root / "index.md").write_text(
+            "# Home\n\n![logo](logo.png) ![gone](gone.png)\n\n"
+            "[guide](sub/guide.md#usage) [bad](sub/guide.md#nope) [top](#home) [x](#nowhere)\n\n"
+            "[ok](https://example.com/a) [404](https://example.com/missing)\n",
+            encoding='utf-8'
+        )
+        (self.root / "sub" / "guide.md").write_text(
+            "# Guide\n\n## Usage\n\n![logo](../logo.png)\n\n"
+            "[ok](https://example.com/a) [404](https://example.com/missing)\n",
+            encoding='utf-8'
+        )
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_path_exists_uses_listing_cache(self):
+        """Test that a directory is listed once for many lookups"""
+        checker = LinkChecker()
+        self.assertTrue(checker.path_exists(str(self.root / "logo.png")))
+        self.assertFalse(checker.path_exists(str(self.root / "other.png")))
+        self.assertFalse(checker.path_exists(str(self.root / "none" / "a.png")))
+        self.assertEqual(len(checker._listings), 2)
+    
+    def test_path_exists_case_insensitive(self):
+        """Test that names in other case defer to the file system"""
+        checker = LinkChecker()
+        with mock.patch('core.link_checker.os.path.exists', return_value=True) as exists:
+            self.assertTrue(checker.path_exists(str(self.root / "LOGO.png")))
+            self.assertTrue(checker.path_exists(str(self.root / "logo.png")))
+        exists.assert_called_once()
+    
+    def test_export_batch_progress(self):
+        """Test that files that cannot be read still advance the progress"""
+        output = Path(self.temp_dir.name) / "out"
+        calls = []
+        sources = [self.root / "missing.md", self.root / "index.md"]
+        
+        result = Exporter(MarkdownProcessor()).export_batch(
+            sources, self.root, output, progress=lambda done, total: calls.append((done, total)))
+        
+        self.assertEqual(result.exported, 1)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(calls, [(1, 2), (2, 2)])
+    
+    def test_export_batch(self):
+        """Test that local and remote problems are found, each URL requested once"""
+        output = Path(self.temp_dir.name) / "out"
+        checker = LinkChecker(check_remote=True, endpoint=self.endpoint)
+        sources = [self.root / "index.md", self.root / "sub" / "guide.md"]
+        
+        result = Exporter(MarkdownProcessor()).export_batch(sources, self.root, output, checker=checker)
+        
+        self.assertEqual(result.exported, 2)
+        self.assertEqual(result.errors, [])
+        self.assertTrue((output / "sub" / "guide.html").exists())
+        problems = sorted((p.source.name, p.kind, p.target, p.reason) for p in result.problems)
+        self.assertEqual(problems, [
+            ("guide.md", "link", "https://example.com/missing", "HTTP 404"),
+            ("index.md", "image", "gone.png", "file not found"),
+            ("index.md", "link", "#nowhere", "no heading #nowhere"),
+            ("index.md", "link", "https://example.com/missing", "HTTP 404"),
+            ("index.md", "link", "sub/guide.md#nope", "no heading #nope"),
+        ])
+        self.assertEqual(sorted(StubHandler.requests),
+                         ["https://example.com/a", "https://example.com/missing"])
+        
+        # Results are reused for the rest of the run
+        checker.check_urls(["https://example.com/a"])
+        self.assertEqual(checker.requests_sent, 2)
+    
+    def test_remote_checks_disabled(self):
+        """Test that no requests are sent unless remote checking is enabled"""
+        checker = LinkChecker(check_remote=False, endpoint=self.endpoint)
+        self.assertEqual(checker.check_urls(["https://example.com/missing"]),
+                         {"https://example.com/missing": None})
+        self.assertEqual(StubHandler.requests, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for LinkIndex
+"""
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.link_index import LinkIndex, is_external, link_at
+from core.workspace_index import WorkspaceIndex
+
+class TestLinkIndex(unittest.TestCase):
+    """Test cases for LinkIndex"""
+    
+    def setUp(self):
+        """Create a small workspace"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / "docs").mkdir()
+        (self.root / "index.md").write_text(
+            "# Home\n\n[guide](docs/guide.md#install-it)\n[missing](nope.md)\n"
+            "[bad anchor](docs/guide.md#nothing)\n[top](#home)\n[web](https://example.com)\n",
+            encoding='utf-8'
+        )
+        (self.root / "docs" / "guide.md").write_text(
+            "# Guide\n\n## Install it\n\n[home](/index.md)\n", encoding='utf-8'
+        )
+        self.index = LinkIndex(self.root)
+        for path in self.root.rglob("*.md"):
+            self.index.update_file(str(path))
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_resolve(self):
+        """Test resolving links to files and headings"""
+        source = str(self.root / "index.md")
+        target = self.index.resolve(source, "docs/guide.md#install-it")
+        self.assertEqual(target.path, (self.root / "docs" / "guide.md").resolve())
+        self.assertEqual(target.line, 2)
+        self.assertEqual(self.index.resolve(source, "#home").line, 0)
+        self.assertIsNone(self.index.resolve(source, "docs/guide.md#nothing"))
+        self.assertIsNone(self.index.resolve(source, "https://example.com"))
+        
+        root_relative = self.index.resolve(str(self.root / "docs" / "guide.md"), "/index.md")
+        self.assertEqual(root_relative.path, (self.root / "index.md").resolve())
+    
+    def test_check(self):
+        """Test that broken files and anchors are reported"""
+        broken = self.index.check(str(self.root / "index.md"))
+        self.assertEqual([(b.line, b.target, b.reason) for b in broken], [
+            (3, "nope.md", "file not found"),
+            (4, "docs/guide.md#nothing", "no heading #nothing"),
+        ])
+        self.assertEqual(len(self.index.broken_links()), 2)
+    
+    def test_incremental_update(self):
+        """Test that updating a file changes resolution and backlinks"""
+        guide = str(self.root / "docs" / "guide.md")
+        self.assertEqual(self.index.backlinks(guide), [(self.root / "index.md").resolve()])
+        
+        self.index.update_file(guide, "# Guide\n\n## Install\n")
+        self.assertIsNone(self.index.resolve(str(self.root / "index.md"), "docs/guide.md#install-it"))
+        self.assertEqual(self.index.backlinks(str(self.root / "index.md")), [])
+        
+        self.index.remove_file(str(self.root / "index.md"))
+        self.assertEqual(self.index.backlinks(guide), [])
+    
+    def test_load_from_workspace_index(self):
+        """Test loading outlines stored by the workspace index"""
+        with tempfile.TemporaryDirectory() as index_dir:
+            workspace = WorkspaceIndex(self.root, Path(index_dir))
+            workspace.update()
+            index = LinkIndex(self.root)
+            index.load(workspace.outlines())
+            workspace.close()
+        
+        self.assertEqual(len(index), 2)
+        target = index.resolve(str(self.root / "index.md"), "docs/guide.md#install-it")
+        self.assertEqual(target.line, 2)
+    
+    def test_helpers(self):
+        """Test external link detection and finding the link at a column"""
+        self.assertTrue(is_external("mailto:me@example.com"))
+        self.assertFalse(is_external("C:/docs/a.md"))
+        self.assertFalse(is_external("a.md#b"))
+        
+        line = "See [a](a.md) and [b](b.md#x)."
+        self.assertEqual(link_at(line, 6), "a.md")
+        self.assertEqual(link_at(line, 20), "b.md#x")
+        self.assertIsNone(link_at(line, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,16 @@
 """
 Unit tests for MarkdownProcessor
 """
+import io
 import unittest
 import sys
+from contextlib import redirect_stdout
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from markdown.preprocessors import Preprocessor
 from core.markdown_processor import MarkdownProcessor
 
 class TestMarkdownProcessor(unittest.TestCase):
@@ -113,6 +116,116 @@ class TestMarkdownProcessor(unittest.TestCase):
         self.assertEqual(toc[0][0], 1)  # Level 1
         self.assertEqual(toc[1][0], 2)  # Level 2
         self.assertEqual(toc[2][0], 3)  # Level 3
+    
+    def test_render_block_cached(self):
+        """Test that rendered blocks are served from the fragment cache"""
+        key = self.processor.block_key("**cached**")
+        html = self.processor.render_block("**cached**", key=key)
+        
+        self.assertIn('<strong>cached</strong>', html)
+        self.assertEqual(self.processor.get_cached_block(key), html)
+    
+    def test_render_block_definitions(self):
+        """Test that reference links resolve across blocks"""
+        html = self.processor.render_block("[docs][d]", "[d]: https://example.com")
+        
+        self.assertIn('href="https://example.com"', html)
+    
+    def test_render_block_footnotes(self):
+        """Test that footnotes resolve across blocks and are listed where defined"""
+        model = self.processor.parse_document("Note[^b] and[^a].\n\n[^a]: Ay\n\n[^b]: Bee")
+        fragments = [self.processor.render_block(model.block_text(i), model.definitions)
+                     for i in range(len(model))]
+        
+        self.assertIn('href="#fn:b">2</a>', fragments[0])
+        self.assertNotIn('class="footnote"', fragments[0])
+        self.assertIn('<li id="fn:a">', fragments[1])
+        self.assertNotIn('fn:b', fragments[1])
+        self.assertIn('footnote 2', fragments[2])
+    
+    def test_repeated_heading_ids(self):
+        """Test that headings repeated in other blocks get the table of contents' ids"""
+        text = "## Setup\n\nText\n\n## Setup\n\n## Setup"
+        model = self.processor.parse_document(text)
+        fragments = [self.processor.apply_heading_ids(
+            self.processor.render_block(model.block_text(i), model.definitions), model, i)
+            for i in range(len(model))]
+        
+        self.assertIn('id="setup_1"', fragments[2])
+        self.assertIn('href="#setup_2"', fragments[3])
+        self.assertIn('href="#setup_2"', self.processor.build_toc_html(text))
+    
+    def test_render_block_error(self):
+        """Test that a block an extension fails on is shown as its source"""
+        calls = []
+        
+        class Failing(Preprocessor):
+            def run(self, lines):
+                calls.append(lines)
+                if any('boom' in line for line in lines):
+                    raise ValueError("bad block")
+                return lines
+        
+        self.processor.md.preprocessors.register(Failing(self.processor.md), 'failing', 100)
+        with redirect_stdout(io.StringIO()) as output:
+            html = self.processor.render_block("boom <b>")
+            again = self.processor.render_block("boom <b>")
+        
+        self.assertIn('class="mdr-render-error"', html)
+        self.assertIn('ValueError: bad block', html)
+        self.assertIn('boom &lt;b&gt;', html)
+        self.assertEqual(again, html)
+        self.assertEqual(len(calls), 1)  # not retried
+        self.assertIn("Warning", output.getvalue())
+        self.assertIn('<strong>fine</strong>', self.processor.render_block("**fine**"))
+    
+    def test_convert_block_error(self):
+        """Test that exports keep the blocks an extension does not fail on"""
+        class Failing(Preprocessor):
+            def run(self, lines):
+                if any('boom' in line for line in lines):
+                    raise ValueError("bad block")
+                return lines
+        
+        self.processor.md.preprocessors.register(Failing(self.processor.md), 'failing', 100)
+        with redirect_stdout(io.StringIO()) as output:
+            html = self.processor.convert("# Title\n\nboom <b>\n\n**fine**[^1]\n\n[^1]: Note")
+        
+        self.assertIn('class="mdr-render-error"', html)
+        self.assertIn('boom &lt;b&gt;', html)
+        self.assertIn('<h1 id="title">', html)
+        self.assertIn('<strong>fine</strong>', html)
+        self.assertIn('href="#fn:1"', html)
+        self.assertIn('href="#title"', html)  # table of contents
+        self.assertIn("Warning", output.getvalue())
+    
+    def test_convert_block_error_links(self):
+        """Test that the links of every block are collected when exports fall back"""
+        document = "# Intro\n\n[a](a.md) [b](#outro)\n\n# Outro\n\n[c](c.md)\n\n# Intro\n\n![i](i.png)"
+        self.processor.convert(document)
+        expected = self.processor.collected_links
+        
+        class Failing(Preprocessor):
+            def run(self, lines):
+                if any('boom' in line for line in lines):
+                    raise ValueError("bad block")
+                return lines
+        
+        self.processor.md.preprocessors.register(Failing(self.processor.md), 'failing', 100)
+        with redirect_stdout(io.StringIO()):
+            self.processor.convert(document + "\n\nboom")
+        
+        self.assertEqual(self.processor.collected_links, expected)
+        self.assertEqual(expected.ids, {'intro', 'outro', 'intro_1'})
+        self.assertEqual(expected.links[-1], '#intro_1')
+    
+    def test_toc_html(self):
+        """Test table of contents HTML built from headings"""
+        toc_html = self.processor.build_toc_html("# Title\n## Sub")
+        
+        self.assertIn('<div class="toc">', toc_html)
+        self.assertIn('href="#sub"', toc_html)
+        self.assertEqual(self.processor.build_toc_html("No headings"), "")
 
 if __name__ == '__main__':
     unittest.main()
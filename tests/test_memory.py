@@ -0,0 +1,62 @@
+"""
+Unit tests for memory accounting
+"""
+import os
+import shutil
+import subprocess
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.memory import MemoryBudget, UndoHistoryMeter, child_pids, resident_bytes
+
+class TestMemory(unittest.TestCase):
+    """Test cases for the memory helpers"""
+    
+    def test_undo_history_meter(self):
+        """Test the estimate and the budget of an undo history"""
+        meter = UndoHistoryMeter(max_bytes=1000)
+        self.assertFalse(meter.record_command())
+        self.assertFalse(meter.record_change(100))
+        self.assertEqual(meter.bytes, UndoHistoryMeter.COMMAND_BYTES + 200)
+        self.assertTrue(meter.record_change(400))
+        
+        meter.reset()
+        self.assertEqual((meter.bytes, meter.commands), (0, 0))
+        self.assertFalse(UndoHistoryMeter(max_bytes=0).record_change(10**9))
+    
+    def test_memory_budget_cooldown(self):
+        """Test that caches are released once per cooldown while over budget"""
+        budget = MemoryBudget(max_bytes=100, cooldown=60)
+        self.assertFalse(budget.should_release(100, now=0))
+        self.assertTrue(budget.should_release(101, now=1))
+        self.assertFalse(budget.should_release(500, now=30))
+        self.assertTrue(budget.should_release(500, now=62))
+        self.assertEqual(budget.releases, 2)
+    
+    @unittest.skipUnless(sys.platform.startswith('linux'), "reads /proc")
+    def test_process_sizes(self):
+        """Test reading resident sizes and child processes"""
+        self.assertGreater(resident_bytes(), 1024 * 1024)
+        child = subprocess.Popen([sys.executable, '-c', "import time; time.sleep(30)"])
+        try:
+            self.assertIn(child.pid, child_pids())
+            self.assertGreater(resident_bytes(child.pid), 0)
+        finally:
+            child.kill()
+            child.wait()
+        self.assertIsNone(resident_bytes(2**22 + os.getpid()))
+    
+    @unittest.skipUnless(shutil.which('ps'), "needs ps")
+    def test_ps_resident(self):
+        """Test reading the current resident size where /proc is missing"""
+        with mock.patch.object(sys, 'platform', 'darwin'), mock.patch.object(os, 'name', 'posix'):
+            self.assertGreater(resident_bytes(), 1024 * 1024)
+            self.assertIsNone(resident_bytes(2**22 + os.getpid()))
+
+if __name__ == '__main__':
+    unittest.main()
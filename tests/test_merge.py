@@ -0,0 +1,70 @@
+"""
+Unit tests for three-way merge
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.merge import merge3, has_conflict_markers, changed_span
+
+BASE = "# Title\n\nfirst\n\nsecond\n\nthird\n"
+
+class TestMerge3(unittest.TestCase):
+    """Test cases for merge3"""
+    
+    def test_one_side_changed(self):
+        """Test that changes from either side are taken over"""
+        theirs = BASE.replace("second", "SECOND")
+        self.assertEqual(merge3(BASE, BASE, theirs), (theirs, 0))
+        self.assertEqual(merge3(BASE, theirs, BASE), (theirs, 0))
+    
+    def test_disjoint_changes(self):
+        """Test that edits to different regions are combined"""
+        ours = BASE.replace("first", "FIRST")
+        theirs = BASE.replace("third", "THIRD") + "appended\n"
+        result = merge3(BASE, ours, theirs)
+        self.assertEqual(result.conflicts, 0)
+        self.assertEqual(result.text, "# Title\n\nFIRST\n\nsecond\n\nTHIRD\nappended\n")
+    
+    def test_same_change_on_both_sides(self):
+        """Test that identical edits do not conflict"""
+        changed = BASE.replace("second", "2nd")
+        self.assertEqual(merge3(BASE, changed, changed), (changed, 0))
+    
+    def test_conflict(self):
+        """Test that different edits to one region are marked"""
+        ours = BASE.replace("second", "mine")
+        theirs = BASE.replace("second", "theirs")
+        result = merge3(BASE, ours, theirs)
+        self.assertEqual(result.conflicts, 1)
+        self.assertIn("<<<<<<< editor\nmine\n=======\ntheirs\n>>>>>>> disk\n", result.text)
+        self.assertTrue(result.text.startswith("# Title\n\nfirst\n"))
+        self.assertTrue(has_conflict_markers(result.text))
+        self.assertFalse(has_conflict_markers(BASE))
+    
+    def test_conflict_without_final_newline(self):
+        """Test that markers stay on their own lines at the end of the text"""
+        result = merge3("a\nb", "a\nmine", "a\ntheirs")
+        self.assertEqual(result.text, "a\n<<<<<<< editor\nmine\n=======\ntheirs\n>>>>>>> disk\n")
+
+class TestChangedSpan(unittest.TestCase):
+    """Test cases for changed_span"""
+    
+    def test_span(self):
+        """Test that the common prefix and suffix are excluded"""
+        old, new = "hello brave world", "hello new world"
+        start, old_end, new_end = changed_span(old, new)
+        self.assertEqual(old[start:old_end], "brave")
+        self.assertEqual(new[start:new_end], "new")
+    
+    def test_identical_and_appended(self):
+        """Test identical texts and pure insertions"""
+        self.assertEqual(changed_span("abc", "abc"), (3, 3, 3))
+        self.assertEqual(changed_span("abc", "abcd"), (3, 3, 4))
+        self.assertEqual(changed_span("aaa", "aaaa"), (3, 3, 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the metrics registry
+"""
+import json
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.metrics import MetricsRegistry, timed
+from core.file_handler import FILE_ERRORS, FILE_SECONDS, FileHandler
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for counters, histograms and their export"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = MetricsRegistry(namespace="test")
+    
+    def test_histogram_statistics(self):
+        """Test bucket counts and quantile estimates"""
+        histogram = self.registry.histogram('work_seconds', "Work", ('kind',),
+                                            buckets=(0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5):
+            histogram.observe(value, kind='a')
+        
+        labels, stats = histogram.samples()[0]
+        self.assertEqual(labels, {'kind': 'a'})
+        self.assertEqual(stats['count'], 4)
+        self.assertAlmostEqual(stats['sum'], 0.605)
+        self.assertEqual([count for _, count in stats['buckets']], [1, 3, 4, 4])
+        self.assertTrue(0.01 <= histogram.quantile(0.5, kind='a') <= 0.1)
+        self.assertEqual(histogram.quantile(1.0, kind='a'), 0.5)
+        self.assertIsNone(histogram.quantile(0.5, kind='b'))
+        
+        with self.assertRaises(ValueError):
+            histogram.observe(1.0)
+        self.assertIs(self.registry.histogram('work_seconds', "Work", ('kind',)), histogram)
+        with self.assertRaises(ValueError):
+            self.registry.counter('work_seconds', "Work")
+    
+    def test_export(self):
+        """Test the Prometheus text and JSON formats"""
+        counter = self.registry.counter('hits_total', "Cache hits", ('cache',))
+        counter.inc(cache='a"b')
+        counter.inc(2, cache='a"b')
+        histogram = self.registry.histogram('load_seconds', "Loads", buckets=(0.5,))
+        histogram.observe(0.25)
+        
+        text = self.registry.to_prometheus()
+        self.assertIn('# TYPE test_hits_total counter', text)
+        self.assertIn('test_hits_total{cache="a\\"b"} 3', text)
+        self.assertIn('test_load_seconds_bucket{le="0.5"} 1', text)
+        self.assertIn('test_load_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn('test_load_seconds_count 1', text)
+        
+        exported = {m['name']: m for m in json.loads(self.registry.to_json())['metrics']}
+        self.assertEqual(exported['test_hits_total']['series'][0]['value'], 3)
+        self.assertEqual(exported['test_load_seconds']['series'][0]['buckets'][-1], ["+Inf", 1])
+        
+        rows = self.registry.rows()
+        self.assertEqual([row.name for row in rows], ['hits_total', 'load_seconds'])
+        self.assertEqual(rows[1].mean, 0.25)
+        
+        self.registry.reset()
+        self.assertEqual(self.registry.rows(), [])
+    
+    def test_timed(self):
+        """Test timing calls and counting failed ones"""
+        histogram = self.registry.histogram('call_seconds', "Calls")
+        errors = self.registry.counter('call_errors_total', "Failed calls")
+        
+        @timed(histogram, errors)
+        def call(success):
+            if success is None:
+                raise RuntimeError("boom")
+            return success, ""
+        
+        call(True)
+        call(False)
+        with self.assertRaises(RuntimeError):
+            call(None)
+        self.assertEqual(histogram.samples()[0][1]['count'], 3)
+        self.assertEqual(errors.value(), 2)
+        
+        # FileHandler is instrumented through the process-wide registry
+        before = FILE_ERRORS.value(operation='open')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertFalse(FileHandler().open_file(str(Path(temp_dir) / "missing.md"))[0])
+        self.assertEqual(FILE_ERRORS.value(operation='open'), before + 1)
+        self.assertIsNotNone(FILE_SECONDS.quantile(0.5, operation='open'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Unit tests for the Markdown outline scanner
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import markdown
+import config
+from core.outline import scan_outline
+
+def toc_ids(text):
+    """Get the heading ids the toc extension assigns in a full render"""
+    md = markdown.Markdown(extensions=config.MARKDOWN_EXTENSIONS,
+                           extension_configs=config.MARKDOWN_EXTENSION_CONFIGS)
+    md.convert(text)
+    
+    ids = []
+    def walk(tokens):
+        for token in tokens:
+            ids.append(token['id'])
+            walk(token['children'])
+    walk(md.toc_tokens)
+    return ids
+
+class TestScanOutline(unittest.TestCase):
+    """Test cases for scan_outline"""
+    
+    def assertMatchesToc(self, text):
+        """Assert that scanned anchors equal the rendered heading ids"""
+        self.assertEqual([h.anchor for h in scan_outline(text).headings], toc_ids(text))
+    
+    def test_duplicate_headings(self):
+        """Test that repeated headings are numbered like the toc extension"""
+        self.assertMatchesToc("# Setup\n\n## Setup\n\n## Setup\n")
+    
+    def test_explicit_ids(self):
+        """Test that attr_list ids are kept and reserved"""
+        text = "# Intro {#setup}\n\n## Setup\n"
+        self.assertMatchesToc(text)
+        self.assertEqual(scan_outline(text).headings[0].title, "Intro")
+    
+    def test_inline_markup(self):
+        """Test that titles and anchors ignore inline markup and entities"""
+        text = "# Using `code` &amp; **bold** [links](x.md)\n\nSub\n---\n"
+        self.assertMatchesToc(text)
+        self.assertEqual(scan_outline(text).headings[0].title, "Using code & bold links")
+    
+    def test_fenced_code_skipped(self):
+        """Test that headings and links in fenced code are ignored"""
+        outline = scan_outline("# A\n\n~~~\n# B\n[x](y.md)\n~~~\n\n[z](w.md)\n")
+        self.assertEqual([h.title for h in outline.headings], ["A"])
+        self.assertEqual(outline.links, [(7, "w.md")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Unit tests for PreviewStateCache
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.document_model import DocumentModel
+from core.preview_state import PreviewState, PreviewStateCache
+
+class TestPreviewStateCache(unittest.TestCase):
+    """Test cases for PreviewStateCache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache = PreviewStateCache(max_entries=2)
+    
+    def _state(self, revision):
+        return PreviewState(revision, DocumentModel(), '', 0.0)
+    
+    def test_put_and_get(self):
+        """Test that a stored snapshot is returned"""
+        state = self._state(1)
+        self.cache.put('a', state)
+        self.assertEqual(self.cache.get('a'), state)
+        self.assertIsNone(self.cache.get('b'))
+    
+    def test_bounded(self):
+        """Test that the least recently used snapshot is dropped"""
+        self.cache.put('a', self._state(1))
+        self.cache.put('b', self._state(2))
+        self.cache.get('a')
+        self.cache.put('c', self._state(3))
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+    
+    def test_discard(self):
+        """Test that a snapshot can be dropped explicitly"""
+        self.cache.put('a', self._state(1))
+        self.cache.discard('a')
+        self.cache.discard('missing')
+        self.assertIsNone(self.cache.get('a'))
+
+if __name__ == '__main__':
+    unittest.main()
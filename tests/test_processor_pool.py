@@ -0,0 +1,80 @@
+"""
+Unit tests for ProcessorPool
+"""
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.processor_pool import ProcessorPool
+
+class TestProcessorPool(unittest.TestCase):
+    """Test cases for ProcessorPool"""
+    
+    def test_processor_reused(self):
+        """Test that a returned processor is handed out again"""
+        pool = ProcessorPool(size=2)
+        with pool.acquire() as first:
+            pass
+        with pool.acquire() as second:
+            self.assertIs(first, second)
+    
+    def test_processors_share_diagrams(self):
+        """Test that all processors of a pool share one diagram cache"""
+        pool = ProcessorPool(size=2)
+        with pool.acquire() as first, pool.acquire() as second:
+            self.assertIsNot(first, second)
+            self.assertIs(first.diagrams, pool.diagrams)
+            self.assertIs(second.diagrams, pool.diagrams)
+    
+    def test_exhausted_pool_times_out(self):
+        """Test that acquiring from a fully used pool gives up after the timeout"""
+        pool = ProcessorPool(size=1)
+        with pool.acquire():
+            with self.assertRaises(TimeoutError):
+                with pool.acquire(timeout=0.01):
+                    pass
+    
+    def test_waiter_gets_released_processor(self):
+        """Test that a waiting caller receives the processor once it is returned"""
+        pool = ProcessorPool(size=1)
+        received = []
+        
+        def worker():
+            with pool.acquire(timeout=5) as processor:
+                received.append(processor)
+        
+        with pool.acquire() as processor:
+            thread = threading.Thread(target=worker)
+            thread.start()
+        thread.join()
+        self.assertEqual(received, [processor])
+    
+    def test_release_caches(self):
+        """Test that released caches keep only the requested fragments"""
+        pool = ProcessorPool(size=1)
+        with pool.acquire() as processor:
+            keep = processor.block_key("# Keep")
+            processor.render_block("# Keep", key=keep)
+            processor.render_block("# Drop")
+        pool.diagrams.put("abc", "<svg/>")
+        before = pool.memory_usage()
+        
+        pool.release_caches({int(keep, 16)})
+        with pool.acquire() as again:
+            self.assertIs(again, processor)
+            self.assertEqual(len(processor.fragments), 1)
+            self.assertIsNotNone(processor.get_cached_block(keep))
+        self.assertIsNone(pool.diagrams.get("abc"))
+        self.assertLess(pool.memory_usage(), before)
+    
+    def test_invalid_size(self):
+        """Test that an empty pool is rejected"""
+        with self.assertRaises(ValueError):
+            ProcessorPool(size=0)
+
+if __name__ == '__main__':
+    unittest.main()
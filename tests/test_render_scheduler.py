@@ -0,0 +1,62 @@
+"""
+Unit tests for PreviewScheduler
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.render_scheduler import PreviewScheduler
+
+class TestPreviewScheduler(unittest.TestCase):
+    """Test cases for PreviewScheduler"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scheduler = PreviewScheduler(min_delay_ms=30, max_delay_ms=1500, max_wait_ms=2000)
+    
+    def test_initial_delay_is_minimum(self):
+        """Test that an unmeasured scheduler uses the minimum delay"""
+        self.assertEqual(self.scheduler.next_delay(now=0.0), 30)
+    
+    def test_delay_follows_render_cost(self):
+        """Test that slow renders stretch the debounce delay"""
+        self.scheduler.record_render(0.2)
+        self.assertEqual(self.scheduler.next_delay(now=0.0), 400)
+    
+    def test_delay_is_clamped(self):
+        """Test that the delay never exceeds the maximum"""
+        self.scheduler.record_render(5.0)
+        self.assertEqual(self.scheduler.next_delay(now=0.0), 1500)
+    
+    def test_delay_follows_typing_rate(self):
+        """Test that the delay waits for a pause in typing"""
+        for i in range(5):
+            self.scheduler.record_keystroke(now=i * 0.1)
+        self.scheduler.render_started()
+        self.assertEqual(self.scheduler.next_delay(now=0.4), 150)
+    
+    def test_long_pauses_ignored(self):
+        """Test that pauses between bursts do not count as typing gaps"""
+        self.scheduler.record_keystroke(now=0.0)
+        self.scheduler.record_keystroke(now=10.0)
+        self.assertIsNone(self.scheduler.typing_interval())
+    
+    def test_max_wait(self):
+        """Test that continuous typing cannot postpone rendering forever"""
+        self.scheduler.record_render(0.5)
+        self.scheduler.record_keystroke(now=0.0)
+        self.assertEqual(self.scheduler.next_delay(now=0.0), 1000)
+        self.assertEqual(self.scheduler.next_delay(now=1.5), 500)
+        self.assertEqual(self.scheduler.next_delay(now=3.0), 0)
+    
+    def test_render_clears_pending(self):
+        """Test that starting a render resets the max-wait window"""
+        self.scheduler.record_keystroke(now=0.0)
+        self.scheduler.render_started()
+        self.assertEqual(self.scheduler.next_delay(now=10.0), 30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the headless render server
+"""
+import asyncio
+import http.client
+import json
+import subprocess
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.render_server import RenderServer, RenderService
+
+class SlowService(RenderService):
+    """Service whose computed responses take a while, to fill the queue"""
+    
+    def respond(self, op, params):
+        time.sleep(0.3)
+        return super().respond(op, params)
+
+class TestRenderServer(unittest.TestCase):
+    """Test cases for RenderService and RenderServer"""
+    
+    def start(self, service, queue_size=8):
+        """Run a server on a free port in a background thread"""
+        loop = asyncio.new_event_loop()
+        server = RenderServer(service, queue_size)
+        listener = loop.run_until_complete(server.start('127.0.0.1', 0))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        
+        def stop():
+            asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        self.addCleanup(stop)
+        return listener.sockets[0].getsockname()[1]
+    
+    def post(self, connection, path, payload):
+        """Send a JSON request and decode the response"""
+        connection.request('POST', path, json.dumps(payload), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    
+    def test_endpoints_on_one_connection(self):
+        """Test render, statistics, batch and health over a kept-alive connection"""
+        port = self.start(RenderService(workers=1))
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        self.addCleanup(connection.close)
+        
+        status, result = self.post(connection, '/render', {'markdown': "---\ntitle: T\n---\n# Hi"})
+        self.assertEqual(status, 200)
+        self.assertIn("<title>T</title>", result['html'])
+        self.assertEqual(result['metadata'], {'title': 'T'})
+        
+        status, result = self.post(connection, '/render', {'markdown': "*x*", 'standalone': False})
+        self.assertEqual(result['html'], "<p><em>x</em></p>")
+        
+        status, result = self.post(connection, '/statistics', {'markdown': "one two\nthree"})
+        self.assertEqual((result['words'], result['lines']), (3, 2))
+        
+        status, result = self.post(connection, '/batch', {'requests': [
+            {'op': 'statistics', 'markdown': "a"},
+            {'markdown': 5},
+            {'markdown': "*x*", 'standalone': False},
+        ]})
+        self.assertEqual(status, 200)
+        self.assertEqual(result['results'][0]['words'], 1)
+        self.assertIn('error', result['results'][1])
+        self.assertEqual(result['results'][2]['html'], "<p><em>x</em></p>")
+        
+        connection.request('GET', '/health')
+        health = json.loads(connection.getresponse().read())
+        self.assertEqual(health['cache_hits'], 1)  # the repeated fragment
+        self.assertEqual(health['computed'], 4)
+    
+    def test_errors(self):
+        """Test responses to bad requests"""
+        port = self.start(RenderService(workers=1))
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        self.addCleanup(connection.close)
+        
+        self.assertEqual(self.post(connection, '/render', {'markdown': "x", 'theme': "none"})[0], 400)
+        self.assertEqual(self.post(connection, '/missing', {})[0], 404)
+        for layout in ("../../etc/passwd.html", "no-such-layout"):
+            markdown_text = f"---\nlayout: {layout}\n---\nx"
+            self.assertEqual(self.post(connection, '/render', {'markdown': markdown_text})[0], 400)
+        connection.request('POST', '/render', "{not json")
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 400)
+        connection.request('GET', '/render')
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 405)
+    
+    def test_backpressure(self):
+        """Test that requests beyond the queue are refused with 503"""
+        port = self.start(SlowService(workers=1), queue_size=1)
+        statuses = []
+        
+        def send(number):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            statuses.append(self.post(connection, '/render', {'markdown': f"doc {number}"})[0])
+            connection.close()
+        
+        threads = [threading.Thread(target=send, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(sorted(statuses), [200, 200, 503, 503])
+    
+    def test_no_qt_import(self):
+        """Test that the server runs without Qt"""
+        code = "import sys, core.render_server; sys.exit('PyQt6' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent)
+        self.assertEqual(result.returncode, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for incremental static site builds
+"""
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.exporter import Exporter
+from core.markdown_processor import MarkdownProcessor
+
+class TestSiteBuilder(unittest.TestCase):
+    """Test cases for SiteBuilder through Exporter.export_site"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = Path(self.temp_dir.name) / "docs"
+        self.output = Path(self.temp_dir.name) / "site"
+        self.exporter = Exporter(MarkdownProcessor())
+        
+        self.write("a.md", "# Alpha\n\nSee [beta](guide/b.md#part) and [zeta](z.md).")
+        self.write("guide/b.md", "# Beta\n\n## Part\n\nText.")
+        self.write("d.md", "---\ntitle: Delta\n---\nNo heading.")
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+    
+    def write(self, name, text):
+        """Write a source file with a new modification time"""
+        path = self.source / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        mtime = path.stat().st_mtime_ns + 10**9 if path.exists() else None
+        path.write_text(text, encoding='utf-8')
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+    
+    def build(self, theme_css="body {}"):
+        """Build the site"""
+        return self.exporter.export_site(self.source, self.output, theme_css)
+    
+    def test_first_build(self):
+        """Test pages, shared stylesheet, navigation and contents"""
+        result = self.build()
+        self.assertEqual(sorted(result.built), ["a.md", "d.md", "guide/b.md"])
+        self.assertEqual(result.errors, [])
+        
+        page = (self.output / "a.html").read_text(encoding='utf-8')
+        self.assertIn('href="guide/b.html#part"', page)
+        self.assertIn('href="z.md"', page)  # not a page
+        self.assertIn('<link rel="stylesheet" href="assets/site.css">', page)
+        self.assertNotIn("Base styles", page)
+        self.assertIn('rel="next" href="d.html">Delta &rarr;', page)
+        
+        nested = (self.output / "guide" / "b.html").read_text(encoding='utf-8')
+        self.assertIn('href="../assets/site.css"', nested)
+        self.assertIn('rel="prev" href="../d.html"', nested)
+        
+        self.assertIn("body {}", (self.output / "assets" / "site.css").read_text(encoding='utf-8'))
+        contents = (self.output / "contents.html").read_text(encoding='utf-8')
+        self.assertIn('<a href="guide/b.html">Beta</a>', contents)
+    
+    def test_unchanged_build(self):
+        """Test that a second build renders nothing"""
+        self.build()
+        self.write("a.md", (self.source / "a.md").read_text(encoding='utf-8'))  # touched only
+        
+        result = self.build()
+        self.assertEqual(result.built, [])
+        self.assertEqual(result.unchanged, 3)
+    
+    def test_edit_rebuilds_page(self):
+        """Test that editing a page's body rebuilds only that page"""
+        self.build()
+        self.write("guide/b.md", "# Beta\n\n## Part\n\nNew text.")
+        
+        self.assertEqual(self.build().built, ["guide/b.md"])
+        self.assertIn("New text", (self.output / "guide" / "b.html").read_text(encoding='utf-8'))
+    
+    def test_title_change_rebuilds_neighbours(self):
+        """Test that a new title rebuilds the pages whose navigation shows it"""
+        self.build()
+        self.write("d.md", "---\ntitle: Omega\n---\nNo heading.")
+        
+        self.assertEqual(sorted(self.build().built), ["a.md", "d.md", "guide/b.md"])
+        self.assertIn("Omega", (self.output / "contents.html").read_text(encoding='utf-8'))
+    
+    def test_new_link_target(self):
+        """Test that adding a page rebuilds its neighbours and pages linking to it"""
+        self.build()
+        self.write("z.md", "# Zeta")
+        
+        result = self.build()
+        self.assertEqual(sorted(result.built), ["a.md", "d.md", "guide/b.md", "z.md"])
+        self.assertIn('href="z.html"', (self.output / "a.html").read_text(encoding='utf-8'))
+    
+    def test_removed_page(self):
+        """Test that a deleted source removes its page"""
+        self.build()
+        (self.source / "d.md").unlink()
+        
+        result = self.build()
+        self.assertEqual(result.removed, ["d.md"])
+        self.assertFalse((self.output / "d.html").exists())
+        self.assertEqual(sorted(result.built), ["a.md", "guide/b.md"])
+    
+    def test_theme_change(self):
+        """Test that a theme change only rewrites the stylesheet"""
+        self.build()
+        result = self.build("body { color: red; }")
+        
+        self.assertEqual(result.built, [])
+        self.assertIn("color: red", (self.output / "assets" / "site.css").read_text(encoding='utf-8'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for trace recording
+"""
+import json
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.tracing import Tracer, now
+
+class TestTracing(unittest.TestCase):
+    """Test cases for the Chrome trace-event writer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "trace.json"
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+    
+    def events(self, path=None):
+        """Load the non-metadata events of a trace file"""
+        events = json.loads((path or self.path).read_text(encoding='utf-8'))
+        return [event for event in events if event['ph'] != 'M']
+    
+    def test_spans(self):
+        """Test nested spans, instants and spans on a separate track"""
+        tracer = Tracer(self.path)
+        with tracer.span('ignored'):
+            pass
+        self.assertFalse(self.path.exists())
+        
+        self.assertTrue(tracer.start())
+        with tracer.span('outer', 'preview', blocks=3):
+            with tracer.span('inner'):
+                tracer.instant('keystroke', 'edit')
+        start = now()
+        tracer.complete('page.render', start, start + 0.002, 'page', track="Preview page")
+        tracer.stop()
+        
+        inner, outer, page = [e for e in self.events() if e['ph'] == 'X']
+        self.assertEqual((inner['name'], outer['name']), ('inner', 'outer'))
+        self.assertEqual(outer['args'], {'blocks': 3})
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+        self.assertNotEqual(page['tid'], outer['tid'])
+        self.assertAlmostEqual(page['dur'], 2000, delta=1)
+        
+        names = [e['args']['name'] for e in json.loads(self.path.read_text()) if e['ph'] == 'M']
+        self.assertIn("Preview page", names)
+    
+    def test_rotation(self):
+        """Test that full files are rotated and old ones dropped"""
+        tracer = Tracer(self.path, max_bytes=2000, backups=2)
+        tracer.start()
+        for index in range(100):
+            tracer.instant('event', index=index)
+        tracer.stop()
+        
+        self.assertTrue(self.path.with_name("trace.json.2").exists())
+        self.assertFalse(self.path.with_name("trace.json.3").exists())
+        # Every file, rotated or not, is a complete trace
+        previous = self.events(self.path.with_name("trace.json.1"))
+        current = self.events()
+        self.assertEqual(current[-1]['args']['index'], 99)
+        self.assertEqual(previous[-1]['args']['index'] + 1, current[0]['args']['index'])
+
+if __name__ == '__main__':
+    unittest.main()
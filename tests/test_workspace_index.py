@@ -0,0 +1,121 @@
+"""
+Unit tests for WorkspaceIndex
+"""
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.workspace_index import WorkspaceIndex, parse_document, tokenize
+
+class TestParseDocument(unittest.TestCase):
+    """Test cases for Markdown parsing used by the index"""
+    
+    def test_tokenize(self):
+        """Test that terms are lowercased words"""
+        self.assertEqual(tokenize("Hello, World_2 café"), ['hello', 'world', '2', 'café'])
+    
+    def test_headings_and_links(self):
+        """Test that headings and link targets are extracted outside code"""
+        parsed = parse_document(
+            "# Title\n\nSee [setup](setup.md#install) and <https://example.com>.\n\n"
+            "```\n# not a heading\n[x](code.md)\n```\n\nSub\n---\n\n[ref]: other.md\n"
+        )
+        self.assertEqual(parsed.title, "Title")
+        self.assertEqual([(h.line, h.level, h.text) for h in parsed.headings],
+                         [(0, 1, "Title"), (9, 2, "Sub")])
+        self.assertEqual([target for _, target in parsed.links],
+                         ['setup.md#install', 'https://example.com', 'other.md'])
+        self.assertEqual(parsed.heading_terms['title'], 1)
+
+class TestWorkspaceIndex(unittest.TestCase):
+    """Test cases for WorkspaceIndex"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        base = Path(self.temp_dir.name)
+        self.root = base / "notes"
+        self.root.mkdir()
+        (self.root / "deploy.md").write_text("# Deploy runbook\n\nRestart the web servers.\n", encoding='utf-8')
+        (self.root / "sub").mkdir()
+        (self.root / "sub" / "db.md").write_text(
+            "# Database\n\nServers are listed in [deploy](../deploy.md#steps).\n", encoding='utf-8')
+        (self.root / ".git").mkdir()
+        (self.root / ".git" / "ignored.md").write_text("servers", encoding='utf-8')
+        (self.root / "notes.txt").write_text("servers", encoding='utf-8')
+        self.index = WorkspaceIndex(self.root, base / "index")
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.index.close()
+        self.temp_dir.cleanup()
+    
+    def test_update_indexes_markdown_files(self):
+        """Test that only Markdown files outside hidden folders are indexed"""
+        self.assertEqual(self.index.update(), (2, 0))
+        self.assertEqual(self.index.document_count(), 2)
+    
+    def test_incremental_update(self):
+        """Test that unchanged files are skipped and removed files dropped"""
+        self.index.update()
+        self.assertEqual(self.index.update(), (0, 0))
+        
+        path = self.root / "deploy.md"
+        path.write_text("# Deploy\n\nRollback steps.\n", encoding='utf-8')
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+        (self.root / "sub" / "db.md").unlink()
+        self.assertEqual(self.index.update(), (1, 1))
+        self.assertEqual([r.path.name for r in self.index.search("rollback")], ["deploy.md"])
+        self.assertEqual(self.index.search("database"), [])
+    
+    def test_search(self):
+        """Test that all terms must match and headings rank higher"""
+        self.index.update()
+        results = self.index.search("servers")
+        self.assertEqual({r.path.name for r in results}, {"deploy.md", "db.md"})
+        
+        results = self.index.search("database servers")
+        self.assertEqual([r.title for r in results], ["Database"])
+        self.assertEqual(results[0].line, 0)
+        
+        results = self.index.search("restart")
+        self.assertEqual(results[0].line, 2)
+        self.assertEqual(results[0].snippet, "Restart the web servers.")
+    
+    def test_prefix_search(self):
+        """Test that the last term matches as a prefix while typing"""
+        self.index.update()
+        self.assertEqual([r.path.name for r in self.index.search("datab")], ["db.md"])
+        self.assertEqual(self.index.search("datab "), [])
+    
+    def test_index_persists(self):
+        """Test that a reopened index does not need to read files again"""
+        self.index.update()
+        self.index.close()
+        self.index = WorkspaceIndex(self.root, Path(self.temp_dir.name) / "index")
+        self.assertEqual(self.index.document_count(), 2)
+        self.assertEqual(self.index.update(), (0, 0))
+    
+    def test_headings_and_links_to(self):
+        """Test heading and backlink lookups"""
+        self.index.update()
+        self.assertEqual([h.text for h in self.index.headings(str(self.root / "deploy.md"))],
+                         ["Deploy runbook"])
+        self.assertEqual(self.index.links_to("../deploy.md"), [(self.root / "sub" / "db.md", 2)])
+    
+    def test_update_file(self):
+        """Test re-indexing a single saved file"""
+        self.index.update()
+        path = self.root / "deploy.md"
+        path.write_text("# Deploy\n\nCanary release.\n", encoding='utf-8')
+        self.assertTrue(self.index.update_file(str(path)))
+        self.assertEqual([r.path.name for r in self.index.search("canary")], ["deploy.md"])
+        self.assertFalse(self.index.update_file(str(Path(self.temp_dir.name) / "outside.md")))
+
+if __name__ == '__main__':
+    unittest.main()
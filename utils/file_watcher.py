@@ -0,0 +1,115 @@
+"""
+Watch open files for changes made by other programs
+"""
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+import config
+
+class FileWatcher(QObject):
+    """
+    Report changes to watched files, once per burst of change events
+    
+    QFileSystemWatcher uses the platform's notification API (inotify,
+    FSEvents, ReadDirectoryChangesW). Files it cannot watch, e.g. on some
+    network drives, are polled for modification time and size instead.
+    """
+    
+    fileChanged = pyqtSignal(str)
+    
+    def __init__(self, debounce_ms: int = config.FILE_WATCH_DEBOUNCE_MS, parent=None):
+        """
+        Initialize the watcher
+        
+        Args:
+            debounce_ms: Quiet time after the last event before reporting
+        """
+        super().__init__(parent)
+        
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_event)
+        self._watched: Set[str] = set()
+        
+        # Paths with events waiting for the burst to end
+        self._pending: Set[str] = set()
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._flush)
+        
+        # Polling fallback: path -> last (mtime_ns, size)
+        self._polled: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(config.FILE_WATCH_POLL_MS)
+        self._poll_timer.timeout.connect(self._poll)
+    
+    def watch(self, file_path: str):
+        """
+        Start watching a file
+        
+        Args:
+            file_path: Path of the file
+        """
+        path = str(Path(file_path).resolve())
+        if path in self._watched:
+            return
+        
+        self._watched.add(path)
+        if not self._watcher.addPath(path):
+            self._polled[path] = self._stat(path)
+            self._poll_timer.start()
+    
+    def unwatch(self, file_path: str):
+        """
+        Stop watching a file
+        
+        Args:
+            file_path: Path of the file
+        """
+        path = str(Path(file_path).resolve())
+        self._watched.discard(path)
+        self._pending.discard(path)
+        self._watcher.removePath(path)
+        self._polled.pop(path, None)
+        if not self._polled:
+            self._poll_timer.stop()
+    
+    def _on_event(self, path: str):
+        """Collect an event and restart the quiet period"""
+        if path in self._watched:
+            self._pending.add(path)
+            self._debounce_timer.start()
+    
+    def _flush(self):
+        """Report every file that changed during the burst"""
+        paths, self._pending = self._pending, set()
+        for path in paths:
+            # Saving via a temporary file and rename replaces the watched
+            # file, which drops it from QFileSystemWatcher
+            if path not in self._polled and path not in self._watcher.files():
+                if not self._watcher.addPath(path):
+                    self._polled[path] = self._stat(path)
+                    self._poll_timer.start()
+            self.fileChanged.emit(path)
+    
+    def _poll(self):
+        """Check polled files for changes"""
+        for path, last in list(self._polled.items()):
+            current = self._stat(path)
+            if current != last:
+                self._polled[path] = current
+                # Retry native watching, e.g. once a deleted file is back
+                if current is not None and self._watcher.addPath(path):
+                    del self._polled[path]
+                self._on_event(path)
+        if not self._polled:
+            self._poll_timer.stop()
+    
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        """Get a file's modification time and size, or None if it is missing"""
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size